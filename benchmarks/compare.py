@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Compare two benchmark result files from run.py.
+
+Runs are matched by scenario and concurrency. A run counts as a regression
+when throughput drops, or p95 latency or peak RSS grows, by more than the
+threshold.
+
+Usage:
+    python benchmarks/compare.py baseline.json candidate.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def load_runs(path: Path) -> tuple[dict[str, Any], dict[tuple[str, int], dict]]:
+    data = json.loads(path.read_text())
+    runs = {
+        (result["scenario"], result["concurrency"]): result
+        for result in data["results"]
+    }
+    return data, runs
+
+
+def change(before: float | None, after: float | None) -> float | None:
+    """Relative change in percent, or None if it cannot be computed."""
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def fmt(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:+.1f}%"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Percent change that counts as a regression (default: 10)",
+    )
+    args = parser.parse_args()
+
+    baseline_data, baseline = load_runs(args.baseline)
+    candidate_data, candidate = load_runs(args.candidate)
+    if baseline_data.get("settings") != candidate_data.get("settings"):
+        print("⚠️  Runs used different settings; differences may not be meaningful")
+
+    print(
+        f"{baseline_data['environment'].get('git')} -> "
+        f"{candidate_data['environment'].get('git')}\n"
+    )
+    print(f"{'scenario':<14}{'conc':>5}{'pages/s':>12}{'p95':>12}{'peak RSS':>12}")
+
+    regressions = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        throughput = change(before["pages_per_sec"], after["pages_per_sec"])
+        p95 = change(
+            (before["latency_ms"] or {}).get("p95"),
+            (after["latency_ms"] or {}).get("p95"),
+        )
+        rss = change(before["peak_rss_mb"], after["peak_rss_mb"])
+        print(
+            f"{key[0]:<14}{key[1]:>5}{fmt(throughput):>12}{fmt(p95):>12}{fmt(rss):>12}"
+        )
+
+        if throughput is not None and throughput < -args.threshold:
+            regressions.append(f"{key[0]} x{key[1]}: throughput {fmt(throughput)}")
+        if p95 is not None and p95 > args.threshold:
+            regressions.append(f"{key[0]} x{key[1]}: p95 latency {fmt(p95)}")
+        if rss is not None and rss > args.threshold:
+            regressions.append(f"{key[0]} x{key[1]}: peak RSS {fmt(rss)}")
+
+    missing = sorted(baseline.keys() ^ candidate.keys())
+    if missing:
+        print(f"\nOnly in one file: {', '.join(f'{s} x{c}' for s, c in missing)}")
+
+    if regressions:
+        print(f"\n❌ Regressions beyond {args.threshold:g}%:")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.threshold:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Local HTTP server serving synthetic pages for benchmarks.
+
+Pages are generated on the fly, so every URL can be unique (no browser cache
+hits between captures) while staying reproducible. Page kinds:
+
+- ``text``: long article, mostly layout and text shaping
+- ``images``: grid of generated PNG images, one request per image
+- ``dom``: thousands of styled cards with shadows and gradients
+- ``scripted``: content rendered by JavaScript after a delayed fetch
+
+``scale`` multiplies the amount of content, and ``latency_ms`` delays every
+response to imitate a remote origin.
+"""
+
+import argparse
+import json
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_KINDS = ("text", "images", "dom", "scripted")
+
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo"
+).split()
+
+_STYLE = """
+body { font-family: sans-serif; margin: 0; padding: 24px; background: #f4f4f6; }
+.grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(220px, 1fr)); gap: 16px; }
+.card { background: linear-gradient(135deg, #fff, #e8ecf5); border-radius: 12px;
+        box-shadow: 0 4px 12px rgba(0, 0, 0, .15); padding: 12px; }
+.card h3 { margin: 0 0 8px; color: #223; }
+.card span { display: inline-block; padding: 2px 6px; margin: 2px; border-radius: 4px;
+             background: hsl(var(--hue), 70%, 85%); }
+img { width: 100%; height: auto; display: block; border-radius: 8px; }
+"""
+
+
+def _sentence(seed: int, length: int = 14) -> str:
+    words = [_WORDS[(seed * 7 + i * 13) % len(_WORDS)] for i in range(length)]
+    return " ".join(words).capitalize() + "."
+
+
+def _png(width: int, height: int, seed: int) -> bytes:
+    """Encode a gradient PNG without any imaging library."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)  # no filter
+        for x in range(width):
+            rows += bytes(
+                (
+                    (x * 255 // width + seed * 40) % 256,
+                    (y * 255 // height) % 256,
+                    seed * 53 % 256,
+                )
+            )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(bytes(rows), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def render_page(kind: str, n: int, scale: int) -> str:
+    """HTML for one synthetic page."""
+    if kind == "text":
+        body = "".join(
+            f"<h2>Section {i}</h2><p>{' '.join(_sentence(n + i + j) for j in range(8))}</p>"
+            for i in range(20 * scale)
+        )
+    elif kind == "images":
+        body = (
+            '<div class="grid">'
+            + "".join(
+                f'<div class="card"><img src="/asset/img/{n}-{i}.png" width="320" height="200">'
+                f"<h3>Image {i}</h3></div>"
+                for i in range(12 * scale)
+            )
+            + "</div>"
+        )
+    elif kind == "dom":
+        body = (
+            '<div class="grid">'
+            + "".join(
+                f'<div class="card" style="--hue: {(n * 31 + i * 17) % 360}"><h3>Card {i}</h3>'
+                + "".join(f"<span>tag {j}</span>" for j in range(8))
+                + f"<p>{_sentence(n + i)}</p></div>"
+                for i in range(150 * scale)
+            )
+            + "</div>"
+        )
+    elif kind == "scripted":
+        body = f"""<div id="app">Loading…</div>
+<script>
+fetch("/asset/data.json?n={n}&scale={scale}")
+  .then(r => r.json())
+  .then(items => {{
+    document.getElementById("app").innerHTML = '<div class="grid">' + items.map(
+      item => `<div class="card" style="--hue: ${{item.hue}}"><h3>${{item.title}}</h3><p>${{item.text}}</p></div>`
+    ).join("") + "</div>";
+  }});
+</script>"""
+    else:
+        raise ValueError(f"Unknown page kind: {kind}")
+
+    return (
+        f"<!doctype html><html><head><meta charset='utf-8'><title>{kind} {n}</title>"
+        f"<style>{_STYLE}</style></head><body><h1>{kind} page {n}</h1>{body}</body></html>"
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FixtureServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+
+        try:
+            if parsed.path.startswith("/page/"):
+                kind = parsed.path.removeprefix("/page/")
+                content = render_page(
+                    kind, int(query.get("n", 0)), int(query.get("scale", 1))
+                ).encode()
+                content_type = "text/html; charset=utf-8"
+            elif parsed.path.startswith("/asset/img/"):
+                seed = sum(int(part) for part in parsed.path[11:-4].split("-"))
+                content = _png(320, 200, seed)
+                content_type = "image/png"
+            elif parsed.path == "/asset/data.json":
+                n, scale = int(query.get("n", 0)), int(query.get("scale", 1))
+                time.sleep(0.05)  # a backend call the page has to wait for
+                content = json.dumps(
+                    [
+                        {
+                            "title": f"Item {i}",
+                            "text": _sentence(n + i),
+                            "hue": (n + i * 23) % 360,
+                        }
+                        for i in range(100 * scale)
+                    ]
+                ).encode()
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+        except ValueError:
+            self.send_error(400)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    Serves synthetic pages from a background thread.
+
+    Usage:
+        with FixtureServer() as server:
+            urls = server.urls(pages=20)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: int = 0):
+        super().__init__((host, port), _Handler)
+        self.latency_ms = latency_ms
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def url(self, kind: str, n: int, scale: int = 1) -> str:
+        """URL of one synthetic page."""
+        return f"{self.base_url}/page/{kind}?n={n}&scale={scale}"
+
+    def urls(
+        self, pages: int, mix: tuple[str, ...] = PAGE_KINDS, scale: int = 1
+    ) -> list[str]:
+        """``pages`` distinct URLs cycling through the page kinds in ``mix``."""
+        return [self.url(mix[i % len(mix)], i, scale) for i in range(pages)]
+
+
+def main() -> None:
+    """Serve the fixtures in the foreground for manual inspection."""
+    parser = argparse.ArgumentParser(description="Serve synthetic benchmark pages")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FixtureServer(port=args.port, latency_ms=args.latency_ms)
+    print(f"Serving on {server.base_url}, e.g. {server.url('dom', 1)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
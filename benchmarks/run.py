@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""Throughput benchmarks for the capture paths.
+
+Serves synthetic pages from a local fixture server and runs each scenario at
+several concurrency levels:
+
+- ``screenshot``: take_screenshot to local files, one shared BrowserPool
+- ``snapshot``: take_snapshot_to_s3 with a shared pool and UploadQueue
+- ``cli``: the CLI batch path (``--url-file --parallel N``), end to end
+- ``batch_handler``: the Lambda batch handler on its warm runtime
+
+S3 is moto's in-process mock unless --bucket is given. For a local S3
+stand-in such as MinIO, pass --bucket and set AWS_ENDPOINT_URL_S3.
+
+Each run reports pages/sec, per-page latency percentiles, per-stage timings,
+peak RSS of the process tree (Python, Playwright driver and Chromium) and
+bytes written or uploaded. Results are printed and saved as JSON for
+comparison across commits with compare.py.
+
+Usage:
+    python benchmarks/run.py --pages 40 --concurrency 1,2,4
+    python benchmarks/compare.py benchmarks/results/before.json benchmarks/results/after.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+
+# Benchmark the working tree, not whatever version happens to be installed
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(BENCHMARKS))
+
+import boto3  # noqa: E402
+from fixture_server import PAGE_KINDS, FixtureServer  # noqa: E402
+
+from playwright_s3_snapshot import cli, lambda_handler  # noqa: E402
+from playwright_s3_snapshot.batch import run_batch  # noqa: E402
+from playwright_s3_snapshot.browser_pool import (  # noqa: E402
+    BrowserPool,
+    process_tree_rss_mb,
+)
+from playwright_s3_snapshot.runtime import get_runtime  # noqa: E402
+from playwright_s3_snapshot.s3_upload import UploadQueue  # noqa: E402
+from playwright_s3_snapshot.screenshot import take_screenshot  # noqa: E402
+from playwright_s3_snapshot.snapshot import take_snapshot_to_s3  # noqa: E402
+from playwright_s3_snapshot.timings import (  # noqa: E402
+    StageTimer,
+    TimingSummary,
+    percentile,
+)
+
+SCENARIOS = ("screenshot", "snapshot", "cli", "batch_handler")
+
+MOTO_BUCKET = "benchmark-screenshots"
+
+
+class Measurement:
+    """Per-page latencies, stage timings and failures for one run."""
+
+    def __init__(self):
+        self.latencies_ms: list[float] = []
+        self.stages = TimingSummary()
+        self.failed = 0
+
+    def add(self, seconds: float, timings: dict[str, float] | None) -> None:
+        self.latencies_ms.append(seconds * 1000)
+        if timings:
+            self.stages.add(timings)
+
+    def fail(self, *_: Any) -> None:
+        self.failed += 1
+
+
+class PeakRss:
+    """Samples the resident memory of the whole process tree in the background."""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "PeakRss":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        rss = process_tree_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+
+@contextlib.contextmanager
+def timed_calls(module: Any, name: str, measurement: Measurement) -> Iterator[None]:
+    """Wrap an async capture function so every call's latency is recorded."""
+    original = getattr(module, name)
+
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await original(*args, **kwargs)
+        except Exception:
+            measurement.fail()
+            raise
+        measurement.add(time.perf_counter() - start, result.get("timings"))
+        return result
+
+    with patch.object(module, name, wrapper):
+        yield
+
+
+def bench_screenshot(
+    urls: list[str], concurrency: int, workdir: Path, measurement: Measurement, **_: Any
+) -> None:
+    output_dir = workdir / f"screenshot-c{concurrency}"
+
+    async def run() -> None:
+        async with BrowserPool(size=concurrency) as pool:
+
+            async def capture(index: int, url: str) -> None:
+                timer = StageTimer()
+                start = time.perf_counter()
+                await take_screenshot(
+                    url, str(output_dir / f"{index}.png"), pool=pool, timer=timer
+                )
+                measurement.add(time.perf_counter() - start, timer.as_dict())
+
+            await run_batch(
+                urls, capture, concurrency=concurrency, on_failure=measurement.fail
+            )
+
+    asyncio.run(run())
+
+
+def bench_snapshot(
+    urls: list[str],
+    concurrency: int,
+    bucket: str,
+    prefix: str,
+    measurement: Measurement,
+    **_: Any,
+) -> None:
+    async def run() -> None:
+        async with (
+            BrowserPool(size=concurrency) as pool,
+            UploadQueue(max_in_flight=concurrency) as uploads,
+        ):
+
+            async def capture(_: int, url: str) -> None:
+                start = time.perf_counter()
+                result = await take_snapshot_to_s3(
+                    url,
+                    bucket,
+                    key_prefix=prefix,
+                    pool=pool,
+                    upload_queue=uploads,
+                    key_strategy="unique",
+                )
+                measurement.add(time.perf_counter() - start, result["timings"])
+
+            # As in the CLI, extra workers hold finished captures while they
+            # upload so the browsers can move on
+            await run_batch(
+                urls, capture, concurrency=concurrency * 2, on_failure=measurement.fail
+            )
+
+    asyncio.run(run())
+
+
+def bench_cli(
+    urls: list[str],
+    concurrency: int,
+    workdir: Path,
+    bucket: str,
+    prefix: str,
+    measurement: Measurement,
+    **_: Any,
+) -> None:
+    url_file = workdir / f"urls-c{concurrency}.txt"
+    url_file.write_text("\n".join(urls) + "\n")
+    argv = [
+        "snapshot",
+        "--url-file",
+        str(url_file),
+        "--bucket",
+        bucket,
+        "--prefix",
+        prefix,
+        "--parallel",
+        str(concurrency),
+        "--retries",
+        "1",
+        "--quiet",
+    ]
+
+    # Run from the scratch directory so no config file in the checkout applies
+    with (
+        timed_calls(cli, "take_snapshot_to_s3", measurement),
+        contextlib.chdir(workdir),
+        patch.object(sys, "argv", argv),
+    ):
+        cli.main()
+
+
+def bench_batch_handler(
+    urls: list[str],
+    concurrency: int,
+    bucket: str,
+    prefix: str,
+    measurement: Measurement,
+    **_: Any,
+) -> None:
+    event = {"urls": urls, "bucket": bucket, "prefix": prefix, "parallel": concurrency}
+    with timed_calls(lambda_handler, "take_snapshot_to_s3", measurement):
+        lambda_handler.batch_handler(event, None)
+
+
+BENCHES: dict[str, Callable[..., None]] = {
+    "screenshot": bench_screenshot,
+    "snapshot": bench_snapshot,
+    "cli": bench_cli,
+    "batch_handler": bench_batch_handler,
+}
+
+
+def bytes_under_prefix(bucket: str, prefix: str) -> int:
+    s3 = boto3.client("s3")
+    total = 0
+    for page in s3.get_paginator("list_objects_v2").paginate(
+        Bucket=bucket, Prefix=prefix
+    ):
+        total += sum(obj["Size"] for obj in page.get("Contents", []))
+    return total
+
+
+def run_scenario(
+    scenario: str,
+    urls: list[str],
+    concurrency: int,
+    workdir: Path,
+    bucket: str,
+    run_id: str,
+) -> dict[str, Any]:
+    """Run one scenario at one concurrency level and summarise it."""
+    measurement = Measurement()
+    prefix = f"bench/{run_id}/{scenario}-c{concurrency}/"
+
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        BENCHES[scenario](
+            urls=urls,
+            concurrency=concurrency,
+            workdir=workdir,
+            bucket=bucket,
+            prefix=prefix,
+            measurement=measurement,
+        )
+        wall = time.perf_counter() - start
+
+    latencies = measurement.latencies_ms
+    result: dict[str, Any] = {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "pages": len(urls),
+        "succeeded": len(latencies),
+        "failed": measurement.failed,
+        "wall_s": round(wall, 3),
+        "pages_per_sec": round(len(latencies) / wall, 3) if wall else None,
+        "latency_ms": (
+            {
+                "p50": round(percentile(latencies, 50), 1),
+                "p95": round(percentile(latencies, 95), 1),
+                "max": round(max(latencies), 1),
+                "mean": round(sum(latencies) / len(latencies), 1),
+            }
+            if latencies
+            else None
+        ),
+        "peak_rss_mb": round(rss.peak_mb, 1) if rss.peak_mb is not None else None,
+        "stages": measurement.stages.summary(),
+    }
+    if scenario == "screenshot":
+        output_dir = workdir / f"screenshot-c{concurrency}"
+        result["bytes_written"] = sum(
+            path.stat().st_size for path in output_dir.glob("*") if path.is_file()
+        )
+    else:
+        result["bytes_uploaded"] = bytes_under_prefix(bucket, prefix)
+    return result
+
+
+@contextlib.contextmanager
+def s3_bucket(bucket: str | None, region: str) -> Iterator[str]:
+    """The bucket to upload to: a real one, or a fresh bucket in moto's mock."""
+    if bucket:
+        yield bucket
+        return
+
+    from moto import mock_aws
+
+    for key, value in {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": region,
+    }.items():
+        os.environ.setdefault(key, value)
+
+    with mock_aws():
+        boto3.client("s3", region_name=region).create_bucket(Bucket=MOTO_BUCKET)
+        yield MOTO_BUCKET
+
+
+def git_revision() -> str | None:
+    try:
+        revision = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision.stdout.strip()
+
+
+def environment() -> dict[str, Any]:
+    try:
+        playwright_version = metadata.version("playwright")
+    except metadata.PackageNotFoundError:
+        playwright_version = None
+    return {
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "playwright": playwright_version,
+    }
+
+
+def print_row(result: dict[str, Any]) -> None:
+    latency = result["latency_ms"] or {}
+    rss = result["peak_rss_mb"]
+    size = result.get("bytes_uploaded", result.get("bytes_written", 0))
+    print(
+        f"{result['scenario']:<14}{result['concurrency']:>5}"
+        f"{result['succeeded']:>6}/{result['pages']:<5}"
+        f"{result['pages_per_sec'] or 0:>9.2f}"
+        f"{latency.get('p50', 0):>9,.0f}{latency.get('p95', 0):>9,.0f}"
+        f"{latency.get('max', 0):>9,.0f}"
+        f"{rss if rss is not None else float('nan'):>10,.0f}"
+        f"{size / 1024 / 1024:>10.1f}"
+    )
+
+
+def parse_int_list(value: str) -> list[int]:
+    try:
+        numbers = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected integers, got: {value}") from None
+    if not numbers or min(numbers) < 1:
+        raise argparse.ArgumentTypeError("Values must be positive integers")
+    return numbers
+
+
+def parse_choices(choices: tuple[str, ...]) -> Callable[[str], list[str]]:
+    def parse(value: str) -> list[str]:
+        items = [part.strip() for part in value.split(",") if part.strip()]
+        unknown = sorted(set(items).difference(choices))
+        if not items or unknown:
+            raise argparse.ArgumentTypeError(
+                f"Choose from: {', '.join(choices)} (got: {value})"
+            )
+        return items
+
+    return parse
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark screenshot throughput against local fixture pages"
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=parse_choices(SCENARIOS),
+        default=list(SCENARIOS),
+        help=f"Comma-separated scenarios (default: {','.join(SCENARIOS)})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=parse_int_list,
+        default=[1, 2, 4],
+        help="Comma-separated concurrency levels (default: 1,2,4)",
+    )
+    parser.add_argument(
+        "--pages", type=int, default=20, help="Pages per run (default: 20)"
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_choices(PAGE_KINDS),
+        default=list(PAGE_KINDS),
+        help=f"Page kinds to cycle through (default: {','.join(PAGE_KINDS)})",
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="Content multiplier per page (default: 1)"
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=int,
+        default=0,
+        help="Delay added to every fixture response (default: 0)",
+    )
+    parser.add_argument(
+        "--bucket",
+        help="Upload to this real bucket instead of moto "
+        "(set AWS_ENDPOINT_URL_S3 for a local S3 stand-in)",
+    )
+    parser.add_argument("--region", default="us-east-1", help="AWS region")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="JSON results file (default: benchmarks/results/<time>-<git>.json)",
+    )
+    args = parser.parse_args()
+
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    info = environment()
+    output = args.output or (
+        BENCHMARKS / "results" / f"{run_id}-{info['git'] or 'unknown'}.json"
+    )
+
+    print(
+        f"{'scenario':<14}{'conc':>5}{'ok':>6} {'':<5}{'pages/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'RSS MB':>10}{'out MB':>10}"
+    )
+
+    results = []
+    with (
+        FixtureServer(latency_ms=args.latency_ms) as server,
+        s3_bucket(args.bucket, args.region) as bucket,
+        tempfile.TemporaryDirectory() as workdir,
+    ):
+        urls = server.urls(args.pages, tuple(args.mix), args.scale)
+        try:
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    result = run_scenario(
+                        scenario, urls, concurrency, Path(workdir), bucket, run_id
+                    )
+                    print_row(result)
+                    results.append(result)
+        finally:
+            # batch_handler keeps its browsers warm between runs, like Lambda
+            get_runtime().close()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "run_id": run_id,
+                "environment": info,
+                "settings": {
+                    "pages": args.pages,
+                    "mix": args.mix,
+                    "scale": args.scale,
+                    "latency_ms": args.latency_ms,
+                    "s3": "bucket" if args.bucket else "moto",
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    print(f"\nResults written to {output}")
+    return 1 if any(result["failed"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Concurrent batch engine for processing many URLs on one event loop."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from .scheduler import MAX_BACKOFF, HostScheduler, RateLimitedError
+
+# Marks the end of the work queue for a worker
+_DONE = object()
+
+
+async def run_batch(
+    items: Iterable[Any],
+    handler: Callable[[int, Any], Awaitable[Any]],
+    concurrency: int = 1,
+    attempts: int = 1,
+    retry_delay: float = 2.0,
+    on_success: Callable[[int, Any, Any], None] | None = None,
+    on_retry: Callable[[int, Any, int, Exception], None] | None = None,
+    on_failure: Callable[[int, Any, Exception], None] | None = None,
+    scheduler: HostScheduler | None = None,
+) -> dict[str, int]:
+    """
+    Run ``handler`` over ``items`` with a bounded pool of asyncio workers.
+
+    Items are fed through a small bounded queue, so ``items`` may be a lazy
+    iterator of any length. Retries happen inside the worker that owns the
+    item, using ``asyncio.sleep`` so other workers keep running meanwhile.
+    A RateLimitedError carrying a Retry-After delay stretches that wait.
+
+    With a ``scheduler``, workers pull items from it instead of taking them
+    in input order, so per-host limits hold and a rate-limited host is
+    paused for every item, not just the one that was refused.
+
+    Args:
+        items: URLs (or any job descriptions) to process
+        handler: Coroutine function called as ``handler(index, item)``;
+            index is 1-based
+        concurrency: Number of concurrent workers
+        attempts: Total attempts per item before it is reported as failed
+        retry_delay: Seconds to wait between attempts
+        on_success: Called as ``on_success(index, item, result)``
+        on_retry: Called as ``on_retry(index, item, attempt, error)`` after a
+            failed attempt that will be retried
+        on_failure: Called as ``on_failure(index, item, error)`` after the
+            last attempt failed
+        scheduler: Optional HostScheduler deciding which item runs next
+
+    Returns:
+        Summary dictionary:
+        {
+            "total": 10,
+            "successful": 9,
+            "failed": 1
+        }
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if attempts < 1:
+        raise ValueError("attempts must be at least 1")
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    summary = {"total": 0, "successful": 0, "failed": 0}
+
+    async def produce() -> None:
+        for index, item in enumerate(items, 1):
+            await queue.put((index, item))
+        for _ in range(concurrency):
+            await queue.put(_DONE)
+
+    async def next_job() -> tuple[int, Any] | None:
+        if scheduler is not None:
+            return await scheduler.get()
+        job = await queue.get()
+        return None if job is _DONE else job
+
+    async def attempt_all(job: tuple[int, Any]) -> None:
+        index, item = job
+        summary["total"] += 1
+        for attempt in range(1, attempts + 1):
+            try:
+                result = await handler(index, item)
+            except Exception as e:
+                delay = retry_delay
+                if isinstance(e, RateLimitedError):
+                    backoff = min(e.retry_after or retry_delay, MAX_BACKOFF)
+                    delay = max(delay, backoff)
+                    if scheduler is not None:
+                        scheduler.defer(job, backoff)
+                if attempt < attempts:
+                    if on_retry is not None:
+                        on_retry(index, item, attempt, e)
+                    await asyncio.sleep(delay)
+                    if scheduler is not None:
+                        await scheduler.wait_turn(job)
+                    continue
+                summary["failed"] += 1
+                if on_failure is not None:
+                    on_failure(index, item, e)
+            else:
+                summary["successful"] += 1
+                if on_success is not None:
+                    on_success(index, item, result)
+            break
+
+    async def work() -> None:
+        while True:
+            job = await next_job()
+            if job is None:
+                return
+            try:
+                await attempt_all(job)
+            finally:
+                if scheduler is not None:
+                    scheduler.release(job)
+
+    if scheduler is not None:
+        scheduler.feed(enumerate(items, 1))
+        tasks = []
+    else:
+        tasks = [asyncio.create_task(produce())]
+    tasks += [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return summary
@@ -0,0 +1,324 @@
+"""Persistent Chromium pool shared across many screenshots."""
+
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .cache import AssetCache
+
+# Chromium flags tuned for containerised / Lambda environments
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-dev-tools",
+    "--disable-setuid-sandbox",
+    "--no-first-run",
+    "--no-zygote",
+    "--single-process",
+    "--disable-background-timer-throttling",
+    "--disable-background-networking",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI",
+    "--disable-ipc-flooding-protection",
+]
+
+
+def async_playwright() -> Any:
+    """
+    Playwright's async context manager, imported on first use.
+
+    Importing playwright.async_api takes ~100ms, which the CLI's --help,
+    --create-config and config-only paths should not pay for.
+    """
+    from playwright.async_api import async_playwright as start_playwright
+
+    return start_playwright()
+
+
+def process_tree_rss_mb(pid: int | None = None) -> float | None:
+    """
+    Resident memory of a process and all of its descendants, in megabytes.
+
+    Playwright runs Chromium as a grandchild of the Python process (via the
+    Node driver), so the whole tree is summed. Returns None where /proc is
+    not available (e.g. macOS).
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+
+    root = os.getpid() if pid is None else pid
+    children: dict[int, list[int]] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces, so split after the closing paren
+        fields = stat.rsplit(")", 1)[-1].split()
+        children.setdefault(int(fields[1]), []).append(int(entry.name))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            resident_pages = int((proc / str(current) / "statm").read_text().split()[1])
+        except (OSError, IndexError, ValueError):
+            resident_pages = 0
+        total += resident_pages * page_size
+        stack.extend(children.get(current, []))
+
+    return total / (1024 * 1024)
+
+
+class _PooledBrowser:
+    """Bookkeeping for a single browser owned by the pool."""
+
+    def __init__(self, browser: Any):
+        self.browser = browser
+        self.active = 0
+        self.served = 0
+        self.retiring = False
+
+    def is_healthy(self) -> bool:
+        return self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Launches Chromium once and hands out isolated browser contexts per job.
+
+    Browser launch usually costs far more than rendering a single page, so the
+    pool keeps ``size`` browsers alive for its whole lifetime. Each job gets a
+    fresh ``BrowserContext`` (its own cookies, cache and storage) which is
+    closed when the job finishes. Browsers are recycled after serving
+    ``max_pages_per_browser`` contexts, when the browser process tree exceeds
+    ``max_memory_mb``, or when they crash.
+
+    Fresh contexts also mean an empty HTTP cache per job. Pass an AssetCache
+    to share static assets across contexts, browsers and runs.
+
+    Usage:
+        async with BrowserPool(size=2) as pool:
+            async with pool.context(viewport={"width": 1280, "height": 720}) as ctx:
+                page = await ctx.new_page()
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        contexts_per_browser: int = 1,
+        max_pages_per_browser: int = 100,
+        max_memory_mb: float | None = None,
+        headless: bool = True,
+        launch_args: list[str] | None = None,
+        cache: "AssetCache | None" = None,
+    ):
+        """
+        Initialize browser pool.
+
+        Args:
+            size: Number of Chromium instances to keep running
+            contexts_per_browser: Concurrent contexts allowed per browser
+            max_pages_per_browser: Contexts served before a browser is recycled
+            max_memory_mb: Recycle browsers when the process tree RSS exceeds this
+            headless: Run Chromium headless
+            launch_args: Chromium command-line flags (defaults to CHROMIUM_ARGS)
+            cache: Optional AssetCache installed on every context
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        if contexts_per_browser < 1:
+            raise ValueError("contexts_per_browser must be at least 1")
+
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_memory_mb = max_memory_mb
+        self.headless = headless
+        self.launch_args = list(CHROMIUM_ARGS if launch_args is None else launch_args)
+        self.cache = cache
+
+        self.launch_count = 0
+        self._playwright = None
+        self._browsers: list[_PooledBrowser] = []
+        self._condition: asyncio.Condition | None = None
+        self._closed = False
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of contexts that can be open at the same time."""
+        return self.size * self.contexts_per_browser
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Start Playwright and launch all browsers up front."""
+        if self._playwright is not None:
+            return
+
+        self._closed = False
+        self._condition = asyncio.Condition()
+        self._playwright = await async_playwright().start()
+
+        try:
+            async with self._condition:
+                while len(self._browsers) < self.size:
+                    await self._launch()
+        except Exception:
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        """Close every browser and stop Playwright."""
+        self._closed = True
+        browsers, self._browsers = self._browsers, []
+        for pooled in browsers:
+            await self._close_browser(pooled)
+
+        if self._playwright is not None:
+            playwright, self._playwright = self._playwright, None
+            try:
+                await playwright.stop()
+            except Exception:  # noqa: S110 - driver may have died
+                pass
+
+    def is_healthy(self) -> bool:
+        """
+        Whether the pool can keep serving contexts without a full restart.
+
+        Individually crashed browsers are replaced on demand, but if every
+        browser has disconnected the Playwright driver itself is most likely
+        gone and the pool should be closed and started again.
+        """
+        if self._playwright is None or self._closed:
+            return False
+        if not self._browsers:
+            return True
+        return any(pooled.is_healthy() for pooled in self._browsers)
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[Any]:
+        """
+        Borrow an isolated browser context for a single job.
+
+        Args:
+            **context_options: Passed through to ``Browser.new_context``
+
+        Yields:
+            A Playwright ``BrowserContext`` that is closed on exit
+        """
+        pooled = await self._acquire()
+        try:
+            browser_context = await pooled.browser.new_context(**context_options)
+        except Exception:
+            await self._release(pooled)
+            raise
+
+        if self.cache is not None:
+            try:
+                await self.cache.attach(browser_context)
+            except Exception:
+                await browser_context.close()
+                await self._release(pooled)
+                raise
+
+        try:
+            yield browser_context
+        finally:
+            try:
+                await browser_context.close()
+            except Exception:  # noqa: S110 - browser may already be gone
+                pass
+            await self._release(pooled)
+
+    async def _launch(self) -> _PooledBrowser:
+        """Launch a browser and register it. Caller must hold the condition."""
+        browser = await self._playwright.chromium.launch(
+            headless=self.headless, args=self.launch_args
+        )
+        pooled = _PooledBrowser(browser)
+        self._browsers.append(pooled)
+        self.launch_count += 1
+        return pooled
+
+    async def _acquire(self) -> _PooledBrowser:
+        if self._playwright is None or self._closed:
+            raise RuntimeError("BrowserPool is not started")
+
+        async with self._condition:
+            while True:
+                # Drop crashed browsers nobody is using; retire busy ones
+                for pooled in list(self._browsers):
+                    if not pooled.is_healthy():
+                        pooled.retiring = True
+                        if pooled.active == 0:
+                            self._browsers.remove(pooled)
+
+                available = [
+                    pooled
+                    for pooled in self._browsers
+                    if not pooled.retiring and pooled.active < self.contexts_per_browser
+                ]
+                if available:
+                    pooled = min(available, key=lambda b: b.active)
+                    pooled.active += 1
+                    return pooled
+
+                live = [pooled for pooled in self._browsers if not pooled.retiring]
+                if len(live) < self.size:
+                    pooled = await self._launch()
+                    pooled.active += 1
+                    return pooled
+
+                await self._condition.wait()
+
+    async def _release(self, pooled: _PooledBrowser) -> None:
+        to_close = None
+        async with self._condition:
+            pooled.active -= 1
+            pooled.served += 1
+
+            if (
+                pooled.served >= self.max_pages_per_browser
+                or not pooled.is_healthy()
+                or self._over_memory_limit()
+            ):
+                pooled.retiring = True
+
+            if pooled.retiring and pooled.active == 0 and pooled in self._browsers:
+                self._browsers.remove(pooled)
+                to_close = pooled
+
+            self._condition.notify_all()
+
+        if to_close is not None:
+            await self._close_browser(to_close)
+
+    def _over_memory_limit(self) -> bool:
+        if self.max_memory_mb is None:
+            return False
+        rss_mb = process_tree_rss_mb()
+        return rss_mb is not None and rss_mb > self.max_memory_mb
+
+    @staticmethod
+    async def _close_browser(pooled: _PooledBrowser) -> None:
+        try:
+            await pooled.browser.close()
+        except Exception:  # noqa: S110 - already disconnected
+            pass
@@ -0,0 +1,325 @@
+"""Shared on-disk cache of static assets across captures."""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import UTC
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+# Lambda's /tmp is 512MB by default; leave room for everything else
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+# Subresources worth keeping; documents and XHR/fetch are usually dynamic
+CACHEABLE_TYPES = ("stylesheet", "script", "image", "font")
+
+# Freshness for responses that say nothing about it, in seconds
+DEFAULT_TTL = 3600.0
+
+# Eviction frees down to this fraction of max_bytes so that every store
+# does not trigger another directory scan
+_EVICT_TO = 0.9
+
+# Bodies are stored decoded, so transfer-level headers no longer apply
+_DROPPED_HEADERS = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+    "connection",
+    "set-cookie",
+}
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*(?:s-maxage|max-age)\s*=\s*\"?(\d+)")
+
+# Names of entries (sha256 of the URL) and of entries being written; the
+# directory may be shared, so nothing else in it is ever counted or removed
+_ENTRY_NAME = re.compile(r"^[0-9a-f]{64}$")
+_TEMP_NAME = re.compile(r"^[0-9a-f]{64}\.\d+\.\d+\.tmp$")
+
+
+class AssetCache:
+    """
+    Serves stylesheets, scripts, images and fonts from a shared directory.
+
+    Pool contexts are incognito, so Chromium's HTTP cache starts empty for
+    every capture and is thrown away with the context; a batch of pages from
+    one site downloads the same assets again for every page. Installed on a
+    BrowserPool, this cache answers cacheable GET requests from disk, fetches
+    misses once and keeps responses the server allows to be cached
+    (no-store, no-cache and private are honoured, as are max-age and Expires;
+    other responses stay fresh for ``default_ttl``).
+
+    Least recently used entries are evicted once the directory grows beyond
+    ``max_bytes``. The directory outlives the process, so a warm Lambda
+    container or the next CLI run starts with what earlier ones fetched.
+
+    Usage:
+        cache = AssetCache("/tmp/ps3s-cache", max_bytes=128 * 1024 * 1024)
+        async with BrowserPool(cache=cache) as pool:
+            ...
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = DEFAULT_CACHE_SIZE,
+        default_ttl: float = DEFAULT_TTL,
+        resource_types: Iterable[str] = CACHEABLE_TYPES,
+    ):
+        """
+        Initialize the cache. The directory is created if needed.
+
+        Args:
+            directory: Where cached responses are kept
+            max_bytes: Size cap for the directory
+            default_ttl: Seconds a response without freshness headers is reused
+            resource_types: Playwright resource types that may be cached
+
+        Raises:
+            ValueError: If max_bytes or default_ttl is not positive
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got: {max_bytes}")
+        if default_ttl <= 0:
+            raise ValueError(f"default_ttl must be positive, got: {default_ttl}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.resource_types = frozenset(resource_types)
+
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self.bytes_served = 0
+
+        # Loads and stores run in worker threads
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    async def attach(self, context: Any) -> None:
+        """Install the cache on a Playwright browser context (or page)."""
+        await context.route("**/*", self._handle_route)
+
+    def stats(self) -> dict[str, int]:
+        """Counters since the cache was created, plus the directory size."""
+        with self._lock:
+            size = self._current_size()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "evicted": self.evicted,
+            "bytes_served": self.bytes_served,
+            "size": size,
+        }
+
+    def load(self, url: str) -> tuple[int, dict[str, str], bytes] | None:
+        """
+        A fresh cached response for ``url``, or None.
+
+        Returns:
+            (status, headers, body)
+        """
+        path = self._path(url)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("url") != url:
+            return None
+        if meta["expires"] <= time.time():
+            self._remove(path)
+            return None
+
+        # Modification time doubles as the last-used time for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return meta["status"], meta["headers"], body
+
+    def store(
+        self,
+        url: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+        ttl: float,
+    ) -> bool:
+        """
+        Keep a response for ``ttl`` seconds; returns False if it was too large.
+
+        A single entry may use at most a quarter of max_bytes.
+        """
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": {
+                name: value
+                for name, value in headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+            "expires": time.time() + ttl,
+        }
+        data = json.dumps(meta).encode() + b"\n" + body
+        if len(data) > self.max_bytes // 4:
+            return False
+
+        path = self._path(url)
+        temp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp.write_bytes(data)
+
+        with self._lock:
+            size = self._current_size()
+            try:
+                size -= path.stat().st_size
+            except OSError:
+                pass
+            # Atomic, so concurrent readers see the old or the new entry
+            os.replace(temp, path)
+            self._size = size + len(data)
+            self.stored += 1
+            if self._size > self.max_bytes:
+                self._evict()
+        return True
+
+    def clear(self) -> None:
+        """Remove every cached response, leaving other files in the directory."""
+        with self._lock:
+            for path in self.directory.iterdir():
+                if _ENTRY_NAME.match(path.name) or _TEMP_NAME.match(path.name):
+                    path.unlink(missing_ok=True)
+            self._size = 0
+
+    def freshness(self, headers: Mapping[str, str]) -> float | None:
+        """
+        Seconds a response may be reused according to its headers, or None.
+
+        Args:
+            headers: Response headers with lower-case names
+        """
+        cache_control = headers.get("cache-control", "").lower()
+        if any(
+            directive in cache_control
+            for directive in ("no-store", "no-cache", "private")
+        ):
+            return None
+        if headers.get("vary", "").strip() == "*":
+            return None
+
+        match = _MAX_AGE.search(cache_control)
+        if match:
+            seconds = float(match.group(1))
+            return seconds or None
+
+        expires = headers.get("expires")
+        if expires:
+            try:
+                when = parsedate_to_datetime(expires)
+            except (TypeError, ValueError):
+                # Invalid Expires values mean "already expired"
+                return None
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=UTC)
+            seconds = when.timestamp() - time.time()
+            return seconds if seconds > 0 else None
+
+        return self.default_ttl
+
+    async def _handle_route(self, route: Any) -> None:
+        request = route.request
+        if request.method != "GET" or request.resource_type not in self.resource_types:
+            await route.fallback()
+            return
+
+        cached = await asyncio.to_thread(self.load, request.url)
+        if cached is not None:
+            status, headers, body = cached
+            self.hits += 1
+            self.bytes_served += len(body)
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        self.misses += 1
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            # Let the browser make (and fail) the request as it normally would
+            await route.fallback()
+            return
+        await route.fulfill(response=response, body=body)
+
+        if response.status == 200:
+            ttl = self.freshness(response.headers)
+            if ttl is not None:
+                await asyncio.to_thread(
+                    self.store,
+                    request.url,
+                    response.status,
+                    response.headers,
+                    body,
+                    ttl,
+                )
+
+    def _path(self, url: str) -> Path:
+        return self.directory / hashlib.sha256(url.encode()).hexdigest()
+
+    def _current_size(self) -> int:
+        """Directory size, scanned once and then tracked. Caller holds the lock."""
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        return self._size
+
+    def _entries(self) -> Iterator[Path]:
+        """Cached responses in the directory; other files are left alone."""
+        for entry in self.directory.iterdir():
+            if _ENTRY_NAME.match(entry.name) and entry.is_file():
+                yield entry
+
+    def _remove(self, path: Path) -> None:
+        with self._lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                return
+            if self._size is not None:
+                self._size -= size
+
+    def _evict(self) -> None:
+        """Drop least recently used entries. Caller holds the lock."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort()
+
+        # Rescan in case other processes share the directory
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_bytes * _EVICT_TO
+        for _, entry_size, entry in entries:
+            if size <= target:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            size -= entry_size
+            self.evicted += 1
+        self._size = size
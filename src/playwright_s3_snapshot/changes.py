@@ -0,0 +1,455 @@
+"""Change detection against a downscaled baseline of each URL."""
+
+import base64
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .s3_upload import S3Uploader
+
+# Thumbnail width in pixels; the height follows the page's aspect ratio
+THUMBNAIL_WIDTH = 64
+
+# Taller pages are compared on their top part only
+MAX_THUMBNAIL_HEIGHT = 1024
+
+# Fraction of thumbnail pixels that must change before a capture is stored
+DEFAULT_THRESHOLD = 0.01
+
+# Grey levels a thumbnail pixel may drift (antialiasing, JPEG-ish noise)
+DEFAULT_TOLERANCE = 24
+
+# Diff images are the thumbnail enlarged by this factor
+_DIFF_SCALE = 4
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class Thumbnail:
+    """
+    A small grayscale render of a page, or of the region being captured.
+
+    Chromium does the downscaling while capturing, so building one costs a
+    tiny PNG rather than decoding the full-size screenshot in Python.
+    """
+
+    def __init__(self, width: int, height: int, pixels: bytes):
+        """
+        Initialize a thumbnail.
+
+        Args:
+            width: Width in pixels
+            height: Height in pixels
+            pixels: One grey level per pixel, row by row
+
+        Raises:
+            ValueError: If the pixel count does not match the size
+        """
+        if len(pixels) != width * height:
+            raise ValueError(
+                f"Expected {width * height} pixels for {width}x{height}, "
+                f"got {len(pixels)}"
+            )
+        self.width = width
+        self.height = height
+        self.pixels = bytes(pixels)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Thumbnail):
+            return NotImplemented
+        return vars(self) == vars(other)
+
+    @classmethod
+    async def capture(
+        cls,
+        page: Any,
+        width: int = THUMBNAIL_WIDTH,
+        clip: dict[str, float] | None = None,
+    ) -> "Thumbnail":
+        """
+        Render a loaded Playwright page at ``width`` pixels wide.
+
+        Args:
+            page: Playwright page
+            width: Thumbnail width in pixels
+            clip: Part of the page to render, as from Region.resolve
+                (default: the whole page)
+        """
+        session = await page.context.new_cdp_session(page)
+        try:
+            if clip is None:
+                metrics = await session.send("Page.getLayoutMetrics")
+                content = metrics["cssContentSize"]
+                clip = {
+                    "x": 0,
+                    "y": 0,
+                    "width": content["width"],
+                    "height": content["height"],
+                }
+            scale = width / clip["width"]
+            height = min(clip["height"], MAX_THUMBNAIL_HEIGHT / scale)
+            result = await session.send(
+                "Page.captureScreenshot",
+                {
+                    "format": "png",
+                    "captureBeyondViewport": True,
+                    "clip": {
+                        "x": clip["x"],
+                        "y": clip["y"],
+                        "width": clip["width"],
+                        "height": height,
+                        "scale": scale,
+                    },
+                },
+            )
+        finally:
+            await session.detach()
+        return cls.from_png(base64.b64decode(result["data"]))
+
+    @classmethod
+    def from_png(cls, data: bytes) -> "Thumbnail":
+        """Decode a PNG into a grayscale thumbnail."""
+        width, height, pixels = _decode_png_gray(data)
+        return cls(width, height, pixels)
+
+    def to_record(self) -> dict[str, Any]:
+        """JSON-serialisable form, compressed."""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "pixels": base64.b64encode(zlib.compress(self.pixels, 9)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> "Thumbnail":
+        """Inverse of to_record."""
+        pixels = zlib.decompress(base64.b64decode(record["pixels"]))
+        return cls(record["width"], record["height"], pixels)
+
+    def changed_pixels(
+        self, baseline: "Thumbnail", tolerance: int = DEFAULT_TOLERANCE
+    ) -> list[bool]:
+        """
+        Which of this thumbnail's pixels differ from the baseline.
+
+        Rows the baseline does not have count as changed. Thumbnails of
+        different widths cannot be lined up, so every pixel is changed.
+        """
+        if self.width != baseline.width:
+            return [True] * len(self.pixels)
+        shared = min(len(self.pixels), len(baseline.pixels))
+        mask = [
+            abs(new - old) > tolerance
+            for new, old in zip(
+                self.pixels[:shared], baseline.pixels[:shared], strict=True
+            )
+        ]
+        mask.extend([True] * (len(self.pixels) - shared))
+        return mask
+
+    def change_ratio(
+        self, baseline: "Thumbnail", tolerance: int = DEFAULT_TOLERANCE
+    ) -> float:
+        """Fraction of pixels that changed, counting rows only one side has."""
+        if self.width != baseline.width:
+            return 1.0
+        mask = self.changed_pixels(baseline, tolerance)
+        removed = max(0, baseline.height - self.height) * self.width
+        return (sum(mask) + removed) / (len(mask) + removed)
+
+    def diff_png(self, mask: list[bool]) -> bytes:
+        """PNG of this thumbnail, faded, with changed pixels in red and enlarged."""
+        rows = []
+        for y in range(self.height):
+            row = bytearray()
+            for x in range(self.width):
+                index = y * self.width + x
+                if mask[index]:
+                    pixel = (230, 30, 30)
+                else:
+                    grey = 128 + self.pixels[index] // 2
+                    pixel = (grey, grey, grey)
+                row += bytes(pixel) * _DIFF_SCALE
+            rows.extend([bytes(row)] * _DIFF_SCALE)
+        return _encode_png_rgb(
+            self.width * _DIFF_SCALE, self.height * _DIFF_SCALE, rows
+        )
+
+
+class LocalBaselineStore:
+    """Keeps one baseline JSON file per URL in a local directory."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def load(self, url: str) -> dict[str, Any] | None:
+        """The stored baseline for a URL, or None."""
+        path = self.directory / baseline_name(url)
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+
+    def save(self, url: str, record: dict[str, Any]) -> None:
+        """Replace the baseline for a URL atomically."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(record, f)
+        os.replace(temp_path, self.directory / baseline_name(url))
+
+
+class S3BaselineStore:
+    """Keeps one baseline JSON object per URL under a prefix in S3."""
+
+    def __init__(self, uploader: S3Uploader, prefix: str = "baselines/"):
+        """
+        Initialize the store.
+
+        Args:
+            uploader: S3Uploader for the bucket holding the baselines
+            prefix: Key prefix for baseline objects
+        """
+        self.uploader = uploader
+        self.prefix = prefix.rstrip("/") + "/" if prefix else ""
+
+    def load(self, url: str) -> dict[str, Any] | None:
+        """The stored baseline for a URL, or None."""
+        data = self.uploader.download_bytes(self.prefix + baseline_name(url))
+        return json.loads(data) if data is not None else None
+
+    def save(self, url: str, record: dict[str, Any]) -> None:
+        """Replace the baseline for a URL."""
+        self.uploader.upload_bytes(
+            json.dumps(record).encode(),
+            self.prefix + baseline_name(url),
+            content_type="application/json",
+        )
+
+
+class Change:
+    """Outcome of comparing a capture with its URL's baseline."""
+
+    def __init__(
+        self,
+        changed: bool,
+        ratio: float | None = None,
+        baseline: dict[str, Any] | None = None,
+        diff: bytes | None = None,
+    ):
+        """
+        Args:
+            changed: Whether the capture should be stored
+            ratio: Fraction of changed pixels, None without a baseline
+            baseline: The stored baseline record, if there was one
+            diff: PNG highlighting the changes, if requested and changed
+        """
+        self.changed = changed
+        self.ratio = ratio
+        self.baseline = baseline
+        self.diff = diff
+
+
+class ChangeDetector:
+    """
+    Decides whether a capture differs enough from the last stored one.
+
+    The baseline of a URL is only replaced when a capture is stored, so slow
+    drift still adds up and is eventually detected.
+
+    Usage:
+        detector = ChangeDetector(LocalBaselineStore(".baselines"), threshold=0.02)
+        change = detector.check(url, thumbnail)
+        if change.changed:
+            ...upload...
+            detector.record(url, thumbnail, s3_key)
+    """
+
+    def __init__(
+        self,
+        store: LocalBaselineStore | S3BaselineStore,
+        threshold: float = DEFAULT_THRESHOLD,
+        tolerance: int = DEFAULT_TOLERANCE,
+        diff_image: bool = True,
+        thumbnail_width: int = THUMBNAIL_WIDTH,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            store: Where baselines are kept
+            threshold: Fraction of thumbnail pixels (0-1) that must change
+            tolerance: Grey levels a pixel may drift and still count as equal
+            diff_image: Produce a diff PNG for changed captures
+            thumbnail_width: Width of the thumbnails compared
+
+        Raises:
+            ValueError: If threshold or tolerance is out of range
+        """
+        if not 0 <= threshold < 1:
+            raise ValueError(f"threshold must be between 0 and 1, got: {threshold}")
+        if not 0 <= tolerance <= 255:
+            raise ValueError(f"tolerance must be between 0 and 255, got: {tolerance}")
+
+        self.store = store
+        self.threshold = threshold
+        self.tolerance = tolerance
+        self.diff_image = diff_image
+        self.thumbnail_width = thumbnail_width
+
+    def check(self, url: str, thumbnail: Thumbnail) -> Change:
+        """Compare a capture's thumbnail with the URL's baseline."""
+        baseline = self.store.load(url)
+        if baseline is None:
+            return Change(changed=True)
+
+        previous = Thumbnail.from_record(baseline["thumbnail"])
+        ratio = thumbnail.change_ratio(previous, self.tolerance)
+        if ratio <= self.threshold:
+            return Change(changed=False, ratio=ratio, baseline=baseline)
+
+        diff = None
+        if self.diff_image:
+            diff = thumbnail.diff_png(
+                thumbnail.changed_pixels(previous, self.tolerance)
+            )
+        return Change(changed=True, ratio=ratio, baseline=baseline, diff=diff)
+
+    def record(self, url: str, thumbnail: Thumbnail, s3_key: str) -> None:
+        """Make a stored capture the new baseline for its URL."""
+        self.store.save(
+            url,
+            {
+                "url": url,
+                "s3_key": s3_key,
+                "updated": datetime.now().isoformat(),
+                "thumbnail": thumbnail.to_record(),
+            },
+        )
+
+
+def baseline_name(url: str) -> str:
+    """File or object name of a URL's baseline."""
+    return hashlib.sha256(url.encode()).hexdigest()[:32] + ".json"
+
+
+def _decode_png_gray(data: bytes) -> tuple[int, int, bytes]:
+    """
+    Decode an 8-bit, non-interlaced PNG to grey levels.
+
+    This is all Chromium produces, and thumbnails are small enough for pure
+    Python to decode quickly.
+
+    Raises:
+        ValueError: If the data is not a PNG this decoder supports
+    """
+    if not data.startswith(_PNG_SIGNATURE):
+        raise ValueError("Not a PNG image")
+
+    offset = len(_PNG_SIGNATURE)
+    header = None
+    compressed = bytearray()
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset : offset + 4])
+        kind = data[offset + 4 : offset + 8]
+        chunk = data[offset + 8 : offset + 8 + length]
+        offset += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif kind == b"IDAT":
+            compressed += chunk
+        elif kind == b"IEND":
+            break
+
+    if header is None:
+        raise ValueError("PNG has no header")
+    width, height, depth, color_type, _, _, interlace = header
+    channels = {0: 1, 2: 3, 4: 2, 6: 4}.get(color_type)
+    if depth != 8 or channels is None or interlace:
+        raise ValueError(
+            f"Unsupported PNG (bit depth {depth}, color type {color_type}, "
+            f"interlace {interlace})"
+        )
+
+    raw = zlib.decompress(bytes(compressed))
+    stride = width * channels
+    previous = bytearray(stride)
+    grey = bytearray()
+    for y in range(height):
+        start = y * (stride + 1)
+        line = _unfilter(
+            raw[start],
+            bytearray(raw[start + 1 : start + 1 + stride]),
+            previous,
+            channels,
+        )
+        if channels >= 3:
+            grey += bytes(
+                (line[i] * 299 + line[i + 1] * 587 + line[i + 2] * 114) // 1000
+                for i in range(0, stride, channels)
+            )
+        else:
+            grey += line[::channels]
+        previous = line
+    return width, height, bytes(grey)
+
+
+def _unfilter(
+    kind: int, line: bytearray, previous: bytearray, channels: int
+) -> bytearray:
+    """Undo one PNG scanline filter in place."""
+    if kind == 0:
+        return line
+    for i in range(len(line)):
+        left = line[i - channels] if i >= channels else 0
+        up = previous[i]
+        if kind == 1:
+            line[i] = (line[i] + left) & 0xFF
+        elif kind == 2:
+            line[i] = (line[i] + up) & 0xFF
+        elif kind == 3:
+            line[i] = (line[i] + (left + up) // 2) & 0xFF
+        elif kind == 4:
+            up_left = previous[i - channels] if i >= channels else 0
+            estimate = left + up - up_left
+            distances = (
+                abs(estimate - left),
+                abs(estimate - up),
+                abs(estimate - up_left),
+            )
+            if distances[0] <= distances[1] and distances[0] <= distances[2]:
+                predictor = left
+            elif distances[1] <= distances[2]:
+                predictor = up
+            else:
+                predictor = up_left
+            line[i] = (line[i] + predictor) & 0xFF
+        else:
+            raise ValueError(f"Unknown PNG filter type: {kind}")
+    return line
+
+
+def _encode_png_rgb(width: int, height: int, rows: list[bytes]) -> bytes:
+    """Encode 8-bit RGB rows as a PNG."""
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(body))
+            + kind
+            + body
+            + struct.pack(">I", zlib.crc32(kind + body))
+        )
+
+    raw = b"".join(b"\x00" + row for row in rows)
+    return (
+        _PNG_SIGNATURE
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 9))
+        + chunk(b"IEND", b"")
+    )
@@ -1,15 +1,56 @@
 """Command-line interface for Playwright S3 Snapshot."""
 
 import argparse
+import asyncio
+import json
 import os
 import re
 import sys
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
+from typing import Any
 from urllib.parse import urlparse
 
-from .config import create_sample_config_file, load_config_manager
-from .screenshot import take_screenshot_sync
-from .snapshot import take_snapshot_to_s3_sync
+from .batch import run_batch
+from .blocking import RESOURCE_TYPES, ResourceBlocker, parse_list
+from .browser_pool import BrowserPool
+from .cache import DEFAULT_CACHE_SIZE, AssetCache
+from .changes import (
+    DEFAULT_THRESHOLD,
+    ChangeDetector,
+    LocalBaselineStore,
+    S3BaselineStore,
+)
+from .config import create_sample_config_file, load_config_manager, parse_size
+from .journal import Journal
+from .regions import Region, parse_clip
+from .s3_upload import KEY_STRATEGIES, S3Uploader, UploadQueue, make_transfer_config
+from .scheduler import HostScheduler, RateLimitedError, host_of
+from .screenshot import (
+    ARTIFACTS,
+    DEFAULT_MAX_PAGE_HEIGHT,
+    IMAGE_FORMATS,
+    artifact_filename,
+    capture_artifacts,
+    capture_tiles,
+    capture_viewports,
+    check_image_options,
+    image_extension,
+    parse_artifacts,
+    take_screenshot,
+)
+from .snapshot import (
+    take_artifacts_snapshot_to_s3,
+    take_snapshot_to_s3,
+    take_tiled_snapshot_to_s3,
+    take_viewports_snapshot_to_s3,
+    tile_manifest,
+)
+from .timings import StageTimer, TimingSummary
+from .viewports import VIEWPORT_PRESETS, parse_viewports
+from .waits import WaitRules, parse_wait, parse_wait_rule
 
 
 def validate_url(url: str) -> str:
@@ -58,14 +99,144 @@ def validate_positive_int(value: str) -> int:
         raise argparse.ArgumentTypeError(f"Invalid integer: {value}") from None
 
 
+def validate_size(value: str) -> int:
+    """Validate a positive byte size such as 8388608, 64KB or 8MB."""
+    try:
+        size = parse_size(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}") from None
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"Size must be positive, got: {value}")
+    return size
+
+
+def validate_fraction(value: str) -> float:
+    """Validate a fraction from 0 up to (not including) 1."""
+    try:
+        fraction = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid number: {value}") from None
+    if not 0 <= fraction < 1:
+        raise argparse.ArgumentTypeError(f"Value must be between 0 and 1, got: {value}")
+    return fraction
+
+
+def validate_positive_float(value: str) -> float:
+    """Validate a positive number."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid number: {value}") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"Value must be positive, got: {value}")
+    return number
+
+
+def validate_artifacts(value: str) -> list[str]:
+    """Validate a comma-separated list of artifacts."""
+    try:
+        return parse_artifacts(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def validate_clip(value: str) -> tuple:
+    """Validate a clip rectangle given as X,Y,WIDTH,HEIGHT."""
+    try:
+        return parse_clip(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def validate_resource_types(value: str) -> list[str]:
+    """Validate a comma-separated list of Playwright resource types."""
+    types = [t.lower() for t in parse_list(value)]
+    unknown = sorted(set(types).difference(RESOURCE_TYPES))
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"Unknown resource type(s): {', '.join(unknown)}. "
+            f"Choose from: {', '.join(RESOURCE_TYPES)}"
+        )
+    return types
+
+
+def validate_wait(value: str) -> str:
+    """Validate a wait strategy spec such as "domcontentloaded+selector:#app"."""
+    try:
+        parse_wait(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
+def validate_wait_rule(value: str) -> tuple[str, str]:
+    """Validate a per-URL wait rule "PATTERN=SPEC"."""
+    try:
+        pattern, spec = parse_wait_rule(value)
+        parse_wait(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return pattern, spec
+
+
+def validate_viewports(value: str) -> list:
+    """Validate a comma-separated list of viewport presets or WIDTHxHEIGHT[@SCALE] sizes."""
+    try:
+        viewports = parse_viewports(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    if not viewports:
+        raise argparse.ArgumentTypeError("At least one viewport is required")
+    return viewports
+
+
+def validate_url_file(file_path: str) -> str:
+    """Validate that a URL file exists; "-" means standard input."""
+    if file_path != "-" and not Path(file_path).is_file():
+        raise argparse.ArgumentTypeError(f"URL file not found: {file_path}")
+    return file_path
+
+
+def iter_urls_from_file(
+    file_path: str,
+    on_invalid: Callable[[int, str, Exception], None] | None = None,
+) -> Iterator[str]:
+    """
+    Lazily yield URLs from a file (one per line), or from stdin for "-".
+
+    The file is never held in memory, so arbitrarily long lists can be
+    streamed into a batch. Invalid lines are reported through
+    ``on_invalid(line_number, line, error)`` and skipped.
+    """
+    f = sys.stdin if file_path == "-" else open(file_path)
+    try:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield validate_url(line)
+            except argparse.ArgumentTypeError as e:
+                if on_invalid is not None:
+                    on_invalid(line_number, line, e)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
 def parse_urls_from_file(file_path: str) -> list[str]:
-    """Parse URLs from a file (one per line)."""
+    """
+    Read every URL from a file into a list; see iter_urls_from_file.
+
+    Raises:
+        argparse.ArgumentTypeError: If the file is missing or a line is not a URL
+    """
+
+    def reject(line_number: int, line: str, error: Exception) -> None:
+        raise error
+
     try:
-        with open(file_path) as f:
-            urls = [
-                line.strip() for line in f if line.strip() and not line.startswith("#")
-            ]
-        return [validate_url(url) for url in urls]
+        return list(iter_urls_from_file(file_path, on_invalid=reject))
     except FileNotFoundError:
         raise argparse.ArgumentTypeError(f"URL file not found: {file_path}") from None
     except Exception as e:
@@ -86,7 +257,14 @@ Examples:
   %(prog)s https://example.com --output screenshot.png
   %(prog)s https://example.com --bucket my-bucket --prefix qa/
   %(prog)s --url-file urls.txt --bucket my-bucket
+  %(prog)s --url-file urls.txt --bucket my-bucket --parallel 8
+  %(prog)s --url-file urls.txt --bucket my-bucket --resume
+  cat urls.txt | %(prog)s --url-file - --bucket my-bucket --journal run.journal
   %(prog)s https://example.com --width 1280 --height 720 --timeout 60000
+  %(prog)s https://example.com --block-trackers --block-resources font,media
+  %(prog)s https://example.com --wait "domcontentloaded+selector:#app"
+  %(prog)s https://example.com --bucket my-bucket --format webp --max-bytes 500KB
+  %(prog)s https://example.com --bucket my-bucket --viewports desktop,tablet,mobile
   %(prog)s --create-config  # Create sample config file
 
 Configuration:
@@ -112,9 +290,9 @@ Configuration:
     )
     url_group.add_argument(
         "--url-file",
-        type=parse_urls_from_file,
+        type=validate_url_file,
         metavar="FILE",
-        help="File containing URLs (one per line)",
+        help="File containing URLs (one per line), read lazily; '-' reads stdin",
     )
 
     # S3 configuration
@@ -135,6 +313,74 @@ Configuration:
         default=config.get("region", "us-east-1"),
         help="AWS region (default: us-east-1)",
     )
+    s3_group.add_argument(
+        "--key-strategy",
+        choices=KEY_STRATEGIES,
+        default=config.get("key_strategy"),
+        help="S3 key naming: timestamp, unique (timestamp + URL slug + content "
+        "hash) or content (URL slug + content hash). Default: timestamp for a "
+        "single URL, unique for batches",
+    )
+    s3_group.add_argument(
+        "--dedup",
+        action="store_true",
+        default=config.get("dedup", False),
+        help="Skip uploads whose identical bytes are already stored "
+        "(implies --key-strategy content)",
+    )
+    s3_group.add_argument(
+        "--detect-changes",
+        action="store_true",
+        default=config.get("detect_changes", False),
+        help="Only upload captures that visibly differ from the last one stored "
+        "for the URL, plus a diff image",
+    )
+    s3_group.add_argument(
+        "--change-threshold",
+        type=validate_fraction,
+        default=config.get("change_threshold", DEFAULT_THRESHOLD),
+        metavar="FRACTION",
+        help="Fraction of the page that must change to count as changed "
+        f"(default: {DEFAULT_THRESHOLD})",
+    )
+    s3_group.add_argument(
+        "--baseline-dir",
+        default=config.get("baseline_dir"),
+        help="Keep change-detection baselines in this local directory "
+        "(default: in the bucket, under --baseline-prefix)",
+    )
+    s3_group.add_argument(
+        "--baseline-prefix",
+        default=config.get("baseline_prefix", "baselines/"),
+        help="S3 prefix for change-detection baselines (default: baselines/)",
+    )
+    s3_group.add_argument(
+        "--no-diff-image",
+        action="store_true",
+        help="Do not upload a diff image for changed captures",
+    )
+    s3_group.add_argument(
+        "--multipart-threshold",
+        type=validate_size,
+        default=config.get("multipart_threshold"),
+        metavar="SIZE",
+        help="Use multipart upload for captures at least this big, e.g. 8MB "
+        "(default: boto3's 8MB)",
+    )
+    s3_group.add_argument(
+        "--multipart-chunksize",
+        type=validate_size,
+        default=config.get("multipart_chunksize"),
+        metavar="SIZE",
+        help="Multipart part size, e.g. 16MB (default: boto3's 8MB)",
+    )
+    s3_group.add_argument(
+        "--multipart-concurrency",
+        type=validate_positive_int,
+        default=config.get("multipart_concurrency"),
+        metavar="N",
+        help="Parts uploaded in parallel per capture (default: boto3's 10)",
+    )
 
     # Output configuration
     output_group = parser.add_argument_group("Output options")
@@ -143,6 +389,26 @@ Configuration:
         metavar="PATH",
         help="Local output path (ignored if --bucket specified)",
     )
+    output_group.add_argument(
+        "--format",
+        choices=list(IMAGE_FORMATS),
+        default=config.get("format", "png"),
+        help="Image format (default: png)",
+    )
+    output_group.add_argument(
+        "--quality",
+        type=validate_positive_int,
+        default=config.get("quality"),
+        metavar="1-100",
+        help="JPEG/WebP quality (default: 80)",
+    )
+    output_group.add_argument(
+        "--max-bytes",
+        type=validate_size,
+        default=config.get("max_bytes"),
+        metavar="SIZE",
+        help="Lower JPEG/WebP quality until each image fits, e.g. 500KB",
+    )
     output_group.add_argument(
         "--verbose",
         "-v",
@@ -178,6 +444,105 @@ Configuration:
         default=config.get("timeout", 30000),
         help="Page load timeout in milliseconds (default: 30000)",
     )
+    browser_group.add_argument(
+        "--viewports",
+        type=validate_viewports,
+        default=config.get("viewports"),
+        metavar="LIST",
+        help="Capture each URL at several viewports from one page load: presets "
+        f"({', '.join(VIEWPORT_PRESETS)}) or WIDTHxHEIGHT[@SCALE], comma-separated "
+        "(overrides --width/--height)",
+    )
+    browser_group.add_argument(
+        "--artifacts",
+        type=validate_artifacts,
+        default=config.get("artifacts"),
+        metavar="LIST",
+        help="Artifacts to produce from one page load, comma-separated: "
+        f"{', '.join(ARTIFACTS)} (default: screenshot)",
+    )
+    browser_group.add_argument(
+        "--selector",
+        default=config.get("selector"),
+        metavar="CSS",
+        help="Capture only the first element matching this CSS selector",
+    )
+    browser_group.add_argument(
+        "--clip",
+        type=validate_clip,
+        default=config.get("clip"),
+        metavar="X,Y,WIDTH,HEIGHT",
+        help="Capture only this rectangle of the page, in CSS pixels",
+    )
+    browser_group.add_argument(
+        "--viewport-only",
+        action="store_true",
+        default=config.get("viewport_only", False),
+        help="Capture only the initial viewport instead of the full page",
+    )
+    browser_group.add_argument(
+        "--tile-height",
+        type=validate_positive_int,
+        default=config.get("tile_height"),
+        metavar="PX",
+        help="Capture very tall pages as tiles of this height plus a "
+        "manifest.json, keeping memory bounded by one tile",
+    )
+    browser_group.add_argument(
+        "--max-page-height",
+        type=validate_positive_int,
+        default=config.get("max_page_height"),
+        metavar="PX",
+        help="Stop tiling after this many pixels of page height "
+        f"(default: {DEFAULT_MAX_PAGE_HEIGHT}; requires --tile-height)",
+    )
+    browser_group.add_argument(
+        "--wait",
+        type=validate_wait,
+        default=config.get("wait"),
+        metavar="SPEC",
+        help="When the page is ready: load, domcontentloaded, networkidle, "
+        "selector:CSS, function:JS, quiet:MS (no requests for MS) or stable:MS "
+        "(no visual change for MS), joined with '+' (default: networkidle)",
+    )
+    browser_group.add_argument(
+        "--wait-rule",
+        type=validate_wait_rule,
+        action="append",
+        default=[],
+        metavar="PATTERN=SPEC",
+        help="Wait strategy for URLs matching PATTERN (wildcards allowed); "
+        "may be repeated, first match wins",
+    )
+    browser_group.add_argument(
+        "--wait-ignore",
+        type=parse_list,
+        default=config.get("wait_ignore", []),
+        metavar="PATTERNS",
+        help="Comma-separated URL patterns not counted by quiet:MS, "
+        "e.g. beacons or long-polling endpoints",
+    )
+    browser_group.add_argument(
+        "--block-resources",
+        type=validate_resource_types,
+        default=config.get("block_resources"),
+        metavar="TYPES",
+        help="Comma-separated resource types to block, e.g. font,media",
+    )
+    browser_group.add_argument(
+        "--block-domains",
+        type=parse_list,
+        default=config.get("block_domains"),
+        metavar="PATTERNS",
+        help="Comma-separated domains to block, including subdomains "
+        "(wildcards allowed, e.g. ads.example.com,*.cdn.example.net)",
+    )
+    browser_group.add_argument(
+        "--block-trackers",
+        action="store_true",
+        default=config.get("block_trackers", False),
+        help="Block well-known analytics, ad and tag-manager domains",
+    )
 
     # Advanced options
     advanced_group = parser.add_argument_group("Advanced options")
@@ -191,11 +556,76 @@ Configuration:
         "--parallel",
         type=validate_positive_int,
         default=config.get("parallel", 1),
-        help="Number of parallel processes for batch jobs (default: 1)",
+        help="Number of URLs captured concurrently in batch jobs (default: 1)",
+    )
+    advanced_group.add_argument(
+        "--max-uploads",
+        type=validate_positive_int,
+        default=config.get("max_uploads"),
+        metavar="N",
+        help="Maximum S3 uploads in flight while rendering continues "
+        "(default: same as --parallel)",
+    )
+    advanced_group.add_argument(
+        "--max-per-host",
+        type=validate_positive_int,
+        default=config.get("max_per_host"),
+        metavar="N",
+        help="Maximum URLs of one host captured at once (default: no limit)",
+    )
+    advanced_group.add_argument(
+        "--host-rate",
+        type=validate_positive_float,
+        default=config.get("host_rate"),
+        metavar="PER_SECOND",
+        help="Maximum page loads per second on one host, e.g. 0.5 "
+        "(default: no limit)",
+    )
+    advanced_group.add_argument(
+        "--journal",
+        metavar="FILE",
+        help="Append the outcome of every URL to this JSON Lines file "
+        "(default with --resume: <url-file>.journal)",
+    )
+    advanced_group.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip URLs the journal records as completed; failed URLs are retried",
+    )
+    advanced_group.add_argument(
+        "--recycle-after",
+        type=validate_positive_int,
+        default=config.get("recycle_after", 100),
+        metavar="PAGES",
+        help="Relaunch the browser after this many pages (default: 100)",
+    )
+    advanced_group.add_argument(
+        "--max-browser-memory",
+        type=validate_positive_int,
+        default=config.get("max_browser_memory"),
+        metavar="MB",
+        help="Relaunch the browser when its memory use exceeds MB (default: off)",
+    )
+    advanced_group.add_argument(
+        "--cache-dir",
+        default=config.get("cache_dir"),
+        metavar="DIR",
+        help="Share stylesheets, scripts, images and fonts between pages and "
+        "runs through an on-disk cache in DIR (default: off)",
+    )
+    advanced_group.add_argument(
+        "--cache-size",
+        type=validate_size,
+        default=config.get("cache_size", DEFAULT_CACHE_SIZE),
+        metavar="SIZE",
+        help="Evict least recently used assets beyond this size (default: 256MB)",
     )
 
     args = parser.parse_args()
 
+    # Wait rules from the command line take precedence over the config file
+    args.wait_rule += list((config.get("wait_rules") or {}).items())
+
     # Handle special commands
     if args.create_config:
         try:
@@ -215,6 +645,71 @@ Configuration:
     if args.quiet and args.verbose:
         parser.error("--quiet and --verbose are mutually exclusive")
 
+    if (args.resume or args.journal) and not args.url_file:
+        parser.error("--journal and --resume require --url-file")
+    if args.resume and not args.journal:
+        if args.url_file == "-":
+            parser.error("--resume with stdin input requires --journal")
+        args.journal = f"{args.url_file}.journal"
+
+    if args.detect_changes and not args.bucket:
+        parser.error("--detect-changes requires --bucket")
+
+    try:
+        check_image_options(args.format, args.quality, args.max_bytes)
+        # Config files may list viewports as JSON objects rather than a string
+        args.viewports = parse_viewports(args.viewports)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.detect_changes and args.viewports:
+        parser.error("--detect-changes cannot be combined with --viewports")
+    if sum(map(bool, (args.selector, args.clip, args.viewport_only))) > 1:
+        parser.error("--selector, --clip and --viewport-only are mutually exclusive")
+    try:
+        # Config files may give the clip as a list or an object
+        args.capture_region = Region.from_options(
+            selector=args.selector, clip=args.clip, viewport=args.viewport_only
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if args.capture_region and args.viewports:
+        parser.error(
+            "--selector, --clip and --viewport-only cannot be combined with --viewports"
+        )
+    if args.capture_region and args.tile_height:
+        parser.error(
+            "--selector, --clip and --viewport-only cannot be combined with --tile-height"
+        )
+    try:
+        # Config files may list artifacts as JSON arrays
+        if args.artifacts is not None:
+            args.artifacts = parse_artifacts(args.artifacts)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.artifacts == ["screenshot"]:
+        args.artifacts = None
+    if args.artifacts:
+        for option, value in (
+            ("--viewports", args.viewports),
+            ("--tile-height", args.tile_height),
+            ("--detect-changes", args.detect_changes),
+        ):
+            if value:
+                parser.error(f"--artifacts cannot be combined with {option}")
+    if args.max_page_height and not args.tile_height:
+        parser.error("--max-page-height requires --tile-height")
+    if args.tile_height:
+        for option, value in (
+            ("--viewports", args.viewports),
+            ("--detect-changes", args.detect_changes),
+            ("--max-bytes", args.max_bytes),
+            ("--dedup", args.dedup),
+        ):
+            if value:
+                parser.error(f"--tile-height cannot be combined with {option}")
+        if args.key_strategy == "content":
+            parser.error("--tile-height cannot be combined with --key-strategy content")
+
     # Set up output level
     def log_info(msg: str):
         if not args.quiet:
@@ -227,111 +722,38 @@ Configuration:
     def log_error(msg: str):
         print(f"❌ Error: {msg}", file=sys.stderr)
 
+    def log_invalid(line_number: int, line: str, error: Exception) -> None:
+        log_error(f"Skipping line {line_number} of {args.url_file}: {error}")
+
     try:
-        # Get URLs to process
-        urls = []
+        # Get URLs to process; files are streamed rather than loaded up front
         if args.url:
-            urls = [args.url]
-        elif args.url_file:
-            urls = args.url_file
-            log_verbose(f"Loaded {len(urls)} URLs from file")
-
-        if not urls:
-            parser.error("No URLs specified")
-
-        success_count = 0
-        total_urls = len(urls)
-
-        for i, url in enumerate(urls, 1):
-            if total_urls > 1:
-                log_info(f"\n[{i}/{total_urls}] Processing: {url}")
-
-            retry_count = 0
-            success = False
-
-            while retry_count < args.retries and not success:
-                try:
-                    if args.bucket:
-                        # S3 upload mode
-                        if retry_count == 0:
-                            log_info(f"Taking screenshot of: {url}")
-                            log_verbose(f"Uploading to S3 bucket: {args.bucket}")
-                        else:
-                            log_info(f"Retry {retry_count}/{args.retries - 1}: {url}")
-
-                        result = take_snapshot_to_s3_sync(
-                            url=url,
-                            bucket_name=args.bucket,
-                            key_prefix=args.prefix,
-                            viewport_width=args.width,
-                            viewport_height=args.height,
-                            wait_timeout=args.timeout,
-                            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-                            region_name=args.region,
-                        )
-
-                        log_info("✅ Screenshot uploaded successfully!")
-                        if args.verbose or total_urls == 1:
-                            log_info(f"S3 URL: {result['s3_url']}")
-                            log_info(f"File size: {result['file_size']:,} bytes")
-                            log_verbose(f"Timestamp: {result['timestamp']}")
-
-                    else:
-                        # Local file mode
-                        if retry_count == 0:
-                            log_info(f"Taking screenshot of: {url}")
-                        else:
-                            log_info(f"Retry {retry_count}/{args.retries - 1}: {url}")
-
-                        # Generate output path for batch processing
-                        output_path = args.output
-                        if total_urls > 1 and not output_path:
-                            from datetime import datetime
-
-                            timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-                            output_path = f"screenshot_{i}_{timestamp}.png"
-
-                        result_path = take_screenshot_sync(
-                            url=url,
-                            output_path=output_path,
-                            viewport_width=args.width,
-                            viewport_height=args.height,
-                            wait_timeout=args.timeout,
-                        )
-
-                        log_info(f"Screenshot saved to: {result_path}")
-
-                        if Path(result_path).exists():
-                            file_size = Path(result_path).stat().st_size
-                            log_verbose(f"File size: {file_size:,} bytes")
-                            log_info("✅ Screenshot file created successfully!")
-                        else:
-                            raise Exception("Screenshot file not found after creation")
-
-                    success = True
-                    success_count += 1
-
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count < args.retries:
-                        log_verbose(f"Attempt {retry_count} failed: {e}")
-                        log_info("Retrying in 2 seconds...")
-                        import time
-
-                        time.sleep(2)
-                    else:
-                        log_error(f"Failed after {args.retries} attempts: {e}")
+            urls: Iterable[str] = [args.url]
+        else:
+            urls = iter_urls_from_file(args.url_file, on_invalid=log_invalid)
+
+        summary = asyncio.run(
+            _process_urls(args, urls, log_info, log_verbose, log_error)
+        )
+
+        if summary["total"] + summary["skipped"] == 0:
+            log_error("No URLs specified")
+            return 1
 
         # Summary for batch jobs
-        if total_urls > 1:
-            log_info(
-                f"\n📊 Summary: {success_count}/{total_urls} screenshots completed successfully"
+        if summary["batch"]:
+            message = (
+                f"\n📊 Summary: {summary['successful']}/{summary['total']} "
+                "screenshots completed successfully"
             )
-            if success_count < total_urls:
-                return 1
+            if summary["skipped"]:
+                message += f" ({summary['skipped']} already done)"
+            log_info(message)
+            if summary["timings"]:
+                log_info(format_timing_summary(summary["timings"]))
+            return 1 if summary["failed"] else 0
 
-        return 0 if success_count > 0 else 1
+        return 0 if summary["successful"] > 0 else 1
 
     except KeyboardInterrupt:
         log_error("Operation interrupted by user")
@@ -341,5 +763,515 @@ Configuration:
         return 1
 
 
+def format_timing_summary(stats: dict[str, dict[str, float]]) -> str:
+    """Render TimingSummary.summary() as a table of p50/p95/max per stage."""
+    lines = [f"⏱️  Stage timings (ms) {'p50':>10} {'p95':>10} {'max':>10}"]
+    for name, stat in stats.items():
+        lines.append(
+            f"   {name:<18}"
+            f"{stat['p50']:>10,.0f} {stat['p95']:>10,.0f} {stat['max']:>10,.0f}"
+        )
+    return "\n".join(lines)
+
+
+async def _process_urls(
+    args: argparse.Namespace,
+    urls: Iterable[str],
+    log_info: Callable[[str], None],
+    log_verbose: Callable[[str], None],
+    log_error: Callable[[str], None],
+) -> dict[str, int]:
+    """
+    Screenshot every URL with ``args.parallel`` workers sharing one browser pool.
+
+    ``urls`` is consumed lazily, so memory does not grow with the input.
+
+    Returns:
+        run_batch's summary plus "skipped" (already done according to the
+        journal), "batch" (whether more than one URL was given) and "timings"
+        (per-stage percentiles of the successful captures)
+    """
+    # Peek far enough ahead to size the pool and tell a single URL from a batch
+    urls = iter(urls)
+    head = list(islice(urls, max(args.parallel, 2)))
+    total_urls = len(head) if len(head) < max(args.parallel, 2) else None
+    urls = chain(head, urls)
+    batch = total_urls != 1
+
+    browsers = max(1, min(args.parallel, len(head)))
+    max_uploads = args.max_uploads or browsers
+
+    # In S3 mode, extra workers hold finished captures while they upload so
+    # that every browser slot can move straight on to the next URL
+    workers = browsers
+    if args.bucket:
+        workers = browsers + max_uploads
+        if total_urls is not None:
+            workers = max(1, min(workers, total_urls))
+
+    # Batches must not reuse second-resolution keys: concurrent captures
+    # would overwrite each other
+    key_strategy = args.key_strategy
+    if args.dedup:
+        key_strategy = "content"
+    elif key_strategy is None:
+        key_strategy = "unique" if batch else "timestamp"
+
+    journal = Journal(args.journal) if args.journal else None
+    if journal is not None and args.resume:
+        completed = journal.load()
+        if completed:
+            log_info(f"Resuming: {completed} URLs already completed")
+
+    # URLs keep their input position across runs, so it is carried with each
+    # item rather than taken from run_batch's count of submitted work
+    skipped = 0
+
+    def pending() -> Iterator[tuple[int, str]]:
+        nonlocal skipped
+        for index, url in enumerate(urls, 1):
+            if journal is not None and journal.is_done(index):
+                skipped += 1
+                continue
+            yield index, url
+
+    blocker = ResourceBlocker.from_options(
+        resource_types=args.block_resources,
+        domains=args.block_domains,
+        trackers=args.block_trackers,
+    )
+
+    wait_rules = WaitRules.from_options(
+        default=args.wait, rules=args.wait_rule, ignore=args.wait_ignore
+    )
+
+    transfer_config = make_transfer_config(
+        multipart_threshold=args.multipart_threshold,
+        multipart_chunksize=args.multipart_chunksize,
+        max_concurrency=args.multipart_concurrency,
+    )
+
+    image_options = {
+        "image_format": args.format,
+        "quality": args.quality,
+        "max_bytes": args.max_bytes,
+    }
+
+    change_detector = None
+    if args.detect_changes:
+        if args.baseline_dir:
+            store = LocalBaselineStore(args.baseline_dir)
+        else:
+            store = S3BaselineStore(
+                S3Uploader(
+                    bucket_name=args.bucket,
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    region_name=args.region,
+                ),
+                prefix=args.baseline_prefix,
+            )
+        change_detector = ChangeDetector(
+            store,
+            threshold=args.change_threshold,
+            diff_image=not args.no_diff_image,
+        )
+
+    timings = TimingSummary()
+
+    def record_timings(stage_timings: dict[str, float] | None) -> None:
+        if stage_timings:
+            timings.add(stage_timings)
+            log_verbose(
+                "Timings: "
+                + ", ".join(f"{name} {ms:,.0f}ms" for name, ms in stage_timings.items())
+            )
+
+    async def capture(index: int, url: str) -> dict[str, Any]:
+        if batch:
+            position = f"{index}/{total_urls}" if total_urls else str(index)
+            log_info(f"\n[{position}] Processing: {url}")
+        log_info(f"Taking screenshot of: {url}")
+
+        if args.viewports:
+            return await capture_variants(index, url)
+        if args.tile_height:
+            return await capture_tiled(index, url)
+        if args.artifacts:
+            return await capture_archive(index, url)
+
+        if args.bucket:
+            # S3 upload mode
+            log_verbose(f"Uploading to S3 bucket: {args.bucket}")
+            result = await take_snapshot_to_s3(
+                url=url,
+                bucket_name=args.bucket,
+                key_prefix=args.prefix,
+                viewport_width=args.width,
+                viewport_height=args.height,
+                wait_timeout=args.timeout,
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region_name=args.region,
+                pool=pool,
+                upload_queue=uploads,
+                transfer_config=transfer_config,
+                key_strategy=key_strategy,
+                dedup=args.dedup,
+                blocker=blocker,
+                wait=wait_rules.for_url(url, raise_on_rate_limit=batch),
+                change_detector=change_detector,
+                region=args.capture_region,
+                **image_options,
+            )
+            record_timings(result.get("timings"))
+
+            if result.get("deduplicated"):
+                log_info(f"✅ Unchanged, already stored: {url}")
+                log_verbose(f"S3 URL: {result['s3_url']}")
+                return {"s3_key": result["s3_key"], "deduplicated": True}
+
+            log_info(f"✅ Screenshot uploaded successfully: {url}")
+            if result.get("change_ratio") is not None:
+                log_info(f"Changed: {result['change_ratio']:.1%} of the page")
+            if result.get("diff_s3_url"):
+                log_verbose(f"Diff image: {result['diff_s3_url']}")
+            if args.verbose or not batch:
+                log_info(f"S3 URL: {result['s3_url']}")
+                log_info(f"File size: {result['file_size']:,} bytes")
+                log_verbose(f"Timestamp: {result['timestamp']}")
+            return {"s3_key": result["s3_key"]}
+
+        # Local file mode; batch output paths carry the index so concurrent
+        # captures within the same second do not collide
+        output_path = args.output
+        if batch and not output_path:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+            output_path = (
+                f"screenshot_{index}_{timestamp}{image_extension(args.format)}"
+            )
+
+        timer = StageTimer()
+        result_path = await take_screenshot(
+            url=url,
+            output_path=output_path,
+            viewport_width=args.width,
+            viewport_height=args.height,
+            wait_timeout=args.timeout,
+            pool=pool,
+            blocker=blocker,
+            wait=wait_rules.for_url(url, raise_on_rate_limit=batch),
+            timer=timer,
+            region=args.capture_region,
+            **image_options,
+        )
+        record_timings(timer.as_dict())
+
+        if not Path(result_path).exists():
+            raise Exception("Screenshot file not found after creation")
+
+        log_info(f"Screenshot saved to: {result_path}")
+        log_verbose(f"File size: {Path(result_path).stat().st_size:,} bytes")
+        log_info("✅ Screenshot file created successfully!")
+        return {"path": result_path}
+
+    async def capture_variants(index: int, url: str) -> dict[str, Any]:
+        if args.bucket:
+            result = await take_viewports_snapshot_to_s3(
+                url=url,
+                bucket_name=args.bucket,
+                viewports=args.viewports,
+                key_prefix=args.prefix,
+                wait_timeout=args.timeout,
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region_name=args.region,
+                pool=pool,
+                upload_queue=uploads,
+                transfer_config=transfer_config,
+                key_strategy=key_strategy,
+                dedup=args.dedup,
+                blocker=blocker,
+                wait=wait_rules.for_url(url, raise_on_rate_limit=batch),
+                **image_options,
+            )
+            record_timings(result.get("timings"))
+
+            log_info(
+                f"✅ {len(result['variants'])} viewports uploaded successfully: {url}"
+            )
+            for variant in result["variants"]:
+                status = " (unchanged)" if variant["deduplicated"] else ""
+                log_verbose(f"{variant['viewport']}: {variant['s3_url']}{status}")
+            return {"key_group": result["key_group"]}
+
+        # Local file mode: one file per viewport next to --output
+        if args.output:
+            stem = str(Path(args.output).with_suffix(""))
+        else:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+            stem = (
+                f"screenshot_{index}_{timestamp}"
+                if batch
+                else f"screenshot_{timestamp}"
+            )
+
+        timer = StageTimer()
+        captures = await capture_viewports(
+            url=url,
+            viewports=args.viewports,
+            wait_timeout=args.timeout,
+            pool=pool,
+            blocker=blocker,
+            wait=wait_rules.for_url(url, raise_on_rate_limit=batch),
+            timer=timer,
+            **image_options,
+        )
+        record_timings(timer.as_dict())
+        paths = []
+        for viewport, image in captures:
+            path = Path(f"{stem}_{viewport.name}{image_extension(args.format)}")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(image)
+            paths.append(str(path))
+            log_info(f"Screenshot saved to: {path}")
+            log_verbose(f"File size: {len(image):,} bytes")
+        log_info(f"✅ {len(captures)} viewport screenshots created successfully!")
+        return {"paths": paths}
+
+    async def capture_archive(index: int, url: str) -> dict[str, Any]:
+        if args.bucket:
+            result = await take_artifacts_snapshot_to_s3(
+                url=url,
+                bucket_name=args.bucket,
+                artifacts=args.artifacts,
+                key_prefix=args.prefix,
+                viewport_width=args.width,
+                viewport_height=args.height,
+                wait_timeout=args.timeout,
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region_name=args.region,
+                pool=pool,
+                upload_queue=uploads,
+                transfer_config=transfer_config,
+                key_strategy=key_strategy,
+                dedup=args.dedup,
+                blocker=blocker,
+                wait=wait_rules.for_url(url, raise_on_rate_limit=batch),
+                region=args.capture_region,
+                **image_options,
+            )
+            record_timings(result.get("timings"))
+
+            log_info(
+                f"✅ {len(result['artifacts'])} artifacts uploaded successfully: {url}"
+            )
+            for artifact in result["artifacts"]:
+                status = " (unchanged)" if artifact["deduplicated"] else ""
+                log_verbose(f"{artifact['artifact']}: {artifact['s3_url']}{status}")
+            return {"key_group": result["key_group"]}
+
+        # Local file mode: one file per artifact, sharing --output's stem
+        if args.output:
+            stem = str(Path(args.output).with_suffix(""))
+        else:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+            stem = (
+                f"screenshot_{index}_{timestamp}"
+                if batch
+                else f"screenshot_{timestamp}"
+            )
+
+        timer = StageTimer()
+        captures = await capture_artifacts(
+            url=url,
+            artifacts=args.artifacts,
+            viewport_width=args.width,
+            viewport_height=args.height,
+            wait_timeout=args.timeout,
+            pool=pool,
+            blocker=blocker,
+            wait=wait_rules.for_url(url, raise_on_rate_limit=batch),
+            timer=timer,
+            region=args.capture_region,
+            **image_options,
+        )
+        record_timings(timer.as_dict())
+        paths = []
+        for name, data in captures.items():
+            path = Path(stem + Path(artifact_filename(name, args.format)).suffix)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            paths.append(str(path))
+            log_info(f"Saved {name} to: {path}")
+            log_verbose(f"File size: {len(data):,} bytes")
+        log_info(f"✅ {len(captures)} artifacts created successfully!")
+        return {"paths": paths}
+
+    async def capture_tiled(index: int, url: str) -> dict[str, Any]:
+        tile_options = {
+            "tile_height": args.tile_height,
+            "image_format": args.format,
+            "quality": args.quality,
+        }
+        if args.bucket:
+            result = await take_tiled_snapshot_to_s3(
+                url=url,
+                bucket_name=args.bucket,
+                key_prefix=args.prefix,
+                viewport_width=args.width,
+                viewport_height=args.height,
+                wait_timeout=args.timeout,
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region_name=args.region,
+                pool=pool,
+                upload_queue=uploads,
+                transfer_config=transfer_config,
+                key_strategy=key_strategy,
+                blocker=blocker,
+                wait=wait_rules.for_url(url, raise_on_rate_limit=batch),
+                max_page_height=args.max_page_height or DEFAULT_MAX_PAGE_HEIGHT,
+                **tile_options,
+            )
+            record_timings(result.get("timings"))
+
+            log_info(f"✅ {len(result['tiles'])} tiles uploaded successfully: {url}")
+            if result["truncated"]:
+                log_info(
+                    f"Page is {result['page_height']:,}px tall, captured the "
+                    f"first {result['captured_height']:,}px"
+                )
+            log_verbose(f"Manifest: {result['manifest_url']}")
+            return {"key_group": result["key_group"]}
+
+        # Local file mode: tiles and manifest in a directory named after --output
+        started = datetime.now()
+        if args.output:
+            directory = Path(args.output).with_suffix("")
+        else:
+            timestamp = started.strftime("%Y-%m-%d_%H%M%S")
+            directory = Path(
+                f"screenshot_{index}_{timestamp}"
+                if batch
+                else f"screenshot_{timestamp}"
+            )
+        directory.mkdir(parents=True, exist_ok=True)
+        tiles = []
+
+        async def save(tile) -> None:
+            name = f"tile-{tile.index:04d}{image_extension(args.format)}"
+            (directory / name).write_bytes(tile.data)
+            tiles.append(
+                {
+                    "name": name,
+                    "y": tile.y,
+                    "height": tile.height,
+                    "file_size": len(tile.data),
+                }
+            )
+
+        timer = StageTimer()
+        page = await capture_tiles(
+            url=url,
+            on_tile=save,
+            viewport_width=args.width,
+            viewport_height=args.height,
+            wait_timeout=args.timeout,
+            pool=pool,
+            blocker=blocker,
+            wait=wait_rules.for_url(url, raise_on_rate_limit=batch),
+            max_height=args.max_page_height or DEFAULT_MAX_PAGE_HEIGHT,
+            timer=timer,
+            **tile_options,
+        )
+        record_timings(timer.as_dict())
+        manifest = tile_manifest(
+            url, started, args.format, args.tile_height, page, tiles
+        )
+        (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+        log_info(f"Screenshot tiles saved to: {directory}")
+        log_verbose(f"Tiles: {len(tiles)}, page height: {page['page_height']:,}px")
+        log_info(f"✅ {len(tiles)} screenshot tiles created successfully!")
+        return {"path": str(directory)}
+
+    async def run_item(_: int, item: tuple[int, str]) -> dict[str, Any]:
+        return await capture(*item)
+
+    def on_success(_: int, item: tuple[int, str], details: dict[str, Any]) -> None:
+        if journal is not None:
+            journal.record(*item, "ok", **details)
+
+    def on_retry(_: int, item: tuple[int, str], attempt: int, error: Exception) -> None:
+        log_verbose(f"Attempt {attempt} failed for {item[1]}: {error}")
+        delay = 2.0
+        if isinstance(error, RateLimitedError) and error.retry_after:
+            delay = max(delay, min(error.retry_after, scheduler.max_backoff))
+        log_info(f"Retry {attempt}/{args.retries - 1} in {delay:g} seconds: {item[1]}")
+
+    def on_failure(_: int, item: tuple[int, str], error: Exception) -> None:
+        log_error(f"Failed after {args.retries} attempts: {item[1]}: {error}")
+        if journal is not None:
+            journal.record(*item, "failed", error=str(error))
+
+    # URLs are interleaved across hosts, and per-host limits and Retry-After
+    # pauses hold across all workers
+    scheduler = HostScheduler(
+        per_host=args.max_per_host,
+        rate=args.host_rate,
+        key=lambda item: host_of(item[1]),
+    )
+
+    if browsers > 1:
+        log_verbose(f"Processing URLs with {browsers} parallel workers")
+
+    cache = (
+        AssetCache(args.cache_dir, max_bytes=args.cache_size)
+        if args.cache_dir
+        else None
+    )
+
+    async with (
+        BrowserPool(
+            size=browsers,
+            max_pages_per_browser=args.recycle_after,
+            max_memory_mb=args.max_browser_memory,
+            cache=cache,
+        ) as pool,
+        UploadQueue(max_in_flight=max_uploads) as uploads,
+    ):
+        try:
+            summary = await run_batch(
+                pending(),
+                run_item,
+                concurrency=workers,
+                attempts=args.retries,
+                retry_delay=2.0,
+                on_success=on_success,
+                on_retry=on_retry,
+                on_failure=on_failure,
+                scheduler=scheduler,
+            )
+        finally:
+            if journal is not None:
+                journal.close()
+
+    if cache is not None:
+        stats = cache.stats()
+        log_verbose(
+            f"Asset cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['bytes_served']:,} bytes served from {args.cache_dir}"
+        )
+
+    return {
+        **summary,
+        "skipped": skipped,
+        "batch": batch,
+        "timings": timings.summary(),
+    }
+
+
 if __name__ == "__main__":
     sys.exit(main())
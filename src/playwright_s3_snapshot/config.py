@@ -42,20 +42,88 @@ class Config:
             "PS3S_HEIGHT": "height",
             "PS3S_TIMEOUT": "timeout",
             "PS3S_RETRIES": "retries",
+            "PS3S_PARALLEL": "parallel",
+            "PS3S_MAX_UPLOADS": "max_uploads",
+            "PS3S_MAX_PER_HOST": "max_per_host",
+            "PS3S_HOST_RATE": "host_rate",
             "PS3S_VERBOSE": "verbose",
             "PS3S_QUIET": "quiet",
+            "PS3S_RECYCLE_AFTER": "recycle_after",
+            "PS3S_MAX_BROWSER_MEMORY": "max_browser_memory",
+            "PS3S_CACHE_DIR": "cache_dir",
+            "PS3S_CACHE_SIZE": "cache_size",
+            "PS3S_MULTIPART_THRESHOLD": "multipart_threshold",
+            "PS3S_MULTIPART_CHUNKSIZE": "multipart_chunksize",
+            "PS3S_MULTIPART_CONCURRENCY": "multipart_concurrency",
+            "PS3S_KEY_STRATEGY": "key_strategy",
+            "PS3S_DEDUP": "dedup",
+            "PS3S_DETECT_CHANGES": "detect_changes",
+            "PS3S_CHANGE_THRESHOLD": "change_threshold",
+            "PS3S_BASELINE_DIR": "baseline_dir",
+            "PS3S_BASELINE_PREFIX": "baseline_prefix",
+            "PS3S_BLOCK_RESOURCES": "block_resources",
+            "PS3S_BLOCK_DOMAINS": "block_domains",
+            "PS3S_BLOCK_TRACKERS": "block_trackers",
+            "PS3S_WAIT": "wait",
+            "PS3S_WAIT_IGNORE": "wait_ignore",
+            "PS3S_FORMAT": "format",
+            "PS3S_QUALITY": "quality",
+            "PS3S_MAX_BYTES": "max_bytes",
+            "PS3S_VIEWPORTS": "viewports",
+            "PS3S_ARTIFACTS": "artifacts",
+            "PS3S_SELECTOR": "selector",
+            "PS3S_CLIP": "clip",
+            "PS3S_VIEWPORT_ONLY": "viewport_only",
+            "PS3S_TILE_HEIGHT": "tile_height",
+            "PS3S_MAX_PAGE_HEIGHT": "max_page_height",
         }
 
         for env_var, config_key in env_mapping.items():
             value = os.getenv(env_var)
             if value is not None:
                 # Convert string values to appropriate types
-                if config_key in ["width", "height", "timeout", "retries"]:
+                if config_key in [
+                    "width",
+                    "height",
+                    "timeout",
+                    "retries",
+                    "parallel",
+                    "max_uploads",
+                    "max_per_host",
+                    "recycle_after",
+                    "max_browser_memory",
+                    "multipart_concurrency",
+                    "quality",
+                    "tile_height",
+                    "max_page_height",
+                ]:
                     try:
                         self.data[config_key] = int(value)
                     except ValueError:
                         continue
-                elif config_key in ["verbose", "quiet"]:
+                elif config_key in [
+                    "multipart_threshold",
+                    "multipart_chunksize",
+                    "max_bytes",
+                    "cache_size",
+                ]:
+                    try:
+                        self.data[config_key] = parse_size(value)
+                    except ValueError:
+                        continue
+                elif config_key in ["change_threshold", "host_rate"]:
+                    try:
+                        self.data[config_key] = float(value)
+                    except ValueError:
+                        continue
+                elif config_key in [
+                    "verbose",
+                    "quiet",
+                    "dedup",
+                    "detect_changes",
+                    "block_trackers",
+                    "viewport_only",
+                ]:
                     self.data[config_key] = value.lower() in ("true", "1", "yes", "on")
                 else:
                     self.data[config_key] = value
@@ -71,6 +139,26 @@ class Config:
                 parser_defaults[key] = value
 
 
+def parse_size(value: str | int) -> int:
+    """
+    Parse a byte size such as 8388608, "64KB", "8MB" or "1GB".
+
+    Suffixes are binary (1KB = 1024 bytes).
+
+    Raises:
+        ValueError: If the value is not a valid size
+    """
+    if isinstance(value, int):
+        return value
+
+    units = {"KB": 1024, "MB": 1024**2, "GB": 1024**3, "B": 1}
+    text = value.strip().upper()
+    for suffix, multiplier in units.items():
+        if text.endswith(suffix):
+            return int(float(text[: -len(suffix)].strip()) * multiplier)
+    return int(text)
+
+
 def load_config_manager() -> Config:
     """Load configuration from files and environment."""
     return Config()
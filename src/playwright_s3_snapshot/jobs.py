@@ -0,0 +1,204 @@
+"""Asynchronous capture jobs whose status is kept in a JSON manifest in S3."""
+
+import json
+import re
+import secrets
+from datetime import UTC, datetime
+from typing import Any
+
+from .s3_upload import S3Uploader
+
+# Job states, in the order a job moves through them
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+FINISHED = (SUCCEEDED, FAILED)
+
+DEFAULT_JOB_PREFIX = "jobs/"
+
+# Job IDs double as object names and as the secret that grants read access to
+# a job's manifest, so they are random and checked before use in a key
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def new_job_id() -> str:
+    """A random, unguessable job ID."""
+    return secrets.token_hex(16)
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat(timespec="seconds")
+
+
+class JobStore:
+    """
+    Keeps one manifest object per job under a prefix in S3.
+
+    A manifest records the job's status and request, timestamps for each
+    transition and, once finished, the capture result or the error:
+    {
+        "job_id": "3f2c...",
+        "status": "succeeded",
+        "url": "https://example.com",
+        "request": {...},
+        "submitted_at": "2025-07-15T14:30:22+00:00",
+        "started_at": "2025-07-15T14:30:23+00:00",
+        "finished_at": "2025-07-15T14:30:51+00:00",
+        "result": {"s3_key": "screenshots/2025-07-15_143023.png", ...}
+    }
+
+    Every transition rewrites the whole object. S3 reads after writes are
+    strongly consistent, so pollers always see the latest state.
+
+    Usage:
+        store = JobStore(S3Uploader(bucket_name="my-bucket"))
+        manifest = store.submit({"url": "https://example.com"})
+        ...
+        store.load(manifest["job_id"])["status"]
+    """
+
+    def __init__(self, uploader: S3Uploader, prefix: str = DEFAULT_JOB_PREFIX):
+        """
+        Initialize the store.
+
+        Args:
+            uploader: S3Uploader for the bucket holding the manifests
+            prefix: Key prefix for manifest objects
+        """
+        self.uploader = uploader
+        self.prefix = prefix.rstrip("/") + "/" if prefix else ""
+
+    def key(self, job_id: str) -> str:
+        """
+        The manifest key of a job.
+
+        Raises:
+            ValueError: If job_id is not a job ID
+        """
+        if not isinstance(job_id, str) or not _JOB_ID.match(job_id):
+            raise ValueError(f"Invalid job ID: {job_id!r}")
+        return f"{self.prefix}{job_id}.json"
+
+    def url(self, job_id: str) -> str:
+        """S3 URL of a job's manifest."""
+        return self.uploader.get_url(self.key(job_id))
+
+    def load(self, job_id: str) -> dict[str, Any] | None:
+        """
+        The manifest of a job, or None if there is no such job.
+
+        Raises:
+            ValueError: If job_id is not a job ID
+        """
+        data = self.uploader.download_bytes(self.key(job_id))
+        return json.loads(data) if data is not None else None
+
+    def save(self, manifest: dict[str, Any]) -> None:
+        """Write a manifest, replacing the previous state."""
+        self.uploader.upload_bytes(
+            json.dumps(manifest, default=str).encode(),
+            self.key(manifest["job_id"]),
+            content_type="application/json",
+        )
+
+    def submit(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Record a new pending job for a capture request and return its manifest."""
+        manifest = {
+            "job_id": new_job_id(),
+            "status": PENDING,
+            "url": request.get("url"),
+            "request": request,
+            "submitted_at": _now(),
+        }
+        self.save(manifest)
+        return manifest
+
+    def start(self, manifest: dict[str, Any]) -> dict[str, Any]:
+        """Mark a job as running."""
+        return self._update(manifest, status=RUNNING, started_at=_now())
+
+    def succeed(self, manifest: dict[str, Any], result: Any) -> dict[str, Any]:
+        """Mark a job as finished and attach its result."""
+        return self._update(
+            manifest, status=SUCCEEDED, finished_at=_now(), result=result
+        )
+
+    def fail(self, manifest: dict[str, Any], error: Exception) -> dict[str, Any]:
+        """Mark a job as failed and record the error."""
+        return self._update(
+            manifest,
+            status=FAILED,
+            finished_at=_now(),
+            error=str(error),
+            type=type(error).__name__,
+        )
+
+    def _update(self, manifest: dict[str, Any], **fields: Any) -> dict[str, Any]:
+        manifest = {**manifest, **fields}
+        self.save(manifest)
+        return manifest
+
+
+def dispatch_job(
+    function_name: str,
+    payload: dict[str, Any],
+    region_name: str | None = None,
+    lambda_client: Any = None,
+) -> None:
+    """
+    Invoke a Lambda function asynchronously with a job payload.
+
+    Lambda queues the event and returns at once, so the caller's request is
+    not held open while the capture runs.
+
+    Args:
+        function_name: Function name or ARN to invoke
+        payload: Event for the function
+        region_name: AWS region of the function
+        lambda_client: boto3 Lambda client (defaults to a new one)
+    """
+    if lambda_client is None:
+        import boto3
+
+        lambda_client = boto3.client("lambda", region_name=region_name)
+
+    lambda_client.invoke(
+        FunctionName=function_name,
+        InvocationType="Event",
+        Payload=json.dumps(payload, default=str).encode(),
+    )
+
+
+def publish_job(
+    topic_arn: str,
+    manifest: dict[str, Any],
+    region_name: str | None = None,
+    sns_client: Any = None,
+) -> None:
+    """
+    Announce a finished job on an SNS topic.
+
+    The message is the manifest itself. A "status" message attribute lets
+    subscriptions filter on succeeded or failed jobs.
+
+    Args:
+        topic_arn: SNS topic ARN
+        manifest: The job's final manifest
+        region_name: AWS region of the topic
+        sns_client: boto3 SNS client (defaults to a new one)
+    """
+    if sns_client is None:
+        import boto3
+
+        sns_client = boto3.client("sns", region_name=region_name)
+
+    sns_client.publish(
+        TopicArn=topic_arn,
+        Subject=f"Screenshot job {manifest['status']}",
+        Message=json.dumps(manifest, default=str),
+        MessageAttributes={
+            "status": {"DataType": "String", "StringValue": manifest["status"]},
+        },
+    )
@@ -0,0 +1,109 @@
+"""Append-only checkpoint journal for resumable batch runs."""
+
+import json
+from pathlib import Path
+from typing import Any, TextIO
+
+
+class Journal:
+    """
+    Records the outcome of every URL in a batch, one JSON object per line.
+
+    Entries are keyed by the URL's 1-based position in the input, so a run
+    can be resumed against the same URL file. Lines are flushed as they are
+    written, so a crash loses at most the entries that were still in flight.
+
+    Completed positions are kept as a high-water mark (every position up to
+    it is done) plus the few positions completed out of order above it.
+    Workers finish in roughly input order, so memory stays bounded by the
+    batch concurrency rather than the length of the input.
+
+    Usage:
+        with Journal("urls.txt.journal") as journal:
+            journal.load()
+            if not journal.is_done(index):
+                ...
+                journal.record(index, url, "ok", s3_key="prefix/key.png")
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Initialize the journal.
+
+        Args:
+            path: JSON Lines file; created on first write
+        """
+        self.path = Path(path)
+        self.watermark = 0
+        self._done_above: set[int] = set()
+        self._file: TextIO | None = None
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def load(self) -> int:
+        """
+        Read completed positions from an existing journal.
+
+        Failed entries are not treated as done, so they are retried on resume.
+        A truncated last line (from a crash mid-write) is ignored.
+
+        Returns:
+            Number of completed entries found
+        """
+        if not self.path.exists():
+            return 0
+
+        completed = 0
+        with self.path.open() as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("status") == "ok":
+                    self._mark_done(int(entry["i"]))
+                    completed += 1
+        return completed
+
+    def is_done(self, index: int) -> bool:
+        """Whether the URL at this position has already been captured."""
+        return index <= self.watermark or index in self._done_above
+
+    def record(self, index: int, url: str, status: str, **details: Any) -> None:
+        """
+        Append an outcome.
+
+        Args:
+            index: 1-based position of the URL in the input
+            url: The URL
+            status: "ok" or "failed"
+            **details: Extra fields, e.g. s3_key, path or error
+        """
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a")
+
+        entry = {"i": index, "url": url, "status": status, **details}
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+        if status == "ok":
+            self._mark_done(index)
+
+    def close(self) -> None:
+        """Close the journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _mark_done(self, index: int) -> None:
+        if index <= self.watermark:
+            return
+        self._done_above.add(index)
+        while self.watermark + 1 in self._done_above:
+            self.watermark += 1
+            self._done_above.discard(self.watermark)
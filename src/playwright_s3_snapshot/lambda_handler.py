@@ -1,56 +1,322 @@
 """AWS Lambda handler for Playwright S3 Snapshot."""
 
+import asyncio
 import json
 import logging
 import os
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from .snapshot import take_snapshot_to_s3_sync
+from .batch import run_batch
+from .blocking import ResourceBlocker, parse_list
+from .browser_pool import BrowserPool
+from .changes import DEFAULT_THRESHOLD, ChangeDetector, S3BaselineStore
+from .config import parse_size
+from .jobs import (
+    DEFAULT_JOB_PREFIX,
+    FAILED,
+    FINISHED,
+    JobStore,
+    dispatch_job,
+    publish_job,
+)
+from .regions import Region
+from .runtime import get_runtime
+from .s3_upload import (
+    S3Uploader,
+    UploadQueue,
+    forget_known_keys,
+    make_transfer_config,
+)
+from .scheduler import HostScheduler
+from .screenshot import parse_artifacts
+from .snapshot import (
+    take_artifacts_snapshot_to_s3,
+    take_artifacts_snapshot_to_s3_sync,
+    take_snapshot_to_s3,
+    take_snapshot_to_s3_sync,
+    take_tiled_snapshot_to_s3,
+    take_tiled_snapshot_to_s3_sync,
+    take_viewports_snapshot_to_s3,
+    take_viewports_snapshot_to_s3_sync,
+)
+from .viewports import Viewport, parse_viewports
+from .waits import WaitRules
+
+if TYPE_CHECKING:
+    from .s3_upload import TransferConfig
 
 # Configure logging for Lambda
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Playwright and Chromium live in a module-level runtime (see runtime.get_runtime)
+# that is created on first use and kept warm between invocations of this container
+
+
+def _snapshot_options(event: dict[str, Any], bucket_name: str) -> dict[str, Any]:
+    """Snapshot keyword arguments shared by every handler, with env defaults."""
+    dedup = _is_true(event.get("dedup", os.getenv("DEDUP", "false")))
+    # Second-resolution timestamp keys collide when captures of the same
+    # prefix finish in the same second (concurrent invocations, SQS batches)
+    key_strategy = event.get("key_strategy", os.getenv("KEY_STRATEGY", "unique"))
+    region_name = event.get("region", os.getenv("AWS_REGION", "us-east-1"))
+
+    return {
+        "temp_dir": "/tmp",  # Lambda temp directory
+        "viewport_width": int(event.get("width", os.getenv("VIEWPORT_WIDTH", 1920))),
+        "viewport_height": int(event.get("height", os.getenv("VIEWPORT_HEIGHT", 1080))),
+        "wait_timeout": int(event.get("timeout", os.getenv("WAIT_TIMEOUT", 30000))),
+        "region_name": region_name,
+        "cleanup_local": True,  # Always cleanup in Lambda
+        "transfer_config": _transfer_config(event),
+        # Dedup only works when identical bytes map to the same key
+        "key_strategy": "content" if dedup else key_strategy,
+        "dedup": dedup,
+        "blocker": _blocker(event),
+        "change_detector": _change_detector(event, bucket_name, region_name),
+        "region": _region(event),
+        **_image_options(event),
+    }
+
+
+def _is_true(value: Any) -> bool:
+    """Interpret a JSON or environment flag."""
+    return str(value).lower() in ("true", "1", "yes", "on")
+
+
+def _transfer_config(event: dict[str, Any]) -> "TransferConfig | None":
+    """Multipart upload settings from the event or MULTIPART_* env vars."""
+    settings = {}
+    for event_key, env_var in [
+        ("multipart_threshold", "MULTIPART_THRESHOLD"),
+        ("multipart_chunksize", "MULTIPART_CHUNKSIZE"),
+        ("multipart_concurrency", "MULTIPART_CONCURRENCY"),
+    ]:
+        value = event.get(event_key, os.getenv(env_var))
+        settings[event_key] = parse_size(value) if value is not None else None
+
+    return make_transfer_config(
+        multipart_threshold=settings["multipart_threshold"],
+        multipart_chunksize=settings["multipart_chunksize"],
+        max_concurrency=settings["multipart_concurrency"],
+    )
+
+
+def _blocker(event: dict[str, Any]) -> ResourceBlocker | None:
+    """Request blocking from the event or BLOCK_* env vars."""
+    return ResourceBlocker.from_options(
+        resource_types=event.get("block_resources", os.getenv("BLOCK_RESOURCES")),
+        domains=event.get("block_domains", os.getenv("BLOCK_DOMAINS")),
+        trackers=_is_true(
+            event.get("block_trackers", os.getenv("BLOCK_TRACKERS", "false"))
+        ),
+    )
+
+
+def _change_detector(
+    event: dict[str, Any], bucket_name: str, region_name: str
+) -> ChangeDetector | None:
+    """Change detection from the event or DETECT_CHANGES / CHANGE_* env vars."""
+    if not _is_true(event.get("detect_changes", os.getenv("DETECT_CHANGES", "false"))):
+        return None
+
+    # Baselines live next to the captures so every container shares them
+    store = S3BaselineStore(
+        S3Uploader(bucket_name=bucket_name, region_name=region_name),
+        prefix=event.get("baseline_prefix", os.getenv("BASELINE_PREFIX", "baselines/")),
+    )
+    return ChangeDetector(
+        store,
+        threshold=float(
+            event.get(
+                "change_threshold", os.getenv("CHANGE_THRESHOLD", DEFAULT_THRESHOLD)
+            )
+        ),
+        diff_image=_is_true(event.get("diff_image", os.getenv("DIFF_IMAGE", "true"))),
+    )
+
+
+def _image_options(event: dict[str, Any]) -> dict[str, Any]:
+    """Output format settings from the event or IMAGE_* env vars."""
+    quality = event.get("quality", os.getenv("IMAGE_QUALITY"))
+    max_bytes = event.get("max_bytes", os.getenv("MAX_IMAGE_BYTES"))
+    return {
+        "image_format": event.get("format", os.getenv("IMAGE_FORMAT", "png")),
+        "quality": int(quality) if quality is not None else None,
+        "max_bytes": parse_size(max_bytes) if max_bytes is not None else None,
+    }
+
+
+def _region(event: dict[str, Any]) -> Region | None:
+    """Part of the page to capture from the event or SELECTOR / CLIP / VIEWPORT_ONLY env vars."""
+    return Region.from_options(
+        selector=event.get("selector", os.getenv("SELECTOR")),
+        clip=event.get("clip", os.getenv("CLIP")),
+        viewport=_is_true(
+            event.get("viewport_only", os.getenv("VIEWPORT_ONLY", "false"))
+        ),
+    )
+
+
+def _viewports(event: dict[str, Any]) -> list[Viewport]:
+    """Viewports for multi-viewport capture from the event or VIEWPORTS env var."""
+    return parse_viewports(event.get("viewports", os.getenv("VIEWPORTS")))
+
+
+def _viewport_options(options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Snapshot options without the single-viewport size.
+
+    Raises:
+        ValueError: If change detection was requested, which compares one
+            capture per URL, or a region, which applies to one page size
+    """
+    if options.get("change_detector") is not None:
+        raise ValueError("detect_changes cannot be combined with viewports")
+    if options.get("region") is not None:
+        raise ValueError(
+            "selector, clip and viewport_only cannot be combined with viewports"
+        )
+    return {
+        key: value
+        for key, value in options.items()
+        if key not in ("viewport_width", "viewport_height", "change_detector", "region")
+    }
+
+
+def _artifacts(event: dict[str, Any]) -> list[str] | None:
+    """Artifacts beyond a plain screenshot from the event or ARTIFACTS env var."""
+    value = event.get("artifacts", os.getenv("ARTIFACTS"))
+    if not value:
+        return None
+    artifacts = parse_artifacts(value)
+    return None if artifacts == ["screenshot"] else artifacts
+
+
+def _artifact_options(options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Snapshot options for a multi-artifact capture.
+
+    Raises:
+        ValueError: If change detection was requested; it compares one
+            screenshot per URL
+    """
+    if options.get("change_detector") is not None:
+        raise ValueError("detect_changes cannot be combined with artifacts")
+    return {key: value for key, value in options.items() if key != "change_detector"}
+
+
+def _tiling(event: dict[str, Any]) -> dict[str, int] | None:
+    """Tiled capture settings from the event or TILE_HEIGHT / MAX_PAGE_HEIGHT env vars."""
+    tile_height = event.get("tile_height", os.getenv("TILE_HEIGHT"))
+    if not tile_height:
+        return None
+    tiling = {"tile_height": int(tile_height)}
+    max_page_height = event.get("max_page_height", os.getenv("MAX_PAGE_HEIGHT"))
+    if max_page_height:
+        tiling["max_page_height"] = int(max_page_height)
+    return tiling
+
+
+def _tiled_options(options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Snapshot options for a tiled capture.
+
+    Raises:
+        ValueError: If change detection, dedup or max_bytes was requested,
+            which all work on one image per URL, or a region
+    """
+    if options.get("change_detector") is not None:
+        raise ValueError("detect_changes cannot be combined with tile_height")
+    if options.get("dedup"):
+        raise ValueError("dedup cannot be combined with tile_height")
+    if options.get("max_bytes") is not None:
+        raise ValueError("max_bytes cannot be combined with tile_height")
+    if options.get("region") is not None:
+        raise ValueError(
+            "selector, clip and viewport_only cannot be combined with tile_height"
+        )
+    return {
+        key: value
+        for key, value in options.items()
+        if key not in ("change_detector", "dedup", "max_bytes", "region")
+    }
+
+
+def _wait_rules(event: dict[str, Any]) -> WaitRules:
+    """Readiness strategies from the event or WAIT_STRATEGY / WAIT_IGNORE env vars."""
+    return WaitRules.from_options(
+        default=event.get("wait", os.getenv("WAIT_STRATEGY")),
+        rules=event.get("wait_rules"),
+        ignore=parse_list(event.get("wait_ignore", os.getenv("WAIT_IGNORE"))),
+    )
+
+
+def _host_scheduler(event: dict[str, Any]) -> HostScheduler:
+    """Per-host limits from the event or MAX_PER_HOST / HOST_RATE env vars."""
+    per_host = event.get("max_per_host", os.getenv("MAX_PER_HOST"))
+    rate = event.get("host_rate", os.getenv("HOST_RATE"))
+    return HostScheduler(
+        per_host=int(per_host) if per_host is not None else None,
+        rate=float(rate) if rate is not None else None,
+    )
+
+
+def _time_budget(event: dict[str, Any], context: Any) -> float | None:
+    """
+    Seconds left before work must stop, keeping a safety margin.
+
+    The margin comes from the event's "deadline_margin" or DEADLINE_MARGIN_MS
+    (default 15000 ms). None when the context has no deadline (local runs).
+    """
+    if not hasattr(context, "get_remaining_time_in_millis"):
+        return None
+    deadline_margin = int(
+        event.get("deadline_margin", os.getenv("DEADLINE_MARGIN_MS", 15000))
+    )
+    # Stop starting new work this long before Lambda would kill us
+    return (context.get_remaining_time_in_millis() - deadline_margin) / 1000
+
+
+def _batch_concurrency(event: dict[str, Any]) -> int:
+    """Resolve the batch concurrency cap from the event's "parallel" field."""
+    parallel = event.get("parallel", False)
+    if parallel is True:
+        return max(1, int(os.getenv("BATCH_CONCURRENCY", 4)))
+    if not parallel:
+        return 1
+    return max(1, int(parallel))
+
 
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     AWS Lambda handler for taking screenshots and uploading to S3.
 
-    Expected event structure:
-    {
-        "url": "https://example.com",
-        "bucket": "my-bucket",
-        "prefix": "screenshots/",
-        "width": 1920,
-        "height": 1080,
-        "timeout": 30000,
-        "region": "us-east-1"
-    }
+    Args:
+        event: Capture request such as {"url": "https://example.com",
+            "bucket": "my-bucket", "prefix": "screenshots/"}; every field and
+            its environment variable fallback is listed under "Event Fields"
+            in the README
+        context: Lambda context
 
     Returns:
-    {
-        "statusCode": 200,
-        "body": {
-            "success": true,
-            "result": {
-                "url": "https://example.com",
-                "s3_url": "https://bucket.s3.amazonaws.com/key",
-                "s3_key": "screenshots/2025-07-15_143022.png",
-                "timestamp": "2025-07-15T14:30:22",
-                "file_size": 55531
-            }
-        }
-    }
+        API Gateway response whose body holds the capture result, e.g.
+        {"statusCode": 200, "body": {"success": true, "result": {...}}}, or
+        202 with a "job_id" for "async" requests (see jobs.JobStore)
     """
+    # Objects may have been deleted since the last invocation of this container
+    forget_known_keys()
     try:
         logger.info(f"Processing screenshot request: {json.dumps(event, default=str)}")
 
         # Parse request body if it's from API Gateway
+        request = event
         if "body" in event and event["body"]:
             try:
                 body = json.loads(event["body"])
                 # Merge body parameters into event for processing
                 event = {**event, **body}
+                request = body
             except json.JSONDecodeError:
                 logger.warning("Failed to parse request body as JSON")
 
@@ -67,29 +333,18 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
 
         # Optional parameters with defaults
         key_prefix = event.get("prefix", os.getenv("KEY_PREFIX", ""))
-        viewport_width = int(event.get("width", os.getenv("VIEWPORT_WIDTH", 1920)))
-        viewport_height = int(event.get("height", os.getenv("VIEWPORT_HEIGHT", 1080)))
-        wait_timeout = int(event.get("timeout", os.getenv("WAIT_TIMEOUT", 30000)))
-        region_name = event.get("region", os.getenv("AWS_REGION", "us-east-1"))
 
         logger.info(
             f"Taking screenshot: url={url}, bucket={bucket_name}, prefix={key_prefix}"
         )
 
-        # Take screenshot and upload to S3
-        result = take_snapshot_to_s3_sync(
-            url=url,
-            bucket_name=bucket_name,
-            key_prefix=key_prefix,
-            temp_dir="/tmp",  # Lambda temp directory
-            viewport_width=viewport_width,
-            viewport_height=viewport_height,
-            wait_timeout=wait_timeout,
-            region_name=region_name,
-            cleanup_local=True,  # Always cleanup in Lambda
-        )
+        if event.get("job_id") and not _from_api(event):
+            return _run_job(event, url, bucket_name, key_prefix)
+        if _is_true(event.get("async", os.getenv("ASYNC_JOBS", "false"))):
+            return _submit_job(request, context, bucket_name)
 
-        logger.info(f"Screenshot completed successfully: {result['s3_url']}")
+        # Take screenshot and upload to S3
+        result = _capture(event, url, bucket_name, key_prefix)
 
         return {
             "statusCode": 200,
@@ -127,6 +382,240 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
         }
 
 
+def _capture(
+    event: dict[str, Any], url: str, bucket_name: str, key_prefix: str
+) -> dict[str, Any]:
+    """Capture one URL in the warm runtime as the event asks and return the result."""
+    viewports = _viewports(event)
+    tiling = _tiling(event)
+    artifacts = _artifacts(event)
+    if sum(map(bool, (viewports, tiling, artifacts))) > 1:
+        raise ValueError("viewports, tile_height and artifacts cannot be combined")
+    if artifacts:
+        result = take_artifacts_snapshot_to_s3_sync(
+            url=url,
+            bucket_name=bucket_name,
+            artifacts=artifacts,
+            key_prefix=key_prefix,
+            runtime=get_runtime(),
+            wait=_wait_rules(event).for_url(url),
+            **_artifact_options(_snapshot_options(event, bucket_name)),
+        )
+        logger.info(
+            f"Captured {len(result['artifacts'])} artifacts: {result['key_group']}"
+        )
+        _log_timings(result)
+    elif tiling:
+        result = take_tiled_snapshot_to_s3_sync(
+            url=url,
+            bucket_name=bucket_name,
+            key_prefix=key_prefix,
+            runtime=get_runtime(),
+            wait=_wait_rules(event).for_url(url),
+            **tiling,
+            **_tiled_options(_snapshot_options(event, bucket_name)),
+        )
+        logger.info(f"Captured {len(result['tiles'])} tiles: {result['key_group']}")
+        _log_timings(result)
+    elif viewports:
+        result = take_viewports_snapshot_to_s3_sync(
+            url=url,
+            bucket_name=bucket_name,
+            viewports=viewports,
+            key_prefix=key_prefix,
+            runtime=get_runtime(),
+            wait=_wait_rules(event).for_url(url),
+            **_viewport_options(_snapshot_options(event, bucket_name)),
+        )
+        logger.info(
+            f"Captured {len(result['variants'])} viewports: {result['key_group']}"
+        )
+        _log_timings(result)
+    else:
+        result = take_snapshot_to_s3_sync(
+            url=url,
+            bucket_name=bucket_name,
+            key_prefix=key_prefix,
+            runtime=get_runtime(),
+            wait=_wait_rules(event).for_url(url),
+            **_snapshot_options(event, bucket_name),
+        )
+        logger.info(f"Screenshot completed successfully: {result['s3_url']}")
+        _log_timings(result)
+    return result
+
+
+def _from_api(event: dict[str, Any]) -> bool:
+    """Whether the event came through API Gateway rather than a direct invocation."""
+    return "requestContext" in event or "httpMethod" in event
+
+
+def _json_response(status_code: int, body: dict[str, Any]) -> dict[str, Any]:
+    """An API Gateway proxy response with a JSON body."""
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+        },
+        "body": json.dumps(body, default=str),
+    }
+
+
+def _job_store(event: dict[str, Any], bucket_name: str) -> JobStore:
+    """Job manifests in the capture bucket under JOB_PREFIX (default jobs/)."""
+    return JobStore(
+        S3Uploader(
+            bucket_name=bucket_name,
+            region_name=event.get("region", os.getenv("AWS_REGION", "us-east-1")),
+        ),
+        prefix=os.getenv("JOB_PREFIX", DEFAULT_JOB_PREFIX),
+    )
+
+
+def _submit_job(
+    request: dict[str, Any], context: Any, bucket_name: str
+) -> dict[str, Any]:
+    """
+    Record a pending job and hand the capture to an asynchronous invocation.
+
+    The function invokes itself (or JOB_FUNCTION_NAME) with InvocationType
+    "Event", so the API call returns as soon as the job is queued.
+
+    Raises:
+        ValueError: If there is no function to invoke
+    """
+    function_name = os.getenv("JOB_FUNCTION_NAME") or getattr(
+        context, "invoked_function_arn", None
+    )
+    if not function_name:
+        raise ValueError(
+            "Asynchronous jobs need a Lambda context or the JOB_FUNCTION_NAME env var"
+        )
+
+    request = {key: value for key, value in request.items() if key != "async"}
+    store = _job_store(request, bucket_name)
+    manifest = store.submit(request)
+    job_id = manifest["job_id"]
+    try:
+        dispatch_job(
+            function_name,
+            {**request, "bucket": bucket_name, "job_id": job_id},
+            region_name=request.get("region", os.getenv("AWS_REGION")),
+        )
+    except Exception as e:
+        store.fail(manifest, e)
+        raise
+
+    logger.info(f"Submitted job {job_id} for {manifest['url']}")
+    return _json_response(
+        202,
+        {
+            "success": True,
+            "job_id": job_id,
+            "status": manifest["status"],
+            "manifest_key": store.key(job_id),
+            "manifest_url": store.url(job_id),
+        },
+    )
+
+
+def _run_job(
+    event: dict[str, Any], url: str, bucket_name: str, key_prefix: str
+) -> dict[str, Any]:
+    """
+    Capture a submitted job and record the outcome in its manifest.
+
+    Errors are written to the manifest instead of being raised: a raised
+    error would make Lambda retry the asynchronous invocation and capture
+    the page again. A job whose manifest is already finished (Lambda may
+    deliver an asynchronous event more than once) is not run again.
+    """
+    store = _job_store(event, bucket_name)
+    job_id = event["job_id"]
+    manifest = store.load(job_id) or {"job_id": job_id, "url": url, "request": event}
+    if manifest.get("status") in FINISHED:
+        logger.info(f"Job {job_id} already {manifest['status']}, skipping")
+        return _json_response(200, {"success": True, "job": manifest})
+
+    manifest = store.start(manifest)
+    try:
+        manifest = store.succeed(
+            manifest, _capture(event, url, bucket_name, key_prefix)
+        )
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        manifest = store.fail(manifest, e)
+
+    topic_arn = os.getenv("JOB_TOPIC_ARN")
+    if topic_arn:
+        try:
+            publish_job(
+                topic_arn,
+                manifest,
+                region_name=event.get("region", os.getenv("AWS_REGION")),
+            )
+        except Exception as e:
+            # The manifest is the source of truth; pollers still see the result
+            logger.error(f"Could not publish job {job_id} to {topic_arn}: {e}")
+
+    logger.info(f"Job {job_id} {manifest['status']}")
+    succeeded = manifest["status"] != FAILED
+    return _json_response(
+        200 if succeeded else 500, {"success": succeeded, "job": manifest}
+    )
+
+
+def job_status_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """
+    Lambda handler returning the manifest of an asynchronous job.
+
+    The job ID is read from the path (``/screenshot/jobs/{job_id}``), the
+    query string or the event itself; the bucket from the query string, the
+    event or BUCKET_NAME.
+
+    Returns:
+    {
+        "statusCode": 200,
+        "body": {
+            "success": true,
+            "job": {"job_id": "3f2c...", "status": "running", ...}
+        }
+    }
+    """
+    try:
+        params = {
+            **(event.get("queryStringParameters") or {}),
+            **(event.get("pathParameters") or {}),
+        }
+        job_id = params.get("job_id") or event.get("job_id")
+        if not job_id:
+            raise ValueError("job_id is required")
+
+        bucket_name = (
+            params.get("bucket") or event.get("bucket") or os.getenv("BUCKET_NAME")
+        )
+        if not bucket_name:
+            raise ValueError("Bucket name is required")
+
+        manifest = _job_store(event, bucket_name).load(job_id)
+        if manifest is None:
+            return _json_response(
+                404, {"success": False, "error": f"No such job: {job_id}"}
+            )
+        return _json_response(200, {"success": True, "job": manifest})
+
+    except ValueError as e:
+        return _json_response(
+            400, {"success": False, "error": str(e), "type": type(e).__name__}
+        )
+    except Exception as e:
+        logger.error(f"Error reading job status: {e}")
+        return _json_response(
+            500, {"success": False, "error": str(e), "type": type(e).__name__}
+        )
+
+
 def batch_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     Lambda handler for batch screenshot processing.
@@ -136,11 +625,23 @@ def batch_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
         "urls": ["https://example.com", "https://google.com"],
         "bucket": "my-bucket",
         "prefix": "batch-screenshots/",
-        "parallel": false
+        "parallel": 4,
+        "max_per_host": 2,
+        "host_rate": 1.0
     }
 
+    "parallel" may be false (sequential), true (BATCH_CONCURRENCY pages at a
+    time, default 4) or an integer concurrency cap; all pages share one
+    browser pool. "max_per_host" (env MAX_PER_HOST) and "host_rate" (env
+    HOST_RATE) tune the per-host politeness described in
+    scheduler.HostScheduler. Near the deadline (see _time_budget) in-flight
+    pages are abandoned and the remaining URLs are reported under "skipped"
+    so the caller can resubmit them. Capture options ("wait", "wait_rules",
+    "block_*", ...) are the same as for lambda_handler and apply to every URL.
+
     Returns summary of batch processing results.
     """
+    forget_known_keys()
     try:
         logger.info(
             f"Processing batch screenshot request: {json.dumps(event, default=str)}"
@@ -156,45 +657,46 @@ def batch_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
 
         key_prefix = event.get("prefix", os.getenv("KEY_PREFIX", ""))
 
-        results = []
-        errors = []
-
-        for i, url in enumerate(urls, 1):
-            try:
-                logger.info(f"Processing URL {i}/{len(urls)}: {url}")
-
-                # Create individual event for each URL
-                individual_event = {
-                    **event,
-                    "url": url,
-                    "prefix": (
-                        f"{key_prefix}batch-{i:03d}-"
-                        if key_prefix
-                        else f"batch-{i:03d}-"
-                    ),
-                }
+        concurrency = min(_batch_concurrency(event), len(urls))
+        time_budget = _time_budget(event, context)
 
-                # Process individual screenshot
-                response = lambda_handler(individual_event, context)
+        logger.info(
+            f"Processing {len(urls)} URLs with concurrency={concurrency}, "
+            f"time_budget={time_budget}s"
+        )
 
-                if response["statusCode"] == 200:
-                    response_data = json.loads(response["body"])
-                    results.append(response_data["result"])
-                else:
-                    error_data = json.loads(response["body"])
-                    errors.append(
-                        {"url": url, "error": error_data.get("error", "Unknown error")}
-                    )
+        outcomes = get_runtime().run(
+            lambda pool: _run_batch_snapshots(
+                urls=urls,
+                bucket_name=bucket_name,
+                key_prefix=key_prefix,
+                options=_snapshot_options(event, bucket_name),
+                wait_rules=_wait_rules(event),
+                viewports=_viewports(event),
+                tiling=_tiling(event),
+                artifacts=_artifacts(event),
+                pool=pool,
+                concurrency=concurrency,
+                time_budget=time_budget,
+                scheduler=_host_scheduler(event),
+            ),
+            pool_size=concurrency,
+        )
 
-            except Exception as e:
-                logger.error(f"Error processing URL {url}: {e}")
-                errors.append({"url": url, "error": str(e)})
+        results = [outcome["result"] for outcome in outcomes if "result" in outcome]
+        errors = [
+            {"url": outcome["url"], "error": outcome["error"]}
+            for outcome in outcomes
+            if "error" in outcome
+        ]
+        skipped = [outcome["url"] for outcome in outcomes if not outcome.get("done")]
 
         success_count = len(results)
         total_count = len(urls)
 
         logger.info(
-            f"Batch processing completed: {success_count}/{total_count} successful"
+            f"Batch processing completed: {success_count}/{total_count} successful, "
+            f"{len(skipped)} skipped before deadline"
         )
 
         return {
@@ -210,9 +712,11 @@ def batch_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
                         "total_urls": total_count,
                         "successful": success_count,
                         "failed": len(errors),
+                        "skipped": len(skipped),
                     },
                     "results": results,
                     "errors": errors,
+                    "skipped": skipped,
                 }
             ),
         }
@@ -237,6 +741,309 @@ def batch_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
         }
 
 
+async def _run_batch_snapshots(
+    urls: list[str],
+    bucket_name: str,
+    key_prefix: str,
+    options: dict[str, Any],
+    wait_rules: WaitRules,
+    viewports: list[Viewport],
+    pool: BrowserPool,
+    concurrency: int,
+    time_budget: float | None,
+    scheduler: HostScheduler | None = None,
+    tiling: dict[str, int] | None = None,
+    artifacts: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Capture URLs concurrently in the shared pool, stopping at the time budget.
+
+    Returns:
+        One outcome per URL, in input order, with "result" or "error" set for
+        URLs that finished and "done" False for URLs cut off by the deadline
+    """
+    outcomes = [{"url": url, "done": False} for url in urls]
+
+    async def capture(index: int, url: str) -> dict[str, Any]:
+        logger.info(f"Processing URL {index}/{len(urls)}: {url}")
+        return await _snapshot(
+            url=url,
+            bucket_name=bucket_name,
+            key_prefix=(
+                f"{key_prefix}batch-{index:03d}-"
+                if key_prefix
+                else f"batch-{index:03d}-"
+            ),
+            options=options,
+            wait_rules=wait_rules,
+            viewports=viewports,
+            pool=pool,
+            upload_queue=uploads,
+            tiling=tiling,
+            artifacts=artifacts,
+            in_batch=True,
+        )
+
+    def on_success(index: int, url: str, result: dict[str, Any]) -> None:
+        outcomes[index - 1].update(done=True, result=result)
+
+    def on_failure(index: int, url: str, error: Exception) -> None:
+        logger.error(f"Error processing URL {url}: {error}")
+        outcomes[index - 1].update(done=True, error=str(error))
+
+    async with UploadQueue(max_in_flight=concurrency) as uploads:
+        # Twice as many workers as browsers: half render while the others
+        # wait on their uploads, bounded by the upload queue
+        batch = run_batch(
+            urls,
+            capture,
+            concurrency=min(concurrency * 2, len(urls)),
+            on_success=on_success,
+            on_failure=on_failure,
+            scheduler=scheduler,
+        )
+        try:
+            await asyncio.wait_for(batch, timeout=time_budget)
+        except TimeoutError:
+            logger.warning("Lambda deadline approaching, returning partial results")
+
+    return outcomes
+
+
+async def _snapshot(
+    url: str,
+    bucket_name: str,
+    key_prefix: str,
+    options: dict[str, Any],
+    wait_rules: WaitRules,
+    viewports: list[Viewport],
+    pool: BrowserPool,
+    upload_queue: UploadQueue,
+    tiling: dict[str, int] | None = None,
+    artifacts: list[str] | None = None,
+    in_batch: bool = False,
+) -> dict[str, Any]:
+    """
+    Capture one URL in the shared pool: one or several viewports, tiles or artifacts.
+
+    With ``in_batch`` a 429 or 503 response raises RateLimitedError so that
+    run_batch can pause the host and retry.
+    """
+    if sum(map(bool, (viewports, tiling, artifacts))) > 1:
+        raise ValueError("viewports, tile_height and artifacts cannot be combined")
+    if artifacts:
+        result = await take_artifacts_snapshot_to_s3(
+            url=url,
+            bucket_name=bucket_name,
+            artifacts=artifacts,
+            key_prefix=key_prefix,
+            pool=pool,
+            upload_queue=upload_queue,
+            wait=wait_rules.for_url(url, raise_on_rate_limit=in_batch),
+            **_artifact_options(options),
+        )
+    elif tiling:
+        result = await take_tiled_snapshot_to_s3(
+            url=url,
+            bucket_name=bucket_name,
+            key_prefix=key_prefix,
+            pool=pool,
+            upload_queue=upload_queue,
+            wait=wait_rules.for_url(url, raise_on_rate_limit=in_batch),
+            **tiling,
+            **_tiled_options(options),
+        )
+    elif viewports:
+        result = await take_viewports_snapshot_to_s3(
+            url=url,
+            bucket_name=bucket_name,
+            viewports=viewports,
+            key_prefix=key_prefix,
+            pool=pool,
+            upload_queue=upload_queue,
+            wait=wait_rules.for_url(url, raise_on_rate_limit=in_batch),
+            **_viewport_options(options),
+        )
+    else:
+        result = await take_snapshot_to_s3(
+            url=url,
+            bucket_name=bucket_name,
+            key_prefix=key_prefix,
+            pool=pool,
+            upload_queue=upload_queue,
+            wait=wait_rules.for_url(url, raise_on_rate_limit=in_batch),
+            **options,
+        )
+    _log_timings(result)
+    return result
+
+
+def _log_timings(result: dict[str, Any]) -> None:
+    """
+    Log a snapshot's stage timings as one JSON line.
+
+    CloudWatch Logs Insights can then aggregate them directly, e.g.
+    ``filter event = "snapshot_timings" | stats pct(timings.goto, 95)``.
+    """
+    logger.info(
+        json.dumps(
+            {
+                "event": "snapshot_timings",
+                "url": result.get("url"),
+                "key": result.get("s3_key") or result.get("key_group"),
+                "format": result.get("format"),
+                "file_size": result.get("file_size"),
+                "timings": result.get("timings", {}),
+            }
+        )
+    )
+
+
+def sqs_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """
+    Lambda handler for an SQS event source.
+
+    Each record's body is either a bare URL or a JSON object with the same
+    fields as a lambda_handler event:
+    {
+        "url": "https://example.com",
+        "bucket": "my-bucket",
+        "prefix": "screenshots/",
+        "format": "webp"
+    }
+
+    All records of the batch are captured concurrently (SQS_CONCURRENCY,
+    default BATCH_CONCURRENCY or 4) in the warm browser pool. Only records
+    that failed, could not be parsed, or were not reached before the Lambda
+    deadline are returned in "batchItemFailures", so SQS retries just those
+    messages. The event source mapping needs ReportBatchItemFailures enabled.
+
+    Returns:
+    {
+        "batchItemFailures": [{"itemIdentifier": "<messageId>"}]
+    }
+    """
+    forget_known_keys()
+    records = event.get("Records", [])
+    logger.info(f"Processing {len(records)} SQS records")
+    if not records:
+        return {"batchItemFailures": []}
+
+    jobs = []
+    failures = []
+    for record in records:
+        try:
+            jobs.append((record["messageId"], _parse_sqs_message(record)))
+        except (KeyError, ValueError) as e:
+            logger.error(f"Rejecting SQS message {record.get('messageId')}: {e}")
+            failures.append(record.get("messageId"))
+
+    if jobs:
+        concurrency = min(
+            max(
+                1, int(os.getenv("SQS_CONCURRENCY", os.getenv("BATCH_CONCURRENCY", 4)))
+            ),
+            len(jobs),
+        )
+        failures += get_runtime().run(
+            lambda pool: _run_sqs_jobs(
+                jobs=jobs,
+                pool=pool,
+                concurrency=concurrency,
+                time_budget=_time_budget({}, context),
+            ),
+            pool_size=concurrency,
+        )
+
+    logger.info(
+        f"SQS batch completed: {len(records) - len(failures)}/{len(records)} "
+        "successful"
+    )
+    return {
+        "batchItemFailures": [
+            {"itemIdentifier": message_id}
+            for message_id in failures
+            if message_id is not None
+        ]
+    }
+
+
+def _parse_sqs_message(record: dict[str, Any]) -> dict[str, Any]:
+    """
+    Turn an SQS record body into a snapshot request.
+
+    Raises:
+        ValueError: If the body has no URL or no bucket can be resolved
+    """
+    body = record["body"].strip()
+    if body.startswith("{"):
+        message = json.loads(body)
+    else:
+        message = {"url": body}
+
+    if not message.get("url"):
+        raise ValueError("URL is required")
+    message.setdefault("bucket", os.getenv("BUCKET_NAME"))
+    if not message["bucket"]:
+        raise ValueError("Bucket name is required")
+    message.setdefault("prefix", os.getenv("KEY_PREFIX", ""))
+    return message
+
+
+async def _run_sqs_jobs(
+    jobs: list[tuple[str, dict[str, Any]]],
+    pool: BrowserPool,
+    concurrency: int,
+    time_budget: float | None,
+) -> list[str]:
+    """
+    Capture every queued request concurrently in the shared pool.
+
+    Returns:
+        Message IDs that failed or were not finished before the time budget
+    """
+    finished: set[str] = set()
+
+    async def capture(index: int, job: tuple[str, dict[str, Any]]) -> dict[str, Any]:
+        message_id, message = job
+        logger.info(f"Processing SQS message {message_id}: {message['url']}")
+        return await _snapshot(
+            url=message["url"],
+            bucket_name=message["bucket"],
+            key_prefix=message["prefix"],
+            options=_snapshot_options(message, message["bucket"]),
+            wait_rules=_wait_rules(message),
+            viewports=_viewports(message),
+            pool=pool,
+            upload_queue=uploads,
+            tiling=_tiling(message),
+            artifacts=_artifacts(message),
+        )
+
+    def on_success(index: int, job: tuple[str, dict[str, Any]], result: Any) -> None:
+        finished.add(job[0])
+
+    def on_failure(
+        index: int, job: tuple[str, dict[str, Any]], error: Exception
+    ) -> None:
+        logger.error(f"Error processing SQS message {job[0]}: {error}")
+
+    async with UploadQueue(max_in_flight=concurrency) as uploads:
+        batch = run_batch(
+            jobs,
+            capture,
+            concurrency=min(concurrency * 2, len(jobs)),
+            on_success=on_success,
+            on_failure=on_failure,
+        )
+        try:
+            await asyncio.wait_for(batch, timeout=time_budget)
+        except TimeoutError:
+            logger.warning("Lambda deadline approaching, returning unfinished messages")
+
+    return [message_id for message_id, _ in jobs if message_id not in finished]
+
+
 # For local testing
 if __name__ == "__main__":
 
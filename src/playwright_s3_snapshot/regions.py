@@ -0,0 +1,155 @@
+"""Capturing one element or rectangle of a page instead of its full length."""
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+# Document-space bounding box of the first element matching a selector
+_ELEMENT_BOX = """(selector) => {
+    const element = document.querySelector(selector);
+    if (!element) return null;
+    const box = element.getBoundingClientRect();
+    return {
+        x: box.left + window.scrollX,
+        y: box.top + window.scrollY,
+        width: box.width,
+        height: box.height,
+    };
+}"""
+
+
+class Region:
+    """
+    The part of a loaded page to capture.
+
+    - ``Region(viewport=True)``: what is visible without scrolling
+    - ``Region(selector="#chart")``: the first matching element's box
+    - ``Region(clip=(x, y, width, height))``: a rectangle in CSS pixels,
+      measured from the top left of the page
+
+    Only the region is rasterised and encoded, so encode time, image size and
+    upload time scale with the region rather than with the page's length.
+    Without a Region the full page is captured.
+    """
+
+    def __init__(
+        self,
+        selector: str | None = None,
+        clip: tuple[float, float, float, float] | None = None,
+        viewport: bool = False,
+    ):
+        """
+        Initialize a region.
+
+        Args:
+            selector: CSS selector of the element to capture
+            clip: (x, y, width, height) rectangle to capture
+            viewport: Capture only the initial viewport
+
+        Raises:
+            ValueError: If not exactly one kind of region is given, or the
+                clip is empty or off the page
+        """
+        if sum((selector is not None, clip is not None, viewport)) != 1:
+            raise ValueError("A region needs exactly one of selector, clip or viewport")
+        if selector is not None and not selector.strip():
+            raise ValueError("selector must not be empty")
+        if clip is not None:
+            x, y, width, height = clip
+            if x < 0 or y < 0:
+                raise ValueError(f"clip must start on the page, got: {x},{y}")
+            if width <= 0 or height <= 0:
+                raise ValueError(f"clip size must be positive, got: {width}x{height}")
+            clip = (x, y, width, height)
+
+        self.selector = selector
+        self.clip = clip
+        self.viewport = viewport
+
+    @classmethod
+    def from_options(
+        cls,
+        selector: str | None = None,
+        clip: str | Iterable[float] | Mapping[str, float] | None = None,
+        viewport: Any = False,
+    ) -> "Region | None":
+        """
+        Build a region from CLI/config/event values, or None for the full page.
+
+        Raises:
+            ValueError: If more than one region is given or the clip is malformed
+        """
+        if not selector and clip is None and not viewport:
+            return None
+        return cls(
+            selector=selector or None,
+            clip=parse_clip(clip) if clip is not None else None,
+            viewport=bool(viewport),
+        )
+
+    def __repr__(self) -> str:
+        if self.selector is not None:
+            return f"Region(selector={self.selector!r})"
+        if self.clip is not None:
+            return f"Region(clip={self.clip!r})"
+        return "Region(viewport=True)"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Region):
+            return NotImplemented
+        return (self.selector, self.clip, self.viewport) == (
+            other.selector,
+            other.clip,
+            other.viewport,
+        )
+
+    async def resolve(self, page: Any) -> dict[str, float]:
+        """
+        The region on a loaded page as a screenshot clip in page coordinates.
+
+        Raises:
+            ValueError: If the selector matches nothing or an invisible element
+        """
+        if self.clip is not None:
+            x, y, width, height = self.clip
+            return {"x": x, "y": y, "width": width, "height": height}
+
+        if self.viewport:
+            size = page.viewport_size
+            return {"x": 0, "y": 0, "width": size["width"], "height": size["height"]}
+
+        box = await page.evaluate(_ELEMENT_BOX, self.selector)
+        if box is None:
+            raise ValueError(f"No element matches selector: {self.selector}")
+        if box["width"] <= 0 or box["height"] <= 0:
+            raise ValueError(f"Element has no size: {self.selector}")
+        return box
+
+
+def parse_clip(
+    value: str | Iterable[float] | Mapping[str, float],
+) -> tuple[float, float, float, float]:
+    """
+    Parse a clip rectangle.
+
+    Accepts "X,Y,WIDTH,HEIGHT", a sequence of four numbers or a mapping with
+    x, y, width and height (as in JSON events).
+
+    Raises:
+        ValueError: If the value is not a rectangle
+    """
+    try:
+        if isinstance(value, Mapping):
+            numbers = [value[key] for key in ("x", "y", "width", "height")]
+        elif isinstance(value, str):
+            numbers = value.split(",")
+        else:
+            numbers = list(value)
+        numbers = [float(number) for number in numbers]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(
+            f"Invalid clip: {value!r}. Expected X,Y,WIDTH,HEIGHT"
+        ) from None
+
+    if len(numbers) != 4:
+        raise ValueError(f"Invalid clip: {value!r}. Expected X,Y,WIDTH,HEIGHT")
+    return tuple(int(n) if n.is_integer() else n for n in numbers)
@@ -0,0 +1,127 @@
+"""Long-lived browser runtime reused across warm Lambda invocations."""
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from .browser_pool import BrowserPool
+from .cache import DEFAULT_CACHE_SIZE, AssetCache
+from .config import parse_size
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WarmRuntime:
+    """
+    Event loop, Playwright driver and browser pool that outlive a single call.
+
+    ``asyncio.run`` creates and destroys an event loop per call, and Playwright
+    objects are bound to the loop that created them, so nothing can be reused
+    between Lambda invocations that way. The runtime instead keeps one loop
+    open for the life of the container and lazily starts a BrowserPool on it
+    the first time it is needed. Before each job the pool is health-checked
+    and relaunched if its browsers have crashed.
+    """
+
+    def __init__(self, pool_size: int = 1, **pool_options: Any):
+        """
+        Initialize runtime. Nothing is launched until the first job runs.
+
+        Args:
+            pool_size: Initial number of browsers in the pool
+            **pool_options: Extra BrowserPool keyword arguments
+        """
+        self.pool_size = pool_size
+        self.pool_options = pool_options
+        self.pool: BrowserPool | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def run(
+        self,
+        job: Callable[[BrowserPool], Awaitable[T]],
+        pool_size: int | None = None,
+    ) -> T:
+        """
+        Run a coroutine job on the runtime's loop with a healthy pool.
+
+        Args:
+            job: Called as ``job(pool)``; must return an awaitable
+            pool_size: Grow the pool to at least this many browsers first
+
+        Returns:
+            The job's result
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+
+        return self._loop.run_until_complete(self._run(job, pool_size))
+
+    async def _run(
+        self, job: Callable[[BrowserPool], Awaitable[T]], pool_size: int | None
+    ) -> T:
+        pool = await self._ensure_pool()
+        if pool_size is not None and pool_size > pool.size:
+            # Extra browsers are launched lazily as contexts are requested
+            pool.size = pool_size
+        return await job(pool)
+
+    async def _ensure_pool(self) -> BrowserPool:
+        if self.pool is not None and not self.pool.is_healthy():
+            logger.warning("Browser pool unhealthy, relaunching")
+            await self.pool.close()
+            self.pool = None
+
+        if self.pool is None:
+            pool = BrowserPool(size=self.pool_size, **self.pool_options)
+            await pool.start()
+            self.pool = pool
+
+        return self.pool
+
+    def close(self) -> None:
+        """Shut down the pool and the event loop."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        if self.pool is not None:
+            self._loop.run_until_complete(self.pool.close())
+            self.pool = None
+        self._loop.close()
+
+
+_runtime: WarmRuntime | None = None
+
+
+def get_runtime() -> WarmRuntime:
+    """
+    Get the process-wide runtime, creating it on first use.
+
+    Pool sizing and recycling come from BROWSER_POOL_SIZE,
+    BROWSER_RECYCLE_AFTER and BROWSER_MAX_MEMORY_MB. ASSET_CACHE_DIR (e.g.
+    /tmp/asset-cache) enables a shared AssetCache capped at ASSET_CACHE_SIZE
+    (default 256MB) that survives between warm invocations.
+    """
+    global _runtime
+    if _runtime is None:
+        max_memory = os.getenv("BROWSER_MAX_MEMORY_MB")
+        cache_dir = os.getenv("ASSET_CACHE_DIR")
+        cache_size = os.getenv("ASSET_CACHE_SIZE")
+        _runtime = WarmRuntime(
+            pool_size=int(os.getenv("BROWSER_POOL_SIZE", 1)),
+            max_pages_per_browser=int(os.getenv("BROWSER_RECYCLE_AFTER", 100)),
+            max_memory_mb=float(max_memory) if max_memory else None,
+            cache=(
+                AssetCache(
+                    cache_dir,
+                    max_bytes=(
+                        parse_size(cache_size) if cache_size else DEFAULT_CACHE_SIZE
+                    ),
+                )
+                if cache_dir
+                else None
+            ),
+        )
+    return _runtime
@@ -1,10 +1,206 @@
 """S3 upload functionality for screenshots."""
 
+import asyncio
+import functools
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlparse
 
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+# boto3 is imported where it is first needed: it takes ~250ms to import,
+# which commands that never reach S3 (--help, local captures) should not pay
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+
+# Clients are expensive to build (endpoint and credential resolution, a new
+# connection pool), so one is kept per distinct configuration for the life
+# of the process. boto3 clients are thread-safe once created.
+_client_cache: dict[tuple, Any] = {}
+_client_cache_lock = threading.Lock()
+
+KEY_STRATEGIES = ("timestamp", "unique", "content")
+
+# Content-addressed (bucket, key) pairs known to exist, so dedup checks can
+# skip the HEAD request. Least recently used pairs are dropped beyond this many
+KNOWN_KEYS_MAX = 4096
+_known_keys: OrderedDict[tuple[str, str], None] = OrderedDict()
+_known_keys_lock = threading.Lock()
+
+
+def slugify_url(url: str | None, max_length: int = 60) -> str:
+    """
+    Turn a URL into a short, S3-safe slug.
+
+    Example: "https://example.com/blog/post?id=1" -> "example-com-blog-post-id-1"
+    """
+    if not url:
+        return "page"
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    text = f"{parsed.netloc}{parsed.path}"
+    if parsed.query:
+        text += f"-{parsed.query}"
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", text).strip("-").lower()
+    return slug[:max_length].rstrip("-") or "page"
+
+
+def get_s3_client(
+    region_name: str = "us-east-1",
+    aws_access_key_id: str | None = None,
+    aws_secret_access_key: str | None = None,
+    endpoint_url: str | None = None,
+    max_pool_connections: int | None = None,
+    tcp_keepalive: bool | None = None,
+    retry_mode: str | None = None,
+    max_attempts: int | None = None,
+) -> Any:
+    """
+    Get a cached S3 client for the given region, credentials and endpoint.
+
+    Connection settings default to the S3_MAX_POOL_CONNECTIONS (32),
+    S3_TCP_KEEPALIVE (true), S3_RETRY_MODE ("standard") and S3_MAX_ATTEMPTS (3)
+    environment variables.
+
+    Args:
+        region_name: AWS region name
+        aws_access_key_id: AWS access key (optional, can use env vars)
+        aws_secret_access_key: AWS secret key (optional, can use env vars)
+        endpoint_url: Custom S3 endpoint (e.g. a local S3 stand-in)
+        max_pool_connections: Size of the HTTP connection pool
+        tcp_keepalive: Enable TCP keep-alive on S3 connections
+        retry_mode: botocore retry mode ("legacy", "standard" or "adaptive")
+        max_attempts: Maximum attempts per request, including the first
+
+    Returns:
+        boto3 S3 client shared with every caller using the same settings
+    """
+    if max_pool_connections is None:
+        max_pool_connections = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 32))
+    if tcp_keepalive is None:
+        tcp_keepalive = os.getenv("S3_TCP_KEEPALIVE", "true").lower() in (
+            "true",
+            "1",
+            "yes",
+            "on",
+        )
+    if retry_mode is None:
+        retry_mode = os.getenv("S3_RETRY_MODE", "standard")
+    if max_attempts is None:
+        max_attempts = int(os.getenv("S3_MAX_ATTEMPTS", 3))
+
+    if not (aws_access_key_id and aws_secret_access_key):
+        aws_access_key_id = aws_secret_access_key = None
+
+    cache_key = (
+        region_name,
+        aws_access_key_id,
+        aws_secret_access_key,
+        endpoint_url,
+        max_pool_connections,
+        tcp_keepalive,
+        retry_mode,
+        max_attempts,
+    )
+
+    with _client_cache_lock:
+        client = _client_cache.get(cache_key)
+        if client is None:
+            import boto3
+            from botocore.config import Config as BotoConfig
+
+            session = boto3.Session(
+                region_name=region_name,
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+            )
+            client = session.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                config=BotoConfig(
+                    max_pool_connections=max_pool_connections,
+                    tcp_keepalive=tcp_keepalive,
+                    retries={"mode": retry_mode, "max_attempts": max_attempts},
+                ),
+            )
+            _client_cache[cache_key] = client
+
+    return client
+
+
+def make_transfer_config(
+    multipart_threshold: int | None = None,
+    multipart_chunksize: int | None = None,
+    max_concurrency: int | None = None,
+) -> "TransferConfig | None":
+    """
+    Build a TransferConfig for large uploads, or None to use boto3 defaults.
+
+    Objects at or above ``multipart_threshold`` bytes are split into
+    ``multipart_chunksize`` parts which are uploaded by up to
+    ``max_concurrency`` threads in parallel.
+
+    Args:
+        multipart_threshold: Size in bytes at which multipart upload starts
+        multipart_chunksize: Size in bytes of each part (minimum 5 MB on S3)
+        max_concurrency: Parts uploaded in parallel per object
+
+    Returns:
+        TransferConfig, or None if no setting was given
+    """
+    settings = {
+        "multipart_threshold": multipart_threshold,
+        "multipart_chunksize": multipart_chunksize,
+        "max_concurrency": max_concurrency,
+    }
+    settings = {name: value for name, value in settings.items() if value is not None}
+    if not settings:
+        return None
+
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(**settings)
+
+
+def clear_client_cache() -> None:
+    """Drop cached S3 clients and known keys (e.g. after rotating credentials)."""
+    with _client_cache_lock:
+        _client_cache.clear()
+    forget_known_keys()
+
+
+def forget_known_keys() -> None:
+    """
+    Forget which keys are known to exist.
+
+    Called at the start of every Lambda invocation, so that an object deleted
+    since it was seen (e.g. by a lifecycle rule) is checked again instead of
+    being skipped by dedup.
+    """
+    with _known_keys_lock:
+        _known_keys.clear()
+
+
+def _remember_key(bucket_name: str, s3_key: str) -> None:
+    with _known_keys_lock:
+        _known_keys[(bucket_name, s3_key)] = None
+        _known_keys.move_to_end((bucket_name, s3_key))
+        while len(_known_keys) > KNOWN_KEYS_MAX:
+            _known_keys.popitem(last=False)
+
+
+def _is_known_key(bucket_name: str, s3_key: str) -> bool:
+    with _known_keys_lock:
+        if (bucket_name, s3_key) not in _known_keys:
+            return False
+        _known_keys.move_to_end((bucket_name, s3_key))
+        return True
 
 
 class S3Uploader:
@@ -16,29 +212,31 @@ class S3Uploader:
         aws_access_key_id: str | None = None,
         aws_secret_access_key: str | None = None,
         region_name: str = "us-east-1",
+        endpoint_url: str | None = None,
+        transfer_config: "TransferConfig | None" = None,
     ):
         """
         Initialize S3 uploader.
 
+        Uploaders are cheap: the underlying client comes from get_s3_client()
+        and is shared by every uploader with the same settings.
+
         Args:
             bucket_name: Name of the S3 bucket
             aws_access_key_id: AWS access key (optional, can use env vars)
             aws_secret_access_key: AWS secret key (optional, can use env vars)
             region_name: AWS region name
+            endpoint_url: Custom S3 endpoint (optional)
+            transfer_config: Multipart settings, see make_transfer_config()
         """
         self.bucket_name = bucket_name
-
-        session_kwargs = {"region_name": region_name}
-        if aws_access_key_id and aws_secret_access_key:
-            session_kwargs.update(
-                {
-                    "aws_access_key_id": aws_access_key_id,
-                    "aws_secret_access_key": aws_secret_access_key,
-                }
-            )
-
-        session = boto3.Session(**session_kwargs)
-        self.s3_client = session.client("s3")
+        self.transfer_config = transfer_config
+        self.s3_client = get_s3_client(
+            region_name=region_name,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            endpoint_url=endpoint_url,
+        )
 
     def upload_file(
         self,
@@ -66,17 +264,9 @@ class S3Uploader:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        if timestamp is None:
-            timestamp = datetime.now()
-
-        # Generate timestamped key
-        timestamp_str = timestamp.strftime("%Y-%m-%d_%H%M%S")
-        file_extension = file_path.suffix
+        s3_key = self.make_key(key_prefix, file_path.suffix, timestamp)
 
-        if key_prefix:
-            key_prefix = key_prefix.rstrip("/") + "/"
-
-        s3_key = f"{key_prefix}{timestamp_str}{file_extension}"
+        from botocore.exceptions import ClientError, NoCredentialsError
 
         try:
             # Upload file
@@ -84,27 +274,197 @@ class S3Uploader:
                 str(file_path),
                 self.bucket_name,
                 s3_key,
-                ExtraArgs={"ContentType": self._get_content_type(file_extension)},
+                ExtraArgs={"ContentType": self._get_content_type(file_path.suffix)},
+                Config=self.transfer_config,
             )
 
             # Return S3 URL
-            return f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
+            return self.get_url(s3_key)
 
-        except NoCredentialsError as e:
+        except NoCredentialsError:
             raise NoCredentialsError() from None
         except ClientError as e:
-            error_code = e.response["Error"]["Code"]
-            if error_code == "NoSuchBucket":
-                raise ClientError(
-                    {
-                        "Error": {
-                            "Code": "NoSuchBucket",
-                            "Message": f"Bucket '{self.bucket_name}' does not exist",
-                        }
-                    },
-                    "upload_file",
-                ) from None
-            raise
+            self._raise_client_error(e, "upload_file")
+
+    def upload_bytes(
+        self,
+        data: bytes,
+        s3_key: str,
+        content_type: str | None = None,
+        remember: bool = False,
+    ) -> str:
+        """
+        Upload an in-memory object to S3 without touching the filesystem.
+
+        Args:
+            data: Object contents. Pass bytes; a bytearray or memoryview is
+                copied into bytes first
+            s3_key: Full S3 key to write, usually from make_key()
+            content_type: Content type (defaults to one derived from the key)
+            remember: Record the key for object_exists(); only useful for
+                content keys, which are written once and checked by dedup
+
+        Returns:
+            S3 URL of the uploaded object
+
+        Raises:
+            NoCredentialsError: If AWS credentials not found
+            ClientError: If S3 upload fails
+        """
+        if content_type is None:
+            content_type = self._get_content_type(Path(s3_key).suffix)
+        # BytesIO only shares the buffer of an immutable bytes object and
+        # copies anything else, so make the one copy explicit here
+        if type(data) is not bytes:
+            data = bytes(data)
+
+        from botocore.exceptions import ClientError, NoCredentialsError
+
+        try:
+            # BytesIO over bytes shares its buffer rather than copying it;
+            # large objects are read back in chunks and uploaded as parallel
+            # multipart parts per transfer_config
+            self.s3_client.upload_fileobj(
+                io.BytesIO(data),
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={"ContentType": content_type},
+                Config=self.transfer_config,
+            )
+
+            if remember:
+                _remember_key(self.bucket_name, s3_key)
+            return self.get_url(s3_key)
+
+        except NoCredentialsError:
+            raise NoCredentialsError() from None
+        except ClientError as e:
+            self._raise_client_error(e, "upload_fileobj")
+
+    def make_key(
+        self,
+        key_prefix: str = "",
+        file_extension: str = ".png",
+        timestamp: datetime | None = None,
+        strategy: str = "timestamp",
+        url: str | None = None,
+        content_hash: str | None = None,
+    ) -> str:
+        """
+        Build the S3 key for an upload.
+
+        Strategies:
+            "timestamp": prefix/2025-07-15_143022.png (one key per second, so
+                concurrent captures can overwrite each other)
+            "unique": prefix/2025-07-15_143022_example-com-page_9f86d081884c.png
+            "content": prefix/example-com-page/9f86d081884c7d65.png, which is
+                identical for identical bytes and enables dedup
+
+        Args:
+            key_prefix: Optional prefix for the S3 key
+            file_extension: Extension including the leading dot
+            timestamp: Optional timestamp (defaults to now)
+            strategy: One of KEY_STRATEGIES
+            url: Captured URL, used for the slug in "unique"/"content" keys
+            content_hash: Hex SHA-256 of the object, required by
+                "unique"/"content" keys
+
+        Returns:
+            S3 key
+
+        Raises:
+            ValueError: If the strategy is unknown or its inputs are missing
+        """
+        if strategy not in KEY_STRATEGIES:
+            raise ValueError(
+                f"Unknown key strategy '{strategy}', "
+                f"expected one of: {', '.join(KEY_STRATEGIES)}"
+            )
+        if strategy != "timestamp" and not content_hash:
+            raise ValueError(f"Key strategy '{strategy}' requires a content hash")
+
+        if timestamp is None:
+            timestamp = datetime.now()
+
+        timestamp_str = timestamp.strftime("%Y-%m-%d_%H%M%S")
+
+        if key_prefix:
+            key_prefix = key_prefix.rstrip("/") + "/"
+
+        if strategy == "unique":
+            return (
+                f"{key_prefix}{timestamp_str}_{slugify_url(url)}_"
+                f"{content_hash[:12]}{file_extension}"
+            )
+        if strategy == "content":
+            return f"{key_prefix}{slugify_url(url)}/{content_hash[:16]}{file_extension}"
+
+        return f"{key_prefix}{timestamp_str}{file_extension}"
+
+    def object_exists(self, s3_key: str) -> bool:
+        """
+        Check whether a key already exists in the bucket.
+
+        Keys recently uploaded with ``remember`` or found here are answered
+        from an in-memory index (see forget_known_keys); anything else costs
+        one HEAD request.
+        """
+        if _is_known_key(self.bucket_name, s3_key):
+            return True
+
+        from botocore.exceptions import ClientError
+
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            self._raise_client_error(e, "head_object")
+
+        _remember_key(self.bucket_name, s3_key)
+        return True
+
+    def download_bytes(self, s3_key: str) -> bytes | None:
+        """
+        Read a small object into memory.
+
+        Returns:
+            Object contents, or None if the key does not exist
+
+        Raises:
+            ClientError: If the read fails for another reason
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            self._raise_client_error(e, "get_object")
+
+        return response["Body"].read()
+
+    def get_url(self, s3_key: str) -> str:
+        """Get the S3 URL for a key in this bucket."""
+        return f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
+
+    def _raise_client_error(self, error: "ClientError", operation: str) -> None:
+        """Re-raise S3 client errors with a clearer message where possible."""
+        from botocore.exceptions import ClientError
+
+        error_code = error.response["Error"]["Code"]
+        if error_code == "NoSuchBucket":
+            raise ClientError(
+                {
+                    "Error": {
+                        "Code": "NoSuchBucket",
+                        "Message": f"Bucket '{self.bucket_name}' does not exist",
+                    }
+                },
+                operation,
+            ) from None
+        raise error
 
     def _get_content_type(self, file_extension: str) -> str:
         """Get appropriate content type for file extension."""
@@ -112,12 +472,79 @@ class S3Uploader:
             ".png": "image/png",
             ".jpg": "image/jpeg",
             ".jpeg": "image/jpeg",
+            ".webp": "image/webp",
             ".pdf": "application/pdf",
             ".html": "text/html",
+            ".mhtml": "multipart/related",
+            ".json": "application/json",
         }
         return content_types.get(file_extension.lower(), "application/octet-stream")
 
 
+class UploadQueue:
+    """
+    Runs blocking S3 uploads in worker threads, with a cap on uploads in flight.
+
+    boto3 is synchronous, so calling it from a coroutine stalls the event loop
+    (and with it every page being rendered). Uploads submitted here run in a
+    thread pool instead. Once ``max_in_flight`` uploads are running,
+    ``submit`` waits for one to finish, which applies back-pressure to
+    producers when S3 falls behind the browser.
+
+    Usage:
+        async with UploadQueue(max_in_flight=4) as uploads:
+            s3_url = await uploads.run(uploader.upload_bytes, data, key)
+    """
+
+    def __init__(self, max_in_flight: int = 4):
+        """
+        Initialize upload queue.
+
+        Args:
+            max_in_flight: Maximum number of uploads running at the same time
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.max_in_flight = max_in_flight
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="s3-upload"
+        )
+
+    async def __aenter__(self) -> "UploadQueue":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any):
+        """
+        Start ``fn(*args, **kwargs)`` in a worker thread once a slot is free.
+
+        Returns:
+            An asyncio future resolving to the function's result
+        """
+        await self._slots.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Submit an upload and wait for its result."""
+        return await (await self.submit(fn, *args, **kwargs))
+
+    def close(self) -> None:
+        """Stop accepting uploads; running uploads are left to finish."""
+        self._executor.shutdown(wait=False)
+
+
 def upload_to_s3(
     file_path: str,
     bucket_name: str,
@@ -0,0 +1,212 @@
+"""Per-host politeness for batch runs: interleaving, concurrency and rate caps."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import urlparse
+
+# Statuses that mean "slow down" rather than "this page is broken"
+RATE_LIMIT_STATUSES = (429, 503)
+
+# Longest Retry-After honoured, so one host cannot stall a whole batch
+MAX_BACKOFF = 120.0
+
+# Input items read ahead to find work for idle hosts
+DEFAULT_LOOKAHEAD = 1000
+
+
+class RateLimitedError(Exception):
+    """A page answered 429 Too Many Requests or 503 Service Unavailable."""
+
+    def __init__(self, url: str, status: int, retry_after: float | None = None):
+        """
+        Args:
+            url: The URL that was refused
+            status: HTTP status code
+            retry_after: Seconds the server asked us to wait, if it said
+        """
+        message = f"{url} answered HTTP {status}"
+        if retry_after is not None:
+            message += f", retry after {retry_after:g}s"
+        super().__init__(message)
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+
+def host_of(url: str) -> str:
+    """Lower-cased host name of a URL, the unit politeness limits apply to."""
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    return (parsed.hostname or "").lower()
+
+
+def parse_retry_after(value: str | None, now: datetime | None = None) -> float | None:
+    """
+    Seconds to wait according to a Retry-After header.
+
+    Accepts both forms from RFC 9110: a number of seconds or an HTTP date.
+    Returns None if the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - (now or datetime.now(UTC))).total_seconds())
+
+
+class HostScheduler:
+    """
+    Hands batch items to workers so that no host is overloaded.
+
+    - Items are interleaved across hosts round robin, looking up to
+      ``lookahead`` items ahead in the input, so a file listing hundreds of
+      pages of one site does not keep every worker on that site
+    - At most ``per_host`` items of one host are processed at once
+    - Starts on one host are spaced at least ``1 / rate`` seconds apart
+    - ``defer`` pauses a host, e.g. for a Retry-After header
+
+    A worker that finds no host ready waits instead of taking work that would
+    break a limit. A scheduler serves a single batch; pass it to run_batch,
+    which feeds it the items.
+
+    Usage:
+        scheduler = HostScheduler(per_host=2, rate=1.0)
+        await run_batch(urls, capture, concurrency=8, scheduler=scheduler)
+    """
+
+    def __init__(
+        self,
+        per_host: int | None = None,
+        rate: float | None = None,
+        lookahead: int = DEFAULT_LOOKAHEAD,
+        key: Callable[[Any], str] = host_of,
+        max_backoff: float = MAX_BACKOFF,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            per_host: Concurrent items per host (default: unlimited)
+            rate: Item starts per second per host (default: unlimited)
+            lookahead: Input items buffered while looking for a ready host
+            key: Maps an item to its host (default: host_of for URL items)
+            max_backoff: Cap in seconds for any deferral
+
+        Raises:
+            ValueError: If a limit is not positive
+        """
+        if per_host is not None and per_host < 1:
+            raise ValueError(f"per_host must be at least 1, got: {per_host}")
+        if rate is not None and rate <= 0:
+            raise ValueError(f"rate must be positive, got: {rate}")
+        if lookahead < 1:
+            raise ValueError(f"lookahead must be at least 1, got: {lookahead}")
+
+        self.per_host = per_host
+        self.rate = rate
+        self.lookahead = lookahead
+        self.key = key
+        self.max_backoff = max_backoff
+
+        self._jobs: Iterator[tuple[int, Any]] = iter(())
+        self._exhausted = False
+        # Host -> buffered jobs; dict order is the round-robin order
+        self._pending: dict[str, deque] = {}
+        self._buffered = 0
+        self._running: dict[str, int] = {}
+        self._next_start: dict[str, float] = {}
+        self._released = asyncio.Event()
+
+    def feed(self, jobs: Iterable[tuple[int, Any]]) -> None:
+        """Set the (index, item) jobs to schedule; consumed lazily."""
+        self._jobs = iter(jobs)
+        self._exhausted = False
+
+    async def get(self) -> tuple[int, Any] | None:
+        """Wait for the next job whose host may start, or None when none are left."""
+        while True:
+            self._fill()
+            if not self._pending:
+                return None
+
+            now = time.monotonic()
+            wake = math.inf
+            for host, jobs in self._pending.items():
+                if self.per_host and self._running.get(host, 0) >= self.per_host:
+                    continue
+                start = self._next_start.get(host, 0.0)
+                if start > now:
+                    wake = min(wake, start)
+                    continue
+
+                job = jobs.popleft()
+                # The host goes to the back of the line
+                del self._pending[host]
+                if jobs:
+                    self._pending[host] = jobs
+                self._buffered -= 1
+                self._running[host] = self._running.get(host, 0) + 1
+                self._book(host, now)
+                return job
+
+            # Every buffered host is busy or paused: sleep until a job
+            # finishes or the earliest pause ends
+            self._released.clear()
+            try:
+                await asyncio.wait_for(
+                    self._released.wait(),
+                    timeout=None if wake == math.inf else wake - now,
+                )
+            except TimeoutError:
+                pass
+
+    async def wait_turn(self, job: tuple[int, Any]) -> None:
+        """Before retrying a job, wait until its host may start again."""
+        host = self.key(job[1])
+        while (delay := self._next_start.get(host, 0.0) - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        self._book(host, time.monotonic())
+
+    def release(self, job: tuple[int, Any]) -> None:
+        """Mark a job handed out by get() as finished."""
+        host = self.key(job[1])
+        self._running[host] -= 1
+        if not self._running[host]:
+            del self._running[host]
+        self._released.set()
+
+    def defer(self, job: tuple[int, Any], seconds: float) -> None:
+        """Start nothing more on the job's host for ``seconds``."""
+        host = self.key(job[1])
+        until = time.monotonic() + min(max(seconds, 0.0), self.max_backoff)
+        self._next_start[host] = max(self._next_start.get(host, 0.0), until)
+
+    def _book(self, host: str, now: float) -> None:
+        """Record a start on ``host`` for rate limiting."""
+        if self.rate:
+            self._next_start[host] = now + 1 / self.rate
+        elif self._next_start.get(host, math.inf) <= now:
+            del self._next_start[host]
+
+    def _fill(self) -> None:
+        """Buffer input jobs up to the lookahead."""
+        while not self._exhausted and self._buffered < self.lookahead:
+            try:
+                job = next(self._jobs)
+            except StopIteration:
+                self._exhausted = True
+                break
+            self._pending.setdefault(self.key(job[1]), deque()).append(job)
+            self._buffered += 1
@@ -1,9 +1,49 @@
 """Core screenshot functionality using Playwright."""
 
+import base64
+import math
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
-from playwright.async_api import async_playwright
+from .blocking import ResourceBlocker, parse_list
+from .browser_pool import CHROMIUM_ARGS, BrowserPool, async_playwright
+from .regions import Region
+from .runtime import WarmRuntime
+from .timings import StageTimer
+from .viewports import Viewport, group_by_context
+from .waits import WaitStrategy
+
+# Supported output formats and the file extension used for each
+IMAGE_FORMATS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+
+# Artifacts one navigation can produce and the file name used for each
+# (the screenshot's extension follows the image format)
+ARTIFACTS = {
+    "screenshot": "screenshot",
+    "pdf": "page.pdf",
+    "html": "dom.html",
+    "mhtml": "page.mhtml",
+}
+
+# Quality used for lossy formats when none is given
+DEFAULT_QUALITY = 80
+
+# How much quality drops per attempt while fitting a max_bytes budget
+_QUALITY_STEP = 10
+
+# Height of one tile in tiled captures, in CSS pixels
+DEFAULT_TILE_HEIGHT = 4096
+
+# Tiled captures stop here; infinite-scroll pages would otherwise never end
+DEFAULT_MAX_PAGE_HEIGHT = 65536
+
+# Resolves after the next frame has been laid out and painted
+_NEXT_FRAME = (
+    "() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))"
+)
 
 
 async def take_screenshot(
@@ -12,6 +52,14 @@ async def take_screenshot(
     viewport_width: int = 1920,
     viewport_height: int = 1080,
     wait_timeout: int = 30000,
+    pool: BrowserPool | None = None,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+    timer: StageTimer | None = None,
+    region: Region | None = None,
 ) -> str:
     """
     Take a full-page screenshot of the given URL.
@@ -22,6 +70,15 @@ async def take_screenshot(
         viewport_width: Browser viewport width in pixels
         viewport_height: Browser viewport height in pixels
         wait_timeout: Maximum time to wait for page load in milliseconds
+        pool: Optional BrowserPool to borrow a context from instead of
+            launching a dedicated browser
+        blocker: Optional ResourceBlocker aborting unneeded requests
+        wait: How to decide the page is ready (default: networkidle)
+        image_format: "png", "jpeg" or "webp"
+        quality: Starting quality for jpeg/webp, 1-100 (default: 80)
+        max_bytes: Lower the quality until the image fits in this many bytes
+        timer: Optional StageTimer that records where the time went
+        region: Capture only this part of the page (default: the full page)
 
     Returns:
         Path to the saved screenshot file
@@ -31,45 +88,571 @@ async def take_screenshot(
     """
     if output_path is None:
         timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        output_path = f"screenshot_{timestamp}.png"
+        output_path = f"screenshot_{timestamp}{image_extension(image_format)}"
 
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    async with async_playwright() as p:
-        # Configure browser for Lambda environment
-        browser_args = [
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-gpu",
-            "--disable-dev-tools",
-            "--disable-setuid-sandbox",
-            "--no-first-run",
-            "--no-zygote",
-            "--single-process",
-            "--disable-background-timer-throttling",
-            "--disable-background-networking",
-            "--disable-backgrounding-occluded-windows",
-            "--disable-renderer-backgrounding",
-            "--disable-features=TranslateUI",
-            "--disable-ipc-flooding-protection",
-        ]
-
-        browser = await p.chromium.launch(headless=True, args=browser_args)
+    await capture_screenshot(
+        url=url,
+        viewport_width=viewport_width,
+        viewport_height=viewport_height,
+        wait_timeout=wait_timeout,
+        pool=pool,
+        path=str(output_path),
+        blocker=blocker,
+        wait=wait,
+        image_format=image_format,
+        quality=quality,
+        max_bytes=max_bytes,
+        timer=timer,
+        region=region,
+    )
 
-        try:
-            page = await browser.new_page(
-                viewport={"width": viewport_width, "height": viewport_height}
+    return str(output_path)
+
+
+async def capture_screenshot(
+    url: str,
+    viewport_width: int = 1920,
+    viewport_height: int = 1080,
+    wait_timeout: int = 30000,
+    pool: BrowserPool | None = None,
+    path: str | None = None,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+    timer: StageTimer | None = None,
+    after_capture: Callable[[Any], Awaitable[None]] | None = None,
+    region: Region | None = None,
+) -> bytes:
+    """
+    Take a full-page screenshot and return the encoded image in memory.
+
+    Args:
+        url: The URL to screenshot
+        viewport_width: Browser viewport width in pixels
+        viewport_height: Browser viewport height in pixels
+        wait_timeout: Maximum time to wait for page load in milliseconds
+        pool: Optional BrowserPool to borrow a context from
+        path: Optionally also write the image to this path
+        blocker: Optional ResourceBlocker aborting unneeded requests
+        wait: How to decide the page is ready (default: networkidle)
+        image_format: "png", "jpeg" or "webp"
+        quality: Starting quality for jpeg/webp, 1-100 (default: 80)
+        max_bytes: Re-encode at lower quality until the image fits in this
+            many bytes; the smallest attempt is returned if it never fits
+        timer: Optional StageTimer that records where the time went
+        after_capture: Optional coroutine function called with the page
+            after the screenshot, while the page is still open
+        region: Capture only this part of the page (default: the full page)
+
+    Returns:
+        Encoded image bytes
+
+    Raises:
+        ValueError: If the format options are invalid, or the region's
+            selector matches nothing
+        Exception: If screenshot fails
+    """
+    check_image_options(image_format, quality, max_bytes)
+
+    viewport = {"width": viewport_width, "height": viewport_height}
+    if wait is None:
+        wait = WaitStrategy()
+    if timer is None:
+        timer = StageTimer()
+
+    async with _open_page({"viewport": viewport}, pool, blocker, timer) as page:
+        await wait.navigate(page, url, wait_timeout, timer)
+        with timer.stage("encode"):
+            clip = await region.resolve(page) if region is not None else None
+            image = await _encode_page(
+                page, image_format, quality, max_bytes, path, clip
             )
+        if after_capture is not None:
+            await after_capture(page)
+        return image
 
-            await page.goto(url, wait_until="networkidle", timeout=wait_timeout)
 
-            await page.screenshot(path=str(output_path), full_page=True, type="png")
+async def capture_viewports(
+    url: str,
+    viewports: Iterable[Viewport],
+    wait_timeout: int = 30000,
+    pool: BrowserPool | None = None,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+    timer: StageTimer | None = None,
+) -> list[tuple[Viewport, bytes]]:
+    """
+    Capture one URL at several viewports, loading the page as few times as possible.
 
-            return str(output_path)
+    Viewports that share a scale factor, user agent and mobile/touch settings
+    are captured from a single page load by resizing the page between
+    screenshots; each distinct combination needs its own browser context and
+    therefore its own load.
 
+    Args:
+        url: The URL to screenshot
+        viewports: Viewports to capture, e.g. from viewports.parse_viewports
+        wait_timeout: Maximum time to wait for each page load in milliseconds
+        pool: Optional BrowserPool to borrow contexts from
+        blocker: Optional ResourceBlocker aborting unneeded requests
+        wait: How to decide the page is ready (default: networkidle)
+        image_format: "png", "jpeg" or "webp"
+        quality: Starting quality for jpeg/webp, 1-100 (default: 80)
+        max_bytes: Lower the quality until each image fits in this many bytes
+        timer: Optional StageTimer that records where the time went
+
+    Returns:
+        (viewport, image bytes) pairs in the order the viewports were given
+
+    Raises:
+        ValueError: If no viewports are given or the format options are invalid
+        Exception: If a screenshot fails
+    """
+    check_image_options(image_format, quality, max_bytes)
+    viewports = list(viewports)
+    if not viewports:
+        raise ValueError("At least one viewport is required")
+    if wait is None:
+        wait = WaitStrategy()
+    if timer is None:
+        timer = StageTimer()
+
+    images: dict[str, bytes] = {}
+    for group in group_by_context(viewports):
+        context_options = group[0].context_options()
+        async with _open_page(context_options, pool, blocker, timer) as page:
+            await wait.navigate(page, url, wait_timeout, timer)
+
+            for position, viewport in enumerate(group):
+                if position:
+                    # Media queries apply on resize; let layout and paint catch up
+                    with timer.stage("wait"):
+                        await page.set_viewport_size(viewport.size)
+                        await page.evaluate(_NEXT_FRAME)
+                with timer.stage("encode"):
+                    images[viewport.name] = await _encode_page(
+                        page, image_format, quality, max_bytes
+                    )
+
+    return [(viewport, images[viewport.name]) for viewport in viewports]
+
+
+async def capture_artifacts(
+    url: str,
+    artifacts: Iterable[str],
+    viewport_width: int = 1920,
+    viewport_height: int = 1080,
+    wait_timeout: int = 30000,
+    pool: BrowserPool | None = None,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+    timer: StageTimer | None = None,
+    region: Region | None = None,
+) -> dict[str, bytes]:
+    """
+    Load a page once and produce several archival artifacts from it.
+
+    Artifacts are:
+
+    - ``screenshot``: full-page image in ``image_format`` (or the region)
+    - ``pdf``: the page printed to PDF, with backgrounds
+    - ``html``: the DOM as serialised after the page settled
+    - ``mhtml``: a single-file archive of the page and its resources
+
+    Args:
+        url: The URL to capture
+        artifacts: Artifact names, see ARTIFACTS
+        viewport_width: Browser viewport width in pixels
+        viewport_height: Browser viewport height in pixels
+        wait_timeout: Maximum time to wait for page load in milliseconds
+        pool: Optional BrowserPool to borrow a context from
+        blocker: Optional ResourceBlocker aborting unneeded requests
+        wait: How to decide the page is ready (default: networkidle)
+        image_format: "png", "jpeg" or "webp" for the screenshot
+        quality: Starting quality for jpeg/webp, 1-100 (default: 80)
+        max_bytes: Lower the screenshot's quality until it fits in this many bytes
+        timer: Optional StageTimer that records where the time went
+        region: Screenshot only this part of the page (default: the full page)
+
+    Returns:
+        Artifact name -> bytes, in the order the artifacts were given
+
+    Raises:
+        ValueError: If no or unknown artifacts are given, or the format
+            options are invalid
+        Exception: If a capture fails
+    """
+    artifacts = parse_artifacts(artifacts)
+    check_image_options(image_format, quality, max_bytes)
+
+    viewport = {"width": viewport_width, "height": viewport_height}
+    if wait is None:
+        wait = WaitStrategy()
+    if timer is None:
+        timer = StageTimer()
+
+    captured: dict[str, bytes] = {}
+    async with _open_page({"viewport": viewport}, pool, blocker, timer) as page:
+        await wait.navigate(page, url, wait_timeout, timer)
+
+        for artifact in artifacts:
+            with timer.stage("encode"):
+                if artifact == "screenshot":
+                    clip = await region.resolve(page) if region is not None else None
+                    captured[artifact] = await _encode_page(
+                        page, image_format, quality, max_bytes, clip=clip
+                    )
+                elif artifact == "pdf":
+                    captured[artifact] = await page.pdf(print_background=True)
+                elif artifact == "html":
+                    captured[artifact] = (await page.content()).encode()
+                else:
+                    captured[artifact] = await _capture_mhtml(page)
+
+    return captured
+
+
+def parse_artifacts(value: str | Iterable[str] | None) -> list[str]:
+    """
+    Parse a comma-separated artifact list (or pass through a list).
+
+    Raises:
+        ValueError: If the list is empty, has unknown names or duplicates
+    """
+    artifacts = [name.lower() for name in parse_list(value)]
+    if not artifacts:
+        raise ValueError("At least one artifact is required")
+    unknown = [name for name in artifacts if name not in ARTIFACTS]
+    if unknown:
+        raise ValueError(
+            f"Unknown artifact: {', '.join(unknown)}. "
+            f"Choose from: {', '.join(ARTIFACTS)}"
+        )
+    if len(set(artifacts)) != len(artifacts):
+        raise ValueError(f"Duplicate artifacts: {', '.join(artifacts)}")
+    return artifacts
+
+
+def artifact_filename(artifact: str, image_format: str = "png") -> str:
+    """File name of an artifact within its key group, e.g. "page.pdf"."""
+    if artifact == "screenshot":
+        return ARTIFACTS[artifact] + image_extension(image_format)
+    return ARTIFACTS[artifact]
+
+
+async def _capture_mhtml(page: Any) -> bytes:
+    """Serialise the page and its subresources as MHTML over CDP."""
+    session = await page.context.new_cdp_session(page)
+    try:
+        result = await session.send("Page.captureSnapshot", {"format": "mhtml"})
+    finally:
+        await session.detach()
+    return result["data"].encode()
+
+
+class Tile:
+    """One horizontal slice of a tiled capture."""
+
+    def __init__(self, index: int, y: int, width: int, height: int, data: bytes):
+        """
+        Args:
+            index: Position from the top, starting at 0
+            y: Offset of the slice from the top of the page, in CSS pixels
+            width: Width in CSS pixels
+            height: Height in CSS pixels
+            data: Encoded image
+        """
+        self.index = index
+        self.y = y
+        self.width = width
+        self.height = height
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"Tile({self.index}, y={self.y}, {self.width}x{self.height})"
+
+
+async def capture_tiles(
+    url: str,
+    on_tile: Callable[[Tile], Awaitable[None]],
+    viewport_width: int = 1920,
+    viewport_height: int = 1080,
+    wait_timeout: int = 30000,
+    pool: BrowserPool | None = None,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    tile_height: int = DEFAULT_TILE_HEIGHT,
+    max_height: int = DEFAULT_MAX_PAGE_HEIGHT,
+    timer: StageTimer | None = None,
+) -> dict[str, Any]:
+    """
+    Capture a page as fixed-height slices instead of one full-page bitmap.
+
+    A full-page screenshot of a very tall page makes Chromium allocate one
+    bitmap for the whole page. Here each slice is rendered on its own and
+    handed to ``on_tile`` before the next one is rendered, so memory stays
+    proportional to one tile as long as ``on_tile`` does not keep them.
+
+    Args:
+        url: The URL to screenshot
+        on_tile: Coroutine function called with each Tile, top to bottom
+        viewport_width: Browser viewport width in pixels
+        viewport_height: Browser viewport height in pixels
+        wait_timeout: Maximum time to wait for page load in milliseconds
+        pool: Optional BrowserPool to borrow a context from
+        blocker: Optional ResourceBlocker aborting unneeded requests
+        wait: How to decide the page is ready (default: networkidle)
+        image_format: "png", "jpeg" or "webp"
+        quality: Quality for jpeg/webp, 1-100 (default: 80)
+        tile_height: Height of each tile in CSS pixels
+        max_height: Capture at most this much of the page, in CSS pixels
+        timer: Optional StageTimer that records where the time went
+
+    Returns:
+        {
+            "page_width": 1920,
+            "page_height": 182000,
+            "captured_height": 65536,
+            "truncated": true,
+            "tiles": 16
+        }
+
+    Raises:
+        ValueError: If the format or tile options are invalid
+        Exception: If screenshot fails
+    """
+    check_image_options(image_format, quality)
+    if tile_height < 1:
+        raise ValueError(f"tile_height must be positive, got: {tile_height}")
+    if max_height < 1:
+        raise ValueError(f"max_height must be positive, got: {max_height}")
+
+    viewport = {"width": viewport_width, "height": viewport_height}
+    if wait is None:
+        wait = WaitStrategy()
+    if timer is None:
+        timer = StageTimer()
+
+    async with _open_page({"viewport": viewport}, pool, blocker, timer) as page:
+        await wait.navigate(page, url, wait_timeout, timer)
+
+        session = await page.context.new_cdp_session(page)
+        try:
+            metrics = await session.send("Page.getLayoutMetrics")
+            page_width = math.ceil(metrics["cssContentSize"]["width"])
+            page_height = math.ceil(metrics["cssContentSize"]["height"])
+            captured_height = min(page_height, max_height)
+
+            params: dict[str, Any] = {
+                "format": image_format,
+                "captureBeyondViewport": True,
+            }
+            if image_format != "png":
+                params["quality"] = DEFAULT_QUALITY if quality is None else quality
+
+            tiles = 0
+            for y in range(0, captured_height, tile_height):
+                height = min(tile_height, captured_height - y)
+                with timer.stage("encode"):
+                    # Only the clipped region is rasterised
+                    result = await session.send(
+                        "Page.captureScreenshot",
+                        {
+                            **params,
+                            "clip": {
+                                "x": 0,
+                                "y": y,
+                                "width": page_width,
+                                "height": height,
+                                "scale": 1,
+                            },
+                        },
+                    )
+                    data = base64.b64decode(result.pop("data"))
+                await on_tile(Tile(tiles, y, page_width, height, data))
+                del data
+                tiles += 1
         finally:
-            await browser.close()
+            await session.detach()
+
+    return {
+        "page_width": page_width,
+        "page_height": page_height,
+        "captured_height": captured_height,
+        "truncated": page_height > max_height,
+        "tiles": tiles,
+    }
+
+
+async def _encode_page(
+    page: Any,
+    image_format: str,
+    quality: int | None,
+    max_bytes: int | None,
+    path: str | None = None,
+    clip: dict[str, float] | None = None,
+) -> bytes:
+    """Screenshot a loaded page, or the clip of it, in the requested format."""
+    if image_format == "png":
+        return await page.screenshot(
+            path=path, full_page=True, type="png", **_clip_option(clip)
+        )
+
+    image = await _encode_within_budget(page, image_format, quality, max_bytes, clip)
+    if path is not None:
+        Path(path).write_bytes(image)
+    return image
+
+
+def image_extension(image_format: str) -> str:
+    """File extension for an output format, e.g. ".jpg" for "jpeg"."""
+    try:
+        return IMAGE_FORMATS[image_format]
+    except KeyError:
+        raise ValueError(
+            f"Unknown image format: {image_format}. "
+            f"Choose from: {', '.join(IMAGE_FORMATS)}"
+        ) from None
+
+
+def check_image_options(
+    image_format: str, quality: int | None = None, max_bytes: int | None = None
+) -> None:
+    """
+    Validate output format options.
+
+    Raises:
+        ValueError: If the combination cannot be produced
+    """
+    image_extension(image_format)
+    if image_format == "png" and (quality is not None or max_bytes is not None):
+        raise ValueError("quality and max_bytes need a lossy format (jpeg or webp)")
+    if quality is not None and not 1 <= quality <= 100:
+        raise ValueError(f"quality must be between 1 and 100, got: {quality}")
+    if max_bytes is not None and max_bytes <= 0:
+        raise ValueError(f"max_bytes must be positive, got: {max_bytes}")
+
+
+async def _encode_within_budget(
+    page: Any,
+    image_format: str,
+    quality: int | None,
+    max_bytes: int | None,
+    clip: dict[str, float] | None = None,
+) -> bytes:
+    """Encode the page, stepping quality down until it fits in max_bytes."""
+    quality = DEFAULT_QUALITY if quality is None else quality
+    image = smallest = await _encode(page, image_format, quality, clip)
+
+    while max_bytes is not None and len(image) > max_bytes and quality > 1:
+        quality = max(1, quality - _QUALITY_STEP)
+        image = await _encode(page, image_format, quality, clip)
+        if len(image) < len(smallest):
+            smallest = image
+
+    if max_bytes is not None and len(image) > max_bytes:
+        return smallest
+    return image
+
+
+async def _encode(
+    page: Any, image_format: str, quality: int, clip: dict[str, float] | None = None
+) -> bytes:
+    """Lossy screenshot of an already loaded page, or of the clip of it."""
+    if image_format == "jpeg":
+        return await page.screenshot(
+            full_page=True, type="jpeg", quality=quality, **_clip_option(clip)
+        )
+
+    # Page.screenshot only does png/jpeg; Chromium encodes WebP over CDP
+    session = await page.context.new_cdp_session(page)
+    try:
+        if clip is None:
+            metrics = await session.send("Page.getLayoutMetrics")
+            content = metrics["cssContentSize"]
+            clip = {"x": 0, "y": 0, **content}
+        result = await session.send(
+            "Page.captureScreenshot",
+            {
+                "format": "webp",
+                "quality": quality,
+                "captureBeyondViewport": True,
+                "clip": {
+                    "x": clip["x"],
+                    "y": clip["y"],
+                    "width": clip["width"],
+                    "height": clip["height"],
+                    "scale": 1,
+                },
+            },
+        )
+    finally:
+        await session.detach()
+    return base64.b64decode(result["data"])
+
+
+def _clip_option(clip: dict[str, float] | None) -> dict[str, Any]:
+    """Page.screenshot keyword for a clip; with full_page it is in page coordinates."""
+    return {"clip": clip} if clip is not None else {}
+
+
+@asynccontextmanager
+async def _open_page(
+    context_options: dict[str, Any],
+    pool: BrowserPool | None,
+    blocker: ResourceBlocker | None = None,
+    timer: StageTimer | None = None,
+) -> AsyncIterator[Any]:
+    """
+    Open a page from the pool, or from a dedicated browser if there is none.
+
+    With a blocker, its router is installed before the page is handed out.
+    Opening is timed as "launch" and "context", closing as "cleanup".
+    """
+    if blocker is not None:
+        # Service workers can fetch behind the router's back
+        context_options = {**context_options, "service_workers": "block"}
+    if timer is None:
+        timer = StageTimer()
+
+    stack = AsyncExitStack()
+    try:
+        if pool is not None:
+            with timer.stage("context"):
+                context = await stack.enter_async_context(
+                    pool.context(**context_options)
+                )
+                page = await context.new_page()
+        else:
+            with timer.stage("launch"):
+                p = await stack.enter_async_context(async_playwright())
+                # Configure browser for Lambda environment
+                browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+                stack.push_async_callback(browser.close)
+            with timer.stage("context"):
+                page = await browser.new_page(**context_options)
+
+        if blocker is not None:
+            with timer.stage("context"):
+                await blocker.attach(page)
+        yield page
+
+    finally:
+        with timer.stage("cleanup"):
+            await stack.aclose()
 
 
 def take_screenshot_sync(
@@ -78,6 +661,13 @@ def take_screenshot_sync(
     viewport_width: int = 1920,
     viewport_height: int = 1080,
     wait_timeout: int = 30000,
+    runtime: WarmRuntime | None = None,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+    region: Region | None = None,
 ) -> str:
     """
     Synchronous wrapper for take_screenshot.
@@ -88,12 +678,49 @@ def take_screenshot_sync(
         viewport_width: Browser viewport width in pixels
         viewport_height: Browser viewport height in pixels
         wait_timeout: Maximum time to wait for page load in milliseconds
+        runtime: Optional WarmRuntime to reuse instead of launching a browser
+        blocker: Optional ResourceBlocker aborting unneeded requests
+        wait: How to decide the page is ready (default: networkidle)
+        image_format: "png", "jpeg" or "webp"
+        quality: Starting quality for jpeg/webp, 1-100 (default: 80)
+        max_bytes: Lower the quality until the image fits in this many bytes
+        region: Capture only this part of the page (default: the full page)
 
     Returns:
         Path to the saved screenshot file
     """
     import asyncio
 
+    if runtime is not None:
+        return runtime.run(
+            lambda pool: take_screenshot(
+                url,
+                output_path,
+                viewport_width,
+                viewport_height,
+                wait_timeout,
+                pool,
+                blocker,
+                wait,
+                image_format,
+                quality,
+                max_bytes,
+                region=region,
+            )
+        )
+
     return asyncio.run(
-        take_screenshot(url, output_path, viewport_width, viewport_height, wait_timeout)
+        take_screenshot(
+            url,
+            output_path,
+            viewport_width,
+            viewport_height,
+            wait_timeout,
+            blocker=blocker,
+            wait=wait,
+            image_format=image_format,
+            quality=quality,
+            max_bytes=max_bytes,
+            region=region,
+        )
     )
@@ -1,10 +1,36 @@
 """Main snapshot functionality combining screenshot and S3 upload."""
 
+import asyncio
+import hashlib
+import json
+import secrets
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .s3_upload import upload_to_s3
-from .screenshot import take_screenshot
+from .blocking import ResourceBlocker
+from .browser_pool import BrowserPool
+from .changes import ChangeDetector, Thumbnail
+from .regions import Region
+from .runtime import WarmRuntime
+from .s3_upload import S3Uploader, UploadQueue
+from .screenshot import (
+    DEFAULT_MAX_PAGE_HEIGHT,
+    DEFAULT_TILE_HEIGHT,
+    Tile,
+    artifact_filename,
+    capture_artifacts,
+    capture_screenshot,
+    capture_tiles,
+    capture_viewports,
+    image_extension,
+)
+from .timings import StageTimer
+from .viewports import Viewport
+from .waits import WaitStrategy
+
+if TYPE_CHECKING:
+    from .s3_upload import TransferConfig
 
 
 async def take_snapshot_to_s3(
@@ -19,6 +45,18 @@ async def take_snapshot_to_s3(
     aws_secret_access_key: str | None = None,
     region_name: str = "us-east-1",
     cleanup_local: bool = True,
+    pool: BrowserPool | None = None,
+    upload_queue: UploadQueue | None = None,
+    transfer_config: "TransferConfig | None" = None,
+    key_strategy: str = "unique",
+    dedup: bool = False,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+    change_detector: ChangeDetector | None = None,
+    region: Region | None = None,
 ) -> dict:
     """
     Take a screenshot and upload it directly to S3.
@@ -27,14 +65,32 @@ async def take_snapshot_to_s3(
         url: The URL to screenshot
         bucket_name: S3 bucket name
         key_prefix: Optional prefix for S3 key
-        temp_dir: Directory for temporary files
+        temp_dir: Directory for the local copy kept when cleanup_local is False
         viewport_width: Browser viewport width
         viewport_height: Browser viewport height
         wait_timeout: Page load timeout in milliseconds
         aws_access_key_id: AWS access key (optional)
         aws_secret_access_key: AWS secret key (optional)
         region_name: AWS region
-        cleanup_local: Whether to delete local file after upload
+        cleanup_local: Upload from memory only (default). Set to False to also
+            keep a copy of the image in temp_dir, returned as "local_path"
+        pool: Optional BrowserPool shared across snapshots
+        upload_queue: Optional UploadQueue bounding concurrent uploads; without
+            one the upload still runs in a worker thread
+        transfer_config: Multipart upload settings for large captures
+        key_strategy: "unique" (default), "timestamp" or "content" (see
+            S3Uploader.make_key)
+        dedup: Skip the upload when an identical capture is already stored;
+            requires key_strategy="content"
+        blocker: Optional ResourceBlocker aborting unneeded requests
+        wait: How to decide the page is ready (default: networkidle)
+        image_format: "png", "jpeg" or "webp"
+        quality: Starting quality for jpeg/webp, 1-100 (default: 80)
+        max_bytes: Lower the quality until the image fits in this many bytes
+        change_detector: Only store the capture when it differs from the URL's
+            baseline; an unchanged capture reuses the baseline's S3 key
+        region: Capture only this element, rectangle or the initial viewport
+            (default: the full page)
 
     Returns:
         Dictionary with screenshot info:
@@ -43,64 +99,655 @@ async def take_snapshot_to_s3(
             "s3_url": "https://bucket.s3.amazonaws.com/prefix/2025-07-15_143022.png",
             "s3_key": "prefix/2025-07-15_143022.png",
             "timestamp": "2025-07-15T14:30:22",
-            "file_size": 55531
+            "file_size": 55531,
+            "content_hash": "9f86d081884c7d65...",
+            "deduplicated": false,
+            "format": "png",
+            "timings": {"launch": 0.0, "context": 41.2, "goto": 812.4, ...}
         }
 
+        "timings" holds milliseconds per stage (see timings.StageTimer).
+
+        With a change_detector the result also has "changed" and
+        "change_ratio" (None for a URL's first capture). An unchanged capture
+        is not uploaded: "s3_key" is the baseline's and "deduplicated" is
+        true. A changed one may come with "diff_s3_key"/"diff_s3_url", a PNG
+        highlighting what moved.
+
     Raises:
+        ValueError: If dedup is requested without content-addressed keys, the
+            format options are invalid, or the region's selector matches nothing
         Exception: If screenshot or upload fails
     """
+    if dedup and key_strategy != "content":
+        raise ValueError("dedup requires key_strategy='content'")
+
     timestamp = datetime.now()
+    timer = StageTimer()
+    thumbnails: list[Thumbnail] = []
+
+    async def grab_thumbnail(page) -> None:
+        with timer.stage("compare"):
+            # Compare the same part of the page that was captured
+            clip = await region.resolve(page) if region is not None else None
+            thumbnails.append(
+                await Thumbnail.capture(page, change_detector.thumbnail_width, clip)
+            )
+
+    # Capture straight into memory; nothing touches the filesystem unless a
+    # local copy was requested
+    image = await capture_screenshot(
+        url=url,
+        viewport_width=viewport_width,
+        viewport_height=viewport_height,
+        wait_timeout=wait_timeout,
+        pool=pool,
+        blocker=blocker,
+        wait=wait,
+        image_format=image_format,
+        quality=quality,
+        max_bytes=max_bytes,
+        timer=timer,
+        after_capture=grab_thumbnail if change_detector else None,
+        region=region,
+    )
+
+    uploader = S3Uploader(
+        bucket_name=bucket_name,
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+        transfer_config=transfer_config,
+    )
+    content_hash = hashlib.sha256(image).hexdigest()
+    extension = image_extension(image_format)
 
-    # Generate temporary file path
-    timestamp_str = timestamp.strftime("%Y-%m-%d_%H%M%S")
-    temp_file = Path(temp_dir) / f"screenshot_{timestamp_str}.png"
-    temp_file.parent.mkdir(parents=True, exist_ok=True)
+    change = None
+    if change_detector:
+        with timer.stage("compare"):
+            change = await asyncio.to_thread(change_detector.check, url, thumbnails[0])
 
-    try:
-        # Take screenshot
-        local_path = await take_screenshot(
+    if change is not None and not change.changed:
+        # Nothing worth keeping moved: point at the capture already stored
+        s3_key = change.baseline["s3_key"]
+        uploaded = False
+    else:
+        s3_key = uploader.make_key(
+            key_prefix,
+            extension,
+            timestamp,
+            strategy=key_strategy,
             url=url,
-            output_path=str(temp_file),
-            viewport_width=viewport_width,
-            viewport_height=viewport_height,
-            wait_timeout=wait_timeout,
+            content_hash=content_hash,
         )
+        with timer.stage("upload"):
+            uploaded = await _store(
+                uploader, image, s3_key, f"image/{image_format}", dedup, upload_queue
+            )
+
+    result = {
+        "url": url,
+        "s3_url": uploader.get_url(s3_key),
+        "s3_key": s3_key,
+        "timestamp": timestamp.isoformat(),
+        "file_size": len(image),
+        "content_hash": content_hash,
+        "deduplicated": not uploaded,
+        "format": image_format,
+    }
+
+    if change is not None:
+        result["changed"] = change.changed
+        result["change_ratio"] = change.ratio
+        if change.changed:
+            if change.diff is not None:
+                diff_key = s3_key.removesuffix(extension) + ".diff.png"
+                with timer.stage("upload"):
+                    await _store(
+                        uploader,
+                        change.diff,
+                        diff_key,
+                        "image/png",
+                        False,
+                        upload_queue,
+                    )
+                result["diff_s3_key"] = diff_key
+                result["diff_s3_url"] = uploader.get_url(diff_key)
+            with timer.stage("compare"):
+                await asyncio.to_thread(
+                    change_detector.record, url, thumbnails[0], s3_key
+                )
+
+    if not cleanup_local:
+        # Mirror the S3 key so local copies are as collision-free as the keys
+        local_file = Path(temp_dir) / s3_key
+        local_file.parent.mkdir(parents=True, exist_ok=True)
+        local_file.write_bytes(image)
+        result["local_path"] = str(local_file)
 
-        # Get file size
-        file_size = Path(local_path).stat().st_size
-
-        # Upload to S3
-        s3_url = upload_to_s3(
-            file_path=local_path,
-            bucket_name=bucket_name,
-            key_prefix=key_prefix,
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name,
+    result["timings"] = timer.as_dict()
+    return result
+
+
+async def take_viewports_snapshot_to_s3(
+    url: str,
+    bucket_name: str,
+    viewports: list[Viewport],
+    key_prefix: str = "",
+    temp_dir: str = "/tmp",
+    wait_timeout: int = 30000,
+    aws_access_key_id: str | None = None,
+    aws_secret_access_key: str | None = None,
+    region_name: str = "us-east-1",
+    cleanup_local: bool = True,
+    pool: BrowserPool | None = None,
+    upload_queue: UploadQueue | None = None,
+    transfer_config: "TransferConfig | None" = None,
+    key_strategy: str = "unique",
+    dedup: bool = False,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+) -> dict:
+    """
+    Capture a URL at several viewports and upload every variant under one key group.
+
+    The page is loaded once per distinct device setup (see
+    screenshot.capture_viewports) rather than once per viewport. Variants are
+    stored as ``<group>/<viewport name><ext>``, where the group is the key
+    take_snapshot_to_s3 would use for a single image, without extension.
+
+    Args:
+        viewports: Viewports to capture (see viewports.parse_viewports)
+        Others: Same as take_snapshot_to_s3
+
+    Returns:
+        Dictionary with one entry per viewport:
+        {
+            "url": "https://example.com",
+            "key_group": "prefix/2025-07-15_143022",
+            "timestamp": "2025-07-15T14:30:22",
+            "format": "png",
+            "variants": [
+                {
+                    "viewport": "desktop",
+                    "width": 1920,
+                    "height": 1080,
+                    "device_scale_factor": 1,
+                    "s3_url": "https://bucket.s3.amazonaws.com/prefix/2025-07-15_143022/desktop.png",
+                    "s3_key": "prefix/2025-07-15_143022/desktop.png",
+                    "file_size": 55531,
+                    "content_hash": "9f86d081884c7d65...",
+                    "deduplicated": false
+                }
+            ],
+            "timings": {"launch": 0.0, "context": 41.2, "goto": 812.4, ...}
+        }
+
+        "timings" covers the whole call; uploads of the variants overlap, so
+        "upload" is the time until the last one finished.
+
+    Raises:
+        ValueError: If dedup is requested without content-addressed keys, no
+            viewports are given, or the format options are invalid
+        Exception: If screenshot or upload fails
+    """
+    if dedup and key_strategy != "content":
+        raise ValueError("dedup requires key_strategy='content'")
+
+    timestamp = datetime.now()
+    timer = StageTimer()
+
+    captures = await capture_viewports(
+        url=url,
+        viewports=viewports,
+        wait_timeout=wait_timeout,
+        pool=pool,
+        blocker=blocker,
+        wait=wait,
+        image_format=image_format,
+        quality=quality,
+        max_bytes=max_bytes,
+        timer=timer,
+    )
+
+    uploader = S3Uploader(
+        bucket_name=bucket_name,
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+        transfer_config=transfer_config,
+    )
+    hashes = [hashlib.sha256(image).hexdigest() for _, image in captures]
+    group_hash = hashlib.sha256(
+        "".join(
+            f"{viewport.name}:{digest}\n"
+            for (viewport, _), digest in zip(captures, hashes, strict=True)
+        ).encode()
+    ).hexdigest()
+    key_group = uploader.make_key(
+        key_prefix,
+        "",
+        timestamp,
+        strategy=key_strategy,
+        url=url,
+        content_hash=group_hash,
+    )
+    extension = image_extension(image_format)
+
+    async def store(viewport: Viewport, image: bytes, digest: str) -> dict:
+        s3_key = f"{key_group}/{viewport.name}{extension}"
+        uploaded = await _store(
+            uploader, image, s3_key, f"image/{image_format}", dedup, upload_queue
+        )
+        variant = {
+            "viewport": viewport.name,
+            "width": viewport.width,
+            "height": viewport.height,
+            "device_scale_factor": viewport.device_scale_factor,
+            "s3_url": uploader.get_url(s3_key),
+            "s3_key": s3_key,
+            "file_size": len(image),
+            "content_hash": digest,
+            "deduplicated": not uploaded,
+        }
+        if not cleanup_local:
+            local_file = Path(temp_dir) / s3_key
+            local_file.parent.mkdir(parents=True, exist_ok=True)
+            local_file.write_bytes(image)
+            variant["local_path"] = str(local_file)
+        return variant
+
+    with timer.stage("upload"):
+        variants = await asyncio.gather(
+            *(
+                store(viewport, image, digest)
+                for (viewport, image), digest in zip(captures, hashes, strict=True)
+            )
         )
 
-        # Generate S3 key for response
-        if key_prefix:
-            key_prefix = key_prefix.rstrip("/") + "/"
-        s3_key = f"{key_prefix}{timestamp_str}.png"
+    return {
+        "url": url,
+        "key_group": key_group,
+        "timestamp": timestamp.isoformat(),
+        "format": image_format,
+        "variants": list(variants),
+        "timings": timer.as_dict(),
+    }
+
+
+async def take_artifacts_snapshot_to_s3(
+    url: str,
+    bucket_name: str,
+    artifacts: list[str],
+    key_prefix: str = "",
+    temp_dir: str = "/tmp",
+    viewport_width: int = 1920,
+    viewport_height: int = 1080,
+    wait_timeout: int = 30000,
+    aws_access_key_id: str | None = None,
+    aws_secret_access_key: str | None = None,
+    region_name: str = "us-east-1",
+    cleanup_local: bool = True,
+    pool: BrowserPool | None = None,
+    upload_queue: UploadQueue | None = None,
+    transfer_config: "TransferConfig | None" = None,
+    key_strategy: str = "unique",
+    dedup: bool = False,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+    region: Region | None = None,
+) -> dict:
+    """
+    Capture several artifacts from one page load and upload them under one key group.
+
+    Artifacts (see screenshot.capture_artifacts) are stored as
+    ``<group>/screenshot.png``, ``<group>/page.pdf``, ``<group>/dom.html``
+    and ``<group>/page.mhtml``, where the group is the key take_snapshot_to_s3
+    would use for a single image, without extension. The uploads run
+    concurrently.
 
-        # Cleanup local file if requested
-        if cleanup_local:
-            Path(local_path).unlink(missing_ok=True)
+    Args:
+        artifacts: Artifact names, e.g. ["screenshot", "pdf", "mhtml"]
+        Others: Same as take_snapshot_to_s3
+
+    Returns:
+        Dictionary with one entry per artifact:
+        {
+            "url": "https://example.com",
+            "key_group": "prefix/2025-07-15_143022",
+            "timestamp": "2025-07-15T14:30:22",
+            "format": "png",
+            "artifacts": [
+                {
+                    "artifact": "pdf",
+                    "s3_url": "https://bucket.s3.amazonaws.com/prefix/2025-07-15_143022/page.pdf",
+                    "s3_key": "prefix/2025-07-15_143022/page.pdf",
+                    "file_size": 183204,
+                    "content_hash": "9f86d081884c7d65...",
+                    "deduplicated": false
+                }
+            ],
+            "timings": {"launch": 0.0, "context": 41.2, "goto": 812.4, ...}
+        }
+
+    Raises:
+        ValueError: If dedup is requested without content-addressed keys,
+            the artifacts are unknown, or the format options are invalid
+        Exception: If a capture or upload fails
+    """
+    if dedup and key_strategy != "content":
+        raise ValueError("dedup requires key_strategy='content'")
+
+    timestamp = datetime.now()
+    timer = StageTimer()
+
+    captures = await capture_artifacts(
+        url=url,
+        artifacts=artifacts,
+        viewport_width=viewport_width,
+        viewport_height=viewport_height,
+        wait_timeout=wait_timeout,
+        pool=pool,
+        blocker=blocker,
+        wait=wait,
+        image_format=image_format,
+        quality=quality,
+        max_bytes=max_bytes,
+        timer=timer,
+        region=region,
+    )
+
+    uploader = S3Uploader(
+        bucket_name=bucket_name,
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+        transfer_config=transfer_config,
+    )
+    hashes = {name: hashlib.sha256(data).hexdigest() for name, data in captures.items()}
+    group_hash = hashlib.sha256(
+        "".join(f"{name}:{digest}\n" for name, digest in hashes.items()).encode()
+    ).hexdigest()
+    key_group = uploader.make_key(
+        key_prefix,
+        "",
+        timestamp,
+        strategy=key_strategy,
+        url=url,
+        content_hash=group_hash,
+    )
 
-        return {
-            "url": url,
-            "s3_url": s3_url,
+    async def store(name: str, data: bytes) -> dict:
+        s3_key = f"{key_group}/{artifact_filename(name, image_format)}"
+        # The key's extension picks the content type
+        uploaded = await _store(uploader, data, s3_key, None, dedup, upload_queue)
+        artifact = {
+            "artifact": name,
+            "s3_url": uploader.get_url(s3_key),
             "s3_key": s3_key,
-            "timestamp": timestamp.isoformat(),
-            "file_size": file_size,
+            "file_size": len(data),
+            "content_hash": hashes[name],
+            "deduplicated": not uploaded,
+        }
+        if not cleanup_local:
+            local_file = Path(temp_dir) / s3_key
+            local_file.parent.mkdir(parents=True, exist_ok=True)
+            local_file.write_bytes(data)
+            artifact["local_path"] = str(local_file)
+        return artifact
+
+    with timer.stage("upload"):
+        stored = await asyncio.gather(
+            *(store(name, data) for name, data in captures.items())
+        )
+
+    return {
+        "url": url,
+        "key_group": key_group,
+        "timestamp": timestamp.isoformat(),
+        "format": image_format,
+        "artifacts": list(stored),
+        "timings": timer.as_dict(),
+    }
+
+
+async def take_tiled_snapshot_to_s3(
+    url: str,
+    bucket_name: str,
+    key_prefix: str = "",
+    temp_dir: str = "/tmp",
+    viewport_width: int = 1920,
+    viewport_height: int = 1080,
+    wait_timeout: int = 30000,
+    aws_access_key_id: str | None = None,
+    aws_secret_access_key: str | None = None,
+    region_name: str = "us-east-1",
+    cleanup_local: bool = True,
+    pool: BrowserPool | None = None,
+    upload_queue: UploadQueue | None = None,
+    transfer_config: "TransferConfig | None" = None,
+    key_strategy: str = "unique",
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    tile_height: int = DEFAULT_TILE_HEIGHT,
+    max_page_height: int = DEFAULT_MAX_PAGE_HEIGHT,
+) -> dict:
+    """
+    Capture a very tall page as tiles and upload each tile as it is taken.
+
+    Tiles are stored as ``<group>/tile-0000<ext>`` next to a
+    ``<group>/manifest.json`` listing them top to bottom, where the group is
+    the key take_snapshot_to_s3 would use for a single image, without
+    extension. Each tile is uploaded before the next one is rendered, so
+    memory use is bounded by one tile however tall the page is.
+
+    Args:
+        tile_height: Height of each tile in CSS pixels
+        max_page_height: Capture at most this much of the page
+        Others: Same as take_snapshot_to_s3
+
+    Returns:
+        {
+            "url": "https://example.com",
+            "key_group": "prefix/2025-07-15_143022",
+            "manifest_key": "prefix/2025-07-15_143022/manifest.json",
+            "manifest_url": "https://bucket.s3.amazonaws.com/prefix/2025-07-15_143022/manifest.json",
+            "timestamp": "2025-07-15T14:30:22",
+            "format": "png",
+            "page_width": 1920,
+            "page_height": 182000,
+            "captured_height": 65536,
+            "truncated": true,
+            "file_size": 9120455,
+            "tiles": [
+                {
+                    "s3_key": "prefix/2025-07-15_143022/tile-0000.png",
+                    "y": 0,
+                    "height": 4096,
+                    "file_size": 611204
+                }
+            ],
+            "timings": {"launch": 0.0, "context": 41.2, "goto": 812.4, ...}
         }
 
-    except Exception:
-        # Cleanup temp file on error
-        if temp_file.exists():
-            temp_file.unlink(missing_ok=True)
-        raise
+        "file_size" is the total of the tiles. The manifest holds the same
+        tile list with keys relative to the group.
+
+    Raises:
+        ValueError: If key_strategy is "content" (the content is not known
+            until the last tile), or the format or tile options are invalid
+        Exception: If screenshot or upload fails
+    """
+    if key_strategy == "content":
+        raise ValueError("Tiled captures cannot use key_strategy='content'")
+
+    timestamp = datetime.now()
+    timer = StageTimer()
+
+    uploader = S3Uploader(
+        bucket_name=bucket_name,
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+        transfer_config=transfer_config,
+    )
+    # Tiles are uploaded while the page is still being captured, so the key
+    # cannot depend on the content; "unique" keys get a random suffix instead
+    key_group = uploader.make_key(
+        key_prefix,
+        "",
+        timestamp,
+        strategy=key_strategy,
+        url=url,
+        content_hash=secrets.token_hex(6),
+    )
+    extension = image_extension(image_format)
+    tiles: list[dict] = []
+
+    async def store(tile: Tile) -> None:
+        name = f"tile-{tile.index:04d}{extension}"
+        s3_key = f"{key_group}/{name}"
+        with timer.stage("upload"):
+            await _store(
+                uploader,
+                tile.data,
+                s3_key,
+                f"image/{image_format}",
+                False,
+                upload_queue,
+            )
+        if not cleanup_local:
+            local_file = Path(temp_dir) / s3_key
+            local_file.parent.mkdir(parents=True, exist_ok=True)
+            local_file.write_bytes(tile.data)
+        tiles.append(
+            {
+                "name": name,
+                "y": tile.y,
+                "height": tile.height,
+                "file_size": len(tile.data),
+            }
+        )
+
+    page = await capture_tiles(
+        url=url,
+        on_tile=store,
+        viewport_width=viewport_width,
+        viewport_height=viewport_height,
+        wait_timeout=wait_timeout,
+        pool=pool,
+        blocker=blocker,
+        wait=wait,
+        image_format=image_format,
+        quality=quality,
+        tile_height=tile_height,
+        max_height=max_page_height,
+        timer=timer,
+    )
+
+    manifest = tile_manifest(url, timestamp, image_format, tile_height, page, tiles)
+    manifest_key = f"{key_group}/manifest.json"
+    with timer.stage("upload"):
+        await _store(
+            uploader,
+            json.dumps(manifest, indent=2).encode(),
+            manifest_key,
+            "application/json",
+            False,
+            upload_queue,
+        )
+
+    result = {
+        "url": url,
+        "key_group": key_group,
+        "manifest_key": manifest_key,
+        "manifest_url": uploader.get_url(manifest_key),
+        "timestamp": timestamp.isoformat(),
+        "format": image_format,
+        **page,
+        "file_size": sum(tile["file_size"] for tile in tiles),
+        "tiles": [
+            {
+                "s3_key": f"{key_group}/{tile['name']}",
+                "y": tile["y"],
+                "height": tile["height"],
+                "file_size": tile["file_size"],
+            }
+            for tile in tiles
+        ],
+    }
+    if not cleanup_local:
+        result["local_dir"] = str(Path(temp_dir) / key_group)
+    result["timings"] = timer.as_dict()
+    return result
+
+
+def tile_manifest(
+    url: str,
+    timestamp: datetime,
+    image_format: str,
+    tile_height: int,
+    page: dict,
+    tiles: list[dict],
+) -> dict:
+    """
+    The manifest stored next to a tiled capture.
+
+    Args:
+        url: Captured URL
+        timestamp: When the capture started
+        image_format: Format of the tiles
+        tile_height: Requested tile height; the last tile may be shorter
+        page: Page dimensions as returned by screenshot.capture_tiles
+        tiles: {"name", "y", "height", "file_size"} per tile, top to bottom
+
+    Returns:
+        JSON-serialisable manifest
+    """
+    return {
+        "url": url,
+        "timestamp": timestamp.isoformat(),
+        "format": image_format,
+        "page_width": page["page_width"],
+        "page_height": page["page_height"],
+        "captured_height": page["captured_height"],
+        "truncated": page["truncated"],
+        "tile_height": tile_height,
+        "tiles": tiles,
+    }
+
+
+async def _store(
+    uploader: S3Uploader,
+    image: bytes,
+    s3_key: str,
+    content_type: str | None,
+    dedup: bool,
+    upload_queue: UploadQueue | None,
+) -> bool:
+    """Upload one image off the event loop; returns False if dedup skipped it."""
+
+    def store() -> bool:
+        if dedup and uploader.object_exists(s3_key):
+            return False
+        uploader.upload_bytes(image, s3_key, content_type=content_type, remember=dedup)
+        return True
+
+    # Uploads run off the event loop. Single images, viewports and artifacts
+    # are stored after their browser context has been released, so the next
+    # page can render meanwhile; tiles are stored while their page is still
+    # open, so that only one tile is held in memory at a time
+    if upload_queue is not None:
+        return await upload_queue.run(store)
+    return await asyncio.to_thread(store)
 
 
 def take_snapshot_to_s3_sync(
@@ -115,28 +762,137 @@ def take_snapshot_to_s3_sync(
     aws_secret_access_key: str | None = None,
     region_name: str = "us-east-1",
     cleanup_local: bool = True,
+    transfer_config: "TransferConfig | None" = None,
+    key_strategy: str = "unique",
+    dedup: bool = False,
+    blocker: ResourceBlocker | None = None,
+    wait: WaitStrategy | None = None,
+    image_format: str = "png",
+    quality: int | None = None,
+    max_bytes: int | None = None,
+    change_detector: ChangeDetector | None = None,
+    region: Region | None = None,
+    runtime: WarmRuntime | None = None,
 ) -> dict:
     """
     Synchronous wrapper for take_snapshot_to_s3.
 
-    Args: Same as take_snapshot_to_s3
+    Args: Same as take_snapshot_to_s3, plus
+        runtime: Optional WarmRuntime whose event loop and browser pool are
+            reused instead of starting a fresh browser with asyncio.run
 
     Returns: Same as take_snapshot_to_s3
     """
-    import asyncio
+    options = {
+        "url": url,
+        "bucket_name": bucket_name,
+        "key_prefix": key_prefix,
+        "temp_dir": temp_dir,
+        "viewport_width": viewport_width,
+        "viewport_height": viewport_height,
+        "wait_timeout": wait_timeout,
+        "aws_access_key_id": aws_access_key_id,
+        "aws_secret_access_key": aws_secret_access_key,
+        "region_name": region_name,
+        "cleanup_local": cleanup_local,
+        "transfer_config": transfer_config,
+        "key_strategy": key_strategy,
+        "dedup": dedup,
+        "blocker": blocker,
+        "wait": wait,
+        "image_format": image_format,
+        "quality": quality,
+        "max_bytes": max_bytes,
+        "change_detector": change_detector,
+        "region": region,
+    }
 
-    return asyncio.run(
-        take_snapshot_to_s3(
-            url=url,
-            bucket_name=bucket_name,
-            key_prefix=key_prefix,
-            temp_dir=temp_dir,
-            viewport_width=viewport_width,
-            viewport_height=viewport_height,
-            wait_timeout=wait_timeout,
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name,
-            cleanup_local=cleanup_local,
+    if runtime is not None:
+        return runtime.run(lambda pool: take_snapshot_to_s3(**options, pool=pool))
+
+    return asyncio.run(take_snapshot_to_s3(**options))
+
+
+def take_viewports_snapshot_to_s3_sync(
+    url: str,
+    bucket_name: str,
+    viewports: list[Viewport],
+    runtime: WarmRuntime | None = None,
+    **options,
+) -> dict:
+    """
+    Synchronous wrapper for take_viewports_snapshot_to_s3.
+
+    Args: Same as take_viewports_snapshot_to_s3, plus
+        runtime: Optional WarmRuntime whose event loop and browser pool are
+            reused instead of starting a fresh browser with asyncio.run
+
+    Returns: Same as take_viewports_snapshot_to_s3
+    """
+    options = {
+        "url": url,
+        "bucket_name": bucket_name,
+        "viewports": viewports,
+        **options,
+    }
+
+    if runtime is not None:
+        return runtime.run(
+            lambda pool: take_viewports_snapshot_to_s3(**options, pool=pool)
         )
-    )
+
+    return asyncio.run(take_viewports_snapshot_to_s3(**options))
+
+
+def take_tiled_snapshot_to_s3_sync(
+    url: str,
+    bucket_name: str,
+    runtime: WarmRuntime | None = None,
+    **options,
+) -> dict:
+    """
+    Synchronous wrapper for take_tiled_snapshot_to_s3.
+
+    Args: Same as take_tiled_snapshot_to_s3, plus
+        runtime: Optional WarmRuntime whose event loop and browser pool are
+            reused instead of starting a fresh browser with asyncio.run
+
+    Returns: Same as take_tiled_snapshot_to_s3
+    """
+    options = {"url": url, "bucket_name": bucket_name, **options}
+
+    if runtime is not None:
+        return runtime.run(lambda pool: take_tiled_snapshot_to_s3(**options, pool=pool))
+
+    return asyncio.run(take_tiled_snapshot_to_s3(**options))
+
+
+def take_artifacts_snapshot_to_s3_sync(
+    url: str,
+    bucket_name: str,
+    artifacts: list[str],
+    runtime: WarmRuntime | None = None,
+    **options,
+) -> dict:
+    """
+    Synchronous wrapper for take_artifacts_snapshot_to_s3.
+
+    Args: Same as take_artifacts_snapshot_to_s3, plus
+        runtime: Optional WarmRuntime whose event loop and browser pool are
+            reused instead of starting a fresh browser with asyncio.run
+
+    Returns: Same as take_artifacts_snapshot_to_s3
+    """
+    options = {
+        "url": url,
+        "bucket_name": bucket_name,
+        "artifacts": artifacts,
+        **options,
+    }
+
+    if runtime is not None:
+        return runtime.run(
+            lambda pool: take_artifacts_snapshot_to_s3(**options, pool=pool)
+        )
+
+    return asyncio.run(take_artifacts_snapshot_to_s3(**options))
@@ -0,0 +1,141 @@
+"""Drive the SQS Lambda handler from a real or stand-in queue outside Lambda.
+
+This mimics the Lambda event source mapping: receive a batch, hand it to
+``lambda_handler.sqs_handler``, delete the messages that succeeded and leave
+the reported failures to reappear after their visibility timeout. It works
+against AWS, moto's server mode, ElasticMQ or LocalStack via --endpoint-url.
+"""
+
+import argparse
+import sys
+from collections.abc import Callable
+from typing import Any
+
+from .lambda_handler import sqs_handler
+
+
+def poll_once(
+    queue_url: str,
+    sqs_client: Any = None,
+    handler: Callable[[dict[str, Any], Any], dict[str, Any]] = sqs_handler,
+    max_messages: int = 10,
+    wait_time_seconds: int = 1,
+) -> dict[str, int]:
+    """
+    Receive one batch of messages and process it with ``handler``.
+
+    Args:
+        queue_url: SQS queue URL
+        sqs_client: boto3 SQS client (defaults to boto3.client("sqs"))
+        handler: Lambda-style SQS handler
+        max_messages: Messages per batch (1-10)
+        wait_time_seconds: Long-polling wait
+
+    Returns:
+        Counts of received, succeeded and failed messages
+    """
+    if sqs_client is None:
+        import boto3
+
+        sqs_client = boto3.client("sqs")
+
+    response = sqs_client.receive_message(
+        QueueUrl=queue_url,
+        MaxNumberOfMessages=max_messages,
+        WaitTimeSeconds=wait_time_seconds,
+        AttributeNames=["All"],
+        MessageAttributeNames=["All"],
+    )
+    messages = response.get("Messages", [])
+    if not messages:
+        return {"received": 0, "succeeded": 0, "failed": 0}
+
+    event = {
+        "Records": [
+            {
+                "messageId": message["MessageId"],
+                "receiptHandle": message["ReceiptHandle"],
+                "body": message["Body"],
+                "attributes": message.get("Attributes", {}),
+                "messageAttributes": message.get("MessageAttributes", {}),
+                "md5OfBody": message.get("MD5OfBody"),
+                "eventSource": "aws:sqs",
+            }
+            for message in messages
+        ]
+    }
+    result = handler(event, None)
+
+    failed = {
+        failure["itemIdentifier"] for failure in result.get("batchItemFailures", [])
+    }
+    succeeded = [message for message in messages if message["MessageId"] not in failed]
+    if succeeded:
+        sqs_client.delete_message_batch(
+            QueueUrl=queue_url,
+            Entries=[
+                {"Id": str(i), "ReceiptHandle": message["ReceiptHandle"]}
+                for i, message in enumerate(succeeded)
+            ],
+        )
+
+    return {
+        "received": len(messages),
+        "succeeded": len(succeeded),
+        "failed": len(messages) - len(succeeded),
+    }
+
+
+def main() -> int:
+    """Poll a queue until it is empty (or forever with --forever)."""
+    parser = argparse.ArgumentParser(
+        description="Process screenshot requests from an SQS queue outside Lambda"
+    )
+    parser.add_argument("queue_url", help="SQS queue URL")
+    parser.add_argument(
+        "--endpoint-url", help="SQS endpoint, e.g. http://localhost:9324"
+    )
+    parser.add_argument("--region", default="us-east-1", help="AWS region")
+    parser.add_argument(
+        "--batch-size", type=int, default=10, help="Messages per batch (1-10)"
+    )
+    parser.add_argument(
+        "--forever", action="store_true", help="Keep polling when the queue is empty"
+    )
+    args = parser.parse_args()
+
+    import boto3
+
+    sqs_client = boto3.client(
+        "sqs", region_name=args.region, endpoint_url=args.endpoint_url
+    )
+    totals = {"received": 0, "succeeded": 0, "failed": 0}
+    try:
+        while True:
+            counts = poll_once(
+                args.queue_url,
+                sqs_client=sqs_client,
+                max_messages=args.batch_size,
+                wait_time_seconds=20 if args.forever else 1,
+            )
+            for key, value in counts.items():
+                totals[key] += value
+            if counts["received"]:
+                print(
+                    f"Processed {counts['received']} messages: "
+                    f"{counts['succeeded']} succeeded, {counts['failed']} failed"
+                )
+            elif not args.forever:
+                break
+    except KeyboardInterrupt:
+        pass
+
+    print(
+        f"📊 Summary: {totals['succeeded']}/{totals['received']} messages "
+        "processed successfully"
+    )
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Per-stage timing of snapshots and percentile summaries across a batch."""
+
+import math
+import time
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+
+# Stages in the order they happen during a snapshot
+STAGES = (
+    "launch",
+    "context",
+    "goto",
+    "wait",
+    "encode",
+    "compare",
+    "upload",
+    "cleanup",
+)
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock time spent in each stage of a snapshot.
+
+    Stages are:
+
+    - ``launch``: starting Playwright and Chromium (only for captures without
+      a pool; a warm pool has already paid for this)
+    - ``context``: creating the browser context and page
+    - ``goto``: Page.goto until its load state is reached
+    - ``wait``: extra readiness waits, and re-layout between viewports
+    - ``encode``: producing the image bytes
+    - ``compare``: change detection against the URL's baseline
+    - ``upload``: storing the image in S3
+    - ``cleanup``: closing the page, context and any dedicated browser
+
+    A stage entered several times (one ``encode`` per viewport, for example)
+    accumulates. Stages that never ran are left out.
+
+    Usage:
+        timer = StageTimer()
+        with timer.stage("goto"):
+            await page.goto(url)
+        timer.as_dict()  # {"goto": 812.4, "total": 815.0}
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time to a stage."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, float]:
+        """Stage durations plus "total" since the timer was created, in milliseconds."""
+        timings = {
+            name: round(self.stages[name] * 1000, 1) for name in _ordered(self.stages)
+        }
+        timings["total"] = round((time.perf_counter() - self.started) * 1000, 1)
+        return timings
+
+
+class TimingSummary:
+    """
+    Collects the timings of many snapshots and reports p50/p95/max per stage.
+
+    Samples are kept as packed doubles, so a long batch costs a few bytes per
+    URL and stage.
+    """
+
+    def __init__(self):
+        self._samples: dict[str, array] = {}
+
+    def __len__(self) -> int:
+        samples = self._samples.get("total")
+        return len(samples) if samples is not None else 0
+
+    def add(self, timings: Mapping[str, float]) -> None:
+        """Record one snapshot's ``StageTimer.as_dict()`` output."""
+        for name, ms in timings.items():
+            self._samples.setdefault(name, array("d")).append(ms)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Percentiles per stage, in milliseconds.
+
+        Returns:
+            {"goto": {"p50": 640.2, "p95": 1810.0, "max": 2950.3, "count": 120}, ...}
+        """
+        return {
+            name: {
+                "p50": percentile(self._samples[name], 50),
+                "p95": percentile(self._samples[name], 95),
+                "max": max(self._samples[name]),
+                "count": len(self._samples[name]),
+            }
+            for name in _ordered(self._samples)
+        }
+
+
+def percentile(values: Iterable[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Raises:
+        ValueError: If there are no values
+    """
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of an empty sequence")
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _ordered(names: Iterable[str]) -> list[str]:
+    """Known stages first, in snapshot order, then any others, then "total"."""
+    names = set(names)
+    known = [name for name in STAGES if name in names]
+    others = sorted(names.difference(STAGES, ("total",)))
+    return known + others + (["total"] if "total" in names else [])
@@ -0,0 +1,205 @@
+"""Viewport presets for capturing one page at several screen sizes."""
+
+import re
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+_IPHONE_UA = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+_IPAD_UA = (
+    "Mozilla/5.0 (iPad; CPU OS 17_0 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+_ANDROID_UA = (
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0.0.0 Mobile Safari/537.36"
+)
+
+# Custom sizes look like 1280x720 or 390x844@3
+_SIZE_SPEC = re.compile(r"^(\d+)x(\d+)(?:@(\d+(?:\.\d+)?))?$")
+
+
+class Viewport:
+    """
+    A named screen size plus the device settings that go with it.
+
+    ``width``/``height`` can change on a loaded page, but the scale factor,
+    user agent and mobile/touch flags are fixed per browser context. Viewports
+    sharing those settings (see ``context_key``) are captured from a single
+    page load.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        width: int,
+        height: int,
+        device_scale_factor: float = 1,
+        user_agent: str | None = None,
+        is_mobile: bool = False,
+        has_touch: bool = False,
+    ):
+        """
+        Initialize a viewport.
+
+        Args:
+            name: Label used in S3 keys and file names
+            width: CSS pixel width
+            height: CSS pixel height
+            device_scale_factor: Device pixel ratio
+            user_agent: User agent override
+            is_mobile: Emulate a mobile browser (meta viewport, overlay scrollbars)
+            has_touch: Emulate a touch screen
+
+        Raises:
+            ValueError: If the size or name is invalid
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Viewport size must be positive, got: {width}x{height}")
+        if device_scale_factor <= 0:
+            raise ValueError(
+                f"device_scale_factor must be positive, got: {device_scale_factor}"
+            )
+        if not re.match(r"^[A-Za-z0-9_.@-]+$", name):
+            raise ValueError(f"Invalid viewport name: {name!r}")
+
+        self.name = name
+        self.width = width
+        self.height = height
+        self.device_scale_factor = device_scale_factor
+        self.user_agent = user_agent
+        self.is_mobile = is_mobile
+        self.has_touch = has_touch
+
+    def __repr__(self) -> str:
+        return f"Viewport({self.name!r}, {self.width}x{self.height}@{self.device_scale_factor})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Viewport):
+            return NotImplemented
+        return vars(self) == vars(other)
+
+    def __hash__(self) -> int:
+        return hash(tuple(vars(self).values()))
+
+    @property
+    def size(self) -> dict[str, int]:
+        """Size in the form Playwright expects."""
+        return {"width": self.width, "height": self.height}
+
+    @property
+    def context_key(self) -> tuple:
+        """Settings that can only be chosen when a browser context is created."""
+        return (
+            self.device_scale_factor,
+            self.user_agent,
+            self.is_mobile,
+            self.has_touch,
+        )
+
+    def context_options(self) -> dict[str, Any]:
+        """Keyword arguments for ``Browser.new_context``."""
+        options: dict[str, Any] = {
+            "viewport": self.size,
+            "device_scale_factor": self.device_scale_factor,
+            "is_mobile": self.is_mobile,
+            "has_touch": self.has_touch,
+        }
+        if self.user_agent:
+            options["user_agent"] = self.user_agent
+        return options
+
+
+VIEWPORT_PRESETS = {
+    "desktop": Viewport("desktop", 1920, 1080),
+    "laptop": Viewport("laptop", 1366, 768),
+    "tablet": Viewport(
+        "tablet", 768, 1024, 2, user_agent=_IPAD_UA, is_mobile=True, has_touch=True
+    ),
+    "mobile": Viewport(
+        "mobile", 390, 844, 3, user_agent=_IPHONE_UA, is_mobile=True, has_touch=True
+    ),
+    "android": Viewport(
+        "android",
+        412,
+        915,
+        2.625,
+        user_agent=_ANDROID_UA,
+        is_mobile=True,
+        has_touch=True,
+    ),
+}
+
+
+def parse_viewport(spec: str | Mapping[str, Any] | Viewport) -> Viewport:
+    """
+    Build a Viewport from a preset name, a "WIDTHxHEIGHT[@SCALE]" string or a mapping.
+
+    Mappings use Viewport's keyword arguments; "name" defaults to the size
+    and "preset" starts from a preset, e.g. ``{"preset": "mobile", "width": 375}``.
+
+    Raises:
+        ValueError: If the spec is not understood
+    """
+    if isinstance(spec, Viewport):
+        return spec
+
+    if isinstance(spec, Mapping):
+        options = dict(spec)
+        preset = options.pop("preset", None)
+        if preset is not None:
+            options = {**vars(parse_viewport(preset)), **options}
+        try:
+            width, height = int(options.pop("width")), int(options.pop("height"))
+        except KeyError as e:
+            raise ValueError(
+                f"Viewport is missing {e.args[0]!r}: {dict(spec)}"
+            ) from None
+        name = options.pop("name", f"{width}x{height}")
+        return Viewport(name, width, height, **options)
+
+    text = spec.strip()
+    preset = VIEWPORT_PRESETS.get(text.lower())
+    if preset is not None:
+        return preset
+
+    match = _SIZE_SPEC.match(text.lower())
+    if match is None:
+        raise ValueError(
+            f"Unknown viewport: {spec!r}. Use a preset "
+            f"({', '.join(VIEWPORT_PRESETS)}) or WIDTHxHEIGHT[@SCALE]"
+        )
+    width, height, scale = match.groups()
+    return Viewport(text.lower(), int(width), int(height), float(scale or 1))
+
+
+def parse_viewports(
+    value: str | Iterable[str | Mapping[str, Any] | Viewport] | None,
+) -> list[Viewport]:
+    """
+    Parse a comma-separated string or a list of viewport specs.
+
+    Raises:
+        ValueError: If a spec is invalid or two viewports share a name
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [part for part in value.split(",") if part.strip()]
+
+    viewports = [parse_viewport(spec) for spec in value]
+    names = [viewport.name for viewport in viewports]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate viewport name(s): {', '.join(duplicates)}")
+    return viewports
+
+
+def group_by_context(viewports: Iterable[Viewport]) -> list[list[Viewport]]:
+    """Group viewports that can share a browser context, keeping input order."""
+    groups: dict[tuple, list[Viewport]] = {}
+    for viewport in viewports:
+        groups.setdefault(viewport.context_key, []).append(viewport)
+    return list(groups.values())
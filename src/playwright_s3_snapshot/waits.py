@@ -0,0 +1,396 @@
+"""Page readiness strategies used before a screenshot is taken."""
+
+import asyncio
+import copy
+import hashlib
+from collections.abc import Iterable, Mapping
+from fnmatch import fnmatch
+from typing import Any
+
+from .scheduler import RATE_LIMIT_STATUSES, RateLimitedError, parse_retry_after
+from .timings import StageTimer
+
+# Load states understood by Page.goto(wait_until=...)
+LOAD_STATES = ("load", "domcontentloaded", "networkidle", "commit")
+
+# Polling interval for the network-quiet check, in seconds
+_POLL_INTERVAL = 0.05
+
+
+def _matches(pattern: str, value: str) -> bool:
+    """Shell-style wildcard match, or a plain substring match without wildcards."""
+    if any(char in pattern for char in "*?["):
+        return fnmatch(value, pattern)
+    return pattern in value
+
+
+class WaitStrategy:
+    """
+    Decides when a page is ready to be captured.
+
+    A strategy navigates with one of Playwright's load states and can then
+    wait for any combination of:
+
+    - ``selector``: a CSS selector becoming visible
+    - ``function``: a JavaScript expression becoming truthy
+    - ``quiet_ms``: no network requests in flight for this long, ignoring
+      requests whose URL matches ``ignore`` (beacons, long-polling)
+    - ``stable_ms``: two viewport renders this far apart being identical
+
+    Selector and function waits fail the capture when they time out, since
+    they are explicit readiness signals. Network-quiet and visual-stability
+    are heuristics: if the page never settles the capture goes ahead when the
+    timeout is reached.
+
+    Strategies are usually built from a spec string with ``parse_wait``.
+    """
+
+    def __init__(
+        self,
+        wait_until: str = "networkidle",
+        selector: str | None = None,
+        function: str | None = None,
+        quiet_ms: int | None = None,
+        stable_ms: int | None = None,
+        ignore: Iterable[str] = (),
+        raise_on_rate_limit: bool = False,
+    ):
+        """
+        Initialize the strategy.
+
+        Args:
+            wait_until: Load state passed to Page.goto
+            selector: CSS selector to wait for
+            function: JavaScript expression to wait for
+            quiet_ms: Required network quiet period in milliseconds
+            stable_ms: Interval between identical renders in milliseconds
+            ignore: URL patterns not counted as network activity
+            raise_on_rate_limit: Raise RateLimitedError on a 429 or 503
+                instead of capturing the response; only for batches, which
+                back off the host and retry
+
+        Raises:
+            ValueError: If wait_until is not a Playwright load state
+        """
+        if wait_until not in LOAD_STATES:
+            raise ValueError(
+                f"Unknown load state: {wait_until}. Choose from: {', '.join(LOAD_STATES)}"
+            )
+
+        self.wait_until = wait_until
+        self.selector = selector
+        self.function = function
+        self.quiet_ms = quiet_ms
+        self.stable_ms = stable_ms
+        self.ignore = tuple(ignore)
+        self.raise_on_rate_limit = raise_on_rate_limit
+
+    def __repr__(self) -> str:
+        return f"WaitStrategy({describe_wait(self)!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, WaitStrategy):
+            return NotImplemented
+        return vars(self) == vars(other)
+
+    async def navigate(
+        self, page: Any, url: str, timeout: int, timer: StageTimer | None = None
+    ) -> None:
+        """
+        Load ``url`` and wait until the page is ready.
+
+        Args:
+            page: Playwright page
+            url: URL to open
+            timeout: Overall budget for navigation and waiting, in milliseconds
+            timer: Optional StageTimer recording the "goto" and "wait" stages
+
+        Raises:
+            RateLimitedError: If the page answered 429 or 503 and the
+                strategy has raise_on_rate_limit set
+            TimeoutError: If navigation used up the budget before a selector
+                or function wait could start
+        """
+        if timer is None:
+            timer = StageTimer()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout / 1000
+
+        def remaining_ms(waiting_for: str) -> float:
+            # Playwright treats timeout=0 as "no timeout", so a spent budget
+            # must fail here rather than turn into an unlimited wait
+            remaining = (deadline - loop.time()) * 1000
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Timeout of {timeout}ms spent before waiting for {waiting_for}"
+                )
+            return max(1.0, remaining)
+
+        monitor = _NetworkMonitor(page, self.ignore) if self.quiet_ms else None
+
+        with timer.stage("goto"):
+            response = await page.goto(url, wait_until=self.wait_until, timeout=timeout)
+
+        # In a batch a throttled or overloaded site is not worth capturing;
+        # let the batch back off the whole host instead. A single capture
+        # has nobody to retry it, so it captures whatever the site served
+        if (
+            self.raise_on_rate_limit
+            and response is not None
+            and response.status in RATE_LIMIT_STATUSES
+        ):
+            raise RateLimitedError(
+                url,
+                response.status,
+                parse_retry_after(response.headers.get("retry-after")),
+            )
+
+        with timer.stage("wait"):
+            if self.selector:
+                await page.wait_for_selector(
+                    self.selector,
+                    state="visible",
+                    timeout=remaining_ms(f"selector {self.selector}"),
+                )
+            if self.function:
+                await page.wait_for_function(
+                    self.function, timeout=remaining_ms("function")
+                )
+            if monitor is not None:
+                await monitor.wait_quiet(self.quiet_ms / 1000, deadline)
+            if self.stable_ms:
+                await _wait_visually_stable(page, self.stable_ms / 1000, deadline)
+
+
+class _NetworkMonitor:
+    """Tracks in-flight requests on a page from before navigation starts."""
+
+    def __init__(self, page: Any, ignore: tuple[str, ...]):
+        self.ignore = ignore
+        self.in_flight: set[Any] = set()
+        self.last_activity = asyncio.get_running_loop().time()
+
+        page.on("request", self._started)
+        page.on("requestfinished", self._finished)
+        page.on("requestfailed", self._finished)
+
+    def _ignored(self, request: Any) -> bool:
+        return any(_matches(pattern, request.url) for pattern in self.ignore)
+
+    def _started(self, request: Any) -> None:
+        if not self._ignored(request):
+            self.in_flight.add(request)
+            self.last_activity = asyncio.get_running_loop().time()
+
+    def _finished(self, request: Any) -> None:
+        if request in self.in_flight:
+            self.in_flight.discard(request)
+            self.last_activity = asyncio.get_running_loop().time()
+
+    async def wait_quiet(self, quiet: float, deadline: float) -> bool:
+        """Wait until nothing has been in flight for ``quiet`` seconds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if not self.in_flight and now - self.last_activity >= quiet:
+                return True
+            if now >= deadline:
+                return False
+            await asyncio.sleep(min(_POLL_INTERVAL, deadline - now))
+
+
+async def _wait_visually_stable(page: Any, interval: float, deadline: float) -> bool:
+    """Wait until two viewport renders ``interval`` seconds apart are identical."""
+    loop = asyncio.get_running_loop()
+
+    async def render_hash() -> str:
+        # Low-quality JPEG of the viewport is cheap and still changes with layout
+        image = await page.screenshot(type="jpeg", quality=20, full_page=False)
+        return hashlib.sha256(image).hexdigest()
+
+    previous = await render_hash()
+    while loop.time() + interval <= deadline:
+        await asyncio.sleep(interval)
+        current = await render_hash()
+        if current == previous:
+            return True
+        previous = current
+    return False
+
+
+def parse_wait(spec: str | None, ignore: Iterable[str] = ()) -> WaitStrategy:
+    """
+    Build a WaitStrategy from a spec string.
+
+    A spec is one or more steps joined with "+", for example::
+
+        networkidle
+        domcontentloaded+selector:#app
+        load+function:window.appReady === true
+        quiet:500
+        load+quiet:500+stable:300
+
+    A bare load state chooses how Page.goto waits. When the spec only has
+    extra conditions, navigation waits for "load" first.
+
+    Args:
+        spec: Spec string; None or empty means "networkidle"
+        ignore: URL patterns ignored by the network-quiet check
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    if not spec or not spec.strip():
+        return WaitStrategy(ignore=ignore)
+
+    options: dict[str, Any] = {}
+    load_state = None
+    for step in _split_steps(spec):
+        name, _, value = step.partition(":")
+        name = name.strip().lower()
+        value = value.strip()
+
+        if name in LOAD_STATES and not value:
+            load_state = name
+        elif name in ("selector", "function") and value:
+            options[name] = value
+        elif name in ("quiet", "stable"):
+            try:
+                ms = int(value)
+            except ValueError:
+                raise ValueError(
+                    f"{name} needs a duration in milliseconds, e.g. {name}:500"
+                ) from None
+            if ms <= 0:
+                raise ValueError(f"{name} duration must be positive, got: {ms}")
+            options[f"{name}_ms"] = ms
+        else:
+            raise ValueError(f"Invalid wait step: {step!r}")
+
+    if load_state is None:
+        load_state = "load" if options else "networkidle"
+    return WaitStrategy(wait_until=load_state, ignore=ignore, **options)
+
+
+def _split_steps(spec: str) -> list[str]:
+    """Split on "+" between steps, leaving "+" inside selectors and scripts alone."""
+    steps: list[str] = []
+    for part in spec.split("+"):
+        name = part.partition(":")[0].strip().lower()
+        known = name in LOAD_STATES or name in (
+            "selector",
+            "function",
+            "quiet",
+            "stable",
+        )
+        if steps and not known:
+            steps[-1] += "+" + part
+        else:
+            steps.append(part)
+    return [step.strip() for step in steps if step.strip()]
+
+
+def describe_wait(strategy: WaitStrategy) -> str:
+    """Render a strategy back as a spec string."""
+    steps = [strategy.wait_until]
+    if strategy.selector:
+        steps.append(f"selector:{strategy.selector}")
+    if strategy.function:
+        steps.append(f"function:{strategy.function}")
+    if strategy.quiet_ms:
+        steps.append(f"quiet:{strategy.quiet_ms}")
+    if strategy.stable_ms:
+        steps.append(f"stable:{strategy.stable_ms}")
+    return "+".join(steps)
+
+
+class WaitRules:
+    """
+    Chooses a WaitStrategy per URL.
+
+    Rules are URL patterns (shell wildcards, or substrings when there are no
+    wildcards) checked in order; the first match wins and unmatched URLs use
+    the default strategy.
+
+    Usage:
+        rules = WaitRules.from_options(
+            default="networkidle",
+            rules={"https://app.example.com/*": "domcontentloaded+selector:#root"},
+        )
+        strategy = rules.for_url(url)
+    """
+
+    def __init__(
+        self,
+        default: WaitStrategy | None = None,
+        rules: Iterable[tuple[str, WaitStrategy]] = (),
+    ):
+        self.default = default or WaitStrategy()
+        self.rules = list(rules)
+
+    @classmethod
+    def from_options(
+        cls,
+        default: str | None = None,
+        rules: Mapping[str, str] | Iterable[str | tuple[str, str]] | None = None,
+        ignore: Iterable[str] = (),
+    ) -> "WaitRules":
+        """
+        Build rules from config, CLI or event values.
+
+        Args:
+            default: Spec for URLs no rule matches
+            rules: Mapping of URL pattern to spec, or "PATTERN=SPEC" strings
+                or (pattern, spec) pairs
+            ignore: URL patterns ignored by network-quiet checks
+
+        Raises:
+            ValueError: If a spec or rule is malformed
+        """
+        ignore = tuple(ignore)
+        if rules is None:
+            pairs: list[tuple[str, str]] = []
+        elif isinstance(rules, Mapping):
+            pairs = list(rules.items())
+        else:
+            pairs = [
+                parse_wait_rule(rule) if isinstance(rule, str) else tuple(rule)
+                for rule in rules
+            ]
+
+        return cls(
+            default=parse_wait(default, ignore),
+            rules=[(pattern, parse_wait(spec, ignore)) for pattern, spec in pairs],
+        )
+
+    def for_url(self, url: str, raise_on_rate_limit: bool = False) -> WaitStrategy:
+        """
+        Strategy for a single URL.
+
+        Args:
+            url: The URL to capture
+            raise_on_rate_limit: Make 429 and 503 responses raise
+                RateLimitedError; set by batch runs that back off and retry
+        """
+        strategy = next(
+            (strategy for pattern, strategy in self.rules if _matches(pattern, url)),
+            self.default,
+        )
+        if raise_on_rate_limit:
+            strategy = copy.copy(strategy)
+            strategy.raise_on_rate_limit = True
+        return strategy
+
+
+def parse_wait_rule(rule: str) -> tuple[str, str]:
+    """
+    Split a "PATTERN=SPEC" rule.
+
+    Raises:
+        ValueError: If the rule has no "=" or an empty pattern
+    """
+    pattern, sep, spec = rule.partition("=")
+    if not sep or not pattern.strip():
+        raise ValueError(f"Wait rule must look like PATTERN=SPEC, got: {rule!r}")
+    return pattern.strip(), spec.strip()
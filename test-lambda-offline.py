@@ -13,16 +13,17 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 import unittest.mock
 
 
-def mock_upload_to_s3(*args, **kwargs):
+def mock_upload_bytes(self, data, s3_key, content_type=None):
     """Mock S3 upload for offline testing."""
-    return "https://test-bucket.s3.amazonaws.com/test-key.png"
+    return f"https://test-bucket.s3.amazonaws.com/{s3_key}"
 
 
-# Apply the mock
-with unittest.mock.patch(
-    "playwright_s3_snapshot.snapshot.upload_to_s3", side_effect=mock_upload_to_s3
-):
-    from playwright_s3_snapshot.lambda_handler import lambda_handler, batch_handler
+# Apply the mock for the whole run (screenshots are uploaded from memory)
+unittest.mock.patch(
+    "playwright_s3_snapshot.s3_upload.S3Uploader.upload_bytes", mock_upload_bytes
+).start()
+
+from playwright_s3_snapshot.lambda_handler import lambda_handler, batch_handler
 
 
 class MockContext:
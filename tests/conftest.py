@@ -105,4 +105,17 @@ def screenshot_result(temp_dir: str) -> str:
     """
     screenshot_path = Path(temp_dir) / "screenshot.png"
     screenshot_path.write_bytes(b"mock screenshot data")
-    return str(screenshot_path)
\ No newline at end of file
+    return str(screenshot_path)
+
+@pytest.fixture(autouse=True)
+def reset_s3_client_cache() -> Generator[None, None, None]:
+    """Drop cached S3 clients so each test sees its own mocked AWS.
+
+    Yields:
+        Nothing; the cache is cleared before and after each test.
+    """
+    from playwright_s3_snapshot.s3_upload import clear_client_cache
+
+    clear_client_cache()
+    yield
+    clear_client_cache()
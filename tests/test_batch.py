@@ -0,0 +1,128 @@
+"""Tests for the concurrent batch engine.
+
+This module tests the batch engine including:
+- Bounded concurrency
+- Per-item retries inside workers
+- Lazy consumption of the input iterator
+"""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from playwright_s3_snapshot.batch import run_batch
+
+
+class TestRunBatch:
+    """Tests for run_batch."""
+
+    @pytest.mark.asyncio
+    async def test_processes_all_items(self) -> None:
+        """Test that every item is handled and counted."""
+        seen: list[Any] = []
+
+        async def handler(index: int, item: str) -> str:
+            seen.append((index, item))
+            return item.upper()
+
+        results: list[Any] = []
+        summary = await run_batch(
+            ["a", "b", "c"],
+            handler,
+            concurrency=2,
+            on_success=lambda index, item, result: results.append(result),
+        )
+
+        assert summary == {"total": 3, "successful": 3, "failed": 0}
+        assert sorted(seen) == [(1, "a"), (2, "b"), (3, "c")]
+        assert sorted(results) == ["A", "B", "C"]
+
+    @pytest.mark.asyncio
+    async def test_respects_concurrency_limit(self) -> None:
+        """Test that no more than `concurrency` handlers run at once."""
+        running = 0
+        peak = 0
+
+        async def handler(index: int, item: int) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await run_batch(range(20), handler, concurrency=4)
+
+        assert peak == 4
+
+    @pytest.mark.asyncio
+    async def test_retries_then_succeeds(self) -> None:
+        """Test that failed attempts are retried within the worker."""
+        calls = {"count": 0}
+        retries: list[int] = []
+
+        async def handler(index: int, item: str) -> None:
+            calls["count"] += 1
+            if calls["count"] < 3:
+                raise RuntimeError("flaky")
+
+        summary = await run_batch(
+            ["https://example.com"],
+            handler,
+            attempts=3,
+            retry_delay=0,
+            on_retry=lambda index, item, attempt, error: retries.append(attempt),
+        )
+
+        assert summary["successful"] == 1
+        assert retries == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_reports_failure_after_last_attempt(self) -> None:
+        """Test that an item failing every attempt is reported once."""
+        failures: list[str] = []
+
+        async def handler(index: int, item: str) -> None:
+            raise RuntimeError(f"boom {item}")
+
+        summary = await run_batch(
+            ["x"],
+            handler,
+            attempts=2,
+            retry_delay=0,
+            on_failure=lambda index, item, error: failures.append(str(error)),
+        )
+
+        assert summary == {"total": 1, "successful": 0, "failed": 1}
+        assert failures == ["boom x"]
+
+    @pytest.mark.asyncio
+    async def test_consumes_iterator_lazily(self) -> None:
+        """Test that items are pulled from the iterator only as workers free up."""
+        pulled = 0
+
+        def items():
+            nonlocal pulled
+            for i in range(100):
+                pulled += 1
+                yield i
+
+        async def handler(index: int, item: int) -> None:
+            if index == 1:
+                # Items buffered while the first one is in flight stay bounded
+                await asyncio.sleep(0.01)
+                assert pulled <= 4
+
+        summary = await run_batch(items(), handler, concurrency=1)
+
+        assert summary["total"] == 100
+
+    @pytest.mark.asyncio
+    async def test_invalid_concurrency(self) -> None:
+        """Test concurrency validation."""
+
+        async def handler(index: int, item: Any) -> None:
+            pass
+
+        with pytest.raises(ValueError):
+            await run_batch([1], handler, concurrency=0)
@@ -0,0 +1,121 @@
+"""Tests for request blocking.
+
+This module tests the resource blocker including:
+- Blocking by resource type, domain pattern and tracker list
+- Never blocking the page document
+- Route interception on a Playwright page
+- Wiring through capture_screenshot
+"""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from playwright_s3_snapshot.blocking import ResourceBlocker, parse_list
+from playwright_s3_snapshot.screenshot import capture_screenshot
+
+
+class TestResourceBlocker:
+    """Tests for ResourceBlocker decisions."""
+
+    def test_blocks_resource_types(self) -> None:
+        """Test that configured resource types are blocked."""
+        blocker = ResourceBlocker(resource_types=["font", "Media"])
+
+        assert blocker.should_block("font", "https://fonts.example.com/a.woff2")
+        assert blocker.should_block("media", "https://example.com/intro.mp4")
+        assert not blocker.should_block("stylesheet", "https://example.com/site.css")
+
+    def test_blocks_domains_and_subdomains(self) -> None:
+        """Test domain patterns, wildcards and path prefixes."""
+        blocker = ResourceBlocker(
+            domains=["ads.example.com", "*.cdn.example.net", "example.org/track"]
+        )
+
+        assert blocker.should_block("script", "https://ads.example.com/a.js")
+        assert blocker.should_block("image", "https://eu.ads.example.com/pixel.gif")
+        assert not blocker.should_block("script", "https://badads.example.com/a.js")
+        assert blocker.should_block("image", "https://img.cdn.example.net/logo.png")
+        assert blocker.should_block("xhr", "https://example.org/track/event")
+        assert not blocker.should_block("xhr", "https://example.org/api/data")
+
+    def test_blocks_trackers(self) -> None:
+        """Test the built-in tracker list."""
+        blocker = ResourceBlocker(trackers=True)
+
+        assert blocker.should_block("script", "https://www.googletagmanager.com/gtm.js")
+        assert blocker.should_block("image", "https://stats.g.doubleclick.net/collect")
+        assert not blocker.should_block("script", "https://example.com/app.js")
+
+    def test_never_blocks_documents(self) -> None:
+        """Test that the page itself is always allowed."""
+        blocker = ResourceBlocker(resource_types=["image"], domains=["example.com"])
+
+        assert not blocker.should_block("document", "https://example.com/")
+
+    def test_unknown_resource_type(self) -> None:
+        """Test that typos in resource types are rejected."""
+        with pytest.raises(ValueError, match="Unknown resource type"):
+            ResourceBlocker(resource_types=["fonts"])
+
+    def test_from_options(self) -> None:
+        """Test building a blocker from comma-separated settings."""
+        assert ResourceBlocker.from_options() is None
+        assert parse_list(" font, media ,") == ["font", "media"]
+
+        blocker = ResourceBlocker.from_options(
+            resource_types="font,media", domains="ads.example.com"
+        )
+        assert blocker.resource_types == {"font", "media"}
+        assert blocker.domains == ("ads.example.com",)
+
+    @pytest.mark.asyncio
+    async def test_route_handler(self) -> None:
+        """Test that blocked requests are aborted and others continued."""
+        blocker = ResourceBlocker(resource_types=["image"])
+        page = AsyncMock()
+
+        await blocker.attach(page)
+
+        page.route.assert_called_once()
+        handler = page.route.call_args.args[1]
+
+        blocked = AsyncMock()
+        blocked.request = Mock(resource_type="image", url="https://example.com/a.png")
+        allowed = AsyncMock()
+        allowed.request = Mock(resource_type="script", url="https://example.com/a.js")
+
+        await handler(blocked)
+        await handler(allowed)
+
+        blocked.abort.assert_called_once_with("blockedbyclient")
+        allowed.fallback.assert_called_once()
+        assert blocker.blocked_count == 1
+
+
+class TestCaptureWithBlocking:
+    """Tests for blocking during capture."""
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_capture_installs_router(self, mock_playwright: Mock) -> None:
+        """Test that the router is attached before navigation."""
+        page = AsyncMock()
+        page.screenshot.return_value = b"png"
+        browser = AsyncMock()
+        browser.new_page.return_value = page
+        playwright = AsyncMock()
+        playwright.chromium.launch.return_value = browser
+        mock_playwright.return_value.__aenter__.return_value = playwright
+
+        calls = []
+        page.route.side_effect = lambda *args: calls.append("route")
+        page.goto.side_effect = lambda *args, **kwargs: calls.append("goto")
+
+        result = await capture_screenshot(
+            "https://example.com", blocker=ResourceBlocker(trackers=True)
+        )
+
+        assert result == b"png"
+        assert calls == ["route", "goto"]
+        assert browser.new_page.call_args.kwargs["service_workers"] == "block"
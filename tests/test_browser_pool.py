@@ -0,0 +1,155 @@
+"""Tests for the persistent browser pool.
+
+This module tests the browser pool including:
+- Launching browsers once per pool
+- Handing out isolated contexts
+- Recycling browsers after a page budget or crash
+- Integration with take_screenshot
+"""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from playwright_s3_snapshot.browser_pool import BrowserPool, process_tree_rss_mb
+from playwright_s3_snapshot.screenshot import take_screenshot
+
+
+def _mock_playwright(mock_async_playwright: Mock) -> AsyncMock:
+    """Wire a mocked async_playwright() that launches fresh mock browsers."""
+
+    def new_browser(*args, **kwargs) -> AsyncMock:
+        browser = AsyncMock()
+        browser.is_connected = Mock(return_value=True)
+        browser.new_context.side_effect = lambda **options: AsyncMock()
+        return browser
+
+    playwright = AsyncMock()
+    playwright.chromium.launch.side_effect = new_browser
+    mock_async_playwright.return_value.start = AsyncMock(return_value=playwright)
+    return playwright
+
+
+class TestBrowserPool:
+    """Tests for BrowserPool lifecycle and recycling."""
+
+    @patch("playwright_s3_snapshot.browser_pool.async_playwright")
+    @pytest.mark.asyncio
+    async def test_launches_browsers_once(self, mock_async_playwright: Mock) -> None:
+        """Test that contexts reuse the browsers launched at start."""
+        playwright = _mock_playwright(mock_async_playwright)
+
+        async with BrowserPool(size=2) as pool:
+            for _ in range(5):
+                async with pool.context(viewport={"width": 800, "height": 600}):
+                    pass
+
+        assert playwright.chromium.launch.call_count == 2
+        assert pool.launch_count == 2
+        playwright.stop.assert_called_once()
+
+    @patch("playwright_s3_snapshot.browser_pool.async_playwright")
+    @pytest.mark.asyncio
+    async def test_context_is_closed_after_use(
+        self, mock_async_playwright: Mock
+    ) -> None:
+        """Test that each job gets its own context which is closed afterwards."""
+        _mock_playwright(mock_async_playwright)
+
+        async with BrowserPool(size=1) as pool:
+            async with pool.context() as first:
+                pass
+            async with pool.context() as second:
+                pass
+
+        assert first is not second
+        first.close.assert_called_once()
+        second.close.assert_called_once()
+
+    @patch("playwright_s3_snapshot.browser_pool.async_playwright")
+    @pytest.mark.asyncio
+    async def test_recycles_after_page_budget(
+        self, mock_async_playwright: Mock
+    ) -> None:
+        """Test that a browser is relaunched after max_pages_per_browser."""
+        playwright = _mock_playwright(mock_async_playwright)
+
+        async with BrowserPool(size=1, max_pages_per_browser=2) as pool:
+            for _ in range(5):
+                async with pool.context():
+                    pass
+
+        # Initial launch plus a relaunch after pages 2 and 4
+        assert playwright.chromium.launch.call_count == 3
+
+    @patch("playwright_s3_snapshot.browser_pool.async_playwright")
+    @pytest.mark.asyncio
+    async def test_replaces_crashed_browser(self, mock_async_playwright: Mock) -> None:
+        """Test that a disconnected browser is replaced on next acquire."""
+        playwright = _mock_playwright(mock_async_playwright)
+
+        async with BrowserPool(size=1) as pool:
+            crashed = pool._browsers[0].browser
+            crashed.is_connected.return_value = False
+            async with pool.context():
+                pass
+
+        assert playwright.chromium.launch.call_count == 2
+        crashed.new_context.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_context_requires_started_pool(self) -> None:
+        """Test that borrowing from an unstarted pool fails clearly."""
+        pool = BrowserPool()
+
+        with pytest.raises(RuntimeError, match="not started"):
+            async with pool.context():
+                pass
+
+    def test_invalid_size(self) -> None:
+        """Test pool size validation."""
+        with pytest.raises(ValueError):
+            BrowserPool(size=0)
+
+    def test_process_tree_rss(self) -> None:
+        """Test memory measurement of the current process tree."""
+        rss_mb = process_tree_rss_mb()
+
+        if Path("/proc").is_dir():
+            assert rss_mb is not None and rss_mb > 0
+        else:
+            assert rss_mb is None
+
+
+class TestScreenshotWithPool:
+    """Tests for take_screenshot using a shared pool."""
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_take_screenshot_uses_pool(
+        self, mock_playwright: Mock, temp_dir: str
+    ) -> None:
+        """Test that a pooled screenshot does not launch its own browser."""
+        output_path = str(Path(temp_dir) / "screenshot.png")
+
+        page = AsyncMock()
+        context = AsyncMock()
+        context.new_page.return_value = page
+        pool = MagicMock()
+        pool.context.return_value.__aenter__.return_value = context
+
+        result = await take_screenshot(
+            url="https://example.com",
+            output_path=output_path,
+            viewport_width=1280,
+            viewport_height=720,
+            pool=pool,
+        )
+
+        assert result == output_path
+        mock_playwright.assert_not_called()
+        pool.context.assert_called_once_with(viewport={"width": 1280, "height": 720})
+        page.goto.assert_called_once_with(
+            "https://example.com", wait_until="networkidle", timeout=30000
+        )
@@ -0,0 +1,267 @@
+"""Tests for the shared asset cache.
+
+This module tests the on-disk asset cache including:
+- Freshness rules from Cache-Control and Expires
+- Storing, loading and expiring responses
+- Least-recently-used eviction under the size cap
+- Serving requests through a route handler
+- Installing the cache on pool contexts
+"""
+
+import os
+import time
+from email.utils import formatdate
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from playwright_s3_snapshot.browser_pool import BrowserPool
+from playwright_s3_snapshot.cache import AssetCache
+
+
+def _route(
+    url: str, resource_type: str = "stylesheet", method: str = "GET"
+) -> AsyncMock:
+    route = AsyncMock()
+    route.request = Mock(url=url, resource_type=resource_type, method=method)
+    return route
+
+
+class TestFreshness:
+    """Tests for deciding whether and for how long to cache."""
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {"cache-control": "no-store"},
+            {"cache-control": "max-age=600, private"},
+            {"cache-control": "no-cache"},
+            {"cache-control": "max-age=0"},
+            {"vary": "*"},
+            {"expires": "0"},
+        ],
+    )
+    def test_uncacheable(self, headers: dict, temp_dir: str) -> None:
+        """Test that responses the server does not want reused are skipped."""
+        assert AssetCache(temp_dir).freshness(headers) is None
+
+    def test_max_age(self, temp_dir: str) -> None:
+        """Test that max-age (or s-maxage) sets the lifetime."""
+        cache = AssetCache(temp_dir)
+
+        assert (
+            cache.freshness({"cache-control": "public, max-age=31536000, immutable"})
+            == 31536000
+        )
+        assert cache.freshness({"cache-control": "s-maxage=60"}) == 60
+
+    def test_expires(self, temp_dir: str) -> None:
+        """Test that Expires is used when there is no max-age."""
+        headers = {"expires": formatdate(time.time() + 600, usegmt=True)}
+
+        assert AssetCache(temp_dir).freshness(headers) == pytest.approx(600, abs=2)
+
+    def test_default_ttl(self, temp_dir: str) -> None:
+        """Test that responses without freshness headers get the default TTL."""
+        assert AssetCache(temp_dir, default_ttl=90).freshness({}) == 90
+
+    def test_invalid_size(self, temp_dir: str) -> None:
+        """Test that the size cap must be positive."""
+        with pytest.raises(ValueError, match="max_bytes"):
+            AssetCache(temp_dir, max_bytes=0)
+
+
+class TestStorage:
+    """Tests for the on-disk store."""
+
+    def test_round_trip_drops_transfer_headers(self, temp_dir: str) -> None:
+        """Test that responses come back with their status, headers and body."""
+        cache = AssetCache(temp_dir)
+        headers = {
+            "content-type": "text/css",
+            "content-encoding": "br",
+            "set-cookie": "a=b",
+        }
+
+        assert cache.store(
+            "https://example.com/site.css", 200, headers, b"body{}", ttl=60
+        )
+
+        assert cache.load("https://example.com/site.css") == (
+            200,
+            {"content-type": "text/css"},
+            b"body{}",
+        )
+        assert cache.load("https://example.com/other.css") is None
+
+    def test_survives_new_instance(self, temp_dir: str) -> None:
+        """Test that a new cache on the same directory sees earlier entries."""
+        AssetCache(temp_dir).store("https://example.com/app.js", 200, {}, b"js", ttl=60)
+
+        cache = AssetCache(temp_dir)
+
+        assert cache.load("https://example.com/app.js") == (200, {}, b"js")
+        assert cache.stats()["size"] > 0
+
+    def test_expired_entries_removed(self, temp_dir: str) -> None:
+        """Test that stale entries are not served and are deleted."""
+        cache = AssetCache(temp_dir)
+        cache.store("https://example.com/app.js", 200, {}, b"js", ttl=60)
+
+        with patch(
+            "playwright_s3_snapshot.cache.time.time", return_value=time.time() + 120
+        ):
+            assert cache.load("https://example.com/app.js") is None
+
+        assert list(Path(temp_dir).iterdir()) == []
+        assert cache.stats()["size"] == 0
+
+    def test_oversized_entries_skipped(self, temp_dir: str) -> None:
+        """Test that one response cannot take over the cache."""
+        cache = AssetCache(temp_dir, max_bytes=4000)
+
+        assert not cache.store(
+            "https://example.com/hero.jpg", 200, {}, b"x" * 2000, ttl=60
+        )
+        assert cache.load("https://example.com/hero.jpg") is None
+
+    def test_evicts_least_recently_used(self, temp_dir: str) -> None:
+        """Test that eviction keeps the directory under the cap, oldest use first."""
+        cache = AssetCache(temp_dir, max_bytes=4000)
+        old = time.time() - 100
+        for name, age in (("a", 0), ("b", 10), ("c", 20), ("d", 30)):
+            cache.store(f"https://example.com/{name}.js", 200, {}, b"x" * 850, ttl=60)
+            os.utime(
+                cache._path(f"https://example.com/{name}.js"), (old + age, old + age)
+            )
+        # Using "a" again makes "b" and "c" the least recently used
+        cache.load("https://example.com/a.js")
+
+        cache.store("https://example.com/e.js", 200, {}, b"x" * 850, ttl=60)
+
+        assert cache.evicted == 2
+        assert cache.load("https://example.com/b.js") is None
+        assert cache.load("https://example.com/c.js") is None
+        assert cache.load("https://example.com/a.js") is not None
+        assert cache.load("https://example.com/e.js") is not None
+        assert cache.stats()["size"] <= 4000 * 0.9
+
+    def test_leaves_unrelated_files_alone(self, temp_dir: str) -> None:
+        """Test that eviction, size and clear() only consider cache entries."""
+        notes = Path(temp_dir) / "notes.txt"
+        notes.write_bytes(b"x" * 3000)
+        os.utime(notes, (0, 0))
+        cache = AssetCache(temp_dir, max_bytes=4000)
+        # Left behind by a writer that crashed
+        (Path(temp_dir) / ("0" * 64 + ".1.2.tmp")).write_bytes(b"partial")
+
+        for name in "abcde":
+            cache.store(f"https://example.com/{name}.js", 200, {}, b"x" * 850, ttl=60)
+
+        assert cache.evicted > 0
+        assert cache.stats()["size"] <= 4000 * 0.9
+        cache.clear()
+
+        assert list(Path(temp_dir).iterdir()) == [notes]
+        assert notes.read_bytes() == b"x" * 3000
+        assert cache.stats()["size"] == 0
+
+
+class TestRouteHandler:
+    """Tests for answering browser requests."""
+
+    async def test_miss_then_hit(self, temp_dir: str) -> None:
+        """Test that a miss is fetched and stored, then served from disk."""
+        cache = AssetCache(temp_dir)
+        response = AsyncMock(
+            status=200,
+            headers={"cache-control": "max-age=600", "content-type": "text/css"},
+        )
+        response.body.return_value = b"body{}"
+        first = _route("https://example.com/site.css")
+        first.fetch.return_value = response
+
+        await cache._handle_route(first)
+
+        first.fulfill.assert_awaited_once_with(response=response, body=b"body{}")
+        second = _route("https://example.com/site.css")
+
+        await cache._handle_route(second)
+
+        second.fetch.assert_not_awaited()
+        second.fulfill.assert_awaited_once_with(
+            status=200,
+            headers={"cache-control": "max-age=600", "content-type": "text/css"},
+            body=b"body{}",
+        )
+        assert (cache.hits, cache.misses, cache.bytes_served) == (1, 1, 6)
+
+    async def test_documents_and_posts_fall_through(self, temp_dir: str) -> None:
+        """Test that non-cacheable requests go to the network untouched."""
+        cache = AssetCache(temp_dir)
+        document = _route("https://example.com/", resource_type="document")
+        post = _route("https://example.com/app.js", method="POST")
+
+        await cache._handle_route(document)
+        await cache._handle_route(post)
+
+        document.fallback.assert_awaited_once()
+        post.fallback.assert_awaited_once()
+        assert cache.misses == 0
+
+    async def test_uncacheable_response_not_stored(self, temp_dir: str) -> None:
+        """Test that no-store responses are passed on but not kept."""
+        cache = AssetCache(temp_dir)
+        response = AsyncMock(status=200, headers={"cache-control": "no-store"})
+        response.body.return_value = b"secret"
+        route = _route("https://example.com/user.js", resource_type="script")
+        route.fetch.return_value = response
+
+        await cache._handle_route(route)
+
+        route.fulfill.assert_awaited_once()
+        assert cache.stored == 0
+
+    async def test_fetch_failure_falls_back(self, temp_dir: str) -> None:
+        """Test that network errors are left to the browser."""
+        cache = AssetCache(temp_dir)
+        route = _route("https://example.com/font.woff2", resource_type="font")
+        route.fetch.side_effect = Exception("net::ERR_CONNECTION_RESET")
+
+        await cache._handle_route(route)
+
+        route.fallback.assert_awaited_once()
+        route.fulfill.assert_not_awaited()
+
+
+class TestPoolIntegration:
+    """Tests for sharing the cache through the pool."""
+
+    @patch("playwright_s3_snapshot.browser_pool.async_playwright")
+    async def test_cache_installed_on_every_context(
+        self, mock_async_playwright: Mock, temp_dir: str
+    ) -> None:
+        """Test that each pool context routes requests through the cache."""
+        contexts = []
+
+        def new_context(**options) -> AsyncMock:
+            contexts.append(AsyncMock())
+            return contexts[-1]
+
+        browser = AsyncMock()
+        browser.is_connected = Mock(return_value=True)
+        browser.new_context.side_effect = new_context
+        playwright = AsyncMock()
+        playwright.chromium.launch.return_value = browser
+        mock_async_playwright.return_value.start = AsyncMock(return_value=playwright)
+        cache = AssetCache(temp_dir)
+
+        async with BrowserPool(cache=cache) as pool:
+            for _ in range(2):
+                async with pool.context():
+                    pass
+
+        assert len(contexts) == 2
+        for context in contexts:
+            context.route.assert_awaited_once_with("**/*", cache._handle_route)
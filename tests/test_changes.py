@@ -0,0 +1,271 @@
+"""Tests for change detection.
+
+This module tests the change detection system including:
+- Decoding Chromium's thumbnail PNGs without an imaging library
+- Change ratios and diff images
+- Local and S3 baseline stores
+- The check/record cycle of ChangeDetector
+"""
+
+import base64
+import struct
+import zlib
+from unittest.mock import AsyncMock, Mock
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from playwright_s3_snapshot.changes import (
+    ChangeDetector,
+    LocalBaselineStore,
+    S3BaselineStore,
+    Thumbnail,
+    _encode_png_rgb,
+    baseline_name,
+)
+from playwright_s3_snapshot.s3_upload import S3Uploader
+
+
+def _paeth(left: int, up: int, up_left: int) -> int:
+    estimate = left + up - up_left
+    distances = (abs(estimate - left), abs(estimate - up), abs(estimate - up_left))
+    if distances[0] <= distances[1] and distances[0] <= distances[2]:
+        return left
+    if distances[1] <= distances[2]:
+        return up
+    return up_left
+
+
+def _gray_png(width: int, rows: list[bytes], filters: list[int]) -> bytes:
+    """Encode grayscale rows, applying the given PNG filter to each row."""
+    raw = bytearray()
+    previous = bytes(width)
+    for row, kind in zip(rows, filters):
+        filtered = bytearray()
+        for i, value in enumerate(row):
+            left = row[i - 1] if i else 0
+            up = previous[i]
+            up_left = previous[i - 1] if i else 0
+            predictor = [0, left, up, (left + up) // 2, _paeth(left, up, up_left)][kind]
+            filtered.append((value - predictor) & 0xFF)
+        raw += bytes([kind]) + filtered
+        previous = row
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(body))
+            + kind
+            + body
+            + struct.pack(">I", zlib.crc32(kind + body))
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, len(rows), 8, 0, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(bytes(raw)))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _thumbnail(width: int, height: int, value: int = 200) -> Thumbnail:
+    return Thumbnail(width, height, bytes([value]) * (width * height))
+
+
+class TestThumbnail:
+    """Tests for Thumbnail decoding and comparison."""
+
+    def test_from_png_decodes_every_filter(self) -> None:
+        """Test that all five scanline filters decode to the original rows."""
+        rows = [bytes((x * 37 + y * 11) % 256 for x in range(7)) for y in range(5)]
+        thumbnail = Thumbnail.from_png(_gray_png(7, rows, [0, 1, 2, 3, 4]))
+
+        assert (thumbnail.width, thumbnail.height) == (7, 5)
+        assert thumbnail.pixels == b"".join(rows)
+
+    def test_from_png_converts_rgb_to_grey(self) -> None:
+        """Test that RGB pixels are reduced to their luma."""
+        png = _encode_png_rgb(2, 1, [bytes((255, 255, 255, 255, 0, 0))])
+
+        thumbnail = Thumbnail.from_png(png)
+
+        assert thumbnail.pixels == bytes((255, 76))
+
+    def test_from_png_rejects_non_png(self) -> None:
+        """Test that other data is rejected."""
+        with pytest.raises(ValueError, match="Not a PNG"):
+            Thumbnail.from_png(b"GIF89a")
+
+    def test_pixel_count_must_match_size(self) -> None:
+        """Test that a thumbnail cannot be built from the wrong number of pixels."""
+        with pytest.raises(ValueError, match="Expected 6 pixels"):
+            Thumbnail(3, 2, b"\x00" * 5)
+
+    def test_record_round_trip(self) -> None:
+        """Test that thumbnails survive to_record/from_record."""
+        thumbnail = Thumbnail(4, 2, bytes(range(8)))
+
+        assert Thumbnail.from_record(thumbnail.to_record()) == thumbnail
+
+    def test_change_ratio_ignores_small_drift(self) -> None:
+        """Test that pixels within the tolerance count as unchanged."""
+        baseline = _thumbnail(4, 4, 100)
+        drifted = _thumbnail(4, 4, 110)
+
+        assert drifted.change_ratio(baseline, tolerance=24) == 0.0
+        assert drifted.change_ratio(baseline, tolerance=5) == 1.0
+
+    def test_change_ratio_counts_changed_pixels(self) -> None:
+        """Test that the ratio is the fraction of pixels that moved."""
+        baseline = _thumbnail(4, 4)
+        pixels = bytearray(baseline.pixels)
+        pixels[0:4] = b"\x00" * 4
+        current = Thumbnail(4, 4, bytes(pixels))
+
+        assert current.change_ratio(baseline) == 0.25
+
+    def test_change_ratio_counts_height_changes(self) -> None:
+        """Test that rows added or removed count as changed."""
+        baseline = _thumbnail(4, 4)
+
+        assert _thumbnail(4, 5).change_ratio(baseline) == pytest.approx(0.2)
+        assert _thumbnail(4, 2).change_ratio(baseline) == 0.5
+
+    def test_change_ratio_of_different_widths(self) -> None:
+        """Test that thumbnails that cannot be lined up are entirely changed."""
+        assert _thumbnail(4, 4).change_ratio(_thumbnail(8, 2)) == 1.0
+
+    def test_diff_png_marks_changes(self) -> None:
+        """Test that the diff image is enlarged and marks changed pixels."""
+        current = Thumbnail(2, 1, bytes((0, 200)))
+
+        diff = Thumbnail.from_png(current.diff_png([True, False]))
+
+        assert (diff.width, diff.height) == (8, 4)
+        # Red (luma 89) where changed, faded grey (luma 228) elsewhere
+        assert diff.pixels[0] == 89
+        assert diff.pixels[4] == 228
+
+    async def test_capture_downscales_with_chromium(self) -> None:
+        """Test that the thumbnail is rendered by CDP at the requested width."""
+        session = Mock()
+        png = _gray_png(64, [bytes(64)] * 50, [0] * 50)
+        session.send = AsyncMock(
+            side_effect=[
+                {"cssContentSize": {"width": 1280, "height": 1000}},
+                {"data": base64.b64encode(png).decode()},
+            ]
+        )
+        session.detach = AsyncMock()
+        page = Mock()
+        page.context.new_cdp_session = AsyncMock(return_value=session)
+
+        thumbnail = await Thumbnail.capture(page, width=64)
+
+        assert (thumbnail.width, thumbnail.height) == (64, 50)
+        params = session.send.call_args_list[1].args[1]
+        assert params["clip"]["scale"] == 0.05
+        assert params["captureBeyondViewport"] is True
+        session.detach.assert_awaited_once()
+
+
+    async def test_capture_region_clip(self) -> None:
+        """Test that a clip renders only that part of the page."""
+        session = Mock()
+        png = _gray_png(64, [bytes(64)] * 32, [0] * 32)
+        session.send = AsyncMock(return_value={"data": base64.b64encode(png).decode()})
+        session.detach = AsyncMock()
+        page = Mock()
+        page.context.new_cdp_session = AsyncMock(return_value=session)
+        clip = {"x": 10, "y": 300, "width": 640, "height": 320}
+
+        thumbnail = await Thumbnail.capture(page, width=64, clip=clip)
+
+        assert (thumbnail.width, thumbnail.height) == (64, 32)
+        method, params = session.send.call_args.args
+        assert method == "Page.captureScreenshot"
+        assert session.send.await_count == 1
+        assert params["clip"] == {**clip, "scale": 0.1}
+
+class TestBaselineStores:
+    """Tests for where baselines are kept."""
+
+    def test_local_store_round_trip(self, temp_dir: str) -> None:
+        """Test that local baselines are saved per URL and loaded back."""
+        store = LocalBaselineStore(temp_dir)
+
+        assert store.load("https://example.com") is None
+        store.save("https://example.com", {"s3_key": "a.png"})
+        store.save("https://example.org", {"s3_key": "b.png"})
+
+        assert store.load("https://example.com") == {"s3_key": "a.png"}
+        assert store.load("https://example.org") == {"s3_key": "b.png"}
+
+    @mock_aws
+    def test_s3_store_round_trip(self) -> None:
+        """Test that S3 baselines are JSON objects under the prefix."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        store = S3BaselineStore(S3Uploader(bucket_name="test-bucket"), prefix="base")
+
+        assert store.load("https://example.com") is None
+        store.save("https://example.com", {"s3_key": "a.png"})
+
+        assert store.load("https://example.com") == {"s3_key": "a.png"}
+        head = s3_client.head_object(
+            Bucket="test-bucket", Key="base/" + baseline_name("https://example.com")
+        )
+        assert head["ContentType"] == "application/json"
+
+
+class TestChangeDetector:
+    """Tests for ChangeDetector."""
+
+    def test_first_capture_is_changed(self, temp_dir: str) -> None:
+        """Test that a URL without a baseline is always stored."""
+        detector = ChangeDetector(LocalBaselineStore(temp_dir))
+
+        change = detector.check("https://example.com", _thumbnail(4, 4))
+
+        assert change.changed
+        assert change.ratio is None
+        assert change.diff is None
+
+    def test_unchanged_below_threshold(self, temp_dir: str) -> None:
+        """Test that a capture within the threshold points at the baseline."""
+        detector = ChangeDetector(LocalBaselineStore(temp_dir), threshold=0.1)
+        detector.record("https://example.com", _thumbnail(10, 10), "shots/a.png")
+        pixels = bytearray(_thumbnail(10, 10).pixels)
+        pixels[:5] = b"\x00" * 5
+
+        change = detector.check("https://example.com", Thumbnail(10, 10, bytes(pixels)))
+
+        assert not change.changed
+        assert change.ratio == 0.05
+        assert change.baseline["s3_key"] == "shots/a.png"
+
+    def test_changed_above_threshold_has_diff(self, temp_dir: str) -> None:
+        """Test that a changed capture comes with a diff image."""
+        detector = ChangeDetector(LocalBaselineStore(temp_dir), threshold=0.1)
+        detector.record("https://example.com", _thumbnail(4, 4), "shots/a.png")
+
+        change = detector.check("https://example.com", _thumbnail(4, 4, 0))
+
+        assert change.changed
+        assert change.ratio == 1.0
+        assert change.diff.startswith(b"\x89PNG")
+
+    def test_diff_image_can_be_disabled(self, temp_dir: str) -> None:
+        """Test that diff_image=False skips the diff."""
+        detector = ChangeDetector(LocalBaselineStore(temp_dir), diff_image=False)
+        detector.record("https://example.com", _thumbnail(4, 4), "shots/a.png")
+
+        change = detector.check("https://example.com", _thumbnail(4, 4, 0))
+
+        assert change.changed
+        assert change.diff is None
+
+    def test_invalid_threshold(self, temp_dir: str) -> None:
+        """Test that thresholds outside 0-1 are rejected."""
+        with pytest.raises(ValueError, match="threshold"):
+            ChangeDetector(LocalBaselineStore(temp_dir), threshold=1.5)
@@ -7,7 +7,8 @@ This module tests the command-line interface including:
 """
 
 import sys
-from unittest.mock import patch
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock, patch
 import argparse
 
 import pytest
@@ -99,4 +100,494 @@ class TestCLIMainExecution:
         
         with patch.object(sys, 'argv', test_argv):
             exit_code = main()
-            assert exit_code == 1
\ No newline at end of file
+            assert exit_code == 1
+
+class TestCLIBatchExecution:
+    """Tests for concurrent batch execution."""
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_parallel_url_file(self, mock_pool: MagicMock, mock_snapshot: AsyncMock, temp_dir: str) -> None:
+        """Test that --parallel shares one pool across concurrent workers."""
+        from pathlib import Path
+
+        url_file = Path(temp_dir) / "urls.txt"
+        url_file.write_text("https://a.example\n# comment\nhttps://b.example\nc.example\n")
+        mock_snapshot.return_value = {
+            "s3_url": "https://test-bucket.s3.amazonaws.com/screenshot.png",
+            "s3_key": "screenshot.png",
+            "file_size": 123,
+            "timestamp": "2025-07-16T12:00:00",
+        }
+
+        test_argv = [
+            "snapshot",
+            "--url-file", str(url_file),
+            "--bucket", "test-bucket",
+            "--parallel", "2",
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        assert mock_snapshot.call_count == 3
+        mock_pool.assert_called_once()
+        assert mock_pool.call_args.kwargs["size"] == 2
+        pool = mock_pool.return_value.__aenter__.return_value
+        assert all(call.kwargs["pool"] is pool for call in mock_snapshot.call_args_list)
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_retries_inside_workers(self, mock_pool: MagicMock, mock_snapshot: AsyncMock) -> None:
+        """Test that a failing URL is retried and then reported as failed."""
+        mock_snapshot.side_effect = Exception("Navigation timeout")
+
+        test_argv = [
+            "snapshot",
+            "https://example.com",
+            "--bucket", "test-bucket",
+            "--retries", "2",
+        ]
+
+        with patch.object(sys, 'argv', test_argv), patch(
+            "playwright_s3_snapshot.batch.asyncio.sleep", new=AsyncMock()
+        ):
+            exit_code = main()
+
+        assert exit_code == 1
+        assert mock_snapshot.call_count == 2
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_block_options(self, mock_pool: MagicMock, mock_snapshot: AsyncMock) -> None:
+        """Test that blocking flags build one shared ResourceBlocker."""
+        mock_snapshot.return_value = {
+            "s3_url": "https://test-bucket.s3.amazonaws.com/screenshot.png",
+            "s3_key": "screenshot.png",
+            "file_size": 123,
+            "timestamp": "2025-07-16T12:00:00",
+        }
+
+        test_argv = [
+            "snapshot",
+            "https://example.com",
+            "--bucket", "test-bucket",
+            "--block-resources", "font,media",
+            "--block-domains", "ads.example.com",
+            "--block-trackers",
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        blocker = mock_snapshot.call_args.kwargs["blocker"]
+        assert blocker.resource_types == {"font", "media"}
+        assert blocker.domains == ("ads.example.com",)
+        assert blocker.trackers is True
+
+    def test_main_invalid_block_resources(self) -> None:
+        """Test that unknown resource types are rejected by argparse."""
+        test_argv = ["snapshot", "https://example.com", "--block-resources", "fonts"]
+
+        with patch.object(sys, 'argv', test_argv), pytest.raises(SystemExit):
+            main()
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_wait_rules(self, mock_pool: MagicMock, mock_snapshot: AsyncMock, temp_dir: str) -> None:
+        """Test that --wait-rule overrides --wait for matching URLs."""
+        from pathlib import Path
+
+        url_file = Path(temp_dir) / "urls.txt"
+        url_file.write_text("https://app.example.com/home\nhttps://example.org\n")
+        mock_snapshot.return_value = {
+            "s3_url": "https://test-bucket.s3.amazonaws.com/screenshot.png",
+            "s3_key": "screenshot.png",
+            "file_size": 123,
+            "timestamp": "2025-07-16T12:00:00",
+        }
+
+        test_argv = [
+            "snapshot",
+            "--url-file", str(url_file),
+            "--bucket", "test-bucket",
+            "--wait", "load",
+            "--wait-rule", "https://app.example.com/*=domcontentloaded+selector:#root",
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        waits = {call.kwargs["url"]: call.kwargs["wait"] for call in mock_snapshot.call_args_list}
+        assert waits["https://app.example.com/home"].selector == "#root"
+        assert waits["https://example.org"].wait_until == "load"
+
+    def test_main_invalid_wait(self) -> None:
+        """Test that malformed wait specs are rejected by argparse."""
+        test_argv = ["snapshot", "https://example.com", "--wait", "quiet:soon"]
+
+        with patch.object(sys, 'argv', test_argv), pytest.raises(SystemExit):
+            main()
+
+    def test_main_quality_needs_lossy_format(self) -> None:
+        """Test that --quality is rejected for PNG output."""
+        test_argv = ["snapshot", "https://example.com", "--quality", "80"]
+
+        with patch.object(sys, 'argv', test_argv), pytest.raises(SystemExit):
+            main()
+
+    @patch("playwright_s3_snapshot.cli.capture_viewports")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_viewports_local_files(
+        self, mock_pool: MagicMock, mock_capture: AsyncMock, temp_dir: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that --viewports writes one local file per viewport."""
+        from pathlib import Path
+
+        # Keep the sample config in the repo root from switching on S3 mode
+        monkeypatch.chdir(temp_dir)
+
+        from playwright_s3_snapshot.viewports import parse_viewports
+
+        viewports = parse_viewports("desktop,mobile")
+        mock_capture.return_value = [(viewports[0], b"desktop"), (viewports[1], b"mobile")]
+        output = Path(temp_dir) / "home.png"
+
+        test_argv = [
+            "snapshot",
+            "https://example.com",
+            "--output", str(output),
+            "--viewports", "desktop,mobile",
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        assert (Path(temp_dir) / "home_desktop.png").read_bytes() == b"desktop"
+        assert (Path(temp_dir) / "home_mobile.png").read_bytes() == b"mobile"
+        assert mock_capture.call_args.kwargs["viewports"] == viewports
+
+    @patch("playwright_s3_snapshot.cli.capture_tiles")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_tiles_local_files(
+        self, mock_pool: MagicMock, mock_capture: AsyncMock, temp_dir: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that --tile-height writes tiles and a manifest into a directory."""
+        import json
+        from pathlib import Path
+
+        from playwright_s3_snapshot.screenshot import Tile
+
+        monkeypatch.chdir(temp_dir)
+
+        async def capture_tiles(url: str, on_tile: Any, **kwargs: Any) -> Dict[str, Any]:
+            await on_tile(Tile(0, 0, 800, 500, b"top"))
+            await on_tile(Tile(1, 500, 800, 200, b"bottom"))
+            return {"page_width": 800, "page_height": 700, "captured_height": 700, "truncated": False, "tiles": 2}
+
+        mock_capture.side_effect = capture_tiles
+        output = Path(temp_dir) / "tall.png"
+
+        test_argv = [
+            "snapshot", "https://example.com", "--output", str(output),
+            "--tile-height", "500", "--max-page-height", "20000",
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        directory = Path(temp_dir) / "tall"
+        assert (directory / "tile-0001.png").read_bytes() == b"bottom"
+        manifest = json.loads((directory / "manifest.json").read_text())
+        assert [tile["name"] for tile in manifest["tiles"]] == ["tile-0000.png", "tile-0001.png"]
+        assert mock_capture.call_args.kwargs["tile_height"] == 500
+        assert mock_capture.call_args.kwargs["max_height"] == 20000
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_selector(self, mock_pool: MagicMock, mock_snapshot: AsyncMock) -> None:
+        """Test that --selector captures a single element."""
+        from playwright_s3_snapshot.regions import Region
+
+        mock_snapshot.return_value = {
+            "s3_url": "https://test-bucket.s3.amazonaws.com/chart.png",
+            "s3_key": "chart.png",
+            "file_size": 123,
+            "timestamp": "2025-07-16T12:00:00",
+        }
+        test_argv = ["snapshot", "https://example.com", "--bucket", "test-bucket", "--selector", "#chart"]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        assert mock_snapshot.call_args.kwargs["region"] == Region(selector="#chart")
+
+    @patch("playwright_s3_snapshot.cli.capture_artifacts")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_artifacts_local_files(
+        self, mock_pool: MagicMock, mock_capture: AsyncMock, temp_dir: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that --artifacts writes one file per artifact next to --output."""
+        from pathlib import Path
+
+        monkeypatch.chdir(temp_dir)
+        mock_capture.return_value = {"screenshot": b"image", "pdf": b"%PDF", "html": b"<html></html>"}
+        output = Path(temp_dir) / "home.png"
+
+        test_argv = [
+            "snapshot", "https://example.com", "--output", str(output),
+            "--artifacts", "screenshot,pdf,html",
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        assert (Path(temp_dir) / "home.png").read_bytes() == b"image"
+        assert (Path(temp_dir) / "home.pdf").read_bytes() == b"%PDF"
+        assert (Path(temp_dir) / "home.html").read_bytes() == b"<html></html>"
+        assert mock_capture.call_args.kwargs["artifacts"] == ["screenshot", "pdf", "html"]
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            ["--artifacts", "pdf,docx"],
+            ["--artifacts", "pdf", "--viewports", "desktop,mobile"],
+            ["--selector", "#chart", "--viewport-only"],
+            ["--clip", "0,0,100"],
+            ["--clip", "0,0,0,100"],
+            ["--viewport-only", "--viewports", "desktop,mobile"],
+            ["--max-page-height", "20000"],
+            ["--tile-height", "500", "--viewports", "desktop,mobile"],
+            ["--tile-height", "500", "--format", "jpeg", "--max-bytes", "500KB"],
+        ],
+    )
+    def test_main_tile_option_conflicts(self, options: list, temp_dir: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that tiling options are rejected in combinations that cannot work."""
+        monkeypatch.chdir(temp_dir)
+        test_argv = ["snapshot", "https://example.com", *options]
+
+        with patch.object(sys, 'argv', test_argv):
+            with pytest.raises(SystemExit):
+                main()
+
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_interleaves_hosts(self, mock_pool: MagicMock, mock_snapshot: AsyncMock, temp_dir: str) -> None:
+        """Test that batches alternate between hosts and accept per-host limits."""
+        from pathlib import Path
+
+        url_file = Path(temp_dir) / "urls.txt"
+        url_file.write_text("https://a.example/1\nhttps://a.example/2\nhttps://a.example/3\nhttps://b.example/1\n")
+        order = []
+
+        async def snapshot(url: str, **kwargs: Any) -> Dict[str, Any]:
+            order.append(url)
+            return {"s3_url": f"https://test-bucket.s3.amazonaws.com/{url[8:]}.png", "s3_key": f"{url[8:]}.png", "file_size": 1, "timestamp": "2025-07-16T12:00:00"}
+
+        mock_snapshot.side_effect = snapshot
+
+        test_argv = [
+            "snapshot", "--url-file", str(url_file), "--bucket", "test-bucket",
+            "--max-per-host", "1", "--host-rate", "100",
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        assert order == ["https://a.example/1", "https://b.example/1", "https://a.example/2", "https://a.example/3"]
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_batch_timing_summary(
+        self, mock_pool: MagicMock, mock_snapshot: AsyncMock, temp_dir: str, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test that a batch run ends with per-stage percentiles."""
+        from pathlib import Path
+
+        url_file = Path(temp_dir) / "urls.txt"
+        url_file.write_text("https://a.example\nhttps://b.example\n")
+
+        async def snapshot(url: str, **kwargs: Any) -> Dict[str, Any]:
+            goto = 1200.0 if "a.example" in url else 800.0
+            return {
+                "s3_url": f"https://test-bucket.s3.amazonaws.com/{url[8:]}.png",
+                "s3_key": f"{url[8:]}.png",
+                "file_size": 123,
+                "timestamp": "2025-07-16T12:00:00",
+                "timings": {"goto": goto, "upload": 90.0, "total": goto + 100},
+            }
+
+        mock_snapshot.side_effect = snapshot
+
+        test_argv = ["snapshot", "--url-file", str(url_file), "--bucket", "test-bucket"]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        output = capsys.readouterr().out
+        assert "Stage timings (ms)" in output
+        goto_line = next(line for line in output.splitlines() if line.strip().startswith("goto"))
+        assert goto_line.split()[1:] == ["800", "1,200", "1,200"]
+
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_main_detect_changes(
+        self, mock_pool: MagicMock, mock_snapshot: AsyncMock, temp_dir: str, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test that --detect-changes passes a detector with local baselines."""
+        mock_snapshot.return_value = {
+            "s3_url": "https://test-bucket.s3.amazonaws.com/old.png",
+            "s3_key": "old.png",
+            "file_size": 123,
+            "timestamp": "2025-07-16T12:00:00",
+            "deduplicated": True,
+            "changed": False,
+        }
+
+        test_argv = [
+            "snapshot", "https://example.com", "--bucket", "test-bucket",
+            "--detect-changes", "--change-threshold", "0.05", "--baseline-dir", temp_dir,
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        detector = mock_snapshot.call_args.kwargs["change_detector"]
+        assert detector.threshold == 0.05
+        assert str(detector.store.directory) == temp_dir
+        assert "Unchanged, already stored" in capsys.readouterr().out
+
+    def test_main_detect_changes_requires_bucket(self, temp_dir: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that --detect-changes without S3 upload is rejected."""
+        monkeypatch.chdir(temp_dir)
+        test_argv = ["snapshot", "https://example.com", "--detect-changes"]
+
+        with patch.object(sys, 'argv', test_argv):
+            with pytest.raises(SystemExit):
+                main()
+
+
+class TestCLIStreamingBatch:
+    """Tests for streamed URL input and resumable runs."""
+
+    @staticmethod
+    def _result(url: str, **kwargs) -> dict:
+        return {
+            "s3_url": f"https://test-bucket.s3.amazonaws.com/{url[8:]}.png",
+            "s3_key": f"{url[8:]}.png",
+            "file_size": 123,
+            "timestamp": "2025-07-16T12:00:00",
+        }
+
+    def test_iter_urls_is_lazy(self, temp_dir: str) -> None:
+        """Test that URLs are read one line at a time and bad lines skipped."""
+        from pathlib import Path
+
+        from playwright_s3_snapshot.cli import iter_urls_from_file
+
+        url_file = Path(temp_dir) / "urls.txt"
+        url_file.write_text("# header\na.example\n\nhttps://\nhttps://b.example\n")
+        invalid = []
+
+        urls = iter_urls_from_file(str(url_file), on_invalid=lambda *args: invalid.append(args[0]))
+
+        assert next(urls) == "https://a.example"
+        assert invalid == []
+        assert list(urls) == ["https://b.example"]
+        assert invalid == [4]
+
+    def test_parse_urls_shares_iter_rules(self, temp_dir: str) -> None:
+        """Test that the list parser applies the streaming parser's rules and rejects bad lines."""
+        import argparse
+        from pathlib import Path
+
+        from playwright_s3_snapshot.cli import parse_urls_from_file
+
+        url_file = Path(temp_dir) / "urls.txt"
+        url_file.write_text("# header\na.example\n\n  https://b.example  \n")
+
+        assert parse_urls_from_file(str(url_file)) == ["https://a.example", "https://b.example"]
+
+        url_file.write_text("a.example\nhttps://\n")
+        with pytest.raises(argparse.ArgumentTypeError, match="Error reading URL file"):
+            parse_urls_from_file(str(url_file))
+        with pytest.raises(argparse.ArgumentTypeError, match="not found"):
+            parse_urls_from_file(str(Path(temp_dir) / "missing.txt"))
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_resume_skips_completed(self, mock_pool: MagicMock, mock_snapshot: AsyncMock, temp_dir: str) -> None:
+        """Test that --resume only captures URLs the journal has not completed."""
+        import json
+        from pathlib import Path
+
+        url_file = Path(temp_dir) / "urls.txt"
+        url_file.write_text("https://a.example\nhttps://b.example\nhttps://c.example\n")
+        journal = Path(f"{url_file}.journal")
+        journal.write_text(
+            '{"i":1,"url":"https://a.example","status":"ok","s3_key":"a.png"}\n'
+            '{"i":2,"url":"https://b.example","status":"failed","error":"timeout"}\n'
+        )
+        mock_snapshot.side_effect = lambda url, **kwargs: self._result(url)
+
+        test_argv = [
+            "snapshot",
+            "--url-file", str(url_file),
+            "--bucket", "test-bucket",
+            "--resume",
+        ]
+
+        with patch.object(sys, 'argv', test_argv):
+            exit_code = main()
+
+        assert exit_code == 0
+        captured = sorted(call.kwargs["url"] for call in mock_snapshot.call_args_list)
+        assert captured == ["https://b.example", "https://c.example"]
+        entries = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert {(entry["i"], entry["status"]) for entry in entries[2:]} == {(2, "ok"), (3, "ok")}
+        assert entries[-1]["s3_key"].endswith(".png")
+
+    @patch("playwright_s3_snapshot.cli.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.cli.BrowserPool")
+    def test_urls_from_stdin(self, mock_pool: MagicMock, mock_snapshot: AsyncMock, temp_dir: str) -> None:
+        """Test that "--url-file -" streams URLs from standard input."""
+        import io
+        from pathlib import Path
+
+        mock_snapshot.side_effect = lambda url, **kwargs: self._result(url)
+        journal = Path(temp_dir) / "run.journal"
+
+        test_argv = [
+            "snapshot",
+            "--url-file", "-",
+            "--bucket", "test-bucket",
+            "--journal", str(journal),
+        ]
+
+        with patch.object(sys, 'argv', test_argv), patch.object(
+            sys, 'stdin', io.StringIO("https://a.example\nhttps://b.example\n")
+        ):
+            exit_code = main()
+
+        assert exit_code == 0
+        assert mock_snapshot.call_count == 2
+        assert len(journal.read_text().splitlines()) == 2
+
+    def test_resume_from_stdin_needs_journal(self) -> None:
+        """Test that --resume cannot guess a journal path for stdin."""
+        test_argv = ["snapshot", "--url-file", "-", "--resume"]
+
+        with patch.object(sys, 'argv', test_argv), pytest.raises(SystemExit):
+            main()
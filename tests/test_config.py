@@ -12,7 +12,7 @@ from typing import Dict, Any
 
 import pytest
 
-from playwright_s3_snapshot.config import load_config, merge_config
+from playwright_s3_snapshot.config import Config, load_config, merge_config, parse_size
 
 
 class TestConfigLoading:
@@ -79,4 +79,33 @@ class TestConfigMerging:
         assert result == {"bucket": "test"}
 
         result = merge_config({}, {"bucket": "test"})
-        assert result == {"bucket": "test"}
\ No newline at end of file
+        assert result == {"bucket": "test"}
+
+class TestSizeSettings:
+    """Tests for byte size settings such as multipart thresholds."""
+
+    def test_parse_size(self) -> None:
+        """Test parsing of plain and suffixed sizes."""
+        assert parse_size("8388608") == 8388608
+        assert parse_size("64KB") == 64 * 1024
+        assert parse_size("8MB") == 8 * 1024 * 1024
+        assert parse_size("1.5 GB") == int(1.5 * 1024**3)
+        assert parse_size(42) == 42
+
+    def test_parse_size_invalid(self) -> None:
+        """Test that invalid sizes are rejected."""
+        with pytest.raises(ValueError):
+            parse_size("lots")
+
+    def test_multipart_settings_from_env(self, monkeypatch: pytest.MonkeyPatch, temp_dir: str) -> None:
+        """Test PS3S_MULTIPART_* environment variables."""
+        monkeypatch.chdir(temp_dir)
+        monkeypatch.setenv("PS3S_MULTIPART_THRESHOLD", "32MB")
+        monkeypatch.setenv("PS3S_MULTIPART_CHUNKSIZE", "16MB")
+        monkeypatch.setenv("PS3S_MULTIPART_CONCURRENCY", "6")
+
+        config = Config()
+
+        assert config.get("multipart_threshold") == 32 * 1024 * 1024
+        assert config.get("multipart_chunksize") == 16 * 1024 * 1024
+        assert config.get("multipart_concurrency") == 6
@@ -0,0 +1,143 @@
+"""Tests for import-time cost.
+
+This module tests the start-up path including:
+- Entry points importing without boto3 or Playwright
+- --help and --create-config never loading them
+- A `python -X importtime` report of what each entry point costs
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import playwright_s3_snapshot
+
+# Dependencies that are only worth loading once a capture or upload starts
+HEAVY_MODULES = ("boto3", "botocore", "s3transfer", "playwright.async_api")
+
+SRC_DIR = str(Path(playwright_s3_snapshot.__file__).resolve().parents[1])
+
+
+def _run(code: str, cwd: str | None = None) -> subprocess.CompletedProcess:
+    """Run Python code in a fresh interpreter with -X importtime."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [SRC_DIR, os.getenv("PYTHONPATH")])),
+    }
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=cwd,
+        timeout=60,
+    )
+
+
+def _loaded_heavy_modules(code: str, cwd: str | None = None) -> list[str]:
+    """Heavy modules present in sys.modules after running ``code``."""
+    probe = (
+        f"{code}\n"
+        "import sys\n"
+        f"print('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = _run(probe, cwd=cwd)
+    assert result.returncode == 0, result.stderr[-2000:]
+    loaded = result.stdout.splitlines()[-1].removeprefix("loaded:")
+    return [name for name in loaded.split(",") if name]
+
+
+def import_time_report(module: str, top: int = 10) -> str:
+    """The ``top`` slowest imports (cumulative microseconds) behind ``module``."""
+    result = _run(f"import {module}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative), name.rstrip()))
+    rows.sort(reverse=True)
+    return "\n".join(f"{us / 1000:8.1f} ms | {name}" for us, name in rows[:top])
+
+
+class TestLazyImports:
+    """Tests that heavy dependencies are only imported when used."""
+
+    @pytest.mark.parametrize(
+        "module",
+        [
+            "playwright_s3_snapshot.cli",
+            "playwright_s3_snapshot.lambda_handler",
+            "playwright_s3_snapshot.snapshot",
+            "playwright_s3_snapshot.sqs_worker",
+        ],
+    )
+    def test_entry_points_import_without_heavy_dependencies(self, module: str) -> None:
+        """Test that importing an entry point loads neither boto3 nor Playwright."""
+        loaded = _loaded_heavy_modules(f"import {module}")
+
+        assert (
+            loaded == []
+        ), f"{module} imported {loaded}:\n{import_time_report(module)}"
+
+    def test_help_skips_heavy_dependencies(self) -> None:
+        """Test that --help does not pay for boto3 or Playwright."""
+        code = (
+            "import sys\n"
+            "from playwright_s3_snapshot.cli import main\n"
+            "sys.argv = ['snapshot', '--help']\n"
+            "try:\n"
+            "    main()\n"
+            "except SystemExit:\n"
+            "    pass"
+        )
+
+        assert _loaded_heavy_modules(code) == []
+
+    def test_sqs_worker_help_skips_heavy_dependencies(self) -> None:
+        """Test that the SQS worker's --help does not load boto3 or Playwright."""
+        code = (
+            "import sys\n"
+            "from playwright_s3_snapshot.sqs_worker import main\n"
+            "sys.argv = ['sqs-worker', '--help']\n"
+            "try:\n"
+            "    main()\n"
+            "except SystemExit:\n"
+            "    pass"
+        )
+
+        assert _loaded_heavy_modules(code) == []
+
+    def test_create_config_skips_heavy_dependencies(self, temp_dir: str) -> None:
+        """Test that --create-config does not pay for boto3 or Playwright."""
+        code = (
+            "import sys\n"
+            "from playwright_s3_snapshot.cli import main\n"
+            "sys.argv = ['snapshot', '--create-config']\n"
+            "main()"
+        )
+
+        assert _loaded_heavy_modules(code, cwd=temp_dir) == []
+        assert (Path(temp_dir) / "playwright-s3-snapshot.json").exists()
+
+    def test_dependencies_load_on_first_use(self) -> None:
+        """Test that the lazy imports still resolve when needed."""
+        code = (
+            "from playwright_s3_snapshot.s3_upload import make_transfer_config\n"
+            "from playwright_s3_snapshot.browser_pool import async_playwright\n"
+            "make_transfer_config(multipart_threshold=1024)\n"
+            "async_playwright()"
+        )
+
+        assert set(_loaded_heavy_modules(code)) == set(HEAVY_MODULES)
+
+    def test_import_time_report(self) -> None:
+        """Test that the report lists the entry point with its cumulative time."""
+        report = import_time_report("playwright_s3_snapshot.cli")
+
+        assert "playwright_s3_snapshot.cli" in report
+        assert " ms | " in report
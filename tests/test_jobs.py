@@ -0,0 +1,117 @@
+"""Tests for asynchronous capture jobs.
+
+This module tests job bookkeeping including:
+- Job IDs and manifest keys
+- Manifest transitions stored in S3
+- Dispatching jobs to Lambda and announcing them on SNS
+"""
+
+import json
+from unittest.mock import Mock
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from playwright_s3_snapshot.jobs import (
+    FAILED,
+    PENDING,
+    RUNNING,
+    SUCCEEDED,
+    JobStore,
+    dispatch_job,
+    new_job_id,
+    publish_job,
+)
+from playwright_s3_snapshot.s3_upload import S3Uploader
+
+
+class TestJobStore:
+    """Tests for JobStore."""
+
+    def test_job_ids_are_unique_keys(self) -> None:
+        """Test that job IDs are random and map to keys under the prefix."""
+        store = JobStore(Mock(), prefix="jobs")
+        job_id = new_job_id()
+
+        assert job_id != new_job_id()
+        assert store.key(job_id) == f"jobs/{job_id}.json"
+
+    @pytest.mark.parametrize("job_id", ["../secret", "abc", "A" * 32, None])
+    def test_invalid_job_ids_rejected(self, job_id: object) -> None:
+        """Test that only well-formed IDs are turned into keys."""
+        with pytest.raises(ValueError, match="Invalid job ID"):
+            JobStore(Mock()).key(job_id)
+
+    @mock_aws
+    def test_lifecycle(self) -> None:
+        """Test that each transition rewrites the manifest in S3."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        store = JobStore(S3Uploader(bucket_name="test-bucket"))
+
+        manifest = store.submit({"url": "https://example.com", "format": "webp"})
+        job_id = manifest["job_id"]
+
+        assert store.load(job_id)["status"] == PENDING
+        assert store.load(job_id)["request"] == {
+            "url": "https://example.com",
+            "format": "webp",
+        }
+
+        store.start(manifest)
+        assert store.load(job_id)["status"] == RUNNING
+
+        store.succeed(store.load(job_id), {"s3_key": "screenshots/a.webp"})
+        stored = store.load(job_id)
+        assert stored["status"] == SUCCEEDED
+        assert stored["result"] == {"s3_key": "screenshots/a.webp"}
+        assert stored["submitted_at"] <= stored["started_at"] <= stored["finished_at"]
+
+        head = s3_client.head_object(Bucket="test-bucket", Key=f"jobs/{job_id}.json")
+        assert head["ContentType"] == "application/json"
+
+    @mock_aws
+    def test_failure_and_unknown_job(self) -> None:
+        """Test that errors are recorded and missing jobs load as None."""
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+        store = JobStore(S3Uploader(bucket_name="test-bucket"))
+        manifest = store.submit({"url": "https://example.com"})
+
+        store.fail(manifest, TimeoutError("page did not load"))
+
+        stored = store.load(manifest["job_id"])
+        assert stored["status"] == FAILED
+        assert stored["error"] == "page did not load"
+        assert stored["type"] == "TimeoutError"
+        assert store.load(new_job_id()) is None
+
+
+class TestNotifications:
+    """Tests for dispatching and announcing jobs."""
+
+    def test_dispatch_is_asynchronous(self) -> None:
+        """Test that jobs are handed to Lambda as Event invocations."""
+        client = Mock()
+
+        dispatch_job(
+            "arn:aws:lambda:us-east-1:123:function:shots",
+            {"job_id": "x"},
+            lambda_client=client,
+        )
+
+        kwargs = client.invoke.call_args.kwargs
+        assert kwargs["FunctionName"] == "arn:aws:lambda:us-east-1:123:function:shots"
+        assert kwargs["InvocationType"] == "Event"
+        assert json.loads(kwargs["Payload"]) == {"job_id": "x"}
+
+    def test_publish_manifest(self) -> None:
+        """Test that the manifest is the message and the status an attribute."""
+        client = Mock()
+        manifest = {"job_id": "x", "status": SUCCEEDED, "result": {"s3_key": "a.png"}}
+
+        publish_job("arn:aws:sns:us-east-1:123:jobs", manifest, sns_client=client)
+
+        kwargs = client.publish.call_args.kwargs
+        assert json.loads(kwargs["Message"]) == manifest
+        assert kwargs["MessageAttributes"]["status"]["StringValue"] == SUCCEEDED
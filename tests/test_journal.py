@@ -0,0 +1,81 @@
+"""Tests for the batch checkpoint journal.
+
+This module tests the journal including:
+- Appending outcomes as JSON lines
+- Loading completed entries for resume
+- Bounded bookkeeping of completed positions
+"""
+
+import json
+from pathlib import Path
+
+from playwright_s3_snapshot.journal import Journal
+
+
+class TestJournal:
+    """Tests for Journal."""
+
+    def test_record_appends_lines(self, temp_dir: str) -> None:
+        """Test that every outcome is written as one compact JSON line."""
+        path = Path(temp_dir) / "run.journal"
+
+        with Journal(path) as journal:
+            journal.record(1, "https://a.example", "ok", s3_key="a.png")
+            journal.record(2, "https://b.example", "failed", error="timeout")
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines == [
+            {"i": 1, "url": "https://a.example", "status": "ok", "s3_key": "a.png"},
+            {
+                "i": 2,
+                "url": "https://b.example",
+                "status": "failed",
+                "error": "timeout",
+            },
+        ]
+
+    def test_load_skips_only_completed(self, temp_dir: str) -> None:
+        """Test that failed entries are retried on resume."""
+        path = Path(temp_dir) / "run.journal"
+        with Journal(path) as journal:
+            journal.record(1, "https://a.example", "ok")
+            journal.record(2, "https://b.example", "failed", error="timeout")
+            journal.record(3, "https://c.example", "ok")
+
+        resumed = Journal(path)
+
+        assert resumed.load() == 2
+        assert resumed.is_done(1)
+        assert not resumed.is_done(2)
+        assert resumed.is_done(3)
+        assert not resumed.is_done(4)
+
+    def test_load_ignores_truncated_line(self, temp_dir: str) -> None:
+        """Test that a line cut off by a crash does not break resume."""
+        path = Path(temp_dir) / "run.journal"
+        path.write_text(
+            '{"i":1,"url":"https://a.example","status":"ok"}\n{"i":2,"url":"htt'
+        )
+
+        journal = Journal(path)
+
+        assert journal.load() == 1
+        assert journal.is_done(1)
+        assert not journal.is_done(2)
+
+    def test_missing_journal(self, temp_dir: str) -> None:
+        """Test that resuming without a journal starts from scratch."""
+        assert Journal(Path(temp_dir) / "missing.journal").load() == 0
+
+    def test_completed_positions_are_compacted(self, temp_dir: str) -> None:
+        """Test that in-order completions collapse into the watermark."""
+        journal = Journal(Path(temp_dir) / "run.journal")
+
+        for index in [2, 3, 1, 5]:
+            journal.record(index, f"https://{index}.example", "ok")
+        journal.close()
+
+        assert journal.watermark == 3
+        assert journal._done_above == {5}
+        assert journal.is_done(5)
+        assert not journal.is_done(4)
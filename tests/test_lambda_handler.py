@@ -6,13 +6,16 @@ This module tests the Lambda handler including:
 - Lambda-specific functionality
 """
 
+import asyncio
 import json
 from typing import Dict, Any
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
+import boto3
 import pytest
+from moto import mock_aws
 
-from playwright_s3_snapshot.lambda_handler import lambda_handler
+from playwright_s3_snapshot.lambda_handler import batch_handler, job_status_handler, lambda_handler, sqs_handler
 
 
 class TestLambdaHandler:
@@ -73,6 +76,29 @@ class TestLambdaHandler:
         assert body["success"] is False
         assert body["error"] == "Failed to take screenshot"
 
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime")
+    def test_lambda_handler_reuses_warm_runtime(self, mock_get_runtime: Mock, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that every invocation runs on the shared warm runtime."""
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.png"}
+
+        lambda_handler(lambda_event, {})
+        lambda_handler(lambda_event, {})
+
+        runtimes = [call.kwargs["runtime"] for call in mock_snapshot.call_args_list]
+        assert runtimes == [mock_get_runtime.return_value] * 2
+
+    @patch("playwright_s3_snapshot.lambda_handler.forget_known_keys")
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_known_keys_forgotten_per_invocation(self, mock_snapshot: Mock, mock_forget: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that a warm container re-checks dedup keys on every invocation."""
+        mock_snapshot.return_value = {"s3_url": "https://x"}
+
+        lambda_handler(lambda_event, {})
+        lambda_handler(lambda_event, {})
+
+        assert mock_forget.call_count == 2
+
     @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
     def test_lambda_handler_exception(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
         """Test Lambda handler with unexpected exception."""
@@ -83,4 +109,571 @@ class TestLambdaHandler:
         assert result["statusCode"] == 500
         body = json.loads(result["body"])
         assert body["success"] is False
-        assert "Unexpected error" in body["error"]
\ No newline at end of file
+        assert "Unexpected error" in body["error"]
+
+class FakeRuntime:
+    """Stand-in for WarmRuntime running jobs on a throwaway loop."""
+
+    def __init__(self) -> None:
+        self.pool = MagicMock()
+        self.pool_sizes: list = []
+
+    def run(self, job, pool_size=None):
+        self.pool_sizes.append(pool_size)
+        return asyncio.run(job(self.pool))
+
+
+class TestBatchHandler:
+    """Tests for the concurrent batch Lambda handler."""
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime")
+    def test_batch_handler_parallel(self, mock_get_runtime: Mock, mock_snapshot: AsyncMock) -> None:
+        """Test concurrent batch processing in one shared pool."""
+        runtime = FakeRuntime()
+        mock_get_runtime.return_value = runtime
+
+        async def snapshot(url: str, **kwargs: Any) -> Dict[str, Any]:
+            return {"url": url, "s3_key": kwargs["key_prefix"]}
+
+        mock_snapshot.side_effect = snapshot
+        event = {
+            "urls": ["https://a.example", "https://b.example", "https://c.example"],
+            "bucket": "test-bucket",
+            "prefix": "batch/",
+            "parallel": 2,
+        }
+
+        result = batch_handler(event, None)
+
+        assert result["statusCode"] == 200
+        body = json.loads(result["body"])
+        assert body["summary"] == {"total_urls": 3, "successful": 3, "failed": 0, "skipped": 0}
+        assert [r["s3_key"] for r in body["results"]] == [
+            "batch/batch-001-",
+            "batch/batch-002-",
+            "batch/batch-003-",
+        ]
+        assert runtime.pool_sizes == [2]
+        assert all(call.kwargs["pool"] is runtime.pool for call in mock_snapshot.call_args_list)
+        # 429/503 responses raise so the batch can back off the host
+        assert all(call.kwargs["wait"].raise_on_rate_limit for call in mock_snapshot.call_args_list)
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime", new=FakeRuntime)
+    def test_batch_handler_per_host_limit(self, mock_snapshot: AsyncMock) -> None:
+        """Test that "max_per_host" keeps one host to one page at a time."""
+        running: Dict[str, int] = {}
+        peak: Dict[str, int] = {}
+
+        async def snapshot(url: str, **kwargs: Any) -> Dict[str, Any]:
+            host = url.split("/")[2]
+            running[host] = running.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), running[host])
+            await asyncio.sleep(0.01)
+            running[host] -= 1
+            return {"url": url}
+
+        mock_snapshot.side_effect = snapshot
+        event = {
+            "urls": [f"https://a.example/{i}" for i in range(4)] + ["https://b.example/0"],
+            "bucket": "test-bucket",
+            "parallel": 4,
+            "max_per_host": 1,
+        }
+
+        result = batch_handler(event, None)
+
+        assert json.loads(result["body"])["summary"]["successful"] == 5
+        assert peak == {"a.example": 1, "b.example": 1}
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime", new=FakeRuntime)
+    def test_batch_handler_reports_errors(self, mock_snapshot: AsyncMock) -> None:
+        """Test that individual failures are reported without failing the batch."""
+
+        async def snapshot(url: str, **kwargs: Any) -> Dict[str, Any]:
+            if "bad" in url:
+                raise Exception("Navigation timeout")
+            return {"url": url}
+
+        mock_snapshot.side_effect = snapshot
+        event = {"urls": ["https://ok.example", "https://bad.example"], "bucket": "test-bucket"}
+
+        result = batch_handler(event, None)
+
+        body = json.loads(result["body"])
+        assert body["summary"]["successful"] == 1
+        assert body["errors"] == [{"url": "https://bad.example", "error": "Navigation timeout"}]
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime", new=FakeRuntime)
+    def test_batch_handler_partial_results_before_deadline(self, mock_snapshot: AsyncMock) -> None:
+        """Test that URLs still pending at the deadline are returned as skipped."""
+
+        async def snapshot(url: str, **kwargs: Any) -> Dict[str, Any]:
+            if "slow" in url:
+                await asyncio.sleep(10)
+            return {"url": url}
+
+        mock_snapshot.side_effect = snapshot
+        context = Mock()
+        context.get_remaining_time_in_millis.return_value = 1200
+        event = {
+            "urls": ["https://fast.example", "https://slow.example"],
+            "bucket": "test-bucket",
+            "deadline_margin": 1000,
+        }
+
+        result = batch_handler(event, context)
+
+        body = json.loads(result["body"])
+        assert body["summary"]["successful"] == 1
+        assert body["skipped"] == ["https://slow.example"]
+
+
+class TestLambdaSnapshotOptions:
+    """Tests for capture and upload settings in Lambda events."""
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_event_multipart_settings(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that multipart fields in the event reach the uploader."""
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.png"}
+        event = {**lambda_event, "multipart_threshold": "16MB", "multipart_concurrency": 4}
+
+        lambda_handler(event, {})
+
+        transfer_config = mock_snapshot.call_args.kwargs["transfer_config"]
+        assert transfer_config.multipart_threshold == 16 * 1024 * 1024
+        assert transfer_config.max_concurrency == 4
+
+    @mock_aws
+    @patch("playwright_s3_snapshot.snapshot.datetime")
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime")
+    def test_same_second_invocations_get_distinct_keys(
+        self, mock_get_runtime: Mock, mock_capture: AsyncMock, mock_datetime: Mock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that two invocations capturing in the same second do not overwrite each other."""
+        from datetime import datetime
+
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        monkeypatch.delenv("KEY_STRATEGY", raising=False)
+        mock_get_runtime.return_value = FakeRuntime()
+        mock_datetime.now.return_value = datetime(2025, 7, 15, 14, 30, 22)
+        mock_capture.side_effect = [b"first render", b"second render"]
+        event = {"url": "https://example.com", "bucket": "test-bucket", "prefix": "shots/"}
+
+        keys = {json.loads(lambda_handler(event, {})["body"])["result"]["s3_key"] for _ in range(2)}
+
+        assert len(keys) == 2
+        assert len(s3_client.list_objects_v2(Bucket="test-bucket")["Contents"]) == 2
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_default_transfer_config(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that boto3 defaults are kept when nothing is configured."""
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.png"}
+
+        lambda_handler(lambda_event, {})
+
+        assert mock_snapshot.call_args.kwargs["transfer_config"] is None
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_dedup_uses_content_keys(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that enabling dedup switches to content-addressed keys."""
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.png"}
+
+        lambda_handler({**lambda_event, "dedup": True}, {})
+
+        kwargs = mock_snapshot.call_args.kwargs
+        assert kwargs["dedup"] is True
+        assert kwargs["key_strategy"] == "content"
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_block_options(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that blocking fields in the event build a ResourceBlocker."""
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.png"}
+        event = {**lambda_event, "block_resources": ["font"], "block_trackers": True}
+
+        lambda_handler(event, {})
+
+        blocker = mock_snapshot.call_args.kwargs["blocker"]
+        assert blocker.resource_types == {"font"}
+        assert blocker.trackers is True
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_wait_rules(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that per-URL wait rules in the event pick the strategy."""
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.png"}
+        event = {
+            **lambda_event,
+            "wait": "load",
+            "wait_rules": {lambda_event["url"]: "quiet:500"},
+            "wait_ignore": "/collect",
+        }
+
+        lambda_handler(event, {})
+
+        wait = mock_snapshot.call_args.kwargs["wait"]
+        assert wait.quiet_ms == 500
+        assert wait.ignore == ("/collect",)
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_image_options(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that format, quality and size budget reach the snapshot."""
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.jpg"}
+        event = {**lambda_event, "format": "jpeg", "quality": "70", "max_bytes": "500KB"}
+
+        lambda_handler(event, {})
+
+        kwargs = mock_snapshot.call_args.kwargs
+        assert kwargs["image_format"] == "jpeg"
+        assert kwargs["quality"] == 70
+        assert kwargs["max_bytes"] == 500 * 1024
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_viewports_snapshot_to_s3_sync")
+    def test_viewports(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that "viewports" switches to multi-viewport capture."""
+        mock_snapshot.return_value = {"key_group": "screenshots/2025-07-15_143022", "variants": []}
+        event = {**lambda_event, "viewports": ["desktop", {"name": "wide", "width": 2560, "height": 1440}]}
+
+        response = lambda_handler(event, {})
+
+        assert response["statusCode"] == 200
+        kwargs = mock_snapshot.call_args.kwargs
+        assert [viewport.name for viewport in kwargs["viewports"]] == ["desktop", "wide"]
+        assert "viewport_width" not in kwargs
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_detect_changes(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that "detect_changes" keeps baselines in the capture bucket."""
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.png"}
+        event = {**lambda_event, "detect_changes": True, "change_threshold": "0.05"}
+
+        lambda_handler(event, {})
+
+        detector = mock_snapshot.call_args.kwargs["change_detector"]
+        assert detector.threshold == 0.05
+        assert detector.store.uploader.bucket_name == "test-bucket"
+        assert detector.store.prefix == "baselines/"
+
+    def test_detect_changes_rejects_viewports(self, lambda_event: Dict[str, Any]) -> None:
+        """Test that change detection cannot be combined with viewports."""
+        event = {**lambda_event, "detect_changes": True, "viewports": ["desktop"]}
+
+        response = lambda_handler(event, {})
+
+        assert response["statusCode"] == 500
+        assert "viewports" in json.loads(response["body"])["error"]
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_artifacts_snapshot_to_s3_sync")
+    def test_artifacts(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that "artifacts" captures several artifacts from one load."""
+        mock_snapshot.return_value = {"key_group": "screenshots/2025-07-15_143022", "artifacts": []}
+        event = {**lambda_event, "artifacts": "screenshot,pdf,mhtml"}
+
+        response = lambda_handler(event, {})
+
+        assert response["statusCode"] == 200
+        kwargs = mock_snapshot.call_args.kwargs
+        assert kwargs["artifacts"] == ["screenshot", "pdf", "mhtml"]
+        assert "change_detector" not in kwargs
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_clip(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that "clip" captures only that rectangle."""
+        from playwright_s3_snapshot.regions import Region
+
+        mock_snapshot.return_value = {"s3_url": "https://test-bucket.s3.amazonaws.com/a.png"}
+        event = {**lambda_event, "clip": {"x": 0, "y": 0, "width": 1280, "height": 800}}
+
+        lambda_handler(event, {})
+
+        assert mock_snapshot.call_args.kwargs["region"] == Region(clip=(0, 0, 1280, 800))
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_tiled_snapshot_to_s3_sync")
+    def test_tile_height(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that "tile_height" switches to tiled capture."""
+        mock_snapshot.return_value = {"key_group": "screenshots/2025-07-15_143022", "tiles": []}
+        event = {**lambda_event, "tile_height": 4096, "max_page_height": "20000"}
+
+        response = lambda_handler(event, {})
+
+        assert response["statusCode"] == 200
+        kwargs = mock_snapshot.call_args.kwargs
+        assert kwargs["tile_height"] == 4096
+        assert kwargs["max_page_height"] == 20000
+        assert "dedup" not in kwargs
+        assert "change_detector" not in kwargs
+
+    def test_tile_height_rejects_dedup(self, lambda_event: Dict[str, Any]) -> None:
+        """Test that tiled capture cannot be deduplicated."""
+        event = {**lambda_event, "tile_height": 4096, "dedup": True}
+
+        response = lambda_handler(event, {})
+
+        assert response["statusCode"] == 500
+        assert "dedup" in json.loads(response["body"])["error"]
+
+
+class TestTimingLogs:
+    """Tests for structured timing logs."""
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_timings_logged_as_json(
+        self, mock_snapshot: Mock, lambda_event: Dict[str, Any], caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test that each snapshot logs its stage timings as one JSON line."""
+        timings = {"context": 40.0, "goto": 812.5, "encode": 120.0, "upload": 95.0, "total": 1100.0}
+        mock_snapshot.return_value = {
+            "url": "https://example.com",
+            "s3_url": "https://test-bucket.s3.amazonaws.com/screenshot.png",
+            "s3_key": "screenshot.png",
+            "file_size": 12345,
+            "format": "png",
+            "timings": timings,
+        }
+
+        with caplog.at_level("INFO"):
+            result = lambda_handler(lambda_event, {})
+
+        assert result["statusCode"] == 200
+        entries = [
+            json.loads(record.getMessage())
+            for record in caplog.records
+            if record.getMessage().startswith('{"event": "snapshot_timings"')
+        ]
+        assert entries == [
+            {
+                "event": "snapshot_timings",
+                "url": "https://example.com",
+                "key": "screenshot.png",
+                "format": "png",
+                "file_size": 12345,
+                "timings": timings,
+            }
+        ]
+        assert json.loads(result["body"])["result"]["timings"] == timings
+
+
+class TestAsyncJobs:
+    """Tests for submitting captures as jobs and polling their manifests."""
+
+    @staticmethod
+    def _bucket() -> Any:
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        return s3_client
+
+    @mock_aws
+    @patch("playwright_s3_snapshot.lambda_handler.dispatch_job")
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_submit_returns_job_id(self, mock_snapshot: Mock, mock_dispatch: Mock) -> None:
+        """Test that an async request is queued instead of captured inline."""
+        self._bucket()
+        context = Mock(invoked_function_arn="arn:aws:lambda:us-east-1:123:function:shots")
+        event = {
+            "httpMethod": "POST",
+            "requestContext": {"stage": "Prod"},
+            "body": json.dumps({"url": "https://example.com", "bucket": "test-bucket", "async": True, "format": "webp"}),
+        }
+
+        response = lambda_handler(event, context)
+
+        assert response["statusCode"] == 202
+        body = json.loads(response["body"])
+        job_id = body["job_id"]
+        assert body["status"] == "pending"
+        assert body["manifest_key"] == f"jobs/{job_id}.json"
+        mock_snapshot.assert_not_called()
+        function_name, payload = mock_dispatch.call_args.args
+        assert function_name == context.invoked_function_arn
+        # Only the request travels to the worker, not the API Gateway envelope
+        assert payload == {"url": "https://example.com", "bucket": "test-bucket", "format": "webp", "job_id": job_id}
+
+        status = job_status_handler({"pathParameters": {"job_id": job_id}, "queryStringParameters": {"bucket": "test-bucket"}}, None)
+        assert status["statusCode"] == 200
+        assert json.loads(status["body"])["job"]["status"] == "pending"
+
+    @mock_aws
+    @patch("playwright_s3_snapshot.lambda_handler.dispatch_job")
+    def test_submit_without_function_fails(self, mock_dispatch: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that async mode needs something to invoke."""
+        response = lambda_handler({**lambda_event, "async": True}, {})
+
+        assert response["statusCode"] == 500
+        assert "JOB_FUNCTION_NAME" in json.loads(response["body"])["error"]
+        mock_dispatch.assert_not_called()
+
+    @mock_aws
+    @patch("playwright_s3_snapshot.lambda_handler.publish_job")
+    @patch("playwright_s3_snapshot.lambda_handler.dispatch_job")
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_worker_records_result(
+        self, mock_snapshot: Mock, mock_dispatch: Mock, mock_publish: Mock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the asynchronous invocation captures and finishes the job."""
+        self._bucket()
+        monkeypatch.setenv("JOB_FUNCTION_NAME", "shots")
+        monkeypatch.setenv("JOB_TOPIC_ARN", "arn:aws:sns:us-east-1:123:jobs")
+        mock_snapshot.return_value = {"url": "https://example.com", "s3_key": "screenshots/a.png", "s3_url": "https://x"}
+        lambda_handler({"url": "https://example.com", "bucket": "test-bucket", "async": True}, None)
+        payload = mock_dispatch.call_args.args[1]
+
+        lambda_handler(payload, None)
+
+        mock_snapshot.assert_called_once()
+        status = job_status_handler({"job_id": payload["job_id"], "bucket": "test-bucket"}, None)
+        job = json.loads(status["body"])["job"]
+        assert job["status"] == "succeeded"
+        assert job["result"]["s3_key"] == "screenshots/a.png"
+        assert mock_publish.call_args.args[1]["status"] == "succeeded"
+
+        # A repeated delivery of the same event does not capture again
+        lambda_handler(payload, None)
+        mock_snapshot.assert_called_once()
+
+    @mock_aws
+    @patch("playwright_s3_snapshot.lambda_handler.dispatch_job")
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_worker_records_failure(
+        self, mock_snapshot: Mock, mock_dispatch: Mock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that capture errors end up in the manifest rather than raised."""
+        self._bucket()
+        monkeypatch.setenv("JOB_FUNCTION_NAME", "shots")
+        mock_snapshot.side_effect = TimeoutError("page did not load")
+        lambda_handler({"url": "https://example.com", "bucket": "test-bucket", "async": True}, None)
+        payload = mock_dispatch.call_args.args[1]
+
+        response = lambda_handler(payload, None)
+
+        assert response["statusCode"] == 500
+        status = job_status_handler({"job_id": payload["job_id"], "bucket": "test-bucket"}, None)
+        job = json.loads(status["body"])["job"]
+        assert (job["status"], job["error"], job["type"]) == ("failed", "page did not load", "TimeoutError")
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3_sync")
+    def test_api_cannot_run_jobs(self, mock_snapshot: Mock, lambda_event: Dict[str, Any]) -> None:
+        """Test that a job_id sent through API Gateway is an ordinary request."""
+        mock_snapshot.return_value = {"s3_url": "https://x"}
+        event = {"httpMethod": "POST", "body": json.dumps({**lambda_event, "job_id": "0" * 32})}
+
+        response = lambda_handler(event, None)
+
+        assert response["statusCode"] == 200
+        mock_snapshot.assert_called_once()
+
+    @mock_aws
+    def test_status_errors(self) -> None:
+        """Test unknown, malformed and missing job IDs."""
+        self._bucket()
+
+        assert job_status_handler({"job_id": "0" * 32, "bucket": "test-bucket"}, None)["statusCode"] == 404
+        assert job_status_handler({"job_id": "../x", "bucket": "test-bucket"}, None)["statusCode"] == 400
+        assert job_status_handler({"bucket": "test-bucket"}, None)["statusCode"] == 400
+
+
+class TestSqsHandler:
+    """Tests for the SQS event source handler."""
+
+    @staticmethod
+    def _record(message_id: str, body: str) -> Dict[str, Any]:
+        return {"messageId": message_id, "receiptHandle": f"rh-{message_id}", "body": body}
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime")
+    def test_partial_batch_failures(self, mock_get_runtime: Mock, mock_snapshot: AsyncMock, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that only failed and malformed messages are reported."""
+        monkeypatch.setenv("BUCKET_NAME", "env-bucket")
+        runtime = FakeRuntime()
+        mock_get_runtime.return_value = runtime
+
+        async def snapshot(url: str, **kwargs: Any) -> Dict[str, Any]:
+            if "broken" in url:
+                raise Exception("Navigation timeout")
+            return {"url": url, "bucket": kwargs["bucket_name"]}
+
+        mock_snapshot.side_effect = snapshot
+        event = {
+            "Records": [
+                self._record("m1", "https://a.example"),
+                self._record("m2", json.dumps({"url": "https://broken.example"})),
+                self._record("m3", json.dumps({"url": "https://c.example", "bucket": "other-bucket", "format": "jpeg"})),
+                self._record("m4", json.dumps({"prefix": "no-url/"})),
+                self._record("m5", "{not json"),
+            ]
+        }
+
+        result = sqs_handler(event, None)
+
+        assert result == {"batchItemFailures": [{"itemIdentifier": "m4"}, {"itemIdentifier": "m5"}, {"itemIdentifier": "m2"}]}
+        buckets = {call.kwargs["url"]: call.kwargs["bucket_name"] for call in mock_snapshot.call_args_list}
+        assert buckets == {
+            "https://a.example": "env-bucket",
+            "https://broken.example": "env-bucket",
+            "https://c.example": "other-bucket",
+        }
+        formats = {call.kwargs["url"]: call.kwargs["image_format"] for call in mock_snapshot.call_args_list}
+        assert formats["https://c.example"] == "jpeg"
+        assert runtime.pool_sizes == [3]
+        assert not any(call.kwargs["wait"].raise_on_rate_limit for call in mock_snapshot.call_args_list)
+
+    @mock_aws
+    @patch("playwright_s3_snapshot.snapshot.datetime")
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime")
+    def test_same_second_records_get_distinct_keys(
+        self, mock_get_runtime: Mock, mock_capture: AsyncMock, mock_datetime: Mock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that records captured in the same second do not overwrite each other."""
+        from datetime import datetime
+
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        monkeypatch.setenv("BUCKET_NAME", "test-bucket")
+        monkeypatch.setenv("KEY_PREFIX", "shots/")
+        monkeypatch.delenv("KEY_STRATEGY", raising=False)
+        mock_get_runtime.return_value = FakeRuntime()
+        mock_datetime.now.return_value = datetime(2025, 7, 15, 14, 30, 22)
+        mock_capture.side_effect = lambda url, **kwargs: f"capture of {url}".encode()
+        event = {
+            "Records": [
+                self._record("m1", "https://example.com/a"),
+                self._record("m2", "https://example.com/b"),
+            ]
+        }
+
+        result = sqs_handler(event, None)
+
+        assert result == {"batchItemFailures": []}
+        keys = [obj["Key"] for obj in s3_client.list_objects_v2(Bucket="test-bucket")["Contents"]]
+        assert len(keys) == 2
+        assert all(key.startswith("shots/2025-07-15_143022_") for key in keys)
+
+    @patch("playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3")
+    @patch("playwright_s3_snapshot.lambda_handler.get_runtime")
+    def test_unfinished_messages_fail_at_deadline(self, mock_get_runtime: Mock, mock_snapshot: AsyncMock, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that messages cut off by the deadline are handed back to SQS."""
+        monkeypatch.setenv("BUCKET_NAME", "env-bucket")
+        monkeypatch.setenv("DEADLINE_MARGIN_MS", "0")
+        mock_get_runtime.return_value = FakeRuntime()
+
+        async def snapshot(url: str, **kwargs: Any) -> Dict[str, Any]:
+            if "slow" in url:
+                await asyncio.sleep(10)
+            return {"url": url}
+
+        mock_snapshot.side_effect = snapshot
+        context = Mock()
+        context.get_remaining_time_in_millis.return_value = 200
+        event = {"Records": [self._record("fast", "https://a.example"), self._record("slow", "https://slow.example")]}
+
+        result = sqs_handler(event, context)
+
+        assert result == {"batchItemFailures": [{"itemIdentifier": "slow"}]}
+
+    def test_empty_event(self) -> None:
+        """Test that an empty batch reports no failures."""
+        assert sqs_handler({"Records": []}, None) == {"batchItemFailures": []}
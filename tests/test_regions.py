@@ -0,0 +1,197 @@
+"""Tests for region-scoped capture.
+
+This module tests capturing part of a page including:
+- Parsing clip rectangles from CLI, config and event values
+- Resolving selectors, clips and the viewport to screenshot clips
+- Passing the clip to every encoder
+"""
+
+import base64
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from playwright_s3_snapshot.regions import Region, parse_clip
+from playwright_s3_snapshot.screenshot import capture_screenshot
+
+
+def _mock_pool(page: AsyncMock) -> MagicMock:
+    """A pool whose context hands out ``page``."""
+    context = AsyncMock()
+    context.new_page.return_value = page
+    manager = MagicMock()
+    manager.__aenter__ = AsyncMock(return_value=context)
+    manager.__aexit__ = AsyncMock(return_value=False)
+    pool = MagicMock()
+    pool.context.return_value = manager
+    return pool
+
+
+class TestRegionOptions:
+    """Tests for building regions."""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "10,20,300,200",
+            [10, 20, 300, 200],
+            {"x": 10, "y": 20, "width": 300, "height": 200},
+        ],
+    )
+    def test_parse_clip_forms(self, value: object) -> None:
+        """Test that strings, lists and event objects all parse."""
+        assert parse_clip(value) == (10, 20, 300, 200)
+
+    def test_parse_clip_keeps_fractions(self) -> None:
+        """Test that fractional CSS pixels survive."""
+        assert parse_clip("0,0.5,100,50.25") == (0, 0.5, 100, 50.25)
+
+    @pytest.mark.parametrize("value", ["10,20,300", "a,b,c,d", {"x": 1, "y": 2}, 42])
+    def test_parse_clip_rejects_malformed(self, value: object) -> None:
+        """Test that anything but four numbers is rejected."""
+        with pytest.raises(ValueError, match="Invalid clip"):
+            parse_clip(value)
+
+    def test_from_options_defaults_to_full_page(self) -> None:
+        """Test that no options means no region."""
+        assert Region.from_options() is None
+        assert Region.from_options(selector="", viewport="") is None
+
+    def test_from_options(self) -> None:
+        """Test that each option builds its kind of region."""
+        assert Region.from_options(selector="#chart") == Region(selector="#chart")
+        assert Region.from_options(clip="0,0,100,50") == Region(clip=(0, 0, 100, 50))
+        assert Region.from_options(viewport=True) == Region(viewport=True)
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"selector": "#a", "viewport": True},
+            {"clip": (0, 0, 0, 10)},
+            {"clip": (-1, 0, 10, 10)},
+            {"selector": "  "},
+            {},
+        ],
+    )
+    def test_invalid_regions(self, options: dict) -> None:
+        """Test that ambiguous or empty regions are rejected."""
+        with pytest.raises(ValueError):
+            Region(**options)
+
+
+class TestRegionResolve:
+    """Tests for turning regions into screenshot clips."""
+
+    async def test_selector_uses_element_box(self) -> None:
+        """Test that the element's document-space box becomes the clip."""
+        page = AsyncMock()
+        page.evaluate.return_value = {"x": 8, "y": 2400, "width": 600, "height": 300}
+
+        clip = await Region(selector="#chart").resolve(page)
+
+        assert clip == {"x": 8, "y": 2400, "width": 600, "height": 300}
+        assert page.evaluate.call_args.args[1] == "#chart"
+
+    async def test_selector_without_match(self) -> None:
+        """Test that a missing element is an error rather than a blank image."""
+        page = AsyncMock()
+        page.evaluate.return_value = None
+
+        with pytest.raises(ValueError, match="No element matches"):
+            await Region(selector="#missing").resolve(page)
+
+    async def test_hidden_element(self) -> None:
+        """Test that an element without a box is an error."""
+        page = AsyncMock()
+        page.evaluate.return_value = {"x": 0, "y": 0, "width": 0, "height": 0}
+
+        with pytest.raises(ValueError, match="no size"):
+            await Region(selector="#hidden").resolve(page)
+
+    async def test_viewport_and_clip(self) -> None:
+        """Test that viewport and explicit clips need no page script."""
+        page = AsyncMock()
+        page.viewport_size = {"width": 1280, "height": 720}
+
+        assert await Region(viewport=True).resolve(page) == {
+            "x": 0,
+            "y": 0,
+            "width": 1280,
+            "height": 720,
+        }
+        assert await Region(clip=(0, 100, 50, 60)).resolve(page) == {
+            "x": 0,
+            "y": 100,
+            "width": 50,
+            "height": 60,
+        }
+        page.evaluate.assert_not_awaited()
+
+
+class TestRegionCapture:
+    """Tests for capturing only the region."""
+
+    async def test_png_clip(self) -> None:
+        """Test that PNG captures pass the clip to Page.screenshot."""
+        page = AsyncMock()
+        page.screenshot.return_value = b"png bytes"
+
+        image = await capture_screenshot(
+            "https://example.com",
+            pool=_mock_pool(page),
+            region=Region(clip=(0, 50, 400, 300)),
+        )
+
+        assert image == b"png bytes"
+        page.screenshot.assert_awaited_once_with(
+            path=None,
+            full_page=True,
+            type="png",
+            clip={"x": 0, "y": 50, "width": 400, "height": 300},
+        )
+
+    async def test_jpeg_clip(self) -> None:
+        """Test that every quality step re-encodes only the clip."""
+        page = AsyncMock()
+        page.screenshot.side_effect = lambda **kwargs: b"x" * (kwargs["quality"] * 10)
+
+        await capture_screenshot(
+            "https://example.com",
+            pool=_mock_pool(page),
+            image_format="jpeg",
+            max_bytes=700,
+            region=Region(clip=(0, 0, 100, 100)),
+        )
+
+        clips = [call.kwargs["clip"] for call in page.screenshot.call_args_list]
+        assert len(clips) == 2
+        assert all(
+            clip == {"x": 0, "y": 0, "width": 100, "height": 100} for clip in clips
+        )
+
+    async def test_webp_clip_skips_layout_metrics(self) -> None:
+        """Test that WebP uses the region instead of measuring the page."""
+        page = AsyncMock()
+        page.viewport_size = {"width": 1280, "height": 720}
+        session = AsyncMock()
+        session.send.return_value = {"data": base64.b64encode(b"webp bytes").decode()}
+        page.context = Mock(new_cdp_session=AsyncMock(return_value=session))
+
+        image = await capture_screenshot(
+            "https://example.com",
+            pool=_mock_pool(page),
+            image_format="webp",
+            region=Region(viewport=True),
+        )
+
+        assert image == b"webp bytes"
+        session.send.assert_awaited_once()
+        method, params = session.send.call_args.args
+        assert method == "Page.captureScreenshot"
+        assert params["clip"] == {
+            "x": 0,
+            "y": 0,
+            "width": 1280,
+            "height": 720,
+            "scale": 1,
+        }
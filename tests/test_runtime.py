@@ -0,0 +1,114 @@
+"""Tests for the warm browser runtime.
+
+This module tests the runtime reused across Lambda invocations including:
+- Lazy start and reuse of the browser pool
+- Health checks and relaunch after a crash
+- Growing the pool for concurrent batches
+"""
+
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from playwright_s3_snapshot import runtime as runtime_module
+from playwright_s3_snapshot.runtime import WarmRuntime, get_runtime
+
+
+def _pool_factory() -> Mock:
+    """Return a BrowserPool replacement creating healthy mock pools."""
+
+    def new_pool(size: int = 1, **kwargs):
+        pool = MagicMock()
+        pool.size = size
+        pool.start = AsyncMock()
+        pool.close = AsyncMock()
+        pool.is_healthy.return_value = True
+        return pool
+
+    return Mock(side_effect=new_pool)
+
+
+class TestWarmRuntime:
+    """Tests for WarmRuntime."""
+
+    def test_pool_reused_between_runs(self) -> None:
+        """Test that consecutive jobs share one started pool and loop."""
+        factory = _pool_factory()
+        runtime = WarmRuntime()
+
+        async def job(pool):
+            return pool
+
+        with patch("playwright_s3_snapshot.runtime.BrowserPool", factory):
+            first = runtime.run(job)
+            second = runtime.run(job)
+            runtime.close()
+
+        assert first is second
+        factory.assert_called_once()
+        first.start.assert_called_once()
+        first.close.assert_called_once()
+
+    def test_nothing_launched_until_first_run(self) -> None:
+        """Test that creating the runtime is free."""
+        factory = _pool_factory()
+
+        with patch("playwright_s3_snapshot.runtime.BrowserPool", factory):
+            WarmRuntime(pool_size=2)
+
+        factory.assert_not_called()
+
+    def test_relaunches_unhealthy_pool(self) -> None:
+        """Test that a crashed pool is closed and replaced before the next job."""
+        factory = _pool_factory()
+        runtime = WarmRuntime()
+
+        async def job(pool):
+            return pool
+
+        with patch("playwright_s3_snapshot.runtime.BrowserPool", factory):
+            first = runtime.run(job)
+            first.is_healthy.return_value = False
+            second = runtime.run(job)
+
+        assert first is not second
+        first.close.assert_called_once()
+        assert factory.call_count == 2
+
+    def test_grows_pool_for_batches(self) -> None:
+        """Test that pool_size grows the pool but never shrinks it."""
+        factory = _pool_factory()
+        runtime = WarmRuntime(pool_size=1)
+
+        async def job(pool):
+            return pool.size
+
+        with patch("playwright_s3_snapshot.runtime.BrowserPool", factory):
+            assert runtime.run(job, pool_size=4) == 4
+            assert runtime.run(job, pool_size=2) == 4
+
+    def test_job_errors_propagate(self) -> None:
+        """Test that job exceptions reach the caller and the runtime stays usable."""
+        factory = _pool_factory()
+        runtime = WarmRuntime()
+
+        async def failing(pool):
+            raise ValueError("Navigation timeout")
+
+        async def ok(pool):
+            return "ok"
+
+        with patch("playwright_s3_snapshot.runtime.BrowserPool", factory):
+            with pytest.raises(ValueError, match="Navigation timeout"):
+                runtime.run(failing)
+            assert runtime.run(ok) == "ok"
+
+    def test_get_runtime_is_singleton(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the module-level runtime is created once per process."""
+        monkeypatch.setattr(runtime_module, "_runtime", None)
+        monkeypatch.setenv("BROWSER_POOL_SIZE", "3")
+
+        first = get_runtime()
+
+        assert first is get_runtime()
+        assert first.pool_size == 3
@@ -15,7 +15,17 @@ import pytest
 import boto3
 from moto import mock_aws
 
-from playwright_s3_snapshot.s3_upload import S3Uploader, upload_to_s3
+from playwright_s3_snapshot import s3_upload
+from playwright_s3_snapshot.s3_upload import (
+    S3Uploader,
+    UploadQueue,
+    clear_client_cache,
+    forget_known_keys,
+    get_s3_client,
+    make_transfer_config,
+    slugify_url,
+    upload_to_s3,
+)
 
 
 class TestS3Uploader:
@@ -151,4 +161,281 @@ class TestS3ConvenienceFunctions:
         # Verify metadata was set
         response = s3_client.head_object(Bucket="test-bucket", Key="test.png")
         assert response["ContentType"] == "image/png"
-        assert response["CacheControl"] == "max-age=3600"
\ No newline at end of file
+        assert response["CacheControl"] == "max-age=3600"
+
+class TestS3InMemoryUpload:
+    """Tests for uploading screenshots straight from memory."""
+
+    @mock_aws
+    def test_upload_bytes(self) -> None:
+        """Test uploading bytes without a local file."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        uploader = S3Uploader(bucket_name="test-bucket", region_name="us-east-1")
+        s3_url = uploader.upload_bytes(b"\x89PNG image data", "shots/a.png")
+
+        assert s3_url == "https://test-bucket.s3.amazonaws.com/shots/a.png"
+        obj = s3_client.get_object(Bucket="test-bucket", Key="shots/a.png")
+        assert obj["Body"].read() == b"\x89PNG image data"
+        assert obj["ContentType"] == "image/png"
+
+    @mock_aws
+    def test_upload_buffer_types(self) -> None:
+        """Test that bytearray and memoryview contents are uploaded as bytes."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        uploader = S3Uploader(bucket_name="test-bucket", region_name="us-east-1")
+        data = bytearray(b"image data")
+
+        uploader.upload_bytes(data, "shots/a.png")
+        uploader.upload_bytes(memoryview(data)[:5], "shots/b.png")
+
+        assert s3_client.get_object(Bucket="test-bucket", Key="shots/a.png")["Body"].read() == b"image data"
+        assert s3_client.get_object(Bucket="test-bucket", Key="shots/b.png")["Body"].read() == b"image"
+
+    @mock_aws
+    def test_upload_bytes_missing_bucket(self) -> None:
+        """Test that a missing bucket is reported clearly."""
+        from botocore.exceptions import ClientError
+
+        uploader = S3Uploader(bucket_name="nonexistent-bucket", region_name="us-east-1")
+
+        with pytest.raises(ClientError, match="does not exist"):
+            uploader.upload_bytes(b"data", "a.png")
+
+    def test_make_key(self) -> None:
+        """Test timestamped key generation."""
+        from datetime import datetime
+
+        uploader = S3Uploader(bucket_name="test-bucket", region_name="us-east-1")
+        timestamp = datetime(2025, 7, 15, 14, 30, 22)
+
+        assert uploader.make_key("qa", ".png", timestamp) == "qa/2025-07-15_143022.png"
+        assert uploader.make_key("", ".jpg", timestamp) == "2025-07-15_143022.jpg"
+
+
+class TestS3ClientCache:
+    """Tests for the shared S3 client cache."""
+
+    def test_uploaders_share_client(self) -> None:
+        """Test that uploaders with the same settings reuse one client."""
+        first = S3Uploader(bucket_name="bucket-a", region_name="us-east-1")
+        second = S3Uploader(bucket_name="bucket-b", region_name="us-east-1")
+
+        assert first.s3_client is second.s3_client
+
+    def test_distinct_settings_get_distinct_clients(self) -> None:
+        """Test that region, credentials and endpoint are part of the cache key."""
+        base = get_s3_client(region_name="us-east-1")
+
+        assert get_s3_client(region_name="eu-west-1") is not base
+        assert get_s3_client(region_name="us-east-1", endpoint_url="http://localhost:5000") is not base
+        assert get_s3_client(
+            region_name="us-east-1",
+            aws_access_key_id="AKIAEXAMPLE",
+            aws_secret_access_key="secret",
+        ) is not base
+
+    def test_connection_settings(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test pool size, keep-alive and retry configuration."""
+        monkeypatch.setenv("S3_MAX_POOL_CONNECTIONS", "64")
+        monkeypatch.setenv("S3_RETRY_MODE", "adaptive")
+
+        client = get_s3_client(region_name="us-east-1")
+
+        assert client.meta.config.max_pool_connections == 64
+        assert client.meta.config.tcp_keepalive is True
+        assert client.meta.config.retries["mode"] == "adaptive"
+
+    def test_clear_client_cache(self) -> None:
+        """Test that clearing the cache builds a fresh client."""
+        first = get_s3_client(region_name="us-east-1")
+        clear_client_cache()
+
+        assert get_s3_client(region_name="us-east-1") is not first
+
+
+class TestUploadQueue:
+    """Tests for non-blocking uploads with back-pressure."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_event_loop(self) -> None:
+        """Test that uploads run in a worker thread."""
+        import threading
+
+        async with UploadQueue(max_in_flight=2) as uploads:
+            thread_name = await uploads.run(lambda: threading.current_thread().name)
+
+        assert thread_name.startswith("s3-upload")
+
+    @pytest.mark.asyncio
+    async def test_bounds_uploads_in_flight(self) -> None:
+        """Test that no more than max_in_flight uploads run at once."""
+        import asyncio
+        import threading
+        import time
+
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def slow_upload(n: int) -> int:
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            return n
+
+        async with UploadQueue(max_in_flight=2) as uploads:
+            results = await asyncio.gather(*(uploads.run(slow_upload, n) for n in range(6)))
+
+        assert results == list(range(6))
+        assert state["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_submit_applies_back_pressure(self) -> None:
+        """Test that submit waits while the queue is full."""
+        import asyncio
+        import threading
+
+        release = threading.Event()
+
+        async with UploadQueue(max_in_flight=1) as uploads:
+            first = await uploads.submit(release.wait)
+            second = asyncio.ensure_future(uploads.submit(lambda: "done"))
+            await asyncio.sleep(0.01)
+            assert not second.done()
+
+            release.set()
+            await first
+            assert await (await second) == "done"
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self) -> None:
+        """Test that upload exceptions reach the awaiting coroutine."""
+
+        def failing() -> None:
+            raise RuntimeError("SlowDown")
+
+        async with UploadQueue() as uploads:
+            with pytest.raises(RuntimeError, match="SlowDown"):
+                await uploads.run(failing)
+
+
+class TestMultipartTransfer:
+    """Tests for multipart transfer tuning."""
+
+    def test_make_transfer_config(self) -> None:
+        """Test TransferConfig construction from optional settings."""
+        assert make_transfer_config() is None
+
+        config = make_transfer_config(
+            multipart_threshold=16 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=4,
+        )
+
+        assert config.multipart_threshold == 16 * 1024 * 1024
+        assert config.multipart_chunksize == 8 * 1024 * 1024
+        assert config.max_concurrency == 4
+
+    @mock_aws
+    def test_large_capture_uses_multipart(self) -> None:
+        """Test that captures above the threshold upload as multipart parts."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        data = b"\x89PNG" + b"\x00" * (11 * 1024 * 1024)
+
+        uploader = S3Uploader(
+            bucket_name="test-bucket",
+            region_name="us-east-1",
+            transfer_config=make_transfer_config(
+                multipart_threshold=5 * 1024 * 1024,
+                multipart_chunksize=5 * 1024 * 1024,
+                max_concurrency=3,
+            ),
+        )
+        uploader.upload_bytes(data, "big.png")
+
+        head = s3_client.head_object(Bucket="test-bucket", Key="big.png")
+        assert head["ContentLength"] == len(data)
+        # Multipart ETags carry the part count after a dash
+        assert head["ETag"].strip('"').endswith("-3")
+
+
+class TestKeyStrategies:
+    """Tests for S3 key strategies."""
+
+    def test_slugify_url(self) -> None:
+        """Test URL slugs used in keys."""
+        assert slugify_url("https://example.com/blog/post?id=1") == "example-com-blog-post-id-1"
+        assert slugify_url("https://EXAMPLE.com/") == "example-com"
+        assert slugify_url(None) == "page"
+        assert len(slugify_url("https://example.com/" + "a" * 200)) <= 60
+
+    def test_unique_and_content_keys(self) -> None:
+        """Test key layouts for each strategy."""
+        from datetime import datetime
+
+        uploader = S3Uploader(bucket_name="test-bucket", region_name="us-east-1")
+        timestamp = datetime(2025, 7, 15, 14, 30, 22)
+        digest = "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+
+        unique = uploader.make_key("qa", ".png", timestamp, strategy="unique", url="https://example.com", content_hash=digest)
+        content = uploader.make_key("qa", ".png", timestamp, strategy="content", url="https://example.com", content_hash=digest)
+
+        assert unique == "qa/2025-07-15_143022_example-com_9f86d081884c.png"
+        assert content == "qa/example-com/9f86d081884c7d65.png"
+
+    def test_invalid_strategy(self) -> None:
+        """Test that unknown strategies and missing hashes are rejected."""
+        uploader = S3Uploader(bucket_name="test-bucket", region_name="us-east-1")
+
+        with pytest.raises(ValueError, match="Unknown key strategy"):
+            uploader.make_key(strategy="random")
+        with pytest.raises(ValueError, match="content hash"):
+            uploader.make_key(strategy="content")
+
+    @mock_aws
+    def test_object_exists(self) -> None:
+        """Test HEAD-based existence checks."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        s3_client.put_object(Bucket="test-bucket", Key="present.png", Body=b"x")
+
+        uploader = S3Uploader(bucket_name="test-bucket", region_name="us-east-1")
+
+        assert uploader.object_exists("present.png") is True
+        assert uploader.object_exists("missing.png") is False
+
+    @mock_aws
+    def test_known_keys_only_for_content_uploads(self) -> None:
+        """Test that only remembered uploads skip the HEAD request, until forgotten."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        uploader = S3Uploader(bucket_name="test-bucket", region_name="us-east-1")
+
+        uploader.upload_bytes(b"x", "2025-07-15_143022.png")
+        uploader.upload_bytes(b"x", "page/9f86d081884c7d65.png", remember=True)
+        s3_client.delete_object(Bucket="test-bucket", Key="2025-07-15_143022.png")
+        s3_client.delete_object(Bucket="test-bucket", Key="page/9f86d081884c7d65.png")
+
+        assert uploader.object_exists("2025-07-15_143022.png") is False
+        assert uploader.object_exists("page/9f86d081884c7d65.png") is True
+
+        forget_known_keys()
+
+        assert uploader.object_exists("page/9f86d081884c7d65.png") is False
+
+    def test_known_keys_are_bounded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the least recently used keys are dropped beyond the cap."""
+        monkeypatch.setattr(s3_upload, "KNOWN_KEYS_MAX", 2)
+        uploader = S3Uploader(bucket_name="test-bucket", region_name="us-east-1")
+        uploader.s3_client = Mock()
+
+        for key in ("a.png", "b.png", "c.png"):
+            uploader.upload_bytes(b"x", key, remember=True)
+
+        assert list(s3_upload._known_keys) == [("test-bucket", "b.png"), ("test-bucket", "c.png")]
@@ -0,0 +1,180 @@
+"""Tests for the per-host scheduler.
+
+This module tests batch politeness including:
+- Interleaving URLs across hosts
+- Per-host concurrency and rate caps
+- Retry-After parsing and host back-off
+"""
+
+import asyncio
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+
+from playwright_s3_snapshot.batch import run_batch
+from playwright_s3_snapshot.scheduler import (
+    HostScheduler,
+    RateLimitedError,
+    host_of,
+    parse_retry_after,
+)
+
+
+class TestHelpers:
+    """Tests for host and Retry-After parsing."""
+
+    def test_host_of(self) -> None:
+        """Test that hosts are lower-cased and ignore ports and paths."""
+        assert host_of("https://Example.COM:8443/a?b=c") == "example.com"
+        assert host_of("example.com/page") == "example.com"
+
+    def test_retry_after_seconds(self) -> None:
+        """Test the delta-seconds form."""
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+    def test_retry_after_http_date(self) -> None:
+        """Test the HTTP-date form relative to now."""
+        now = datetime(2025, 7, 15, 14, 30, 0, tzinfo=UTC)
+
+        assert parse_retry_after("Tue, 15 Jul 2025 14:30:45 GMT", now=now) == 45.0
+        assert parse_retry_after("Tue, 15 Jul 2025 14:00:00 GMT", now=now) == 0.0
+
+    def test_invalid_limits(self) -> None:
+        """Test that non-positive limits are rejected."""
+        with pytest.raises(ValueError, match="per_host"):
+            HostScheduler(per_host=0)
+        with pytest.raises(ValueError, match="rate"):
+            HostScheduler(rate=0)
+
+
+class TestHostScheduler:
+    """Tests for HostScheduler with run_batch."""
+
+    @pytest.mark.asyncio
+    async def test_interleaves_hosts(self) -> None:
+        """Test that URLs of one host do not run back to back while others wait."""
+        urls = [f"https://a.example/{i}" for i in range(4)] + [
+            "https://b.example/0",
+            "https://b.example/1",
+            "https://c.example/0",
+        ]
+        order: list[str] = []
+
+        async def handler(index: int, url: str) -> None:
+            order.append(host_of(url)[0])
+
+        await run_batch(urls, handler, scheduler=HostScheduler())
+
+        assert "".join(order) == "abcabaa"
+
+    @pytest.mark.asyncio
+    async def test_per_host_cap(self) -> None:
+        """Test that a host never has more than per_host items running."""
+        urls = [f"https://a.example/{i}" for i in range(6)] + [
+            f"https://b.example/{i}" for i in range(6)
+        ]
+        running: dict[str, int] = {}
+        peak: dict[str, int] = {}
+
+        async def handler(index: int, url: str) -> None:
+            host = host_of(url)
+            running[host] = running.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), running[host])
+            await asyncio.sleep(0.01)
+            running[host] -= 1
+
+        summary = await run_batch(
+            urls, handler, concurrency=8, scheduler=HostScheduler(per_host=2)
+        )
+
+        assert summary["successful"] == 12
+        assert peak == {"a.example": 2, "b.example": 2}
+
+    @pytest.mark.asyncio
+    async def test_rate_cap_spaces_starts(self) -> None:
+        """Test that starts on one host are at least 1/rate apart."""
+        starts: list[float] = []
+
+        async def handler(index: int, url: str) -> None:
+            starts.append(time.monotonic())
+
+        await run_batch(
+            [f"https://a.example/{i}" for i in range(3)],
+            handler,
+            concurrency=3,
+            scheduler=HostScheduler(rate=20),
+        )
+
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        assert all(gap >= 0.045 for gap in gaps)
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_host(self) -> None:
+        """Test that a 429 pauses its host for Retry-After, other hosts carry on."""
+        events: list[Any] = []
+        refused = False
+        started = time.monotonic()
+
+        async def handler(index: int, url: str) -> None:
+            nonlocal refused
+            events.append((url, round(time.monotonic() - started, 2)))
+            if url == "https://a.example/0" and not refused:
+                refused = True
+                raise RateLimitedError(url, 429, retry_after=0.2)
+            await asyncio.sleep(0.01)
+
+        summary = await run_batch(
+            ["https://a.example/0", "https://a.example/1", "https://b.example/0"],
+            handler,
+            concurrency=2,
+            attempts=2,
+            retry_delay=0.01,
+            scheduler=HostScheduler(),
+        )
+
+        assert summary == {"total": 3, "successful": 3, "failed": 0}
+        times = dict(reversed(events))
+        assert times["https://b.example/0"] < 0.1
+        assert times["https://a.example/1"] >= 0.2
+        retried = [at for url, at in events if url == "https://a.example/0"]
+        assert retried[1] >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_retry_after_without_scheduler(self) -> None:
+        """Test that Retry-After stretches the retry delay even without a scheduler."""
+        attempts: list[float] = []
+
+        async def handler(index: int, url: str) -> None:
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RateLimitedError(url, 503, retry_after=0.1)
+
+        await run_batch(["https://a.example"], handler, attempts=2, retry_delay=0.01)
+
+        assert attempts[1] - attempts[0] >= 0.1
+
+    @pytest.mark.asyncio
+    async def test_reads_input_lazily(self) -> None:
+        """Test that no more than the lookahead is read ahead of the workers."""
+        consumed = 0
+
+        def urls():
+            nonlocal consumed
+            for i in range(100):
+                consumed += 1
+                yield f"https://a.example/{i}"
+
+        seen_at_start: list[int] = []
+
+        async def handler(index: int, url: str) -> None:
+            if not seen_at_start:
+                seen_at_start.append(consumed)
+
+        await run_batch(urls(), handler, scheduler=HostScheduler(lookahead=5))
+
+        assert seen_at_start == [5]
+        assert consumed == 100
@@ -10,11 +10,11 @@ This module tests the screenshot system including:
 import asyncio
 from pathlib import Path
 from typing import Optional
-from unittest.mock import Mock, patch, AsyncMock
+from unittest.mock import MagicMock, Mock, patch, AsyncMock
 
 import pytest
 
-from playwright_s3_snapshot.screenshot import take_screenshot, take_screenshot_sync
+from playwright_s3_snapshot.screenshot import capture_screenshot, take_screenshot, take_screenshot_sync
 
 
 class TestScreenshotCapture:
@@ -177,4 +177,289 @@ class TestSynchronousScreenshot:
         mock_asyncio_run.assert_called_once()
         args, kwargs = mock_asyncio_run.call_args
         # The first argument should be the coroutine from take_screenshot
-        assert asyncio.iscoroutine(args[0])
\ No newline at end of file
+        assert asyncio.iscoroutine(args[0])
+
+class TestImageFormats:
+    """Tests for lossy formats and size budgets."""
+
+    @staticmethod
+    def _wire(mock_playwright: Mock) -> AsyncMock:
+        page = AsyncMock()
+        browser = AsyncMock()
+        browser.new_page.return_value = page
+        playwright_instance = AsyncMock()
+        playwright_instance.chromium.launch.return_value = browser
+        mock_playwright.return_value.__aenter__.return_value = playwright_instance
+        return page
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_jpeg_quality(self, mock_playwright: Mock, temp_dir: str) -> None:
+        """Test that JPEG captures use the requested quality and are written to disk."""
+        page = self._wire(mock_playwright)
+        page.screenshot.return_value = b"jpeg bytes"
+        output_path = Path(temp_dir) / "shot.jpg"
+
+        image = await capture_screenshot(
+            "https://example.com", image_format="jpeg", quality=60, path=str(output_path)
+        )
+
+        assert image == b"jpeg bytes"
+        assert output_path.read_bytes() == b"jpeg bytes"
+        page.screenshot.assert_called_once_with(full_page=True, type="jpeg", quality=60)
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_max_bytes_steps_quality_down(self, mock_playwright: Mock) -> None:
+        """Test that quality drops until the image fits the budget."""
+        page = self._wire(mock_playwright)
+        page.screenshot.side_effect = lambda **kwargs: b"x" * (kwargs["quality"] * 10)
+
+        image = await capture_screenshot(
+            "https://example.com", image_format="jpeg", max_bytes=500
+        )
+
+        qualities = [call.kwargs["quality"] for call in page.screenshot.call_args_list]
+        assert qualities == [80, 70, 60, 50]
+        assert len(image) == 500
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_max_bytes_returns_smallest(self, mock_playwright: Mock) -> None:
+        """Test that an unreachable budget still yields the smallest attempt."""
+        page = self._wire(mock_playwright)
+        page.screenshot.side_effect = lambda **kwargs: b"x" * (1000 + kwargs["quality"])
+
+        image = await capture_screenshot(
+            "https://example.com", image_format="jpeg", quality=25, max_bytes=10
+        )
+
+        qualities = [call.kwargs["quality"] for call in page.screenshot.call_args_list]
+        assert qualities == [25, 15, 5, 1]
+        assert len(image) == 1001
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_webp_uses_cdp(self, mock_playwright: Mock) -> None:
+        """Test that WebP is captured full-page through a CDP session."""
+        import base64
+
+        page = self._wire(mock_playwright)
+        session = AsyncMock()
+        page.context = Mock(new_cdp_session=AsyncMock(return_value=session))
+        session.send.side_effect = [
+            {"cssContentSize": {"width": 1280, "height": 4000}},
+            {"data": base64.b64encode(b"webp bytes").decode()},
+        ]
+
+        image = await capture_screenshot("https://example.com", image_format="webp", quality=70)
+
+        assert image == b"webp bytes"
+        method, params = session.send.call_args.args
+        assert method == "Page.captureScreenshot"
+        assert params["format"] == "webp"
+        assert params["quality"] == 70
+        assert params["clip"]["height"] == 4000
+        session.detach.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"image_format": "gif"},
+            {"image_format": "png", "quality": 80},
+            {"image_format": "jpeg", "quality": 0},
+            {"image_format": "webp", "max_bytes": -1},
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_invalid_options(self, options: dict) -> None:
+        """Test that impossible format options fail before launching a browser."""
+        with pytest.raises(ValueError):
+            await capture_screenshot("https://example.com", **options)
+
+
+class TestStageTimings:
+    """Tests for stage timing around a dedicated browser."""
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_dedicated_browser_stages(self, mock_playwright: Mock) -> None:
+        """Test that launch, page setup, navigation, encode and teardown are all timed."""
+        from playwright_s3_snapshot.timings import StageTimer
+
+        page = TestImageFormats._wire(mock_playwright)
+        page.screenshot.return_value = b"png bytes"
+        browser = mock_playwright.return_value.__aenter__.return_value.chromium.launch.return_value
+        timer = StageTimer()
+
+        await capture_screenshot("https://example.com", timer=timer)
+
+        assert list(timer.as_dict()) == [
+            "launch",
+            "context",
+            "goto",
+            "wait",
+            "encode",
+            "cleanup",
+            "total",
+        ]
+        browser.close.assert_awaited_once()
+        mock_playwright.return_value.__aexit__.assert_awaited_once()
+
+
+class TestTiledCapture:
+    """Tests for capturing tall pages as tiles."""
+
+    @staticmethod
+    def _wire(mock_playwright: Mock, page_height: int) -> AsyncMock:
+        import base64
+
+        page = TestImageFormats._wire(mock_playwright)
+        session = AsyncMock()
+        page.context = Mock(new_cdp_session=AsyncMock(return_value=session))
+
+        async def send(method: str, params: Optional[dict] = None) -> dict:
+            if method == "Page.getLayoutMetrics":
+                return {"cssContentSize": {"width": 1280.4, "height": page_height}}
+            clip = params["clip"]
+            return {"data": base64.b64encode(f"tile@{clip['y']}".encode()).decode()}
+
+        session.send.side_effect = send
+        return session
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_tiles_cover_page_top_to_bottom(self, mock_playwright: Mock) -> None:
+        """Test that each tile is a clip of the page, the last one shorter."""
+        from playwright_s3_snapshot.screenshot import capture_tiles
+
+        session = self._wire(mock_playwright, page_height=2500)
+        tiles = []
+
+        async def on_tile(tile) -> None:
+            tiles.append(tile)
+
+        page = await capture_tiles("https://example.com", on_tile, tile_height=1000)
+
+        assert page == {
+            "page_width": 1281,
+            "page_height": 2500,
+            "captured_height": 2500,
+            "truncated": False,
+            "tiles": 3,
+        }
+        assert [(tile.index, tile.y, tile.height) for tile in tiles] == [
+            (0, 0, 1000),
+            (1, 1000, 1000),
+            (2, 2000, 500),
+        ]
+        assert tiles[1].data == b"tile@1000"
+        params = session.send.call_args.args[1]
+        assert params["clip"] == {"x": 0, "y": 2000, "width": 1281, "height": 500, "scale": 1}
+        assert params["captureBeyondViewport"] is True
+        assert "quality" not in params
+        session.detach.assert_awaited_once()
+
+    @patch("playwright_s3_snapshot.screenshot.async_playwright")
+    @pytest.mark.asyncio
+    async def test_max_height_truncates(self, mock_playwright: Mock) -> None:
+        """Test that endless pages stop at max_height."""
+        from playwright_s3_snapshot.screenshot import capture_tiles
+
+        session = self._wire(mock_playwright, page_height=1_000_000)
+        tiles = []
+
+        async def on_tile(tile) -> None:
+            tiles.append(tile)
+
+        page = await capture_tiles(
+            "https://example.com",
+            on_tile,
+            image_format="jpeg",
+            tile_height=4000,
+            max_height=10000,
+        )
+
+        assert page["truncated"] is True
+        assert page["captured_height"] == 10000
+        assert [tile.height for tile in tiles] == [4000, 4000, 2000]
+        assert session.send.call_args.args[1]["quality"] == 80
+
+    @pytest.mark.parametrize("options", [{"tile_height": 0}, {"max_height": -1}, {"image_format": "gif"}])
+    @pytest.mark.asyncio
+    async def test_invalid_options(self, options: dict) -> None:
+        """Test that impossible tile options fail before launching a browser."""
+        from playwright_s3_snapshot.screenshot import capture_tiles
+
+        with pytest.raises(ValueError):
+            await capture_tiles("https://example.com", AsyncMock(), **options)
+
+
+class TestArtifactCapture:
+    """Tests for producing several artifacts from one navigation."""
+
+    @staticmethod
+    def _pool(page: AsyncMock) -> MagicMock:
+        context = AsyncMock()
+        context.new_page.return_value = page
+        manager = MagicMock()
+        manager.__aenter__ = AsyncMock(return_value=context)
+        manager.__aexit__ = AsyncMock(return_value=False)
+        pool = MagicMock()
+        pool.context.return_value = manager
+        return pool
+
+    @pytest.mark.asyncio
+    async def test_all_artifacts_from_one_load(self) -> None:
+        """Test that screenshot, PDF, DOM and MHTML share a single page load."""
+        from playwright_s3_snapshot.screenshot import capture_artifacts
+
+        page = AsyncMock()
+        page.screenshot.return_value = b"png bytes"
+        page.pdf.return_value = b"%PDF-1.7"
+        page.content.return_value = "<html>héllo</html>"
+        session = AsyncMock()
+        session.send.return_value = {"data": "MIME-Version: 1.0"}
+        page.context = Mock(new_cdp_session=AsyncMock(return_value=session))
+
+        captured = await capture_artifacts(
+            "https://example.com", ["mhtml", "screenshot", "pdf", "html"], pool=self._pool(page)
+        )
+
+        assert list(captured) == ["mhtml", "screenshot", "pdf", "html"]
+        assert captured["screenshot"] == b"png bytes"
+        assert captured["pdf"] == b"%PDF-1.7"
+        assert captured["html"] == "<html>héllo</html>".encode()
+        assert captured["mhtml"] == b"MIME-Version: 1.0"
+        page.goto.assert_awaited_once()
+        page.pdf.assert_awaited_once_with(print_background=True)
+        session.send.assert_awaited_once_with("Page.captureSnapshot", {"format": "mhtml"})
+        session.detach.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_pdf_only_skips_screenshot(self) -> None:
+        """Test that artifacts that were not asked for are not produced."""
+        from playwright_s3_snapshot.screenshot import capture_artifacts
+
+        page = AsyncMock()
+        page.pdf.return_value = b"%PDF-1.7"
+
+        captured = await capture_artifacts("https://example.com", "pdf", pool=self._pool(page))
+
+        assert captured == {"pdf": b"%PDF-1.7"}
+        page.screenshot.assert_not_awaited()
+
+    @pytest.mark.parametrize("value", ["", "screenshot,gif", "pdf,PDF"])
+    def test_parse_artifacts_rejects(self, value: str) -> None:
+        """Test that empty, unknown and duplicate artifact lists are rejected."""
+        from playwright_s3_snapshot.screenshot import parse_artifacts
+
+        with pytest.raises(ValueError):
+            parse_artifacts(value)
+
+    def test_artifact_filenames(self) -> None:
+        """Test that the screenshot's extension follows the image format."""
+        from playwright_s3_snapshot.screenshot import artifact_filename
+
+        assert artifact_filename("screenshot", "webp") == "screenshot.webp"
+        assert artifact_filename("mhtml") == "page.mhtml"
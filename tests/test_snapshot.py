@@ -15,6 +15,9 @@ import pytest
 import boto3
 from moto import mock_aws
 
+from playwright_s3_snapshot.changes import ChangeDetector, LocalBaselineStore, Thumbnail
+from playwright_s3_snapshot.regions import Region
+from playwright_s3_snapshot.s3_upload import S3Uploader
 from playwright_s3_snapshot.snapshot import take_snapshot_to_s3_sync
 
 
@@ -116,4 +119,484 @@ class TestSnapshotIntegration:
             viewport_width=1366,
             viewport_height=768,
             wait_timeout=60000
-        )
\ No newline at end of file
+        )
+
+class TestInMemorySnapshot:
+    """Tests for the in-memory screenshot-to-S3 pipeline."""
+
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_snapshot_uploads_from_memory(self, mock_capture: Mock, temp_dir: str) -> None:
+        """Test that the capture is uploaded without writing to temp_dir."""
+        mock_capture.return_value = b"\x89PNG in-memory capture"
+
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        result = take_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            key_prefix="screenshots/",
+            temp_dir=temp_dir,
+            region_name="us-east-1",
+        )
+
+        assert result["file_size"] == len(b"\x89PNG in-memory capture")
+        assert result["s3_key"].startswith("screenshots/")
+        assert result["s3_url"].endswith(result["s3_key"])
+        assert "local_path" not in result
+        assert list(Path(temp_dir).iterdir()) == []
+
+        obj = s3_client.get_object(Bucket="test-bucket", Key=result["s3_key"])
+        assert obj["Body"].read() == b"\x89PNG in-memory capture"
+
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_snapshot_keeps_local_copy_on_request(self, mock_capture: Mock, temp_dir: str) -> None:
+        """Test that cleanup_local=False keeps a local copy of the capture."""
+        mock_capture.return_value = b"\x89PNG capture"
+
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        result = take_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            temp_dir=temp_dir,
+            region_name="us-east-1",
+            cleanup_local=False,
+        )
+
+        assert Path(result["local_path"]).read_bytes() == b"\x89PNG capture"
+
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @patch("playwright_s3_snapshot.snapshot.S3Uploader")
+    @pytest.mark.asyncio
+    async def test_snapshot_upload_does_not_block_loop(self, mock_uploader: Mock, mock_capture: Mock) -> None:
+        """Test that the S3 upload runs through the upload queue's threads."""
+        import threading
+
+        from playwright_s3_snapshot.s3_upload import UploadQueue
+        from playwright_s3_snapshot.snapshot import take_snapshot_to_s3
+
+        mock_capture.return_value = b"\x89PNG capture"
+        upload_threads = []
+
+        def upload_bytes(data: bytes, s3_key: str, content_type: str, remember: bool = False) -> str:
+            upload_threads.append(threading.current_thread())
+            return f"https://test-bucket.s3.amazonaws.com/{s3_key}"
+
+        mock_uploader.return_value.make_key.return_value = "a.png"
+        mock_uploader.return_value.get_url.side_effect = lambda key: f"https://test-bucket.s3.amazonaws.com/{key}"
+        mock_uploader.return_value.upload_bytes.side_effect = upload_bytes
+
+        async with UploadQueue(max_in_flight=1) as uploads:
+            result = await take_snapshot_to_s3(
+                url="https://example.com",
+                bucket_name="test-bucket",
+                upload_queue=uploads,
+            )
+
+        assert result["s3_url"] == "https://test-bucket.s3.amazonaws.com/a.png"
+        assert upload_threads and upload_threads[0] is not threading.main_thread()
+
+
+class TestContentAddressedSnapshot:
+    """Tests for content-addressed keys and dedup."""
+
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_unique_keys_do_not_collide(self, mock_capture: Mock) -> None:
+        """Test that two different captures in the same second get distinct keys."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        keys = set()
+        for body in (b"first capture", b"second capture"):
+            mock_capture.return_value = body
+            result = take_snapshot_to_s3_sync(
+                url="https://example.com/page",
+                bucket_name="test-bucket",
+                region_name="us-east-1",
+                key_strategy="unique",
+            )
+            keys.add(result["s3_key"])
+            obj = s3_client.get_object(Bucket="test-bucket", Key=result["s3_key"])
+            assert obj["Body"].read() == body
+
+        assert len(keys) == 2
+
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_dedup_skips_identical_upload(self, mock_capture: Mock) -> None:
+        """Test that identical bytes are uploaded once under a content key."""
+        mock_capture.return_value = b"unchanged page"
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        with patch.object(S3Uploader, "upload_bytes", autospec=True, side_effect=S3Uploader.upload_bytes) as upload:
+            first = take_snapshot_to_s3_sync(
+                url="https://example.com",
+                bucket_name="test-bucket",
+                key_prefix="monitor",
+                region_name="us-east-1",
+                key_strategy="content",
+                dedup=True,
+            )
+            second = take_snapshot_to_s3_sync(
+                url="https://example.com",
+                bucket_name="test-bucket",
+                key_prefix="monitor",
+                region_name="us-east-1",
+                key_strategy="content",
+                dedup=True,
+            )
+
+        assert first["deduplicated"] is False
+        assert second["deduplicated"] is True
+        assert first["s3_key"] == second["s3_key"]
+        assert first["s3_key"].startswith("monitor/example-com/")
+        assert upload.call_count == 1
+
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_dedup_checks_bucket_with_head(self, mock_capture: Mock) -> None:
+        """Test that an object stored by another process is detected via HEAD."""
+        import hashlib
+
+        mock_capture.return_value = b"stored elsewhere"
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        digest = hashlib.sha256(b"stored elsewhere").hexdigest()
+        s3_client.put_object(Bucket="test-bucket", Key=f"example-com/{digest[:16]}.png", Body=b"stored elsewhere")
+
+        result = take_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            region_name="us-east-1",
+            key_strategy="content",
+            dedup=True,
+        )
+
+        assert result["deduplicated"] is True
+
+    def test_dedup_requires_content_keys(self) -> None:
+        """Test that dedup with timestamp keys is rejected."""
+        with pytest.raises(ValueError, match="key_strategy='content'"):
+            take_snapshot_to_s3_sync(
+                url="https://example.com",
+                bucket_name="test-bucket",
+                dedup=True,
+            )
+
+
+class TestSnapshotTimings:
+    """Tests for the per-stage timings returned with every snapshot."""
+
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_result_includes_stage_timings(self, mock_capture: Mock) -> None:
+        """Test that capture stages and the upload are reported in milliseconds."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        async def capture(**kwargs: Any) -> bytes:
+            kwargs["timer"].add("goto", 0.5)
+            kwargs["timer"].add("encode", 0.25)
+            return b"image"
+
+        mock_capture.side_effect = capture
+
+        result = take_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            region_name="us-east-1",
+        )
+
+        timings = result["timings"]
+        assert list(timings) == ["goto", "encode", "upload", "total"]
+        assert timings["goto"] == 500.0
+        assert timings["encode"] == 250.0
+        assert timings["total"] >= timings["upload"]
+
+
+class TestChangeDetection:
+    """Tests for skipping uploads of unchanged pages."""
+
+    @staticmethod
+    def _capture(body: bytes):
+        async def capture(**kwargs: Any) -> bytes:
+            await kwargs["after_capture"](Mock())
+            return body
+
+        return capture
+
+    @patch("playwright_s3_snapshot.snapshot.Thumbnail.capture")
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_unchanged_capture_is_not_uploaded(self, mock_capture: Mock, mock_thumbnail: Mock, temp_dir: str) -> None:
+        """Test that a capture matching its baseline reuses the stored key."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        mock_thumbnail.return_value = Thumbnail(4, 4, b"\x80" * 16)
+        detector = ChangeDetector(LocalBaselineStore(temp_dir))
+
+        mock_capture.side_effect = self._capture(b"first")
+        first = take_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            key_strategy="unique",
+            change_detector=detector,
+        )
+        mock_capture.side_effect = self._capture(b"second, same look")
+        second = take_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            key_strategy="unique",
+            change_detector=detector,
+        )
+
+        assert first["changed"] is True
+        assert first["change_ratio"] is None
+        assert second["changed"] is False
+        assert second["deduplicated"] is True
+        assert second["change_ratio"] == 0.0
+        assert second["s3_key"] == first["s3_key"]
+        assert "upload" not in second["timings"]
+        assert "compare" in second["timings"]
+        objects = s3_client.list_objects_v2(Bucket="test-bucket")["Contents"]
+        assert [obj["Key"] for obj in objects] == [first["s3_key"]]
+
+    @patch("playwright_s3_snapshot.snapshot.Thumbnail.capture")
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_changed_capture_uploads_diff(self, mock_capture: Mock, mock_thumbnail: Mock, temp_dir: str) -> None:
+        """Test that a changed capture is stored with a diff and becomes the baseline."""
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+        detector = ChangeDetector(LocalBaselineStore(temp_dir))
+        mock_capture.side_effect = self._capture(b"image")
+
+        mock_thumbnail.return_value = Thumbnail(4, 4, b"\x80" * 16)
+        take_snapshot_to_s3_sync(url="https://example.com", bucket_name="test-bucket", key_strategy="unique", change_detector=detector)
+        mock_thumbnail.return_value = Thumbnail(4, 4, b"\x00" * 16)
+        result = take_snapshot_to_s3_sync(url="https://example.com", bucket_name="test-bucket", key_strategy="unique", change_detector=detector)
+
+        assert result["changed"] is True
+        assert result["change_ratio"] == 1.0
+        assert result["diff_s3_key"] == result["s3_key"].removesuffix(".png") + ".diff.png"
+        diff = s3_client.get_object(Bucket="test-bucket", Key=result["diff_s3_key"])
+        assert diff["ContentType"] == "image/png"
+        assert detector.store.load("https://example.com")["s3_key"] == result["s3_key"]
+
+
+    @patch("playwright_s3_snapshot.snapshot.Thumbnail.capture")
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_region_is_compared_not_full_page(self, mock_capture: Mock, mock_thumbnail: Mock, temp_dir: str) -> None:
+        """Test that with a region the thumbnail is taken of that region."""
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+        mock_capture.side_effect = self._capture(b"image")
+        mock_thumbnail.return_value = Thumbnail(4, 4, b"\x80" * 16)
+
+        take_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            change_detector=ChangeDetector(LocalBaselineStore(temp_dir)),
+            region=Region(clip=(0, 200, 800, 400)),
+        )
+
+        assert mock_capture.call_args.kwargs["region"] == Region(clip=(0, 200, 800, 400))
+        clip = mock_thumbnail.call_args.args[2]
+        assert clip == {"x": 0, "y": 200, "width": 800, "height": 400}
+
+class TestSnapshotFormats:
+    """Tests for lossy output formats."""
+
+    @patch("playwright_s3_snapshot.snapshot.capture_screenshot")
+    @mock_aws
+    def test_webp_key_and_content_type(self, mock_capture: Mock) -> None:
+        """Test that WebP captures get a .webp key and image/webp content type."""
+        mock_capture.return_value = b"webp bytes"
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        result = take_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            region_name="us-east-1",
+            image_format="webp",
+            quality=70,
+            max_bytes=500 * 1024,
+        )
+
+        assert result["s3_key"].endswith(".webp")
+        assert result["format"] == "webp"
+        obj = s3_client.get_object(Bucket="test-bucket", Key=result["s3_key"])
+        assert obj["ContentType"] == "image/webp"
+        kwargs = mock_capture.call_args.kwargs
+        assert kwargs["quality"] == 70
+        assert kwargs["max_bytes"] == 500 * 1024
+
+
+class TestViewportsSnapshot:
+    """Tests for multi-viewport uploads."""
+
+    @patch("playwright_s3_snapshot.snapshot.capture_viewports")
+    @mock_aws
+    def test_variants_share_key_group(self, mock_capture: Mock) -> None:
+        """Test that every viewport is uploaded under one key group."""
+        from playwright_s3_snapshot.snapshot import take_viewports_snapshot_to_s3_sync
+        from playwright_s3_snapshot.viewports import parse_viewports
+
+        viewports = parse_viewports("desktop,mobile")
+        mock_capture.return_value = [(viewports[0], b"desktop image"), (viewports[1], b"mobile image")]
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        result = take_viewports_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            viewports=viewports,
+            key_prefix="responsive",
+            region_name="us-east-1",
+        )
+
+        assert result["key_group"].startswith("responsive/")
+        keys = [variant["s3_key"] for variant in result["variants"]]
+        assert keys == [f"{result['key_group']}/desktop.png", f"{result['key_group']}/mobile.png"]
+        body = s3_client.get_object(Bucket="test-bucket", Key=keys[1])["Body"].read()
+        assert body == b"mobile image"
+        assert result["variants"][1]["device_scale_factor"] == 3
+
+
+class TestTiledSnapshot:
+    """Tests for tiled uploads of tall pages."""
+
+    @staticmethod
+    async def _capture_tiles(url: str, on_tile: Any, **kwargs: Any) -> Dict[str, Any]:
+        from playwright_s3_snapshot.screenshot import Tile
+
+        for index, y in enumerate(range(0, 2500, 1000)):
+            await on_tile(Tile(index, y, 1280, min(1000, 2500 - y), f"tile {index}".encode()))
+        return {"page_width": 1280, "page_height": 9000, "captured_height": 2500, "truncated": True, "tiles": 3}
+
+    @patch("playwright_s3_snapshot.snapshot.capture_tiles")
+    @mock_aws
+    def test_tiles_and_manifest_uploaded(self, mock_capture: Mock) -> None:
+        """Test that every tile is its own object, listed by a manifest."""
+        import json
+
+        from playwright_s3_snapshot.snapshot import take_tiled_snapshot_to_s3_sync
+
+        mock_capture.side_effect = self._capture_tiles
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        result = take_tiled_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            key_prefix="tall",
+            tile_height=1000,
+            max_page_height=2500,
+        )
+
+        group = result["key_group"]
+        assert group.startswith("tall/")
+        assert [tile["s3_key"] for tile in result["tiles"]] == [
+            f"{group}/tile-0000.png",
+            f"{group}/tile-0001.png",
+            f"{group}/tile-0002.png",
+        ]
+        assert result["truncated"] is True
+        assert result["file_size"] == 18
+        body = s3_client.get_object(Bucket="test-bucket", Key=f"{group}/tile-0002.png")["Body"].read()
+        assert body == b"tile 2"
+
+        manifest_object = s3_client.get_object(Bucket="test-bucket", Key=result["manifest_key"])
+        assert manifest_object["ContentType"] == "application/json"
+        manifest = json.loads(manifest_object["Body"].read())
+        assert manifest["tile_height"] == 1000
+        assert manifest["page_height"] == 9000
+        assert manifest["tiles"][2] == {"name": "tile-0002.png", "y": 2000, "height": 500, "file_size": 6}
+        assert mock_capture.call_args.kwargs["max_height"] == 2500
+
+    @patch("playwright_s3_snapshot.snapshot.capture_tiles")
+    @mock_aws
+    def test_unique_key_groups_differ(self, mock_capture: Mock) -> None:
+        """Test that "unique" groups do not collide within the same second."""
+        from playwright_s3_snapshot.snapshot import take_tiled_snapshot_to_s3_sync
+
+        mock_capture.side_effect = self._capture_tiles
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+
+        groups = {
+            take_tiled_snapshot_to_s3_sync(
+                url="https://example.com", bucket_name="test-bucket", key_strategy="unique"
+            )["key_group"]
+            for _ in range(2)
+        }
+
+        assert len(groups) == 2
+
+    def test_content_keys_rejected(self) -> None:
+        """Test that content-addressed keys are refused; tiles upload before the hash is known."""
+        from playwright_s3_snapshot.snapshot import take_tiled_snapshot_to_s3_sync
+
+        with pytest.raises(ValueError, match="content"):
+            take_tiled_snapshot_to_s3_sync(
+                url="https://example.com", bucket_name="test-bucket", key_strategy="content"
+            )
+
+
+class TestArtifactsSnapshot:
+    """Tests for multi-artifact uploads."""
+
+    @patch("playwright_s3_snapshot.snapshot.capture_artifacts")
+    @mock_aws
+    def test_artifacts_share_key_group(self, mock_capture: Mock) -> None:
+        """Test that every artifact is uploaded with its content type under one key group."""
+        from playwright_s3_snapshot.snapshot import take_artifacts_snapshot_to_s3_sync
+
+        mock_capture.return_value = {"screenshot": b"image", "pdf": b"%PDF", "mhtml": b"MIME"}
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket="test-bucket")
+
+        result = take_artifacts_snapshot_to_s3_sync(
+            url="https://example.com",
+            bucket_name="test-bucket",
+            artifacts=["screenshot", "pdf", "mhtml"],
+            key_prefix="archive",
+            image_format="jpeg",
+        )
+
+        group = result["key_group"]
+        assert group.startswith("archive/")
+        keys = [artifact["s3_key"] for artifact in result["artifacts"]]
+        assert keys == [f"{group}/screenshot.jpg", f"{group}/page.pdf", f"{group}/page.mhtml"]
+        content_types = [s3_client.head_object(Bucket="test-bucket", Key=key)["ContentType"] for key in keys]
+        assert content_types == ["image/jpeg", "application/pdf", "multipart/related"]
+        assert s3_client.get_object(Bucket="test-bucket", Key=keys[1])["Body"].read() == b"%PDF"
+        assert mock_capture.call_args.kwargs["artifacts"] == ["screenshot", "pdf", "mhtml"]
+
+    @patch("playwright_s3_snapshot.snapshot.capture_artifacts")
+    @mock_aws
+    def test_dedup_skips_identical_archive(self, mock_capture: Mock) -> None:
+        """Test that an identical archive maps to the same keys and is not re-uploaded."""
+        from playwright_s3_snapshot.snapshot import take_artifacts_snapshot_to_s3_sync
+
+        mock_capture.return_value = {"html": b"<html></html>", "pdf": b"%PDF"}
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+        options = {
+            "url": "https://example.com",
+            "bucket_name": "test-bucket",
+            "artifacts": ["html", "pdf"],
+            "key_strategy": "content",
+            "dedup": True,
+        }
+
+        first = take_artifacts_snapshot_to_s3_sync(**options)
+        second = take_artifacts_snapshot_to_s3_sync(**options)
+
+        assert first["key_group"] == second["key_group"]
+        assert [artifact["deduplicated"] for artifact in second["artifacts"]] == [True, True]
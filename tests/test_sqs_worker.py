@@ -0,0 +1,83 @@
+"""Tests for running the SQS handler against a stand-in queue.
+
+This module tests the local SQS worker including:
+- Building Lambda-style events from received messages
+- Deleting succeeded messages and leaving failures on the queue
+"""
+
+import json
+from typing import Any
+from unittest.mock import patch
+
+import boto3
+from moto import mock_aws
+
+from playwright_s3_snapshot.lambda_handler import sqs_handler
+from playwright_s3_snapshot.sqs_worker import poll_once
+
+
+class TestPollOnce:
+    """Tests for poll_once against a moto queue."""
+
+    @mock_aws
+    def test_failed_messages_stay_on_queue(self) -> None:
+        """Test the full SQS round trip with partial batch failures."""
+        sqs = boto3.client("sqs", region_name="us-east-1")
+        queue_url = sqs.create_queue(
+            QueueName="screenshots", Attributes={"VisibilityTimeout": "0"}
+        )["QueueUrl"]
+        for url in ["https://a.example", "https://broken.example", "https://c.example"]:
+            sqs.send_message(
+                QueueUrl=queue_url,
+                MessageBody=json.dumps({"url": url, "bucket": "test-bucket"}),
+            )
+
+        async def snapshot(url: str, **kwargs: Any) -> dict[str, Any]:
+            if "broken" in url:
+                raise Exception("Navigation timeout")
+            return {"url": url}
+
+        class Runtime:
+            def run(self, job, pool_size=None):
+                import asyncio
+
+                return asyncio.run(job(None))
+
+        with (
+            patch(
+                "playwright_s3_snapshot.lambda_handler.take_snapshot_to_s3",
+                side_effect=snapshot,
+            ),
+            patch(
+                "playwright_s3_snapshot.lambda_handler.get_runtime",
+                return_value=Runtime(),
+            ),
+        ):
+            counts = poll_once(
+                queue_url, sqs_client=sqs, handler=sqs_handler, wait_time_seconds=0
+            )
+
+        assert counts == {"received": 3, "succeeded": 2, "failed": 1}
+        remaining = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)[
+            "Messages"
+        ]
+        assert [json.loads(message["Body"])["url"] for message in remaining] == [
+            "https://broken.example"
+        ]
+
+    @mock_aws
+    def test_empty_queue(self) -> None:
+        """Test that an empty queue does not invoke the handler."""
+        sqs = boto3.client("sqs", region_name="us-east-1")
+        queue_url = sqs.create_queue(QueueName="screenshots")["QueueUrl"]
+
+        def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+            raise AssertionError("handler should not be called")
+
+        assert poll_once(
+            queue_url, sqs_client=sqs, handler=handler, wait_time_seconds=0
+        ) == {
+            "received": 0,
+            "succeeded": 0,
+            "failed": 0,
+        }
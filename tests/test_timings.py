@@ -0,0 +1,69 @@
+"""Tests for per-stage snapshot timings.
+
+This module tests the timing helpers including:
+- Accumulating time per stage
+- Percentile summaries across many snapshots
+"""
+
+import pytest
+
+from playwright_s3_snapshot.timings import StageTimer, TimingSummary, percentile
+
+
+class TestStageTimer:
+    """Tests for StageTimer."""
+
+    def test_stages_accumulate_in_snapshot_order(self) -> None:
+        """Test that repeated stages add up and are reported in stage order."""
+        timer = StageTimer()
+        timer.add("encode", 0.25)
+        timer.add("goto", 1.5)
+        timer.add("encode", 0.125)
+
+        timings = timer.as_dict()
+
+        assert list(timings) == ["goto", "encode", "total"]
+        assert timings["goto"] == 1500.0
+        assert timings["encode"] == 375.0
+        assert timings["total"] >= 0
+
+    def test_stage_is_recorded_when_it_raises(self) -> None:
+        """Test that a failing stage still counts its time."""
+        timer = StageTimer()
+
+        with pytest.raises(RuntimeError):
+            with timer.stage("goto"):
+                raise RuntimeError("Navigation timeout")
+
+        assert "goto" in timer.stages
+
+
+class TestTimingSummary:
+    """Tests for batch percentiles."""
+
+    def test_percentile_nearest_rank(self) -> None:
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile([7.0], 95) == 7.0
+        with pytest.raises(ValueError):
+            percentile([], 50)
+
+    def test_summary_per_stage(self) -> None:
+        """Test that stages missing from some snapshots are summarised on their own."""
+        summary = TimingSummary()
+        for goto in (100.0, 200.0, 300.0, 400.0):
+            summary.add({"goto": goto, "total": goto + 50})
+        summary.add({"launch": 900.0, "goto": 1000.0, "total": 2000.0})
+
+        stats = summary.summary()
+
+        assert len(summary) == 5
+        assert list(stats) == ["launch", "goto", "total"]
+        assert stats["goto"] == {"p50": 300.0, "p95": 1000.0, "max": 1000.0, "count": 5}
+        assert stats["launch"]["count"] == 1
+
+    def test_empty_summary(self) -> None:
+        """Test that no samples give an empty summary."""
+        assert TimingSummary().summary() == {}
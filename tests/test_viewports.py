@@ -0,0 +1,140 @@
+"""Tests for multi-viewport capture.
+
+This module tests viewport handling including:
+- Presets and custom viewport specs
+- Grouping viewports that can share a browser context
+- Capturing several viewports from one page load
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from playwright_s3_snapshot.screenshot import capture_viewports
+from playwright_s3_snapshot.viewports import (
+    VIEWPORT_PRESETS,
+    Viewport,
+    group_by_context,
+    parse_viewport,
+    parse_viewports,
+)
+
+
+def _mock_pool() -> tuple[MagicMock, list[AsyncMock]]:
+    """A pool whose contexts each hand out a fresh mock page."""
+    pages: list[AsyncMock] = []
+    pool = MagicMock()
+
+    def context(**options):
+        page = AsyncMock()
+        page.screenshot.side_effect = lambda **kwargs: f"image-{len(pages)}".encode()
+        page.context_options = options
+        pages.append(page)
+        context = AsyncMock()
+        context.new_page.return_value = page
+        manager = MagicMock()
+        manager.__aenter__ = AsyncMock(return_value=context)
+        manager.__aexit__ = AsyncMock(return_value=False)
+        return manager
+
+    pool.context.side_effect = context
+    return pool, pages
+
+
+class TestViewportSpecs:
+    """Tests for parsing viewport specs."""
+
+    def test_presets(self) -> None:
+        """Test that preset names resolve to device settings."""
+        mobile = parse_viewport("Mobile")
+
+        assert mobile is VIEWPORT_PRESETS["mobile"]
+        assert mobile.is_mobile is True
+        assert mobile.device_scale_factor == 3
+        assert "iPhone" in mobile.user_agent
+
+    def test_custom_sizes(self) -> None:
+        """Test WIDTHxHEIGHT[@SCALE] specs."""
+        viewport = parse_viewport("1280x720@2")
+
+        assert viewport == Viewport("1280x720@2", 1280, 720, 2.0)
+        assert parse_viewport("800x600").device_scale_factor == 1
+
+    def test_equal_viewports_hash_alike(self) -> None:
+        """Test that viewports work as set members and dict keys."""
+        a = Viewport("1280x720@2", 1280, 720, 2.0)
+        b = parse_viewport("1280x720@2")
+
+        assert hash(a) == hash(b)
+        assert {a, b} == {a}
+        assert len({a, parse_viewport("800x600")}) == 2
+
+    def test_mapping_with_preset(self) -> None:
+        """Test JSON-style specs that tweak a preset."""
+        viewport = parse_viewport(
+            {"preset": "mobile", "name": "small-phone", "width": 320, "height": 568}
+        )
+
+        assert viewport.name == "small-phone"
+        assert viewport.width == 320
+        assert viewport.is_mobile is True
+
+    def test_parse_list(self) -> None:
+        """Test comma-separated lists and duplicate detection."""
+        names = [
+            viewport.name for viewport in parse_viewports("desktop, tablet,mobile")
+        ]
+        assert names == ["desktop", "tablet", "mobile"]
+        assert parse_viewports(None) == []
+
+        with pytest.raises(ValueError, match="Duplicate"):
+            parse_viewports("desktop,desktop")
+
+    @pytest.mark.parametrize("spec", ["phablet", "1280x", "0x720", {"width": 100}])
+    def test_invalid_specs(self, spec) -> None:
+        """Test that unknown or malformed viewports are rejected."""
+        with pytest.raises(ValueError):
+            parse_viewport(spec)
+
+    def test_group_by_context(self) -> None:
+        """Test that only viewports with identical device settings share a load."""
+        viewports = parse_viewports("desktop,mobile,laptop,1280x720@2,tablet")
+
+        groups = [[v.name for v in group] for group in group_by_context(viewports)]
+
+        assert groups == [["desktop", "laptop"], ["mobile"], ["1280x720@2"], ["tablet"]]
+
+
+class TestCaptureViewports:
+    """Tests for capture_viewports."""
+
+    @pytest.mark.asyncio
+    async def test_one_load_per_context_group(self) -> None:
+        """Test that same-device viewports reuse one page load."""
+        pool, pages = _mock_pool()
+        viewports = parse_viewports("desktop,mobile,laptop")
+
+        captures = await capture_viewports("https://example.com", viewports, pool=pool)
+
+        assert [viewport.name for viewport, _ in captures] == [
+            "desktop",
+            "mobile",
+            "laptop",
+        ]
+        assert len(pages) == 2
+
+        desktop_page, mobile_page = pages
+        assert desktop_page.goto.call_count == 1
+        desktop_page.set_viewport_size.assert_called_once_with(
+            {"width": 1366, "height": 768}
+        )
+        assert desktop_page.screenshot.call_count == 2
+        assert mobile_page.context_options["is_mobile"] is True
+        assert mobile_page.context_options["device_scale_factor"] == 3
+        mobile_page.set_viewport_size.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_requires_viewports(self) -> None:
+        """Test that an empty list is rejected."""
+        with pytest.raises(ValueError, match="At least one viewport"):
+            await capture_viewports("https://example.com", [])
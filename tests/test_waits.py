@@ -0,0 +1,265 @@
+"""Tests for page readiness strategies.
+
+This module tests wait strategies including:
+- Parsing wait specs and per-URL rules
+- Navigation with load states, selectors and functions
+- Network-quiet waits with ignored requests
+- Visual-stability waits
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from playwright_s3_snapshot.scheduler import RateLimitedError
+from playwright_s3_snapshot.timings import StageTimer
+from playwright_s3_snapshot.waits import (
+    WaitRules,
+    WaitStrategy,
+    describe_wait,
+    parse_wait,
+    parse_wait_rule,
+)
+
+
+class FakePage:
+    """Minimal page that records calls and lets tests fire request events."""
+
+    def __init__(self) -> None:
+        self.handlers: dict[str, list] = {}
+        self.goto = AsyncMock()
+        self.wait_for_selector = AsyncMock()
+        self.wait_for_function = AsyncMock()
+        self.screenshot = AsyncMock(return_value=b"frame")
+
+    def on(self, event: str, handler) -> None:
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event: str, request: Mock) -> None:
+        for handler in self.handlers.get(event, []):
+            handler(request)
+
+
+class TestParseWait:
+    """Tests for wait spec parsing."""
+
+    def test_default_is_networkidle(self) -> None:
+        """Test that an empty spec keeps the historical behaviour."""
+        assert parse_wait(None) == WaitStrategy(wait_until="networkidle")
+        assert parse_wait("") == WaitStrategy(wait_until="networkidle")
+
+    def test_load_states(self) -> None:
+        """Test bare load states."""
+        assert parse_wait("domcontentloaded").wait_until == "domcontentloaded"
+        assert parse_wait("load").wait_until == "load"
+
+    def test_combined_steps(self) -> None:
+        """Test combining a load state with extra conditions."""
+        strategy = parse_wait(
+            "domcontentloaded+selector:#app > main+quiet:500+stable:300"
+        )
+
+        assert strategy.wait_until == "domcontentloaded"
+        assert strategy.selector == "#app > main"
+        assert strategy.quiet_ms == 500
+        assert strategy.stable_ms == 300
+        assert (
+            describe_wait(strategy)
+            == "domcontentloaded+selector:#app > main+quiet:500+stable:300"
+        )
+
+    def test_conditions_default_to_load(self) -> None:
+        """Test that conditions without a load state navigate to "load"."""
+        strategy = parse_wait("function:window.ready === true")
+
+        assert strategy.wait_until == "load"
+        assert strategy.function == "window.ready === true"
+
+    def test_plus_inside_selector(self) -> None:
+        """Test that "+" combinators in selectors are kept."""
+        assert parse_wait("selector:h1 + p").selector == "h1 + p"
+
+    @pytest.mark.parametrize("spec", ["idle", "quiet:soon", "quiet:0", "selector:"])
+    def test_invalid_specs(self, spec: str) -> None:
+        """Test that malformed specs are rejected."""
+        with pytest.raises(ValueError):
+            parse_wait(spec)
+
+
+class TestWaitRules:
+    """Tests for per-URL strategy selection."""
+
+    def test_first_matching_rule_wins(self) -> None:
+        """Test rule order, wildcards and the default."""
+        rules = WaitRules.from_options(
+            default="load",
+            rules=[
+                "https://app.example.com/*=selector:#root",
+                ("example.com/blog", "quiet:500"),
+                "https://app.example.com/admin=networkidle",
+            ],
+        )
+
+        assert rules.for_url("https://app.example.com/admin").selector == "#root"
+        assert rules.for_url("https://example.com/blog/post").quiet_ms == 500
+        assert rules.for_url("https://other.example").wait_until == "load"
+
+    def test_mapping_rules(self) -> None:
+        """Test rules given as a mapping, as in JSON config or events."""
+        rules = WaitRules.from_options(rules={"*.pdf": "commit"}, ignore=["/collect"])
+
+        strategy = rules.for_url("https://example.com/report.pdf")
+        assert strategy.wait_until == "commit"
+        assert strategy.ignore == ("/collect",)
+
+    def test_invalid_rule(self) -> None:
+        """Test that rules need a pattern and "="."""
+        with pytest.raises(ValueError, match="PATTERN=SPEC"):
+            parse_wait_rule("selector:#root")
+
+
+class TestNavigate:
+    """Tests for WaitStrategy.navigate."""
+
+    @pytest.mark.asyncio
+    async def test_default_navigation(self) -> None:
+        """Test that the default strategy is a plain networkidle goto."""
+        page = FakePage()
+
+        await WaitStrategy().navigate(page, "https://example.com", 30000)
+
+        page.goto.assert_called_once_with(
+            "https://example.com", wait_until="networkidle", timeout=30000
+        )
+        page.wait_for_selector.assert_not_called()
+        assert page.handlers == {}
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_response(self) -> None:
+        """Test that in a batch a 429 raises RateLimitedError carrying Retry-After."""
+        page = FakePage()
+        page.goto.return_value = Mock(status=429, headers={"retry-after": "30"})
+        strategy = WaitRules(parse_wait("load+selector:#app")).for_url(
+            "https://example.com", raise_on_rate_limit=True
+        )
+
+        with pytest.raises(RateLimitedError) as excinfo:
+            await strategy.navigate(page, "https://example.com", 5000)
+
+        assert excinfo.value.status == 429
+        assert excinfo.value.retry_after == 30.0
+        page.wait_for_selector.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_single_capture_keeps_rate_limited_page(self) -> None:
+        """Test that outside a batch a 503 page is captured like any other."""
+        page = FakePage()
+        page.goto.return_value = Mock(status=503, headers={"retry-after": "30"})
+        rules = WaitRules(parse_wait("load+selector:#app"))
+
+        await rules.for_url("https://example.com").navigate(
+            page, "https://example.com", 5000
+        )
+
+        page.wait_for_selector.assert_called_once()
+        # Batch copies do not change the shared strategy
+        assert (
+            rules.for_url("https://example.com", raise_on_rate_limit=True)
+            is not rules.default
+        )
+        assert rules.default.raise_on_rate_limit is False
+
+    @pytest.mark.asyncio
+    async def test_records_goto_and_wait_stages(self) -> None:
+        """Test that navigation and readiness waits are timed separately."""
+        page = FakePage()
+        timer = StageTimer()
+
+        await parse_wait("load+selector:#app").navigate(
+            page, "https://example.com", 5000, timer
+        )
+
+        assert set(timer.stages) == {"goto", "wait"}
+
+    @pytest.mark.asyncio
+    async def test_selector_and_function(self) -> None:
+        """Test that explicit readiness signals share the timeout budget."""
+        page = FakePage()
+        strategy = parse_wait("domcontentloaded+selector:#app+function:window.ready")
+
+        await strategy.navigate(page, "https://example.com", 5000)
+
+        page.goto.assert_called_once_with(
+            "https://example.com", wait_until="domcontentloaded", timeout=5000
+        )
+        selector_timeout = page.wait_for_selector.call_args.kwargs["timeout"]
+        assert 0 < selector_timeout <= 5000
+        assert page.wait_for_selector.call_args.kwargs["state"] == "visible"
+        page.wait_for_function.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_spent_budget_raises(self) -> None:
+        """Test that a navigation using the whole budget never passes timeout=0."""
+        page = FakePage()
+
+        async def slow_goto(*args, **kwargs) -> None:
+            await asyncio.sleep(0.02)
+
+        page.goto.side_effect = slow_goto
+
+        with pytest.raises(TimeoutError, match="selector #app"):
+            await parse_wait("load+selector:#app").navigate(
+                page, "https://example.com", 10
+            )
+
+        page.wait_for_selector.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_network_quiet_ignores_patterns(self) -> None:
+        """Test that quiet:MS waits for tracked requests but not ignored ones."""
+        page = FakePage()
+        strategy = parse_wait("quiet:100", ignore=["/beacon"])
+        api = Mock(url="https://example.com/api")
+        beacon = Mock(url="https://example.com/beacon?id=1")
+
+        async def load(*args, **kwargs) -> None:
+            page.emit("request", api)
+            page.emit("request", beacon)
+
+        page.goto.side_effect = load
+        loop = asyncio.get_running_loop()
+
+        async def finish_api() -> None:
+            await asyncio.sleep(0.2)
+            page.emit("requestfinished", api)
+
+        started = loop.time()
+        finisher = asyncio.create_task(finish_api())
+        await strategy.navigate(page, "https://example.com", 5000)
+        elapsed = loop.time() - started
+        await finisher
+
+        # Waited for the API call plus the quiet period, not the beacon
+        assert 0.3 <= elapsed < 2
+
+    @pytest.mark.asyncio
+    async def test_network_quiet_gives_up_at_timeout(self) -> None:
+        """Test that a page that never goes quiet is captured at the deadline."""
+        page = FakePage()
+        page.goto.side_effect = lambda *args, **kwargs: page.emit(
+            "request", Mock(url="https://example.com/poll")
+        )
+
+        await parse_wait("quiet:100").navigate(page, "https://example.com", 300)
+
+    @pytest.mark.asyncio
+    async def test_visual_stability(self) -> None:
+        """Test that stable:MS waits for two identical renders."""
+        page = FakePage()
+        page.screenshot.side_effect = [b"loading", b"spinner", b"done", b"done"]
+
+        await parse_wait("stable:10").navigate(page, "https://example.com", 5000)
+
+        assert page.screenshot.call_count == 4
+        assert page.screenshot.call_args.kwargs["full_page"] is False